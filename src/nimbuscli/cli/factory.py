@@ -36,9 +36,19 @@ class RunnerFactory:
     def _build_command(self, ns: Namespace) -> Command:
         match ns.command:
             case "up":
-                return self._command_fact.create_up(ns.selectors)
+                return self._command_fact.create_up(ns.selectors, ns.force)
             case "down":
                 return self._command_fact.create_down(ns.selectors)
+            case "backup" if ns.estimate:
+                return self._command_fact.create_estimate(ns.selectors)
             case "backup":
-                return self._command_fact.create_backup(ns.selectors)
+                return self._command_fact.create_backup(ns.selectors, ns.resume)
+            case "catalog":
+                return self._command_fact.create_catalog(ns.selectors, ns.sync)
+            case "prune":
+                return self._command_fact.create_prune(ns.selectors, ns.dry_run)
+            case "verify":
+                return self._command_fact.create_verify(ns.selectors, ns.deep, ns.bandwidth)
+            case "stats":
+                return self._command_fact.create_stats(ns.selectors, ns.days)
         raise ValueError("unknown command")
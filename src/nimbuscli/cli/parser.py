@@ -37,6 +37,11 @@ def create_parser() -> ArgumentParser:
         default="",
         help="glob patterns to filter services",
     )
+    up.add_argument(
+        "--force",
+        action="store_true",
+        help="restart the running services, even if they haven't changed",
+    )
 
     # -- Down
     down = commands.add_parser("down")
@@ -55,5 +60,76 @@ def create_parser() -> ArgumentParser:
         default="",
         help="glob patterns to filter directory groups",
     )
+    backup.add_argument(
+        "--resume",
+        action="store_true",
+        help="resume the interrupted backup run",
+    )
+    backup.add_argument(
+        "--estimate",
+        action="store_true",
+        help="estimate the size and the duration of the backup, without creating it",
+    )
+
+    # -- Catalog
+    catalog = commands.add_parser("catalog")
+    catalog.add_argument(
+        "selectors",
+        nargs="*",
+        default="",
+        help="glob patterns to filter directory groups",
+    )
+    catalog.add_argument(
+        "--sync",
+        action="store_true",
+        help="synchronize the catalog with the backup destinations",
+    )
+
+    # -- Prune
+    prune = commands.add_parser("prune")
+    prune.add_argument(
+        "selectors",
+        nargs="*",
+        default="",
+        help="glob patterns to filter directory groups",
+    )
+    prune.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only report the backups that would be removed",
+    )
+
+    # -- Verify
+    verify = commands.add_parser("verify")
+    verify.add_argument(
+        "selectors",
+        nargs="*",
+        default="",
+        help="glob patterns to filter directory groups",
+    )
+    verify.add_argument(
+        "--deep",
+        action="store_true",
+        help="test the structure of each local archive",
+    )
+    verify.add_argument(
+        "--bandwidth",
+        type=float,
+        help="limit the read bandwidth, in MB/s",
+    )
+
+    # -- Stats
+    stats = commands.add_parser("stats")
+    stats.add_argument(
+        "selectors",
+        nargs="*",
+        default="",
+        help="glob patterns to filter directory groups and services",
+    )
+    stats.add_argument(
+        "--days",
+        type=int,
+        help="compare only the runs of the last days",
+    )
 
     return parser
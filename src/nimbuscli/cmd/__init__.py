@@ -1,4 +1,9 @@
 from nimbuscli.cmd.backup import Backup
+from nimbuscli.cmd.catalog import Catalog
 from nimbuscli.cmd.command import Command, ExecutionResult
 from nimbuscli.cmd.deploy import Down, Up
+from nimbuscli.cmd.estimate import Estimate
 from nimbuscli.cmd.factory import CfgCommandFactory, CommandFactory
+from nimbuscli.cmd.prune import Prune
+from nimbuscli.cmd.stats import Stats
+from nimbuscli.cmd.verify import Verify
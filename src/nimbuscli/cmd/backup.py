@@ -6,12 +6,19 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from logdecorator import log_on_end, log_on_start
+from logdecorator import log_on_end, log_on_error, log_on_start
 
 from nimbuscli.cmd.command import Action, ActionResult, Command
-from nimbuscli.core.archive import ArchivalStatus, Archiver
-from nimbuscli.core.upload import Uploader, UploadProgress, UploadStatus
+from nimbuscli.core.archive import ArchivalStatus, Archiver, StreamSource
+from nimbuscli.core.upload import TransferPool, Uploader, UploadProgress, UploadStatus
 from nimbuscli.provider import DirectoryProvider, DirectoryResource
+from nimbuscli.state import (
+    BackupCatalog,
+    CatalogEntry,
+    FingerprintStore,
+    Journal,
+    fingerprint,
+)
 
 
 class Backup(Command):
@@ -26,12 +33,22 @@ class Backup(Command):
         provider: DirectoryProvider,
         archiver: Archiver,
         uploader: Uploader = None,
+        journal: Journal = None,
+        resume: bool = False,
+        fingerprints: FingerprintStore = None,
+        pool: TransferPool = None,
+        catalog: BackupCatalog = None,
     ):
         super().__init__("Backup", selectors)
         self._destination = Path(destination).expanduser().as_posix()
         self._provider = provider
         self._archiver = archiver
         self._uploader = uploader
+        self._journal = journal
+        self._resume = resume and journal is not None
+        self._fingerprints = fingerprints
+        self._pool = pool
+        self._catalog = catalog
 
     def _config(self) -> dict[str, Any]:
         cfg = {
@@ -39,9 +56,18 @@ class Backup(Command):
             "Upload": bool(self._uploader),
         }
 
+        if self._resume:
+            cfg["Resume"] = True
+
+        if self._fingerprints:
+            cfg["Skip Unchanged"] = True
+
         if self._uploader:
             cfg |= self._uploader.config()
 
+        if self._uploader and self._pool:
+            cfg["Parallel Uploads"] = self._pool.workers
+
         return cfg
 
     @log_on_end(logging.DEBUG, "Pipeline: {result!r}")
@@ -55,6 +81,14 @@ class Backup(Command):
 
     @log_on_end(logging.DEBUG, "Mapped {selectors!r} to {result!s}")
     def _map_directories(self, selectors: list[str]) -> DirectoryMappingActionResult:
+        if self._journal:
+            # When resuming an interrupted run without explicit selectors,
+            # the selectors of the interrupted run are used.
+            if self._resume and self._journal.load():
+                selectors = selectors if selectors else self._journal.selectors
+            else:
+                self._journal.start(selectors)
+
         return DirectoryMappingActionResult(
             self._provider.resolve(selectors),
         )
@@ -64,46 +98,186 @@ class Backup(Command):
 
         for group in mapping.entries:
             for directory in group.directories:
-                backup = BackupEntry(group.name, directory)
+                result.entries.append(self._backup_directory(group.name, directory))
+            for source in group.streams:
+                result.entries.append(self._backup_directory(group.name, source.name, source))
 
-                archive_path = self._generate_backup_path(
-                    self._destination,
-                    backup.group,
-                    backup.directory,
-                )
+        self._record_catalog([self._archive_entry(e) for e in result.entries if e.success])
 
-                os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+        if not self._uploader:
+            self._record_fingerprints([e for e in result.entries if e.success])
+            self._complete_journal(result.processed)
 
-                backup.archive = self._archiver.archive(
-                    backup.directory,
-                    archive_path,
-                )
+        return result
 
-                result.entries.append(backup)
+    def _backup_directory(self, group: str, directory: str, source: StreamSource = None) -> BackupEntry:
+        backup = BackupEntry(group, directory)
+
+        if resumed := self._resumed_archive(group, directory):
+            backup.archive = resumed
+            backup.resumed = True
+            backup.fingerprint = self._journal.entry(group, directory).fingerprint
+            return backup
+
+        # The output of the stream sources cannot be fingerprinted.
+        if self._fingerprints and source is None:
+            backup.fingerprint = self._fingerprint(directory)
+            if backup.fingerprint and backup.fingerprint == self._fingerprints.get(group, directory):
+                backup.unchanged = True
+                return backup
+
+        archive_path = self._generate_backup_path(
+            self._destination,
+            backup.group,
+            backup.directory,
+        )
 
-        return result
+        os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+
+        if self._journal:
+            self._journal.planned(group, directory, archive_path, backup.fingerprint)
+
+        if source is not None:
+            backup.archive = self._archiver.archive_stream(source, archive_path)
+        else:
+            backup.archive = self._archiver.archive(backup.directory, archive_path)
+
+        if self._journal and backup.success:
+            self._journal.archived(group, directory, backup.archive.started, backup.archive.completed)
+
+        return backup
+
+    def _resumed_archive(self, group: str, directory: str) -> ArchivalStatus | None:
+        if not self._resume or not (entry := self._journal.entry(group, directory)):
+            return None
+
+        if not entry.is_archived:
+            # The archival has been interrupted,
+            # so the partially created archive is removed.
+            if entry.archive and os.path.exists(entry.archive):
+                os.remove(entry.archive)
+            return None
+
+        status = ArchivalStatus(directory, entry.archive)
+        status.started = entry.archive_started
+        status.completed = entry.archive_completed
+        return status if status.success else None
 
     def _upload(self, backups: BackupActionResult) -> UploadActionResult:
-        result = UploadActionResult([])
+        archives = [b for b in backups.entries if b.success]
+
+        # The archives are uploaded concurrently through the shared pool,
+        # while the order of the upload entries follows the order of the backups.
+        if self._pool:
+            result = UploadActionResult(self._pool.map(lambda b: b.archive.size, self._upload_archive, archives))
+        else:
+            result = UploadActionResult([self._upload_archive(b) for b in archives])
+
+        self._record_catalog([c for e in result.entries if e.success for c in self._upload_entries(e)])
+        self._record_fingerprints([e.backup for e in result.entries if e.success])
+        self._complete_journal(backups.processed + result.entries)
+
+        return result
 
-        for backup in filter(lambda e: e.success, backups.entries):
-            entry = UploadEntry(backup)
+    def _upload_archive(self, backup: BackupEntry) -> UploadEntry:
+        entry = UploadEntry(backup)
 
-            upload_key = self._generate_upload_key(
+        upload_key = self._generate_upload_key(
+            backup.group,
+            backup.directory,
+            backup.archive.archive,
+        )
+
+        if resumed := self._resumed_upload(backup, upload_key):
+            entry.upload = resumed
+            entry.resumed = True
+            return entry
+
+        entry.upload = self._uploader.upload(
+            backup.archive.archive,
+            upload_key,
+            ProgressTracker(entry),
+        )
+
+        if self._journal and entry.success:
+            self._journal.uploaded(
                 backup.group,
                 backup.directory,
-                backup.archive.archive,
+                entry.upload.key,
+                entry.upload.size,
+                entry.upload.started,
+                entry.upload.completed,
             )
 
-            entry.upload = self._uploader.upload(
-                backup.archive.archive,
-                upload_key,
-                ProgressTracker(entry),
-            )
+        return entry
+
+    def _resumed_upload(self, backup: BackupEntry, key: str) -> UploadStatus | None:
+        if not self._resume or not (entry := self._journal.entry(backup.group, backup.directory)):
+            return None
+
+        if not entry.is_uploaded or entry.key != key:
+            return None
+
+        status = UploadStatus(backup.archive.archive, entry.key)
+        status.location = self._uploader.location
+        status.size = entry.size
+        status.started = entry.upload_started
+        status.completed = entry.upload_completed
+        return status
+
+    def _complete_journal(self, entries: list[BackupEntry | UploadEntry]) -> None:
+        # The journal is kept until every entry succeeds,
+        # so the failed entries could be retried with '--resume'.
+        if self._journal and all(e.success for e in entries):
+            self._journal.complete()
+
+    def _archive_entry(self, backup: BackupEntry) -> CatalogEntry:
+        return CatalogEntry(
+            self._destination,
+            Path(os.path.relpath(backup.archive.archive, self._destination)).as_posix(),
+            backup.archive.size,
+            backup.archive.completed,
+            backup.directory,
+        )
 
-            result.entries.append(entry)
+    def _upload_entries(self, entry: UploadEntry) -> list[CatalogEntry]:
+        # The archive uploaded to several destinations is recorded once per destination.
+        statuses = entry.upload.destinations.values() if entry.upload.destinations else [entry.upload]
+        return [
+            CatalogEntry(
+                s.location,
+                s.key,
+                s.size,
+                s.completed,
+                entry.backup.directory,
+                s.digest if s.digest else entry.upload.digest,
+                s.checksum_algorithm,
+                s.checksum,
+                s.storage_class,
+            )
+            for s in statuses
+            if s.success and s.location
+        ]
 
-        return result
+    @log_on_error(logging.WARNING, "Failed to update the catalog: {e!r}", on_exceptions=Exception, reraise=False)
+    def _record_catalog(self, entries: list[CatalogEntry]) -> None:
+        # All the archives of the action are recorded in a single transaction.
+        if self._catalog and entries:
+            self._catalog.record(entries)
+
+    @log_on_error(
+        logging.WARNING, "Failed to fingerprint {directory!s}: {e!r}", on_exceptions=Exception, reraise=False
+    )
+    def _fingerprint(self, directory: str) -> str | None:
+        return fingerprint(directory)
+
+    def _record_fingerprints(self, entries: list[BackupEntry]) -> None:
+        # The fingerprint is recorded only after the backup is completed,
+        # including the upload, so the failed backups are never skipped.
+        if self._fingerprints:
+            for entry in filter(lambda e: e.fingerprint, entries):
+                self._fingerprints.update(entry.group, entry.directory, entry.fingerprint)
+            self._fingerprints.save()
 
     def _generate_backup_path(self, destination: str, group: str, directory: str) -> str:
         now = datetime.now().strftime("%Y-%m-%d_%H%M")
@@ -144,6 +318,9 @@ class BackupEntry:
         self.group: str = group
         self.directory: str = directory
         self.archive: ArchivalStatus = None
+        self.resumed: bool = False
+        self.unchanged: bool = False
+        self.fingerprint: str = None
 
     @property
     def success(self) -> bool:
@@ -156,6 +333,7 @@ class UploadEntry:
         self.backup: BackupEntry = backup
         self.upload: UploadStatus = None
         self.progress: list[UploadProgress] = []
+        self.resumed: bool = False
 
     @property
     def success(self) -> bool:
@@ -170,7 +348,19 @@ class BackupActionResult(ActionResult[list[BackupEntry]]):
 
     @property
     def success(self) -> bool:
-        return any(b.success for b in self.entries)
+        return any(b.success or b.unchanged for b in self.entries)
+
+    @property
+    def unchanged(self) -> list[BackupEntry]:
+        return [b for b in self.entries if b.unchanged]
+
+    @property
+    def processed(self) -> list[BackupEntry]:
+        return [b for b in self.entries if not b.unchanged]
+
+    @property
+    def failed(self) -> list[BackupEntry]:
+        return [b for b in self.entries if not b.success and not b.unchanged]
 
     @property
     def total_size(self) -> int:
@@ -181,7 +371,8 @@ class UploadActionResult(ActionResult[list[UploadEntry]]):
 
     @property
     def success(self) -> bool:
-        return any(e.success for e in self.entries)
+        # There is nothing to upload, if all directories are unchanged.
+        return not self.entries or any(e.success for e in self.entries)
 
     @property
     def total_size(self) -> int:
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import fnmatch
+import logging
+from typing import Any
+
+from logdecorator import log_on_end
+
+from nimbuscli.cmd.command import Action, ActionResult, Command
+from nimbuscli.core.upload import Uploader
+from nimbuscli.state import BackupCatalog, CatalogEntry
+
+
+class Catalog(Command):
+    """
+    List the backups from the local catalog, without listing the destinations.
+    """
+
+    def __init__(
+        self,
+        selectors: list[str],
+        catalog: BackupCatalog,
+        destinations: list[Uploader],
+        sync: bool = False,
+    ):
+        """
+        Creates a new instance of the Catalog command.
+
+        :param selectors: Glob patterns of the directory groups to list.
+        :param catalog: The local catalog of the backups.
+        :param destinations: The local destination and the upload destinations of the backups.
+        :param sync: Synchronize the catalog with the content of the destinations before listing.
+        """
+        super().__init__("Catalog", selectors)
+        self._catalog = catalog
+        self._destinations = destinations
+        self._sync = sync
+
+    def _config(self) -> dict[str, Any]:
+        cfg = {"Locations": ", ".join(d.location for d in self._destinations)}
+        if self._sync:
+            cfg["Sync"] = True
+        return cfg
+
+    @log_on_end(logging.DEBUG, "Pipeline: {result!r}")
+    def _pipeline(self) -> list[Action]:
+        return [
+            Action(self._list),
+        ]
+
+    @log_on_end(logging.DEBUG, "Listed {selectors!r}: {result!s}")
+    def _list(self, selectors: list[str]) -> CatalogActionResult:
+        synced = [self._synchronize(d) for d in self._destinations] if self._sync else []
+        return CatalogActionResult(
+            [
+                e
+                for e in self._catalog.entries()
+                if not selectors or any(fnmatch.filter([e.group], sel) for sel in selectors)
+            ],
+            synced,
+        )
+
+    def _synchronize(self, destination: Uploader) -> SyncEntry:
+        entry = SyncEntry(destination.location)
+        try:
+            entry.added, entry.removed = self._catalog.sync(destination.location, destination.list_objects())
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            entry.exception = e
+        return entry
+
+
+class SyncEntry:
+
+    def __init__(self, location: str):
+        self.location: str = location
+        self.added: int = 0
+        self.removed: int = 0
+        self.exception: Exception = None
+
+    def __str__(self) -> str:
+        return self.location
+
+    @property
+    def success(self) -> bool:
+        return self.exception is None
+
+
+class CatalogActionResult(ActionResult[list[CatalogEntry]]):
+
+    def __init__(self, entries: list[CatalogEntry] = None, synced: list[SyncEntry] = None):
+        super().__init__(entries)
+        self.synced: list[SyncEntry] = synced if synced else []
+
+    @property
+    def success(self) -> bool:
+        # The catalog is still listed, when only some of the destinations are unavailable.
+        return not self.synced or any(e.success for e in self.synced)
+
+    @property
+    def locations(self) -> dict[str, list[CatalogEntry]]:
+        locations: dict[str, list[CatalogEntry]] = {}
+        for entry in self.entries:
+            locations.setdefault(entry.location, []).append(entry)
+        return locations
+
+    @property
+    def total_size(self) -> int:
+        return sum(entry.size for entry in self.entries)
@@ -2,13 +2,24 @@ from __future__ import annotations
 
 import logging
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from typing import Any
 
 from logdecorator import log_on_end
 
 from nimbuscli.cmd.command import Action, ActionResult, Command
-from nimbuscli.core.deploy import OperationStatus, Service
+from nimbuscli.core.deploy import (
+    CycleError,
+    DeploymentGraph,
+    DeploymentPool,
+    ImagePuller,
+    OperationStatus,
+    Service,
+)
+from nimbuscli.core.execute import CompletedProcess
 from nimbuscli.provider import ServiceFactory, ServiceProvider, ServiceResource
+from nimbuscli.state import FingerprintStore
 
 
 class Deployment(Command):
@@ -22,19 +33,43 @@ class Deployment(Command):
         selectors: list[str],
         provider: ServiceProvider,
         factory: ServiceFactory,
+        pool: DeploymentPool = None,
+        dependencies: dict[str, list[str]] = None,
     ):
+        """
+        Creates a new instance of the Deployment command.
+
+        :param name: Name of the command.
+        :param selectors: Glob patterns of the services to operate on.
+        :param provider: Provider of the services.
+        :param factory: Factory of the services.
+        :param pool: Pool, that runs the operations concurrently. The services are operated one by one by default.
+        :param dependencies: Names of the services, that each service depends on, in addition to
+            the dependencies declared by the services themselves.
+        """
         super().__init__(name, selectors)
         self._provider = provider
         self._factory = factory
+        self._pool = pool if pool else DeploymentPool()
+        self._dependencies = dependencies if dependencies else {}
 
     def _config(self) -> dict[str, Any]:
-        return {}
+        cfg = {}
+
+        if self._pool.workers > 1:
+            cfg["Parallel Deployments"] = self._pool.workers
+
+        if self._pool.fail_fast:
+            cfg["Fail Fast"] = True
+
+        return cfg
 
     @log_on_end(logging.DEBUG, "Pipeline: {result!r}")
     def _pipeline(self) -> list[Action]:
         return [
             Action(self._map_services),
             Action(self._create_services),
+            Action(self._plan),
             Action(self._deploy),
         ]
 
@@ -50,32 +85,164 @@ class Deployment(Command):
             [self._factory.create_service(srv) for srv in mapping.entries],
         )
 
-    def _deploy(self, services: CreateServicesActionResult) -> DeploymentActionResult:
+    @log_on_end(logging.DEBUG, "Plan: {result!r}")
+    def _plan(self, services: CreateServicesActionResult) -> DeploymentPlanActionResult:
+        # Reading the dependencies could require running the service tools, e.g. 'docker compose config'.
+        with ThreadPoolExecutor(max_workers=self._pool.workers) as executor:
+            declared = list(executor.map(lambda srv: srv.dependencies() or [], services.entries))
+
+        dependencies = {
+            srv.name: [*self._dependencies.get(srv.name, []), *deps] for srv, deps in zip(services.entries, declared)
+        }
+
+        plan = DeploymentPlanActionResult(services.entries)
+        try:
+            plan.graph = self._order(DeploymentGraph(services.entries, dependencies))
+        except CycleError as e:
+            plan.exception = e
+        return plan
+
+    def _deploy(self, plan: DeploymentPlanActionResult) -> DeploymentActionResult:
+        statuses = self._pool.run(plan.entries, lambda srv: self._operation(srv, plan), plan.graph)
+
+        # The services of the same name are a single node of the graph, that is done
+        # once all of them are done, so the slowest of them is on the critical path.
+        processed: dict[str, OperationStatus] = {}
+        for s in statuses:
+            if (
+                not s.cancel
+                and not s.skip
+                and (s.service not in processed or s.elapsed > processed[s.service].elapsed)
+            ):
+                processed[s.service] = s
+        path = plan.graph.critical_path({name: s.elapsed for name, s in processed.items()})
         return DeploymentActionResult(
             self._name,
-            [self._operation(service) for service in services.entries],
+            statuses,
+            [processed[name] for name in path],
         )
 
+    def _order(self, graph: DeploymentGraph) -> DeploymentGraph:
+        """
+        Returns the graph in the order of the operation.
+        """
+        return graph
+
     @abstractmethod
-    def _operation(self, service: Service) -> OperationStatus:
+    def _operation(self, service: Service, plan: DeploymentPlanActionResult) -> OperationStatus:
         pass
 
 
 class Up(Deployment):
 
-    def __init__(self, arguments: list[str], provider: ServiceProvider, factory: ServiceFactory):
-        super().__init__("Up", arguments, provider, factory)
+    def __init__(
+        self,
+        arguments: list[str],
+        provider: ServiceProvider,
+        factory: ServiceFactory,
+        pool: DeploymentPool = None,
+        dependencies: dict[str, list[str]] = None,
+        puller: ImagePuller = None,
+        fingerprints: FingerprintStore = None,
+        force: bool = False,
+    ):
+        """
+        Creates a new instance of the Up command.
+
+        :param arguments: Glob patterns of the services to start.
+        :param provider: Provider of the services.
+        :param factory: Factory of the services.
+        :param pool: Pool, that runs the operations concurrently.
+        :param dependencies: Names of the services, that each service depends on.
+        :param puller: Puller of the images of all the services, before any of them is started.
+            Each service pulls its own images, if not specified.
+        :param fingerprints: Fingerprints of the services, taken after their last successful start.
+            The running services, which fingerprint hasn't changed, are skipped.
+        :param force: Whether to start the services, even if they haven't changed.
+        """
+        super().__init__("Up", arguments, provider, factory, pool, dependencies)
+        self._puller = puller
+        self._fingerprints = fingerprints
+        self._force = force
+
+    def _config(self) -> dict[str, Any]:
+        cfg = super()._config()
+
+        if self._puller:
+            cfg["Parallel Pulls"] = self._puller.workers
+
+        if self._fingerprints:
+            cfg["Skip Unchanged"] = not self._force
+
+        return cfg
+
+    @log_on_end(logging.DEBUG, "Pipeline: {result!r}")
+    def _pipeline(self) -> list[Action]:
+        pull = [Action(self._pull)] if self._puller else []
+        return [
+            Action(self._map_services),
+            Action(self._create_services),
+            Action(self._plan),
+            *pull,
+            Action(self._deploy),
+        ]
+
+    def _pull(self, plan: DeploymentPlanActionResult) -> ImagePullActionResult:
+        # The images are shared by many services, e.g. the databases, so each one is pulled once.
+        # The services, which images have failed to pull, pull them on their own, and report the failure.
+        # The services without the images to pull are up to date, unless their images have failed to be read.
+        images = [srv.images() for srv in plan.entries]
+        result = ImagePullActionResult(plan, self._puller.pull([img for imgs in images if imgs for img in imgs]))
+        result.pulled = [
+            srv
+            for srv, imgs in zip(plan.entries, images)
+            if imgs is not None and all(result.pulls[img].success for img in imgs)
+        ]
+        return result
+
+    def _deploy(self, plan: DeploymentPlanActionResult) -> DeploymentActionResult:
+        result = super()._deploy(plan)
+
+        # The fingerprint is recorded only after the successful start,
+        # so the failed services are never skipped.
+        if self._fingerprints:
+            for status in filter(lambda s: s.fingerprint, result.entries):
+                self._fingerprints.update(status.kind, status.service, status.fingerprint)
+            self._fingerprints.save()
+
+        return result
 
-    def _operation(self, service: Service) -> OperationStatus:
-        return service.start()
+    def _operation(self, service: Service, plan: DeploymentPlanActionResult) -> OperationStatus:
+        # The fingerprint reflects the images, that would be started, only once they have been pulled,
+        # so the services, which images have failed to pull, are started to pull them on their own.
+        if self._fingerprints and not self._force and service in plan.pulled:
+            previous = self._fingerprints.get(service.kind, service.name)
+            if previous and previous == service.fingerprint() and service.running():
+                return OperationStatus.unchanged(service)
+
+        status = service.start(pull=service not in plan.pulled)
+        if self._fingerprints and status.success:
+            status.fingerprint = service.fingerprint()
+        return status
 
 
 class Down(Deployment):
 
-    def __init__(self, arguments: list[str], provider: ServiceProvider, factory: ServiceFactory):
-        super().__init__("Down", arguments, provider, factory)
+    def __init__(
+        self,
+        arguments: list[str],
+        provider: ServiceProvider,
+        factory: ServiceFactory,
+        pool: DeploymentPool = None,
+        dependencies: dict[str, list[str]] = None,
+    ):
+        super().__init__("Down", arguments, provider, factory, pool, dependencies)
+
+    def _order(self, graph: DeploymentGraph) -> DeploymentGraph:
+        # The dependent services are stopped before the services they depend on.
+        return graph.reversed()
 
-    def _operation(self, service: Service) -> OperationStatus:
+    def _operation(self, service: Service, plan: DeploymentPlanActionResult) -> OperationStatus:
         return service.stop()
 
 
@@ -87,11 +254,55 @@ class CreateServicesActionResult(ActionResult[list[Service]]):
     pass
 
 
+class DeploymentPlanActionResult(ActionResult[list[Service]]):
+
+    def __init__(self, entries: list[Service] = None):
+        super().__init__(entries)
+        self.graph: DeploymentGraph = None
+        self.pulled: list[Service] = []
+        self.exception: Exception = None
+
+    def __repr__(self) -> str:
+        return repr(self.graph) if self.graph else repr(self.exception)
+
+    @property
+    def success(self) -> bool:
+        return self.exception is None
+
+
+class ImagePullActionResult(DeploymentPlanActionResult):
+    """
+    The plan of the deployment, which services have their images pulled already.
+    """
+
+    def __init__(self, plan: DeploymentPlanActionResult, pulls: dict[str, CompletedProcess]):
+        super().__init__(plan.entries)
+        self.graph = plan.graph
+        self.pulls = pulls
+
+    def __repr__(self) -> str:
+        return "[" + ", ".join(self.pulls) + "]"
+
+    @property
+    def failed(self) -> list[str]:
+        return [image for image, proc in self.pulls.items() if not proc.success]
+
+
 class DeploymentActionResult(ActionResult[list[OperationStatus]]):
 
-    def __init__(self, operation: str, entries: list[OperationStatus] = None):
+    def __init__(
+        self,
+        operation: str,
+        entries: list[OperationStatus] = None,
+        critical_path: list[OperationStatus] = None,
+    ):
         super().__init__(entries)
         self.operation = operation
+        self.critical_path = critical_path if critical_path else []
+
+    @property
+    def critical_elapsed(self) -> timedelta:
+        return sum((s.elapsed for s in self.critical_path), timedelta())
 
     @property
     def success(self) -> bool:
@@ -103,4 +314,12 @@ class DeploymentActionResult(ActionResult[list[OperationStatus]]):
 
     @property
     def failed(self) -> list[OperationStatus]:
-        return [srv for srv in self.entries if not srv.success]
+        return [srv for srv in self.entries if not srv.success and not srv.cancel]
+
+    @property
+    def cancelled(self) -> list[OperationStatus]:
+        return [srv for srv in self.entries if srv.cancel]
+
+    @property
+    def unchanged(self) -> list[OperationStatus]:
+        return [srv for srv in self.entries if srv.skip]
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import logging
+import statistics
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from logdecorator import log_on_end, log_on_error
+
+from nimbuscli.cmd.backup import DirectoryMappingActionResult
+from nimbuscli.cmd.command import Action, ActionResult, Command
+from nimbuscli.core.archive import SizeEstimate, SizeEstimator
+from nimbuscli.provider import DirectoryProvider
+from nimbuscli.state import FileIndex, HistoryRecord, IndexRoot, RunHistory
+
+
+class Estimate(Command):
+    """
+    Estimate the size and the duration of the backups, without creating any archive.
+
+    The size comes from the sampled compression of each directory. The durations come
+    from the historical throughput of the same directory, or of all the directories,
+    and the archival falls back to the speed of the sampled compression.
+    """
+
+    HISTORY = "history"
+    SAMPLE = "sample"
+
+    def __init__(
+        self,
+        selectors: list[str],
+        provider: DirectoryProvider,
+        estimator: SizeEstimator,
+        history: RunHistory,
+        upload: bool = False,
+    ):
+        """
+        Creates a new instance of the Estimate command.
+
+        :param selectors: Glob patterns of the directory groups to estimate.
+        :param provider: Provider of the directory groups.
+        :param estimator: Estimator of the archive size.
+        :param history: The history of the runs, that gives the throughput.
+        :param upload: Whether the backups are uploaded, so the upload time is estimated.
+        """
+        super().__init__("Estimate", selectors)
+        self._provider = provider
+        self._estimator = estimator
+        self._history = history
+        self._upload = upload
+
+    def _config(self) -> dict[str, Any]:
+        return {"Upload": self._upload}
+
+    @log_on_end(logging.DEBUG, "Pipeline: {result!r}")
+    def _pipeline(self) -> list[Action]:
+        return [
+            Action(self._map_directories),
+            Action(self._estimate),
+        ]
+
+    @log_on_end(logging.DEBUG, "Mapped {selectors!r} to {result!s}")
+    def _map_directories(self, selectors: list[str]) -> DirectoryMappingActionResult:
+        return DirectoryMappingActionResult(
+            self._provider.resolve(selectors),
+        )
+
+    def _estimate(self, mapping: DirectoryMappingActionResult) -> EstimateActionResult:
+        # The failed entries and the uploads, that haven't sent anything, would skew the throughput.
+        records = [r for r in self._records() or [] if r.success]
+        archives = [(r.name, r.source_speed) for r in records if r.kind == HistoryRecord.ARCHIVE and r.source_size]
+        uploads = [(r.name, r.speed) for r in records if r.kind == HistoryRecord.UPLOAD and r.size]
+
+        # The metadata of all the directories is collected in a single pass,
+        # and the estimator only samples the files of each directory.
+        result = EstimateActionResult([])
+        index = FileIndex.build(mapping.entries)
+        roots = {(r.group, r.directory): r for r in index.roots}
+        for group in mapping.entries:
+            for directory in group.directories:
+                root = roots[(group.name, directory)]
+                if root.exception:
+                    entry = EstimateEntry(group.name, directory)
+                    entry.exception = root.exception
+                    result.entries.append(entry)
+                    continue
+                entries = self._entries(index, root)
+                result.entries.append(self._estimate_directory(group.name, directory, entries, archives, uploads))
+            for source in group.streams:
+                result.entries.append(self._estimate_stream(group.name, source.name, records, uploads))
+        return result
+
+    def _entries(self, index: FileIndex, root: IndexRoot) -> list[tuple[str, int, int]]:
+        start, end = root.files.start, root.files.stop
+        return list(zip(index.paths(root.files), index.sizes[start:end], index.modes[start:end]))
+
+    @log_on_error(logging.WARNING, "Failed to read the run history: {e!r}", on_exceptions=Exception, reraise=False)
+    def _records(self) -> list[HistoryRecord]:
+        return self._history.records()
+
+    def _estimate_directory(
+        self,
+        group: str,
+        directory: str,
+        entries: list[tuple[str, int, int]],
+        archives: list[tuple[str, int]],
+        uploads: list[tuple[str, int]],
+    ) -> EstimateEntry:
+        entry = EstimateEntry(group, directory)
+        try:
+            entry.estimate = self._estimator.estimate(directory, entries)
+            entry.archive_size = entry.estimate.archive_size
+
+            speed = self._speed(archives, entry.name)
+            if speed:
+                entry.basis = Estimate.HISTORY
+            else:
+                speed = entry.estimate.compression_speed
+                entry.basis = Estimate.SAMPLE
+            if speed:
+                entry.archive_time = timedelta(seconds=entry.estimate.source_size / speed)
+
+            self._estimate_upload(entry, uploads)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            entry.exception = e
+        return entry
+
+    def _estimate_stream(
+        self,
+        group: str,
+        name: str,
+        records: list[HistoryRecord],
+        uploads: list[tuple[str, int]],
+    ) -> EstimateEntry:
+        # The output of the stream source is known only after it has been archived.
+        entry = EstimateEntry(group, name)
+        archives = [r for r in records if r.kind == HistoryRecord.ARCHIVE and r.name == entry.name and r.size]
+        if archives:
+            entry.archive_size = archives[-1].size
+            entry.archive_time = timedelta(seconds=statistics.median(r.elapsed.total_seconds() for r in archives))
+            entry.basis = Estimate.HISTORY
+            self._estimate_upload(entry, uploads)
+        return entry
+
+    def _estimate_upload(self, entry: EstimateEntry, uploads: list[tuple[str, int]]) -> None:
+        if self._upload and (speed := self._speed(uploads, entry.name)):
+            entry.upload_time = timedelta(seconds=entry.archive_size / speed)
+
+    def _speed(self, speeds: list[tuple[str, int]], name: str) -> int | None:
+        # The throughput of the same directory is preferred, since it has the same kind of files.
+        values = [s for n, s in speeds if n == name and s] or [s for _, s in speeds if s]
+        return int(statistics.median(values)) if values else None
+
+
+class EstimateEntry:
+
+    def __init__(self, group: str, directory: str):
+        self.group: str = group
+        self.directory: str = directory
+        self.estimate: SizeEstimate = None
+        self.archive_size: int = None
+        self.archive_time: timedelta = None
+        self.upload_time: timedelta = None
+        self.basis: str = None
+        self.exception: Exception = None
+
+    def __repr__(self) -> str:
+        params = [
+            f"group='{self.group}'",
+            f"directory='{self.directory}'",
+            f"size='{self.archive_size}'",
+            f"archive='{self.archive_time}'",
+            f"upload='{self.upload_time}'",
+        ]
+        return "EstimateEntry(" + ", ".join(params) + ")"
+
+    def __str__(self) -> str:
+        return self.name
+
+    @property
+    def name(self) -> str:
+        return f"{self.group}/{Path(self.directory).name}"
+
+    @property
+    def success(self) -> bool:
+        return self.exception is None
+
+    @property
+    def known(self) -> bool:
+        return self.success and self.archive_size is not None
+
+
+class EstimateActionResult(ActionResult[list[EstimateEntry]]):
+
+    @property
+    def success(self) -> bool:
+        return all(e.success for e in self.entries)
+
+    @property
+    def source_size(self) -> int:
+        return sum(e.estimate.source_size for e in self.entries if e.success and e.estimate)
+
+    @property
+    def archive_size(self) -> int:
+        return sum(e.archive_size for e in self.entries if e.known)
+
+    @property
+    def archive_time(self) -> timedelta:
+        return sum((e.archive_time for e in self.entries if e.known and e.archive_time), timedelta())
+
+    @property
+    def upload_time(self) -> timedelta:
+        return sum((e.upload_time for e in self.entries if e.known and e.upload_time), timedelta())
+
+    @property
+    def unknown(self) -> list[EstimateEntry]:
+        return [e for e in self.entries if not e.known]
@@ -1,17 +1,43 @@
 from __future__ import annotations
 
 import logging
+import os
 from abc import ABC, abstractmethod
+from datetime import timedelta
 
 from logdecorator import log_on_end, log_on_error, log_on_start
 
 from nimbuscli.cmd.backup import Backup
+from nimbuscli.cmd.catalog import Catalog
 from nimbuscli.cmd.command import Command
 from nimbuscli.cmd.deploy import Down, Up
+from nimbuscli.cmd.estimate import Estimate
+from nimbuscli.cmd.prune import Prune
+from nimbuscli.cmd.stats import Stats
+from nimbuscli.cmd.verify import Verify
 from nimbuscli.config import Config
-from nimbuscli.core.archive import Archiver, RarArchiver, TarArchiver, ZipArchiver
+from nimbuscli.core.archive import (
+    Archiver,
+    RarArchiver,
+    SizeEstimator,
+    TarArchiver,
+    ZipArchiver,
+)
+from nimbuscli.core.deploy import DeploymentPool, DockerService, ImagePuller
 from nimbuscli.core.execute import SubprocessRunner
-from nimbuscli.core.upload import AwsUploader, Uploader
+from nimbuscli.core.retention import RetentionPolicy
+from nimbuscli.core.upload import (
+    AwsUploader,
+    FanoutUploader,
+    FileSystemUploader,
+    ProgressAggregator,
+    S3Endpoint,
+    TokenBucket,
+    TransferPool,
+    TransferTuner,
+    Uploader,
+    log_progress,
+)
 from nimbuscli.provider import (
     DirectoryProvider,
     Secrets,
@@ -19,6 +45,15 @@ from nimbuscli.provider import (
     ServiceFactory,
     ServiceProvider,
 )
+from nimbuscli.state import (
+    BackupCatalog,
+    DigestStore,
+    FingerprintStore,
+    Journal,
+    ManifestStore,
+    MultipartStore,
+    RunHistory,
+)
 
 
 class CommandFactory(ABC):
@@ -27,11 +62,31 @@ class CommandFactory(ABC):
     """
 
     @abstractmethod
-    def create_backup(self, selectors: list[str]) -> Command:
+    def create_backup(self, selectors: list[str], resume: bool = False) -> Command:
         pass
 
     @abstractmethod
-    def create_up(self, selectors: list[str]) -> Command:
+    def create_estimate(self, selectors: list[str]) -> Command:
+        pass
+
+    @abstractmethod
+    def create_catalog(self, selectors: list[str], sync: bool = False) -> Command:
+        pass
+
+    @abstractmethod
+    def create_prune(self, selectors: list[str], dry_run: bool = False) -> Command:
+        pass
+
+    @abstractmethod
+    def create_verify(self, selectors: list[str], deep: bool = False, bandwidth: float = None) -> Command:
+        pass
+
+    @abstractmethod
+    def create_stats(self, selectors: list[str], days: int = None) -> Command:
+        pass
+
+    @abstractmethod
+    def create_up(self, selectors: list[str], force: bool = False) -> Command:
         pass
 
     @abstractmethod
@@ -48,26 +103,97 @@ class CfgCommandFactory(CommandFactory):
             "tar": Config({"provider": "tar", "compress": "xz"}),
             "zip": Config({"provider": "zip", "compress": "xz"}),
         }
+        self._progress: ProgressAggregator = None
+        self._stores: dict[str, DigestStore | MultipartStore | ManifestStore] = {}
 
     @log_on_start(logging.DEBUG, "Creating Backup command")
     @log_on_error(logging.ERROR, "Failed to create Backup command: {e!r}", on_exceptions=Exception)
-    def create_backup(self, selectors: list[str]) -> Command:
+    def create_backup(self, selectors: list[str], resume: bool = False) -> Command:
         cfg = self._cfg.commands.backup
         return Backup(
             selectors,
             cfg.destination,
-            DirectoryProvider(cfg.directories),
+            DirectoryProvider(cfg.directories, SubprocessRunner()),
             self.create_archiver(cfg.archive),
-            self.create_uploader(cfg.upload),
+            (
+                self.create_fanout_uploader(cfg.upload, self._megabytes(cfg.upload_buffer))
+                if isinstance(cfg.upload, list)
+                else self.create_uploader(cfg.upload)
+            ),
+            Journal(self.state_path("backup.journal.json")),
+            resume,
+            FingerprintStore(self.state_path("backup.fingerprints.json")) if cfg.skip_unchanged else None,
+            self.create_transfer_pool(cfg.upload[0] if isinstance(cfg.upload, list) else cfg.upload),
+            self.create_catalog_store(),
+        )
+
+    @log_on_start(logging.DEBUG, "Creating Estimate command")
+    @log_on_error(logging.ERROR, "Failed to create Estimate command: {e!r}", on_exceptions=Exception)
+    def create_estimate(self, selectors: list[str]) -> Command:
+        cfg = self._cfg.commands.backup
+        return Estimate(
+            selectors,
+            DirectoryProvider(cfg.directories, SubprocessRunner()),
+            SizeEstimator(self.create_archiver(cfg.archive)),
+            RunHistory(self.state_path("history.db")),
+            bool(cfg.upload),
         )
 
+    @log_on_start(logging.DEBUG, "Creating Catalog command")
+    @log_on_error(logging.ERROR, "Failed to create Catalog command: {e!r}", on_exceptions=Exception)
+    def create_catalog(self, selectors: list[str], sync: bool = False) -> Command:
+        cfg = self._cfg.commands.backup
+
+        # The local archives are listed the same way as the archives in a mounted destination.
+        destinations = [FileSystemUploader(cfg.destination), *self.create_destinations(cfg.upload)]
+
+        return Catalog(selectors, self.create_catalog_store(), destinations, sync)
+
+    @log_on_start(logging.DEBUG, "Creating Prune command")
+    @log_on_error(logging.ERROR, "Failed to create Prune command: {e!r}", on_exceptions=Exception)
+    def create_prune(self, selectors: list[str], dry_run: bool = False) -> Command:
+        cfg = self._cfg.commands.backup
+        policies = {pattern: RetentionPolicy(**policy) for pattern, policy in (cfg.retention or Config({})).items()}
+        return Prune(
+            selectors,
+            policies,
+            self.create_catalog_store(),
+            FileSystemUploader(cfg.destination),
+            self.create_destinations(cfg.upload),
+            dry_run,
+        )
+
+    @log_on_start(logging.DEBUG, "Creating Verify command")
+    @log_on_error(logging.ERROR, "Failed to create Verify command: {e!r}", on_exceptions=Exception)
+    def create_verify(self, selectors: list[str], deep: bool = False, bandwidth: float = None) -> Command:
+        cfg = self._cfg.commands.backup
+        return Verify(
+            selectors,
+            self.create_catalog_store(),
+            self.create_archiver(cfg.archive),
+            FileSystemUploader(cfg.destination),
+            self.create_destinations(cfg.upload),
+            deep,
+            TokenBucket(int(self._megabytes(bandwidth))) if bandwidth else None,
+        )
+
+    @log_on_start(logging.DEBUG, "Creating Stats command")
+    @log_on_error(logging.ERROR, "Failed to create Stats command: {e!r}", on_exceptions=Exception)
+    def create_stats(self, selectors: list[str], days: int = None) -> Command:
+        return Stats(selectors, RunHistory(self.state_path("history.db")), days)
+
     @log_on_start(logging.DEBUG, "Creating Up command")
     @log_on_error(logging.ERROR, "Failed to create Up command: {e!r}", on_exceptions=Exception)
-    def create_up(self, selectors: list[str]) -> Command:
+    def create_up(self, selectors: list[str], force: bool = False) -> Command:
         return Up(
             selectors,
             self.create_service_provider(),
             self.create_service_factory(),
+            self.create_deployment_pool(),
+            self.deploy_dependencies(),
+            ImagePuller(SubprocessRunner(), self._cfg.commands.deploy.pull_workers or 4),
+            FingerprintStore(self.state_path("deploy.fingerprints.json")),
+            force,
         )
 
     @log_on_start(logging.DEBUG, "Creating Down command")
@@ -77,6 +203,8 @@ class CfgCommandFactory(CommandFactory):
             selectors,
             self.create_service_provider(),
             self.create_service_factory(),
+            self.create_deployment_pool(),
+            self.deploy_dependencies(),
         )
 
     @log_on_start(logging.DEBUG, "Creating Archiver: [{profile!s}]")
@@ -95,9 +223,9 @@ class CfgCommandFactory(CommandFactory):
                 case "rar":
                     return RarArchiver(SubprocessRunner(), p.password, p.compress, p.recovery)
                 case "tar":
-                    return TarArchiver(p.compress)
+                    return TarArchiver(p.compress, p.password)
                 case "zip":
-                    return ZipArchiver(p.compress)
+                    return ZipArchiver(p.compress, p.password)
 
         return None
 
@@ -106,27 +234,122 @@ class CfgCommandFactory(CommandFactory):
     @log_on_error(logging.ERROR, "Failed to create Uploader: {e!r}", on_exceptions=Exception)
     def create_uploader(self, profile: str) -> Uploader:
         if cfg := self._cfg.first("profiles.upload", lambda x: x.name == profile):
-            if cfg.provider == "aws":
-                return AwsUploader(
-                    cfg.access_key,
-                    cfg.secret_key,
-                    cfg.bucket,
-                    cfg.storage,
-                )
+            limiter = TokenBucket(int(self._megabytes(cfg.bandwidth))) if cfg.bandwidth else None
+            match cfg.provider:
+                case "aws":
+                    return AwsUploader(
+                        cfg.access_key,
+                        cfg.secret_key,
+                        cfg.bucket,
+                        cfg.storage if cfg.storage else "STANDARD",
+                        TransferTuner(
+                            self._megabytes(cfg.part_size),
+                            cfg.concurrency,
+                            self._megabytes(cfg.threshold),
+                        ),
+                        limiter,
+                        bool(cfg.dedup),
+                        self._state_store(DigestStore, "upload.digests.json") if cfg.dedup else None,
+                        self._state_store(MultipartStore, "upload.multipart.json") if cfg.resumable else None,
+                        timedelta(days=cfg.abandon_after) if cfg.abandon_after else None,
+                        self._state_store(ManifestStore, "upload.manifests.json") if cfg.delta else None,
+                        self.create_progress_aggregator(),
+                        cfg.checksum,
+                        S3Endpoint(
+                            cfg.endpoint, cfg.addressing, cfg.region, cfg.max_connections, bool(cfg.keep_alive)
+                        ),
+                        cfg.parallel if cfg.parallel else 1,
+                    )
+                case "filesystem":
+                    return FileSystemUploader(cfg.directory, limiter, self.create_progress_aggregator())
+
+        return None
+
+    @log_on_start(logging.DEBUG, "Creating Fanout Uploader: {profiles!r}")
+    @log_on_end(logging.DEBUG, "Created Fanout Uploader: {result!r}")
+    @log_on_error(logging.ERROR, "Failed to create Fanout Uploader: {e!r}", on_exceptions=Exception)
+    def create_fanout_uploader(self, profiles: list[str], buffer_size: int = None) -> Uploader:
+        if len(profiles) == 1:
+            return self.create_uploader(profiles[0])
+
+        destinations = {p: self.create_uploader(p) for p in profiles}
+        if missing := [p for p, u in destinations.items() if u is None]:
+            raise ValueError(f"Unknown upload profiles: {', '.join(missing)}")
 
+        return FanoutUploader(destinations, buffer_size)
+
+    @log_on_start(logging.DEBUG, "Creating Transfer Pool: [{profile!s}]")
+    @log_on_end(logging.DEBUG, "Created Transfer Pool: {result!r}")
+    @log_on_error(logging.ERROR, "Failed to create Transfer Pool: {e!r}", on_exceptions=Exception)
+    def create_transfer_pool(self, profile: str) -> TransferPool:
+        cfg = self._cfg.first("profiles.upload", lambda x: x.name == profile)
+        if cfg and cfg.parallel and cfg.parallel > 1:
+            return TransferPool(cfg.parallel, self._megabytes(cfg.max_inflight))
         return None
 
+    def create_destinations(self, profiles: list[str] | str | None) -> list[Uploader]:
+        """
+        Create an uploader for each of the upload destinations.
+        """
+        profiles = profiles if isinstance(profiles, list) else [profiles] if profiles else []
+        return [u for u in map(self.create_uploader, profiles) if u is not None]
+
+    def create_catalog_store(self) -> BackupCatalog:
+        return BackupCatalog(self.state_path("backup.catalog.db"))
+
+    def create_progress_aggregator(self) -> ProgressAggregator:
+        # A single aggregator is shared by all the uploaders,
+        # so the overall progress covers every concurrent transfer.
+        if self._progress is None:
+            self._progress = ProgressAggregator(ProgressAggregator.LOG_INTERVAL)
+            self._progress.subscribe(log_progress)
+        return self._progress
+
+    def _megabytes(self, value: int | float | str | None) -> int | float | str | None:
+        return value * 1024 * 1024 if isinstance(value, (int, float)) else value
+
+    def _state_store(self, store: type, name: str) -> DigestStore | MultipartStore | ManifestStore:
+        # The uploaders of the fan-out run concurrently, so they share a single store of each state file,
+        # which serializes the updates, instead of overwriting the entries of each other.
+        if name not in self._stores:
+            self._stores[name] = store(self.state_path(name))
+        return self._stores[name]
+
+    def state_path(self, name: str) -> str:
+        """
+        Returns a full path to the state file with the given name.
+        """
+        directory = self._cfg.nested("state.directory")
+        directory = directory if directory else "~/.nimbus/state"
+        return os.path.join(os.path.expanduser(directory), name)
+
     @log_on_start(logging.DEBUG, "Creating Service Provider")
     @log_on_end(logging.DEBUG, "Created Service Provider: {result!r}")
     @log_on_error(logging.ERROR, "Failed to create Service Provider: {e!r}", on_exceptions=Exception)
     def create_service_provider(self) -> ServiceProvider:
         return ServiceProvider(self._cfg.commands.deploy.services)
 
+    @log_on_start(logging.DEBUG, "Creating Deployment Pool")
+    @log_on_end(logging.DEBUG, "Created Deployment Pool: {result!r}")
+    @log_on_error(logging.ERROR, "Failed to create Deployment Pool: {e!r}", on_exceptions=Exception)
+    def create_deployment_pool(self) -> DeploymentPool:
+        cfg = self._cfg.commands.deploy
+        return DeploymentPool(cfg.workers if cfg.workers else 1, bool(cfg.fail_fast))
+
+    def deploy_dependencies(self) -> dict[str, list[str]]:
+        """
+        Returns the dependencies between the services, that are declared in the config.
+        """
+        return dict((self._cfg.commands.deploy.dependencies or Config({})).items())
+
     @log_on_start(logging.DEBUG, "Creating Service Factory")
     @log_on_end(logging.DEBUG, "Created Service Factory: {result!r}")
     @log_on_error(logging.ERROR, "Failed to create Service Factory: {e!r}", on_exceptions=Exception)
     def create_service_factory(self) -> ServiceFactory:
+        cfg = self._cfg.commands.deploy
         return ServiceFactory(
             SubprocessRunner(),
-            Secrets(SecretsProvider(self._cfg.commands.deploy.secrets)),
+            Secrets(SecretsProvider(cfg.secrets)),
+            cfg.strategy or DockerService.RESTART,
+            list(cfg.bluegreen or []),
         )
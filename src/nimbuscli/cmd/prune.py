@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import fnmatch
+import logging
+import posixpath
+from typing import Any
+
+from logdecorator import log_on_end, log_on_error
+
+from nimbuscli.cmd.command import Action, ActionResult, Command
+from nimbuscli.core.retention import RetentionPolicy
+from nimbuscli.core.upload import Uploader
+from nimbuscli.state import BackupCatalog, CatalogEntry
+
+
+class Prune(Command):
+    """
+    Remove the backups, that are not kept by the retention policies.
+    """
+
+    def __init__(
+        self,
+        selectors: list[str],
+        policies: dict[str, RetentionPolicy],
+        catalog: BackupCatalog,
+        local: Uploader,
+        remote: list[Uploader],
+        dry_run: bool = False,
+    ):
+        """
+        Creates a new instance of the Prune command.
+
+        :param selectors: Glob patterns of the directory groups to prune.
+        :param policies: Retention policies by the glob pattern of the directory group.
+            The first matching policy is applied, and the groups without a policy are never pruned.
+        :param catalog: The local catalog of the backups.
+        :param local: The local destination. Its archives are listed from the file system.
+        :param remote: The upload destinations. Their archives are listed from the catalog.
+        :param dry_run: Only report the backups, that would be removed.
+        """
+        super().__init__("Prune", selectors)
+        self._policies = policies
+        self._catalog = catalog
+        self._local = local
+        self._remote = remote
+        self._dry_run = dry_run
+
+    def _config(self) -> dict[str, Any]:
+        cfg: dict[str, Any] = {f"Retention [{pattern}]": str(policy) for pattern, policy in self._policies.items()}
+        if self._dry_run:
+            cfg["Dry Run"] = True
+        return cfg
+
+    @log_on_end(logging.DEBUG, "Pipeline: {result!r}")
+    def _pipeline(self) -> list[Action]:
+        return [
+            Action(self._prune),
+        ]
+
+    def _prune(self, selectors: list[str]) -> PruneActionResult:
+        entries = [self._prune_location(self._local, selectors, local=True)]
+        entries += [self._prune_location(d, selectors) for d in self._remote]
+        return PruneActionResult(entries, self._dry_run)
+
+    def _prune_location(self, destination: Uploader, selectors: list[str], local: bool = False) -> PruneEntry:
+        entry = PruneEntry(destination.location)
+        try:
+            archives = self._archives(destination, local)
+            entry.kept = len(archives)
+            entry.expired = self._expired(archives, selectors)
+            entry.kept -= len(entry.expired)
+
+            if not self._dry_run and entry.expired:
+                entry.failures = destination.delete_objects([a.key for a in entry.expired])
+                self._forget(entry)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            entry.exception = e
+        return entry
+
+    @log_on_error(logging.WARNING, "Failed to update the catalog: {e!r}", on_exceptions=Exception, reraise=False)
+    def _forget(self, entry: PruneEntry) -> None:
+        self._catalog.remove(entry.location, [a.key for a in entry.removed])
+
+    def _archives(self, destination: Uploader, local: bool) -> list[CatalogEntry]:
+        if local:
+            return [CatalogEntry(destination.location, o.key, o.size, o.modified) for o in destination.list_objects()]
+        return self._catalog.entries(destination.location)
+
+    @log_on_end(logging.DEBUG, "Expired: {result!r}")
+    def _expired(self, archives: list[CatalogEntry], selectors: list[str]) -> list[CatalogEntry]:
+        # The policy is applied to the backups of each directory on its own.
+        series: dict[str, list[CatalogEntry]] = {}
+        for archive in archives:
+            if not selectors or any(fnmatch.filter([archive.group], sel) for sel in selectors):
+                series.setdefault(posixpath.dirname(archive.key), []).append(archive)
+
+        expired = []
+        for backups in series.values():
+            if policy := self._policy(backups[0].group):
+                expired += policy.expired(backups, lambda a: a.created)
+        return expired
+
+    def _policy(self, group: str) -> RetentionPolicy | None:
+        for pattern, policy in self._policies.items():
+            if fnmatch.filter([group], pattern):
+                return policy
+        return None
+
+
+class PruneEntry:
+
+    def __init__(self, location: str):
+        self.location: str = location
+        self.kept: int = 0
+        self.expired: list[CatalogEntry] = []
+        self.failures: dict[str, Exception] = {}
+        self.exception: Exception = None
+
+    def __str__(self) -> str:
+        return self.location
+
+    @property
+    def success(self) -> bool:
+        return self.exception is None and not self.failures
+
+    @property
+    def removed(self) -> list[CatalogEntry]:
+        if self.exception:
+            return []
+        return [a for a in self.expired if a.key not in self.failures]
+
+    @property
+    def freed_size(self) -> int:
+        return sum(a.size for a in self.removed)
+
+
+class PruneActionResult(ActionResult[list[PruneEntry]]):
+
+    def __init__(self, entries: list[PruneEntry] = None, dry_run: bool = False):
+        super().__init__(entries)
+        self.dry_run: bool = dry_run
+
+    @property
+    def success(self) -> bool:
+        return all(e.success for e in self.entries)
+
+    @property
+    def freed_size(self) -> int:
+        return sum(e.freed_size for e in self.entries)
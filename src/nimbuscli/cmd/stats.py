@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import fnmatch
+import logging
+import statistics
+from datetime import datetime, timedelta
+from typing import Any
+
+from logdecorator import log_on_end
+
+from nimbuscli.cmd.command import Action, ActionResult, Command
+from nimbuscli.state import HistoryRecord, RunHistory
+
+
+class Stats(Command):
+    """
+    Show the performance of the previous runs, and flag the series,
+    which latest run is slower than the most of their history.
+    """
+
+    def __init__(
+        self,
+        selectors: list[str],
+        history: RunHistory,
+        days: int = None,
+        min_history: int = 5,
+    ):
+        """
+        Creates a new instance of the Stats command.
+
+        :param selectors: Glob patterns of the directory groups or the services to show.
+        :param history: The history of the runs.
+        :param days: Only the runs of the last days are compared, if specified.
+        :param min_history: Number of the previous runs, that are needed to flag a regression.
+        """
+        if days is not None and days <= 0:
+            raise ValueError("The number of days should be either None or a positive number.")
+
+        if min_history < 1:
+            raise ValueError("The minimal history should be a positive number.")
+
+        super().__init__("Stats", selectors)
+        self._history = history
+        self._days = days
+        self._min_history = min_history
+
+    def _config(self) -> dict[str, Any]:
+        return {"Period": f"{self._days} days"} if self._days else {}
+
+    @log_on_end(logging.DEBUG, "Pipeline: {result!r}")
+    def _pipeline(self) -> list[Action]:
+        return [
+            Action(self._stats),
+        ]
+
+    def _stats(self, selectors: list[str]) -> StatsActionResult:
+        since = datetime.now() - timedelta(days=self._days) if self._days else None
+
+        # The failed entries and the uploads, that haven't sent anything, would skew the measurements.
+        series: dict[tuple[str, str, str], list[HistoryRecord]] = {}
+        for record in self._history.records(since=since):
+            if not record.success or (record.kind == HistoryRecord.UPLOAD and not record.size):
+                continue
+            if not selectors or any(fnmatch.filter([record.group], sel) for sel in selectors):
+                series.setdefault((record.kind, record.name, record.detail), []).append(record)
+
+        return StatsActionResult(
+            [
+                SeriesStats(kind, name, detail, records, self._min_history)
+                for (kind, name, detail), records in series.items()
+            ]
+        )
+
+
+class SeriesStats:
+    """
+    Statistics of the series of the same measured entry, e.g. the archives of a directory.
+
+    The series with the size are measured by the speed, and the rest by the duration.
+    The percentiles are the percentiles of the slowness, so the 90th percentile
+    is the value, that 90% of the runs have been faster than.
+    """
+
+    def __init__(self, kind: str, name: str, detail: str, records: list[HistoryRecord], min_history: int = 5):
+        """
+        Creates a new instance of the SeriesStats.
+
+        :param kind: Kind of the records.
+        :param name: Name of the series.
+        :param detail: Detail of the series, e.g. the command of the process.
+        :param records: The successful records, ordered by the time.
+        :param min_history: Number of the previous runs, that are needed to flag a regression.
+        """
+        self.kind = kind
+        self.name = name
+        self.detail = detail
+        self.records = records
+        self.min_history = min_history
+
+    def __repr__(self) -> str:
+        params = [
+            f"kind='{self.kind}'",
+            f"name='{self.name}'",
+            f"detail='{self.detail}'",
+            f"runs='{self.runs}'",
+        ]
+        return "SeriesStats(" + ", ".join(params) + ")"
+
+    @property
+    def sized(self) -> bool:
+        return all(r.size is not None for r in self.records)
+
+    @property
+    def runs(self) -> int:
+        return len(self.records)
+
+    @property
+    def latest(self) -> float:
+        return self._values(self.records)[-1]
+
+    @property
+    def p50(self) -> float:
+        return self._percentile(self._values(self.records), 50)
+
+    @property
+    def p90(self) -> float:
+        return self._percentile(self._values(self.records), 90)
+
+    @property
+    def ratio(self) -> float | None:
+        ratios = [r.ratio for r in self.records if r.ratio]
+        return statistics.median(ratios) if ratios else None
+
+    @property
+    def trend(self) -> float | None:
+        """
+        Relative change of the median of the recent half of the runs to the median
+        of the older half. The positive trend is faster, and the negative is slower.
+        """
+        if self.runs < 4:
+            return None
+
+        values = self._values(self.records)
+        half = len(values) // 2
+        older = statistics.median(values[:half])
+        recent = statistics.median(values[half:])
+        if not older or not recent:
+            return None
+        return recent / older - 1 if self.sized else older / recent - 1
+
+    @property
+    def regression(self) -> bool:
+        """
+        Whether the latest run is slower than the 90th percentile of the previous runs.
+        """
+        previous = self._values(self.records[:-1])
+        if len(previous) < self.min_history:
+            return False
+
+        threshold = self._percentile(previous, 90)
+        return self.latest < threshold if self.sized else self.latest > threshold
+
+    def _values(self, records: list[HistoryRecord]) -> list[float]:
+        if self.sized:
+            return [float(r.speed) for r in records]
+        return [r.elapsed.total_seconds() for r in records]
+
+    def _percentile(self, values: list[float], percentile: int) -> float:
+        if len(values) == 1:
+            return values[0]
+
+        # The faster runs have the higher speed, but the lower duration.
+        percentile = 100 - percentile if self.sized else percentile
+        return statistics.quantiles(values, n=100, method="inclusive")[percentile - 1]
+
+
+class StatsActionResult(ActionResult[list[SeriesStats]]):
+
+    @property
+    def success(self) -> bool:
+        return True
+
+    @property
+    def regressions(self) -> list[SeriesStats]:
+        return [s for s in self.entries if s.regression]
+
+    @property
+    def kinds(self) -> dict[str, list[SeriesStats]]:
+        kinds: dict[str, list[SeriesStats]] = {}
+        for entry in sorted(self.entries, key=lambda s: (s.kind, s.name, s.detail or "")):
+            kinds.setdefault(entry.kind, []).append(entry)
+        return kinds
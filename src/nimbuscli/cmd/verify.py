@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import fnmatch
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from logdecorator import log_on_end, log_on_error
+
+from nimbuscli.cmd.command import Action, ActionResult, Command
+from nimbuscli.core.archive import Archiver
+from nimbuscli.core.upload import (
+    AwsUploader,
+    RemoteObject,
+    TokenBucket,
+    Uploader,
+    file_digest,
+)
+from nimbuscli.state import BackupCatalog, CatalogEntry
+
+
+class Verify(Command):
+    """
+    Check the integrity of the local archives and of the uploaded archives.
+
+    The local archives are hashed concurrently and compared to the digests
+    known to the catalog. The uploaded archives are compared to the checksums,
+    that are stored with the objects, or to the sampled ranges of the verified
+    local copy, so the remote objects are never downloaded as a whole.
+    """
+
+    # Size of each range, that is compared to the local copy.
+    SAMPLE_SIZE = 1024 * 1024
+
+    def __init__(
+        self,
+        selectors: list[str],
+        catalog: BackupCatalog,
+        archiver: Archiver,
+        local: Uploader,
+        remote: list[Uploader],
+        deep: bool = False,
+        limiter: TokenBucket = None,
+        samples: int = 4,
+        workers: int = None,
+    ):
+        """
+        Creates a new instance of the Verify command.
+
+        :param selectors: Glob patterns of the directory groups to verify.
+        :param catalog: The local catalog of the backups.
+        :param archiver: The archiver of the backups, that tests the structure of the archives.
+        :param local: The local destination. Its archives are listed from the file system.
+        :param remote: The upload destinations. Their archives are listed from the catalog.
+        :param deep: Test the structure of each local archive, reading all its members.
+        :param limiter: Limit of the read bandwidth shared by the hashing and the sampling.
+            The structural tests are not limited.
+        :param samples: Number of the ranges, that are compared for the objects without a stored checksum.
+        :param workers: Number of the concurrent checks. The number of CPUs is used by default.
+        """
+        if samples < 1:
+            raise ValueError("The number of samples should be a positive number.")
+
+        if workers is not None and workers <= 0:
+            raise ValueError("The number of workers should be either None or a positive number.")
+
+        super().__init__("Verify", selectors)
+        self._catalog = catalog
+        self._archiver = archiver
+        self._local = local
+        self._remote = remote
+        self._deep = deep
+        self._limiter = limiter
+        self._samples = samples
+        self._workers = workers if workers else os.cpu_count() or 1
+
+    def _config(self) -> dict[str, Any]:
+        cfg: dict[str, Any] = {"Locations": ", ".join([self._local.location, *(d.location for d in self._remote)])}
+        if self._deep:
+            cfg["Deep"] = True
+        if self._limiter:
+            cfg["Bandwidth"] = f"{self._limiter.rate / 1024 / 1024:g} MB/s"
+        return cfg
+
+    @log_on_end(logging.DEBUG, "Pipeline: {result!r}")
+    def _pipeline(self) -> list[Action]:
+        return [
+            Action(self._verify),
+        ]
+
+    def _verify(self, selectors: list[str]) -> VerifyActionResult:
+        entries = self._verify_local(selectors)
+
+        # Only the verified local archives are trusted as the reference for the samples.
+        verified = {e.key: e for e in entries if e.success and e.key}
+        for destination in self._remote:
+            entries += self._verify_remote(destination, selectors, verified)
+
+        return VerifyActionResult(entries)
+
+    def _verify_local(self, selectors: list[str]) -> list[VerifyEntry]:
+        try:
+            objects = [o for o in self._local.list_objects() if self._selected(o.key, selectors)]
+            expected = self._expected()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return [VerifyEntry(self._local.location, exception=e)]
+
+        # The hashing releases the GIL, so the files are hashed in parallel by the threads.
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            entries = list(executor.map(lambda o: self._verify_file(o, expected.get(o.key)), objects))
+
+        if self._deep:
+            self._test_structure([e for e in entries if e.success and e.key.endswith(f".{self._archiver.extension}")])
+
+        if recorded := [e for e in entries if e.success and e.method == VerifyEntry.RECORDED]:
+            self._record(recorded, {o.key: o for o in objects})
+
+        return entries
+
+    def _expected(self) -> dict[str, tuple[int, str | None]]:
+        # The size of the local entry is preferred, while the digest is the same
+        # for all the copies of the archive, so it could come from any location.
+        entries: dict[str, CatalogEntry] = {}
+        digests: dict[tuple[str, int], str] = {}
+        for entry in self._catalog.entries():
+            if entry.location == self._local.location or entry.key not in entries:
+                entries[entry.key] = entry
+            if entry.digest:
+                digests[(entry.key, entry.size)] = entry.digest
+        return {k: (e.size, e.digest or digests.get((k, e.size))) for k, e in entries.items()}
+
+    @log_on_end(logging.DEBUG, "Verified {obj.key!s}: {result!r}")
+    def _verify_file(self, obj: RemoteObject, expected: tuple[int, str | None] | None) -> VerifyEntry:
+        entry = VerifyEntry(self._local.location, obj.key, obj.size)
+        size, digest = expected if expected else (obj.size, None)
+        try:
+            if size != obj.size:
+                raise IntegrityError(obj.key, f"the size is {obj.size}, but {size} is expected")
+
+            entry.digest = file_digest(os.path.join(self._local.location, obj.key), self._limiter)
+            if digest:
+                if entry.digest != digest:
+                    raise IntegrityError(obj.key, f"the digest is '{entry.digest}', but '{digest}' is expected")
+                entry.method = VerifyEntry.DIGEST
+            else:
+                # The first verification records the digest, that the following ones are compared to.
+                entry.method = VerifyEntry.RECORDED
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            entry.exception = e
+        return entry
+
+    def _test_structure(self, entries: list[VerifyEntry]) -> None:
+        # The decompression is CPU bound, so the archives are tested by the processes.
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            futures = [(e, executor.submit(self._archiver.test, os.path.join(e.location, e.key))) for e in entries]
+            for entry, future in futures:
+                entry.tested = True
+                if e := future.exception():
+                    entry.exception = e
+
+    @log_on_error(logging.WARNING, "Failed to update the catalog: {e!r}", on_exceptions=Exception, reraise=False)
+    def _record(self, entries: list[VerifyEntry], objects: dict[str, RemoteObject]) -> None:
+        existing = {e.key: e for e in self._catalog.entries(self._local.location)}
+        recorded = []
+        for entry in entries:
+            obj = objects[entry.key]
+            known = existing.get(entry.key)
+            recorded.append(
+                CatalogEntry(
+                    entry.location,
+                    entry.key,
+                    entry.size,
+                    known.created if known else obj.modified,
+                    digest=entry.digest,
+                )
+            )
+        self._catalog.record(recorded)
+
+    def _verify_remote(
+        self,
+        destination: Uploader,
+        selectors: list[str],
+        verified: dict[str, VerifyEntry],
+    ) -> list[VerifyEntry]:
+        try:
+            archives = [a for a in self._catalog.entries(destination.location) if self._selected(a.key, selectors)]
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return [VerifyEntry(destination.location, exception=e)]
+
+        # The checks are dominated by the latency of the requests.
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            return list(executor.map(lambda a: self._verify_object(destination, a, verified.get(a.key)), archives))
+
+    @log_on_end(logging.DEBUG, "Verified {destination.location!s}/{archive.key!s}: {result!r}")
+    def _verify_object(
+        self,
+        destination: Uploader,
+        archive: CatalogEntry,
+        local: VerifyEntry | None,
+    ) -> VerifyEntry:
+        entry = VerifyEntry(destination.location, archive.key, archive.size)
+        try:
+            obj = destination.stat_object(archive.key)
+            if obj is None:
+                raise IntegrityError(archive.key, "the object is missing")
+            if obj.size != archive.size:
+                raise IntegrityError(archive.key, f"the size is {obj.size}, but {archive.size} is expected")
+
+            if archive.checksum and obj.checksum:
+                # The number of parts is not a part of the checksum itself.
+                if obj.checksum.split("-")[0] != archive.checksum.split("-")[0]:
+                    raise IntegrityError(
+                        archive.key, f"the checksum is '{obj.checksum}', but '{archive.checksum}' is expected"
+                    )
+                entry.method = VerifyEntry.CHECKSUM
+            elif local and local.size == obj.size and obj.storage_class not in AwsUploader.ARCHIVAL_STORAGE:
+                self._compare_samples(destination, local, obj.size)
+                entry.method = VerifyEntry.SAMPLES
+            else:
+                entry.method = VerifyEntry.SIZE
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            entry.exception = e
+        return entry
+
+    def _compare_samples(self, destination: Uploader, local: VerifyEntry, size: int) -> None:
+        # The samples are spread evenly, so the beginning and the end are always compared.
+        length = min(Verify.SAMPLE_SIZE, size)
+        offsets = sorted({(size - length) * i // max(self._samples - 1, 1) for i in range(self._samples)})
+
+        with open(os.path.join(local.location, local.key), "rb") as file:
+            for offset in offsets:
+                sample = destination.read_range(local.key, offset, length)
+                if self._limiter:
+                    self._limiter.consume(len(sample))
+
+                file.seek(offset)
+                if sample != file.read(length):
+                    raise IntegrityError(local.key, f"the content at {offset} differs from the local copy")
+
+    def _selected(self, key: str, selectors: list[str]) -> bool:
+        group = key.split("/", 1)[0]
+        return not selectors or any(fnmatch.filter([group], sel) for sel in selectors)
+
+
+class IntegrityError(Exception):
+    """
+    The archive doesn't match the one, that has been recorded.
+    """
+
+    def __init__(self, key: str, reason: str):
+        super().__init__(f"Integrity check of {key} failed: {reason}.")
+        self.key = key
+        self.reason = reason
+
+
+class VerifyEntry:
+
+    DIGEST = "digest"
+    RECORDED = "recorded"
+    CHECKSUM = "checksum"
+    SAMPLES = "samples"
+    SIZE = "size"
+
+    def __init__(self, location: str, key: str = None, size: int = None, exception: Exception = None):
+        self.location: str = location
+        self.key: str = key
+        self.size: int = size
+        self.method: str = None
+        self.digest: str = None
+        self.tested: bool = False
+        self.exception: Exception = exception
+
+    def __repr__(self) -> str:
+        params = [
+            f"location='{self.location}'",
+            f"key='{self.key}'",
+            f"method='{self.method}'",
+            f"tested='{self.tested}'",
+            f"exception={self.exception!r}",
+        ]
+        return "VerifyEntry(" + ", ".join(params) + ")"
+
+    def __str__(self) -> str:
+        return f"{self.location}/{self.key}" if self.key else self.location
+
+    @property
+    def success(self) -> bool:
+        return self.exception is None
+
+
+class VerifyActionResult(ActionResult[list[VerifyEntry]]):
+
+    @property
+    def success(self) -> bool:
+        return all(e.success for e in self.entries)
+
+    @property
+    def failed(self) -> list[VerifyEntry]:
+        return [e for e in self.entries if not e.success]
+
+    @property
+    def locations(self) -> dict[str, list[VerifyEntry]]:
+        locations: dict[str, list[VerifyEntry]] = {}
+        for entry in self.entries:
+            locations.setdefault(entry.location, []).append(entry)
+        return locations
+
+    @property
+    def total_size(self) -> int:
+        return sum(e.size for e in self.entries if e.success and e.size)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from strictyaml import Bool, Enum, Int, Map, MapPattern, Optional, Seq, Str
+from strictyaml import Bool, Enum, Float, Int, Map, MapPattern, Optional, Seq, Str
 
 
 def schema() -> Map:
@@ -11,6 +11,7 @@ def schema() -> Map:
         {
             Optional("observability"): observability(),
             Optional("profiles"): profiles(),
+            Optional("state"): state(),
             "commands": commands(),
         }
     )
@@ -35,6 +36,14 @@ def profiles() -> Map:
     )
 
 
+def state() -> Map:
+    return Map(
+        {
+            "directory": Str(),
+        }
+    )
+
+
 def commands() -> Map:
     return Map(
         {
@@ -124,12 +133,19 @@ def upload() -> Map:
                 "provider": Enum(
                     [
                         "aws",
+                        "filesystem",
                     ]
                 ),
-                "access_key": Str(),
-                "secret_key": Str(),
-                "bucket": Str(),
-                "storage": Enum(
+                Optional("access_key"): Str(),
+                Optional("secret_key"): Str(),
+                Optional("bucket"): Str(),
+                Optional("directory"): Str(),
+                Optional("endpoint"): Str(),
+                Optional("addressing"): Enum(["auto", "virtual", "path"]),
+                Optional("region"): Str(),
+                Optional("max_connections"): Int(),
+                Optional("keep_alive"): Bool(),
+                Optional("storage"): Enum(
                     [
                         "STANDARD",
                         "STANDARD_IA",
@@ -138,6 +154,17 @@ def upload() -> Map:
                         "DEEP_ARCHIVE",
                     ]
                 ),
+                Optional("part_size"): Enum(["auto"]) | Int(),
+                Optional("concurrency"): Enum(["auto"]) | Int(),
+                Optional("threshold"): Int(),
+                Optional("parallel"): Int(),
+                Optional("bandwidth"): Float(),
+                Optional("max_inflight"): Int(),
+                Optional("dedup"): Bool(),
+                Optional("resumable"): Bool(),
+                Optional("abandon_after"): Int(),
+                Optional("delta"): Bool(),
+                Optional("checksum"): Enum(["CRC32", "CRC32C", "SHA1", "SHA256"]),
             }
         )
     )
@@ -147,6 +174,15 @@ def deploy() -> Map:
     return Map(
         {
             "services": Seq(Str()),
+            Optional("workers"): Int(),
+            Optional("fail_fast"): Bool(),
+            Optional("pull_workers"): Int(),
+            Optional("strategy"): Enum(["restart", "update"]),
+            Optional("bluegreen"): Seq(Str()),
+            Optional("dependencies"): MapPattern(
+                Str(),
+                Seq(Str()),
+            ),
             Optional("secrets"): Seq(
                 Map(
                     {
@@ -167,10 +203,32 @@ def backup() -> Map:
         {
             "destination": Str(),
             "archive": Str(),
-            Optional("upload"): Str(),
+            Optional("upload"): Seq(Str()) | Str(),
+            Optional("upload_buffer"): Int(),
+            Optional("skip_unchanged"): Bool(),
+            Optional("retention"): MapPattern(
+                Str(),
+                Map(
+                    {
+                        Optional("last"): Int(),
+                        Optional("daily"): Int(),
+                        Optional("weekly"): Int(),
+                        Optional("monthly"): Int(),
+                        Optional("yearly"): Int(),
+                    }
+                ),
+            ),
             "directories": MapPattern(
                 Str(),
-                Seq(Str()),
+                Seq(
+                    Map(
+                        {
+                            "name": Str(),
+                            "command": Str(),
+                        }
+                    )
+                    | Str()
+                ),
             ),
         }
     )
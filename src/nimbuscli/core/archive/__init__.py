@@ -1,4 +1,10 @@
-from nimbuscli.core.archive.archiver import ArchivalStatus, Archiver
+from nimbuscli.core.archive.archiver import (
+    ArchivalStatus,
+    Archiver,
+    StreamArchivalStatus,
+    StreamSource,
+)
+from nimbuscli.core.archive.estimate import SizeEstimate, SizeEstimator
 from nimbuscli.core.archive.rar import RarArchivalStatus, RarArchiver
 from nimbuscli.core.archive.tar import TarArchiver
 from nimbuscli.core.archive.zip import ZipArchiver
@@ -4,10 +4,12 @@ import logging
 import os
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from typing import ContextManager
+from typing import BinaryIO, Callable, ContextManager
 
 from logdecorator import log_on_end, log_on_start
 
+from nimbuscli.core.execute import CompletedProcess, Runner
+
 
 class Archiver(ABC):
     """
@@ -25,6 +27,37 @@ class Archiver(ABC):
         :return: Status of the directory archival.
         """
 
+    def archive_stream(self, source: StreamSource, archive: str) -> ArchivalStatus:
+        """
+        Archive the output of the stream source as a single named member.
+
+        :param source: The command which output should be archived.
+        :param archive: A file path where the archive should be created.
+        :return: Status of the stream archival.
+        """
+        status = StreamArchivalStatus(source, archive)
+        status.exception = NotImplementedError(f"{self.__class__.__name__} doesn't support stream sources.")
+        return status
+
+    def compressed_size(self, data: bytes) -> int:
+        """
+        Compress the sample of the archived data with the settings of the archiver.
+        The archivers, that don't compress the data, store it as is.
+
+        :param data: A sample of the archived data.
+        :return: Size of the compressed sample.
+        """
+        return len(data)
+
+    def test(self, archive: str) -> None:
+        """
+        Test the structure of the archive, reading and checking all its members.
+
+        :param archive: Full path to the archive.
+        :raise Exception: If the archive is damaged or could not be read.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} doesn't support testing.")
+
     @property
     @abstractmethod
     def extension(self) -> str:
@@ -44,6 +77,7 @@ class FSArchiver(Archiver):
     def archive(self, directory: str, archive: str) -> ArchivalStatus:
         status = ArchivalStatus(directory, archive)
         status.started = datetime.now()
+        status.source_size = 0
 
         try:
             with self.init_archiver(archive) as arc:
@@ -52,6 +86,25 @@ class FSArchiver(Archiver):
                         file_path = os.path.join(root, file)
                         file_name = os.path.relpath(file_path, directory)
                         self.add_file(arc, file_path, file_name)
+                        status.source_size += os.lstat(file_path).st_size
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            status.exception = e
+
+        status.completed = datetime.now()
+        return status
+
+    @log_on_start(logging.INFO, "Archiving {source!s} -> {archive!s}")
+    @log_on_end(logging.INFO, "Archived [{result.success!s}]: {archive!s}")
+    def archive_stream(self, source: StreamSource, archive: str) -> ArchivalStatus:
+        status = StreamArchivalStatus(source, archive)
+        status.started = datetime.now()
+
+        try:
+            with self.init_archiver(archive) as arc:
+                status.proc = source.stream(lambda out: self.add_stream(arc, out, source.name))
+                if not status.proc.success:
+                    # Don't finalize the archive with the incomplete output.
+                    raise status.proc.exception or RuntimeError(f"Command exited with code {status.proc.exitcode}.")
         except Exception as e:  # pylint: disable=broad-exception-caught
             status.exception = e
 
@@ -78,6 +131,17 @@ class FSArchiver(Archiver):
         :param file_name: An alternative name for the file in the archive.
         """
 
+    @abstractmethod
+    def add_stream(self, arc: ContextManager, stream: BinaryIO, name: str) -> None:
+        """
+        Add the content of the stream to the archive using a previously created archiver.
+        The stream is read till the end, using a bounded amount of memory.
+
+        :param arc: An instance of the archiver, created with `init_archiver` method.
+        :param stream: A binary stream that is not seekable.
+        :param name: Name of the member in the archive.
+        """
+
 
 class ArchivalStatus:
 
@@ -87,6 +151,7 @@ class ArchivalStatus:
         self.started: datetime = None
         self.completed: datetime = None
         self.exception: Exception = None
+        self.source_size: int = None
 
     @property
     def success(self) -> bool:
@@ -114,3 +179,52 @@ class ArchivalStatus:
         if self.started is not None and self.completed is not None:
             return self.completed - self.started
         return None
+
+
+class StreamSource:
+    """
+    A command which standard output is archived as a named member.
+    """
+
+    def __init__(self, name: str, cmd: list[str] | str, runner: Runner):
+        """
+        Creates a new instance of the StreamSource.
+
+        :param name: Name of the archive member, e.g. 'database.sql'.
+        :param cmd: A command that writes the content to the standard output.
+        :param runner: Process runner.
+        """
+        if not name:
+            raise ValueError("The stream source name cannot be empty.")
+
+        if runner is None:
+            raise ValueError("The runner cannot be None")
+
+        self.name: str = name
+        self.cmd: list[str] | str = cmd
+        self._runner = runner
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __repr__(self) -> str:
+        params = [
+            f"name='{self.name}'",
+            f"cmd='{self.cmd}'",
+        ]
+        return "StreamSource(" + ", ".join(params) + ")"
+
+    def stream(self, consumer: Callable[[BinaryIO], None]) -> CompletedProcess:
+        return self._runner.stream(self.cmd, consumer)
+
+
+class StreamArchivalStatus(ArchivalStatus):
+
+    def __init__(self, source: StreamSource, archive: str):
+        super().__init__(source.name, archive)
+        self.source = source
+        self.proc: CompletedProcess = None
+
+    @property
+    def success(self) -> bool:
+        return all([self.proc is not None and self.proc.success, super().success])
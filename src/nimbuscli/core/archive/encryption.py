@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Callable, ContextManager, Iterator
+
+MAGIC = b"NIMBUS\x00\x01"
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_HEADER = struct.Struct(">8sI16s7s")
+_TAG_SIZE = 16
+_SCRYPT_N = 2**15
+_SCRYPT_R = 8
+_SCRYPT_P = 1
+
+
+def validate_password(password: str | None) -> None:
+    """
+    Ensure that the password could be used for the encryption,
+    and that the encryption backend is installed.
+
+    :raise ValueError: If the password is an empty string.
+    :raise RuntimeError: If the `cryptography` package is not available.
+    """
+    if password is None:
+        return
+
+    if password == "":
+        raise ValueError("If password is specified, it cannot be empty string.")
+
+    _cipher(bytes(32))
+
+
+def derive_key(password: str, salt: bytes) -> bytes:
+    """
+    Derive a 256-bit key from the password.
+    """
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=_SCRYPT_N,
+        r=_SCRYPT_R,
+        p=_SCRYPT_P,
+        maxmem=64 * 1024 * 1024,
+        dklen=32,
+    )
+
+
+class EncryptedWriter(io.RawIOBase):
+    """
+    A write-only, non-seekable binary stream that encrypts
+    everything written to it and stores the result in a file.
+
+    The encrypted file starts with a fixed-size header followed by
+    a sequence of independently sealed AES-256-GCM chunks:
+
+        header := MAGIC | chunk size (u32) | salt (16 bytes) | nonce prefix (7 bytes)
+        chunk  := ciphertext | tag (16 bytes)
+
+    The chunk nonce is built from the nonce prefix, the chunk index and
+    a flag that marks the last chunk. The header is authenticated with every
+    chunk, so the chunks cannot be reordered, dropped or truncated unnoticed,
+    but each of them could still be verified on its own.
+    """
+
+    def __init__(self, filepath: str, password: str, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Creates a new instance of the EncryptedWriter.
+
+        :param filepath: A file path where the encrypted data should be stored.
+        :param password: Password used to derive the encryption key.
+        :param chunk_size: Size of the plaintext chunk that is sealed independently.
+        """
+        if not password:
+            raise ValueError("The password cannot be None or empty.")
+
+        if chunk_size <= 0:
+            raise ValueError("The chunk size should be positive.")
+
+        super().__init__()
+        salt = os.urandom(16)
+        self._header = _HEADER.pack(MAGIC, chunk_size, salt, os.urandom(7))
+        self._cipher = _cipher(derive_key(password, salt))
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._index = 0
+        self._file = open(filepath, "wb")  # pylint: disable=consider-using-with
+        self._file.write(self._header)
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._buffer += b
+
+        # The last chunk should be sealed with the 'final' flag,
+        # so a full chunk is flushed only when there is more data after it.
+        if len(self._buffer) > self._chunk_size:
+            offset = 0
+            with memoryview(self._buffer) as view:
+                while len(view) - offset > self._chunk_size:
+                    end = offset + self._chunk_size
+                    self._seal(view[offset:end], final=False)
+                    offset = end
+            del self._buffer[:offset]
+
+        return len(b)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            self._seal(bytes(self._buffer), final=True)
+            self._buffer.clear()
+        finally:
+            self._file.close()
+            super().close()
+
+    def abort(self) -> None:
+        """
+        Close the underlying file without sealing the final chunk.
+        The produced file would fail the verification.
+        """
+        self._file.close()
+        super().close()
+
+    def _seal(self, data: bytes, final: bool) -> None:
+        nonce = _nonce(self._header, self._index, final)
+        self._file.write(self._cipher.encrypt(nonce, data, self._header))
+        self._index += 1
+
+
+class DecryptedReader(io.RawIOBase):
+    """
+    A read-only, seekable binary stream
+    that decrypts and authenticates an encrypted file.
+
+    The chunks are sealed independently, so only the chunk at the current
+    position is decrypted and kept in the memory, and it is authenticated
+    before any of its data is returned.
+    """
+
+    def __init__(self, filepath: str, password: str):
+        super().__init__()
+        self._file = open(filepath, "rb")  # pylint: disable=consider-using-with
+        try:
+            self._layout = _Layout.read(self._file, os.fstat(self._file.fileno()).st_size)
+            self._cipher = _cipher(derive_key(password, self._layout.salt))
+        except Exception:
+            self._file.close()
+            raise
+        self._size = self._layout.body_size - self._layout.chunks * _TAG_SIZE
+        self._position = 0
+        self._index = -1
+        self._buffer = b""
+
+    def __len__(self) -> int:
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        origins = {os.SEEK_SET: 0, os.SEEK_CUR: self._position, os.SEEK_END: self._size}
+        if whence not in origins:
+            raise ValueError(f"Unsupported whence: {whence}")
+
+        position = origins[whence] + offset
+        if position < 0:
+            raise ValueError(f"Negative seek position: {position}")
+        self._position = position
+        return position
+
+    def tell(self) -> int:
+        return self._position
+
+    def readinto(self, b) -> int:
+        # The buffer is filled across the chunk boundaries, so the readers,
+        # that expect the exact number of bytes, e.g. the zipfile, never get a short read.
+        filled = 0
+        with memoryview(b) as view:
+            while filled < len(view) and self._position < self._size:
+                index = self._position // self._layout.chunk_size
+                if index != self._index:
+                    self._file.seek(self._layout.offset(index))
+                    self._buffer = self._open(index, self._file.read(self._layout.sealed_size(index)))
+                    self._index = index
+
+                start = self._position - index * self._layout.chunk_size
+                size = min(len(view) - filled, len(self._buffer) - start)
+                end, stop = start + size, filled + size
+                view[filled:stop] = self._buffer[start:end]
+                filled = stop
+                self._position += size
+        return filled
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+    def _open(self, index: int, sealed: bytes) -> bytes:
+        return _open_chunk(self._cipher, self._layout, index, sealed)
+
+
+@contextmanager
+def encrypted_archive(archive: str, password: str, opener: Callable[[io.RawIOBase], ContextManager]) -> Iterator:
+    """
+    Create an archiver that writes into the encrypted output stream.
+    The encrypted file is finalized only if the archiver is closed without errors.
+
+    :param archive: A file path where the encrypted archive should be created.
+    :param password: Password used to derive the encryption key.
+    :param opener: A function that creates the archiver on top of the output stream.
+    """
+    out = EncryptedWriter(archive, password)
+    try:
+        with opener(out) as arc:
+            yield arc
+    except BaseException:
+        out.abort()
+        raise
+    out.close()
+
+
+def decrypt(source: str, destination: str, password: str) -> None:
+    """
+    Decrypt the file and write the plaintext to the destination.
+
+    :raise ValueError: If the file is malformed or fails the authentication.
+    """
+    with DecryptedReader(source, password) as reader, open(destination, "wb") as out:
+        while chunk := reader.read(DEFAULT_CHUNK_SIZE):
+            out.write(chunk)
+
+
+def verify(filepath: str, password: str, workers: int = None) -> int:
+    """
+    Authenticate every chunk of the encrypted file without producing the plaintext.
+    The chunks are verified concurrently in bounded batches.
+
+    :param filepath: Full path to the encrypted file.
+    :param password: Password used to derive the encryption key.
+    :param workers: Maximum number of concurrent verifications.
+    :return: Total size of the verified plaintext.
+    :raise ValueError: If the file is malformed or fails the authentication.
+    """
+    workers = workers if workers else min(8, os.cpu_count() or 1)
+
+    with open(filepath, "rb") as file:
+        layout = _Layout.read(file, os.fstat(file.fileno()).st_size)
+        cipher = _cipher(derive_key(password, layout.salt))
+
+    def check(index: int) -> int:
+        with open(filepath, "rb") as chunk:
+            chunk.seek(layout.offset(index))
+            return len(_open_chunk(cipher, layout, index, chunk.read(layout.sealed_size(index))))
+
+    total = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        batch = workers * 4
+        for start in range(0, layout.chunks, batch):
+            total += sum(executor.map(check, range(start, min(start + batch, layout.chunks))))
+    return total
+
+
+class _Layout:
+    """
+    Location of the sealed chunks within the encrypted file.
+    """
+
+    def __init__(self, header: bytes, chunk_size: int, salt: bytes, body_size: int):
+        self.header = header
+        self.chunk_size = chunk_size
+        self.salt = salt
+        self.body_size = body_size
+
+        # Every chunk, except the last one, is exactly 'chunk_size + tag' long.
+        # The last chunk is always present, even if it is empty.
+        sealed = chunk_size + _TAG_SIZE
+        self.chunks = -(-body_size // sealed)
+        if self.chunks == 0 or body_size - (self.chunks - 1) * sealed < _TAG_SIZE:
+            raise ValueError("The encrypted file is truncated.")
+
+    @staticmethod
+    def read(file, file_size: int) -> _Layout:
+        header = file.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise ValueError("The encrypted file is truncated.")
+
+        magic, chunk_size, salt, _ = _HEADER.unpack(header)
+        if magic != MAGIC or chunk_size == 0:
+            raise ValueError("The file is not encrypted by nimbus or the format is not supported.")
+
+        return _Layout(header, chunk_size, salt, file_size - _HEADER.size)
+
+    def offset(self, index: int) -> int:
+        return _HEADER.size + index * (self.chunk_size + _TAG_SIZE)
+
+    def sealed_size(self, index: int) -> int:
+        if index == self.chunks - 1:
+            return self.body_size - index * (self.chunk_size + _TAG_SIZE)
+        return self.chunk_size + _TAG_SIZE
+
+
+def _nonce(header: bytes, index: int, final: bool) -> bytes:
+    return header[-7:] + struct.pack(">IB", index, 1 if final else 0)
+
+
+def _open_chunk(cipher, layout: _Layout, index: int, sealed: bytes) -> bytes:
+    if len(sealed) != layout.sealed_size(index):
+        raise ValueError("The encrypted file is truncated.")
+
+    nonce = _nonce(layout.header, index, index == layout.chunks - 1)
+    try:
+        return cipher.decrypt(nonce, sealed, layout.header)
+    except _backend().InvalidTag as e:
+        raise ValueError(f"Authentication failed for chunk {index}.") from e
+
+
+def _cipher(key: bytes):
+    return _backend().AESGCM(key)
+
+
+def _backend():
+    # The 'cryptography' package is an optional dependency,
+    # that is required only if the archive encryption is used.
+    try:
+        # pylint: disable-next=import-outside-toplevel
+        from cryptography import exceptions
+
+        # pylint: disable-next=import-outside-toplevel
+        from cryptography.hazmat.primitives.ciphers import aead
+    except ImportError as e:
+        raise RuntimeError(
+            "The archive encryption requires the 'cryptography' package, install 'nimbuscli[encryption]'."
+        ) from e
+    return SimpleNamespace(AESGCM=aead.AESGCM, InvalidTag=exceptions.InvalidTag)
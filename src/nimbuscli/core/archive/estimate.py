@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import bisect
+import itertools
+import logging
+import os
+import stat
+import time
+from datetime import timedelta
+from typing import Iterable, Iterator
+
+from logdecorator import log_on_end, log_on_start
+
+from nimbuscli.core.archive.archiver import Archiver
+
+
+class SizeEstimator:
+    """
+    Estimates the size of the archive without creating it.
+
+    The directory is scanned using only the file metadata, and a few slices
+    of the representative files are compressed with the settings of the archiver.
+    The files are picked with the probability proportional to their size,
+    so the files, that make up the most of the archive, are sampled the most.
+    """
+
+    SLICE_SIZE = 256 * 1024
+
+    def __init__(self, archiver: Archiver, files: int = 16, slices: int = 3):
+        """
+        Creates a new instance of the SizeEstimator.
+
+        :param archiver: The archiver, which compression settings are estimated.
+        :param files: Maximum number of the sampled files.
+        :param slices: Maximum number of the sampled slices of each file.
+        """
+        if files < 1 or slices < 1:
+            raise ValueError("The number of the sampled files and slices should be positive numbers.")
+
+        self._archiver = archiver
+        self._files = files
+        self._slices = slices
+
+    def __repr__(self) -> str:
+        params = [
+            f"archiver={self._archiver!r}",
+            f"files='{self._files}'",
+            f"slices='{self._slices}'",
+        ]
+        return "SizeEstimator(" + ", ".join(params) + ")"
+
+    @log_on_start(logging.INFO, "Estimating {directory!s}")
+    @log_on_end(logging.INFO, "Estimated {directory!s}: {result!r}")
+    def estimate(self, directory: str, entries: Iterable[tuple[str, int, int]] = None) -> SizeEstimate:
+        """
+        Estimate the archive of the directory.
+
+        :param directory: Full path to the directory that would be archived.
+        :param entries: The path, size and mode of each file of the directory, e.g. taken from the file index.
+            The directory is scanned, if the entries are not specified.
+        :return: The estimate of the archive.
+        """
+        estimate = SizeEstimate(directory)
+
+        files: list[tuple[str, int]] = []
+        for path, size, mode in entries if entries is not None else _scan(directory):
+            estimate.files += 1
+            if stat.S_ISREG(mode):
+                files.append((path, size))
+                estimate.source_size += size
+
+        for path, size in self._representative(files, estimate.source_size):
+            self._sample(estimate, path, size)
+
+        return estimate
+
+    def _representative(self, files: list[tuple[str, int]], total: int) -> list[tuple[str, int]]:
+        # The files are picked at the evenly spaced points of the total size,
+        # so the same files are sampled, as long as the directory hasn't changed.
+        if not total:
+            return []
+
+        files = sorted(files)
+        offsets = list(itertools.accumulate(size for _, size in files))
+        picked = {bisect.bisect_right(offsets, (2 * i + 1) * total // (2 * self._files)) for i in range(self._files)}
+        return [files[i] for i in sorted(picked) if i < len(files)]
+
+    def _sample(self, estimate: SizeEstimate, path: str, size: int) -> None:
+        length = min(SizeEstimator.SLICE_SIZE, size)
+        count = min(self._slices, -(-size // SizeEstimator.SLICE_SIZE))
+        offsets = sorted({(size - length) * i // max(count - 1, 1) for i in range(count)})
+
+        try:
+            with open(path, "rb") as file:
+                for offset in offsets:
+                    file.seek(offset)
+                    data = file.read(length)
+
+                    started = time.perf_counter()
+                    estimate.compressed_size += self._archiver.compressed_size(data)
+                    estimate.elapsed += timedelta(seconds=time.perf_counter() - started)
+                    estimate.sampled_size += len(data)
+        except OSError:
+            # The unreadable files would fail the backup anyway.
+            pass
+
+
+def _scan(directory: str) -> Iterator[tuple[str, int, int]]:
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            info = os.lstat(path)
+            yield path, info.st_size, info.st_mode
+
+
+class SizeEstimate:
+    """
+    The estimate of the archive, that is based on the sampled slices.
+    """
+
+    def __init__(self, directory: str):
+        self.directory: str = directory
+        self.files: int = 0
+        self.source_size: int = 0
+        self.sampled_size: int = 0
+        self.compressed_size: int = 0
+        self.elapsed: timedelta = timedelta()
+
+    def __repr__(self) -> str:
+        params = [
+            f"directory='{self.directory}'",
+            f"files='{self.files}'",
+            f"source='{self.source_size}'",
+            f"sampled='{self.sampled_size}'",
+            f"ratio='{self.ratio:.2f}'",
+        ]
+        return "SizeEstimate(" + ", ".join(params) + ")"
+
+    @property
+    def ratio(self) -> float:
+        """
+        Compression ratio of the sampled data: the source size to the compressed size.
+        """
+        return self.sampled_size / self.compressed_size if self.compressed_size else 1.0
+
+    @property
+    def archive_size(self) -> int:
+        return int(self.source_size / self.ratio)
+
+    @property
+    def compression_speed(self) -> int | None:
+        """
+        Speed of the sample compression, in the source bytes per second.
+        """
+        seconds = self.elapsed.total_seconds()
+        return int(self.sampled_size / seconds) if seconds > 0 else None
@@ -1,6 +1,7 @@
 import logging
+import lzma
 
-from logdecorator import log_on_end, log_on_start
+from logdecorator import log_on_end, log_on_error, log_on_start
 
 from nimbuscli.core.archive.archiver import ArchivalStatus, Archiver
 from nimbuscli.core.execute import CompletedProcess, Runner
@@ -66,6 +67,22 @@ class RarArchiver(Archiver):
         proc = self._runner.execute(cmd)
         return RarArchivalStatus(proc, directory, archive)
 
+    def compressed_size(self, data: bytes) -> int:
+        # The RAR compression is not available in Python, while LZMA
+        # is the closest to its ratio on the default compression level.
+        return len(data) if self._compression == 0 else len(lzma.compress(data))
+
+    @log_on_start(logging.INFO, "Testing {archive!s}")
+    @log_on_error(logging.ERROR, "Failed to test {archive!s}: {e!r}", on_exceptions=Exception)
+    def test(self, archive: str) -> None:
+        # The '-p-' option doesn't prompt for the password of the archive without one.
+        cmd = ["rar", "t", "-idq", f"-p{self._password}" if self._password is not None else "-p-", archive]
+        proc = self._runner.execute(cmd)
+        if proc.exception:
+            raise proc.exception
+        if not proc.success:
+            raise ValueError(f"The archive {archive} is damaged, rar exited with code {proc.exitcode}.")
+
     def _generate_cmd(self, directory: str, archive: str) -> list[str]:
         # fmt: off
         cmd = [
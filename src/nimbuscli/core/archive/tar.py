@@ -1,9 +1,15 @@
+import bz2
+import gzip
 import logging
+import lzma
 import tarfile
-from typing import ContextManager
+import time
+from io import BytesIO
+from typing import BinaryIO, ContextManager
 
-from logdecorator import log_on_error
+from logdecorator import log_on_error, log_on_start
 
+from nimbuscli.core.archive import encryption
 from nimbuscli.core.archive.archiver import FSArchiver
 
 
@@ -12,7 +18,9 @@ class TarArchiver(FSArchiver):
     Creates tar archives, including those using gzip, bz2 and lzma compression.
     """
 
-    def __init__(self, compression: str | None = None):
+    SEGMENT_SIZE = 16 * 1024 * 1024
+
+    def __init__(self, compression: str | None = None, password: str | None = None):
         """
         Creates a new instance of the TarArchiver.
 
@@ -21,26 +29,102 @@ class TarArchiver(FSArchiver):
                 - gz - Creates Tarfile with gzip compression.
                 - xz - Creates Tarfile with lzma compression.
                 - bz2 - Creates Tarfile with bzip2 compression.
+        :param password: Password to encrypt the archive with.
+            The archive is encrypted while it is being written.
         """
 
         if compression not in (None, "bz2", "gz", "xz"):
             raise ValueError("Compression should be None or one of: 'bz2', 'gz' or 'xz'.")
 
+        encryption.validate_password(password)
+
         self._compression = compression
+        self._password = password
 
     def __repr__(self) -> str:
-        params = [f"cmp='{self._compression}'"]
+        params = [
+            f"cmp='{self._compression}'",
+            f"pwd='{self._password}'",
+        ]
         return "TarArchiver(" + ", ".join(params) + ")"
 
     @property
     def extension(self) -> str:
-        return "tar" if self._compression is None else f"tar.{self._compression}"
+        ext = "tar" if self._compression is None else f"tar.{self._compression}"
+        return ext if self._password is None else f"{ext}.enc"
+
+    def compressed_size(self, data: bytes) -> int:
+        # The same compression levels, as used by the tarfile.
+        match self._compression:
+            case "gz":
+                return len(gzip.compress(data, compresslevel=9))
+            case "bz2":
+                return len(bz2.compress(data, compresslevel=9))
+            case "xz":
+                return len(lzma.compress(data))
+        return len(data)
+
+    @log_on_start(logging.INFO, "Testing {archive!s}")
+    @log_on_error(logging.ERROR, "Failed to test {archive!s}: {e!r}", on_exceptions=Exception)
+    def test(self, archive: str) -> None:
+        # The archive is read sequentially, so the encrypted archive is decrypted
+        # and authenticated on the fly, and the compressed stream is fully checked.
+        if self._password is not None:
+            with encryption.DecryptedReader(archive, self._password) as source:
+                with tarfile.open(fileobj=source, mode="r|*") as arc:
+                    self._read_members(arc)
+        else:
+            with tarfile.open(archive, mode="r|*") as arc:
+                self._read_members(arc)
+
+    def _read_members(self, arc: tarfile.TarFile) -> None:
+        for member in arc:
+            if member.isfile():
+                with arc.extractfile(member) as data:
+                    while data.read(self.SEGMENT_SIZE):
+                        pass
 
     @log_on_error(logging.ERROR, "Failed init archiver: {e!r}", on_exceptions=Exception)
     def init_archiver(self, archive: str) -> ContextManager:
+        if self._password is not None:
+            # The encrypted output is not seekable, so the tar stream mode is used.
+            mode = "w|" if self._compression is None else f"w|{self._compression}"
+            return encryption.encrypted_archive(
+                archive,
+                self._password,
+                lambda out: tarfile.open(fileobj=out, mode=mode),  # pylint: disable=consider-using-with
+            )
+
         mode = "w" if self._compression is None else f"w:{self._compression}"
         return tarfile.open(archive, mode)
 
     @log_on_error(logging.ERROR, "Failed to add file: {e!r}", on_exceptions=Exception)
     def add_file(self, arc: tarfile.TarFile, file_path: str, file_name: str) -> None:
         arc.add(file_path, arcname=file_name)
+
+    @log_on_error(logging.ERROR, "Failed to add stream: {e!r}", on_exceptions=Exception)
+    def add_stream(self, arc: tarfile.TarFile, stream: BinaryIO, name: str) -> None:
+        # The tar header holds the member size, so the output of unknown length
+        # is split into segments of a bounded size. The output that fits into
+        # a single segment is stored as is, otherwise the segments are stored as
+        # '<name>.part00000', '<name>.part00001', ... and could be restored with:
+        #   cat <name>.part* > <name>
+        segment = stream.read(self.SEGMENT_SIZE)
+        following = stream.read(self.SEGMENT_SIZE) if len(segment) == self.SEGMENT_SIZE else b""
+
+        if not following:
+            self._add_segment(arc, name, segment)
+            return
+
+        index = 0
+        while segment:
+            self._add_segment(arc, f"{name}.part{index:05d}", segment)
+            segment, following = following, stream.read(self.SEGMENT_SIZE)
+            index += 1
+
+    def _add_segment(self, arc: tarfile.TarFile, name: str, data: bytes) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        arc.addfile(info, BytesIO(data))
@@ -1,9 +1,14 @@
+import bz2
 import logging
+import lzma
+import shutil
 import zipfile
-from typing import ContextManager
+import zlib
+from typing import BinaryIO, ContextManager
 
-from logdecorator import log_on_error
+from logdecorator import log_on_error, log_on_start
 
+from nimbuscli.core.archive import encryption
 from nimbuscli.core.archive.archiver import FSArchiver
 
 
@@ -12,7 +17,7 @@ class ZipArchiver(FSArchiver):
     Creates zip archives, including ZIP64 extensions.
     """
 
-    def __init__(self, compression: str | None = None):
+    def __init__(self, compression: str | None = None, password: str | None = None):
         """
         Creates a new instance of the ZipArchiver.
 
@@ -21,30 +26,82 @@ class ZipArchiver(FSArchiver):
                 - gz - Creates zipfile with gzip compression.
                 - xz - Creates zipfile with lzma compression.
                 - bz2 - Creates zipfile with bzip2 compression.
+        :param password: Password to encrypt the archive with.
+            The archive is encrypted while it is being written.
         """
 
         if compression not in (None, "bz2", "gz", "xz"):
             raise ValueError("Compression should be None or one of: 'bz2', 'gz' or 'xz'.")
 
+        encryption.validate_password(password)
+
         self._compression: int = {
             None: zipfile.ZIP_STORED,
             "bz2": zipfile.ZIP_BZIP2,
             "gz": zipfile.ZIP_DEFLATED,
             "xz": zipfile.ZIP_LZMA,
         }[compression]
+        self._password = password
 
     def __repr__(self) -> str:
-        params = [f"cmp='{self._compression}'"]
+        params = [
+            f"cmp='{self._compression}'",
+            f"pwd='{self._password}'",
+        ]
         return "ZipArchiver(" + ", ".join(params) + ")"
 
     @property
     def extension(self) -> str:
-        return "zip"
+        return "zip" if self._password is None else "zip.enc"
+
+    def compressed_size(self, data: bytes) -> int:
+        # The same compression levels, as used by the zipfile.
+        match self._compression:
+            case zipfile.ZIP_DEFLATED:
+                return len(zlib.compress(data))
+            case zipfile.ZIP_BZIP2:
+                return len(bz2.compress(data, compresslevel=9))
+            case zipfile.ZIP_LZMA:
+                return len(lzma.compress(data))
+        return len(data)
+
+    @log_on_start(logging.INFO, "Testing {archive!s}")
+    @log_on_error(logging.ERROR, "Failed to test {archive!s}: {e!r}", on_exceptions=Exception)
+    def test(self, archive: str) -> None:
+        if self._password is None:
+            self._test_members(archive, archive)
+            return
+
+        # Every chunk is authenticated first, and then the zipfile reads the members
+        # through the seekable decrypted stream, without writing the plaintext anywhere.
+        encryption.verify(archive, self._password)
+        with encryption.DecryptedReader(archive, self._password) as reader:
+            self._test_members(reader, archive)
+
+    def _test_members(self, file: str | BinaryIO, archive: str) -> None:
+        with zipfile.ZipFile(file) as arc:
+            if damaged := arc.testzip():
+                raise zipfile.BadZipFile(f"The member '{damaged}' of {archive} is damaged.")
 
     @log_on_error(logging.ERROR, "Failed init archiver: {e!r}", on_exceptions=Exception)
     def init_archiver(self, archive: str) -> ContextManager:
+        if self._password is not None:
+            # The encrypted output is not seekable,
+            # so the zipfile falls back to the data descriptors.
+            return encryption.encrypted_archive(
+                archive,
+                self._password,
+                lambda out: zipfile.ZipFile(out, "w", self._compression),  # pylint: disable=consider-using-with
+            )
+
         return zipfile.ZipFile(archive, "w", self._compression)
 
     @log_on_error(logging.ERROR, "Failed to add file: {e!r}", on_exceptions=Exception)
     def add_file(self, arc: zipfile.ZipFile, file_path: str, file_name: str) -> None:
         arc.write(file_path, arcname=file_name)
+
+    @log_on_error(logging.ERROR, "Failed to add stream: {e!r}", on_exceptions=Exception)
+    def add_stream(self, arc: zipfile.ZipFile, stream: BinaryIO, name: str) -> None:
+        # The member size is unknown in advance, so ZIP64 is always enabled.
+        with arc.open(name, mode="w", force_zip64=True) as member:
+            shutil.copyfileobj(stream, member, 1024 * 1024)
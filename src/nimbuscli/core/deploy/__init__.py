@@ -1,2 +1,5 @@
 from nimbuscli.core.deploy.docker import DockerService
+from nimbuscli.core.deploy.graph import CycleError, DeploymentGraph
+from nimbuscli.core.deploy.images import ImagePuller
+from nimbuscli.core.deploy.pool import DeploymentPool
 from nimbuscli.core.deploy.service import OperationStatus, Service
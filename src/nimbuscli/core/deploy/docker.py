@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+from datetime import timedelta
+from typing import Any
 
-from logdecorator import log_on_end, log_on_start
+from logdecorator import log_on_end, log_on_error, log_on_start
 
 from nimbuscli.core.deploy.service import OperationStatus, Service
 from nimbuscli.core.execute import Runner
@@ -11,23 +15,151 @@ from nimbuscli.core.execute import Runner
 class DockerService(Service):
     """
     A Dockerized service orchestrated using a docker-compose file.
+
+    The dependencies on the other services are declared by the label
+    of any container in the compose file, e.g. 'nimbus.depends_on: proxy, postgres'.
     """
 
-    def __init__(self, name: str, directory: str, env: dict[str, str], runner: Runner):
-        super().__init__(name)
+    DEPENDS_ON = "nimbus.depends_on"
+
+    RESTART = "restart"
+    UPDATE = "update"
+    BLUEGREEN = "bluegreen"
+
+    def __init__(self, name: str, directory: str, env: dict[str, str], runner: Runner, strategy: str = RESTART):
+        """
+        Creates a new instance of the DockerService.
+
+        :param name: Name of the service.
+        :param directory: Directory of the compose file.
+        :param env: Environment of the compose.
+        :param runner: Process runner.
+        :param strategy: How the running service is replaced:
+            'restart' stops the service and starts it again,
+            'update' recreates only the changed containers, without stopping the rest,
+            'bluegreen' starts a new copy of the service, and stops the old one once the new one is healthy.
+        """
+        if strategy not in (DockerService.RESTART, DockerService.UPDATE, DockerService.BLUEGREEN):
+            raise ValueError(f"Unknown deployment strategy: {strategy}")
+
+        super().__init__(name, "docker")
         self._directory = directory
         self._env = env
         self._runner = runner
+        self._strategy = strategy
+        self._compose: dict[str, Any] = None
 
     def __repr__(self) -> str:
         params = [
             f"name='{self._name}'",
             f"dir='{self._directory}'",
+            f"strategy='{self._strategy}'",
         ]
         return "DockerService(" + ", ".join(params) + ")"
 
+    @log_on_error(
+        logging.WARNING,
+        "Failed to read the dependencies of {self._directory!s}: {e!r}",
+        on_exceptions=Exception,
+        reraise=False,
+    )
+    def dependencies(self) -> list[str]:
+        deps = set()
+        for container in self.compose()["services"].values():
+            labels = container.get("labels") or {}
+            if isinstance(labels, list):
+                labels = dict(label.split("=", 1) for label in labels if "=" in label)
+            deps.update(d.strip() for d in labels.get(DockerService.DEPENDS_ON, "").split(","))
+        return sorted(d for d in deps if d and d != self.name)
+
+    @log_on_error(
+        logging.WARNING,
+        "Failed to read the images of {self._directory!s}: {e!r}",
+        on_exceptions=Exception,
+        reraise=False,
+    )
+    def images(self) -> list[str]:
+        # The built images and the images, that should never be pulled, are left to the compose.
+        return sorted(
+            {
+                container["image"]
+                for container in self.compose()["services"].values()
+                if "image" in container
+                and "build" not in container
+                and container.get("pull_policy") not in ("never", "build")
+            }
+        )
+
+    @log_on_error(
+        logging.WARNING,
+        "Failed to take the fingerprint of {self._directory!s}: {e!r}",
+        on_exceptions=Exception,
+        reraise=False,
+    )
+    def fingerprint(self) -> str:
+        # The local image IDs change, when the newer images are pulled,
+        # and the environment is hashed, so the secrets are never stored.
+        images = sorted(
+            {container["image"] for container in self.compose()["services"].values() if "image" in container}
+        )
+        ids = []
+        if images:
+            proc = self._runner.execute(
+                ["docker", "image", "inspect", "--format", "{{.Id}}", *images], self._directory, self._env
+            )
+            if not proc.success:
+                raise ValueError(f"Failed to inspect the images: {proc.stderr or proc.exception}")
+            ids = proc.stdout.split()
+
+        state = {
+            "compose": self.compose(),
+            "env": self._env if self._env else {},
+            "images": dict(zip(images, ids)),
+        }
+        return hashlib.sha256(json.dumps(state, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @log_on_error(
+        logging.WARNING,
+        "Failed to check the containers of {self._directory!s}: {e!r}",
+        on_exceptions=Exception,
+        reraise=False,
+    )
+    def running(self) -> bool:
+        cmd: list[str] | str = "docker compose ps --format json"
+        if self._strategy == DockerService.BLUEGREEN:
+            # The unfinished switch leaves both copies, so the service should be deployed again.
+            projects = self._projects()
+            if projects is None or len(projects) != 1:
+                return False
+            cmd = self._compose_cmd(projects[0], "ps", "--format", "json")
+
+        proc = self._runner.execute(cmd, self._directory, self._env)
+        if not proc.success:
+            return False
+
+        # The older versions of the compose print a single array instead of a line per container.
+        output = proc.stdout.strip() if proc.stdout else ""
+        if output.startswith("["):
+            containers = json.loads(output)
+        else:
+            containers = [json.loads(line) for line in output.splitlines() if line.strip()]
+
+        running = {c.get("Service") for c in containers if c.get("State") == "running"}
+        return set(self.compose()["services"]) <= running
+
+    def compose(self) -> dict[str, Any]:
+        """
+        The resolved compose configuration of the service.
+        """
+        if self._compose is None:
+            proc = self._runner.execute("docker compose config --format json", self._directory, self._env)
+            if not proc.success:
+                raise ValueError(f"Failed to resolve the compose config: {proc.stderr or proc.exception}")
+            self._compose = json.loads(proc.stdout)
+        return self._compose
+
     def _execute(self, operation: str, commands: list[str]) -> OperationStatus:
-        status = OperationStatus(self.name, operation, "docker")
+        status = OperationStatus(self.name, operation, self.kind)
         for cmd in commands:
             proc = self._runner.execute(cmd, self._directory, self._env)
             status.processes.append(proc)
@@ -37,20 +169,26 @@ class DockerService(Service):
 
     @log_on_start(logging.INFO, "Starting {self._directory!s} service")
     @log_on_end(logging.INFO, "Started [{result.success!s}]: {self._directory!s}")
-    def start(self) -> OperationStatus:
-        return self._execute(
-            "Start",
-            [
-                "docker compose config --quiet",
-                "docker compose pull",
-                "docker compose down",
-                "docker compose up --detach",
-            ],
-        )
+    def start(self, pull: bool = True) -> OperationStatus:
+        match self._strategy:
+            case DockerService.UPDATE:
+                return self._update(pull)
+            case DockerService.BLUEGREEN:
+                return self._bluegreen(pull)
+            case _:
+                return self._restart(pull)
 
     @log_on_start(logging.INFO, "Stopping {self._directory!s} service")
     @log_on_end(logging.INFO, "Stopped [{result.success!s}]: {self._directory!s}")
     def stop(self):
+        if self._strategy == DockerService.BLUEGREEN:
+            status = OperationStatus(self.name, "Stop", self.kind)
+            if self._run(status, "docker compose config --quiet"):
+                for project in self._projects(status) or [None]:
+                    if not self._run(status, self._compose_cmd(project, "down")):
+                        break
+            return status
+
         return self._execute(
             "Stop",
             [
@@ -58,3 +196,112 @@ class DockerService(Service):
                 "docker compose down",
             ],
         )
+
+    def _restart(self, pull: bool) -> OperationStatus:
+        # The service is unavailable from the moment it is stopped, till the new containers are running,
+        # or healthy if they have a health check, so the dependent services are started only after that.
+        if pull:
+            commands = [
+                "docker compose config --quiet",
+                "docker compose pull",
+                "docker compose down",
+                "docker compose up --detach --wait",
+            ]
+        else:
+            commands = [
+                "docker compose config --quiet",
+                "docker compose down",
+                "docker compose up --detach --wait --pull never",
+            ]
+
+        status = self._execute("Start", commands)
+        down, up = status.processes[-2:] if len(status.processes) > 1 else (None, None)
+        if status.success and down.started and up.completed:
+            status.downtime = up.completed - down.started
+        return status
+
+    def _update(self, pull: bool) -> OperationStatus:
+        # Only the changed containers are recreated, so the service is unavailable
+        # at most till the compose reports them running, or healthy if they have a health check.
+        commands = ["docker compose config --quiet"]
+        if pull:
+            commands += ["docker compose pull", "docker compose up --detach --wait"]
+        else:
+            commands += ["docker compose up --detach --wait --pull never"]
+
+        status = self._execute("Start", commands)
+        if status.success:
+            status.downtime = status.processes[-1].elapsed
+        return status
+
+    def _bluegreen(self, pull: bool) -> OperationStatus:
+        # The new copy of the service is started as a separate project next to the running one,
+        # and the running one is stopped only after the new one is healthy, so there is no downtime.
+        # The copies have the same labels, so a reverse proxy on an external network could route to either of them.
+        if not self._detachable():
+            return self._update(pull)
+
+        status = OperationStatus(self.name, "Start", self.kind)
+        if not self._run(status, "docker compose config --quiet"):
+            return status
+        if pull and not self._run(status, "docker compose pull"):
+            return status
+
+        running = self._projects(status)
+        if running is None:
+            return status
+
+        base = self.compose().get("name", self.name)
+        target = f"{base}-green" if f"{base}-blue" in running else f"{base}-blue"
+        up = self._compose_cmd(target, "up", "--detach", "--wait", *([] if pull else ["--pull", "never"]))
+        if not self._run(status, up):
+            # The running copy is kept, and the failed one is removed.
+            self._run(status, self._compose_cmd(target, "down"))
+            return status
+
+        for project in running:
+            if project != target and not self._run(status, self._compose_cmd(project, "down")):
+                return status
+
+        status.downtime = timedelta()
+        return status
+
+    @log_on_error(
+        logging.WARNING,
+        "Failed to check the ports of {self._directory!s}: {e!r}",
+        on_exceptions=Exception,
+        reraise=False,
+    )
+    def _detachable(self) -> bool:
+        # The two copies of the service can't publish the same host ports, or run the containers
+        # with the same fixed names, at the same time, so such services are updated in place instead.
+        # The fixed host names would clash on the shared external networks as well.
+        for container in self.compose()["services"].values():
+            if container.get("container_name") or container.get("hostname"):
+                return False
+            if any(isinstance(port, str) or port.get("published") for port in container.get("ports") or []):
+                return False
+        return True
+
+    def _projects(self, status: OperationStatus = None) -> list[str] | None:
+        """
+        Returns the existing copies of the service, or None if they are unknown.
+        """
+        proc = self._runner.execute("docker compose ls --all --format json", self._directory, self._env)
+        if status:
+            status.processes.append(proc)
+        if not proc.success:
+            return None
+
+        base = self.compose().get("name", self.name)
+        candidates = [base, f"{base}-blue", f"{base}-green"]
+        names = {p.get("Name") for p in json.loads(proc.stdout or "[]")}
+        return [c for c in candidates if c in names]
+
+    def _run(self, status: OperationStatus, cmd: list[str] | str) -> bool:
+        proc = self._runner.execute(cmd, self._directory, self._env)
+        status.processes.append(proc)
+        return proc.success
+
+    def _compose_cmd(self, project: str | None, *args: str) -> list[str]:
+        return ["docker", "compose", *(["--project-name", project] if project else []), *args]
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from nimbuscli.core.deploy.service import Service
+
+
+class CycleError(ValueError):
+    """
+    The services depend on each other, so none of them could be deployed first.
+    """
+
+    def __init__(self, cycle: list[str]):
+        super().__init__("Circular dependency: " + " -> ".join(cycle))
+        self.cycle = cycle
+
+
+class DeploymentGraph:
+    """
+    The dependencies between the deployed services.
+
+    Only the dependencies between the selected services are kept, while
+    the rest are expected to be deployed already. The graph is checked for
+    the cycles when it is created, so the cycles are reported before
+    any service is deployed.
+    """
+
+    def __init__(self, services: list[Service], dependencies: dict[str, list[str]]):
+        """
+        Creates a new instance of the DeploymentGraph.
+
+        :param services: The selected services.
+        :param dependencies: Names of the services, that each service depends on.
+        :raises CycleError: If the services depend on each other.
+        """
+        names = [s.name for s in services]
+        self._services = services
+        self._dependencies = {name: sorted({d for d in dependencies.get(name, []) if d in names}) for name in names}
+        self._order = self._sort()
+
+    def __repr__(self) -> str:
+        params = [f"{name}={deps!r}" for name, deps in self._dependencies.items() if deps]
+        return "DeploymentGraph(" + ", ".join(params) + ")"
+
+    def dependencies(self, name: str) -> list[str]:
+        """
+        Returns the names of the services, that should be deployed before the service.
+        """
+        return self._dependencies.get(name, [])
+
+    @property
+    def levels(self) -> list[list[str]]:
+        """
+        The services grouped by the length of their longest dependency chain,
+        so each level depends only on the previous levels.
+        """
+        depth: dict[str, int] = {}
+        for name in self._order:
+            depth[name] = max((depth[d] + 1 for d in self._dependencies[name]), default=0)
+
+        levels: list[list[str]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for service in self._services:
+            levels[depth[service.name]].append(service.name)
+        return levels
+
+    def reversed(self) -> DeploymentGraph:
+        """
+        Returns the graph, where each service should be processed before the services
+        it depends on, e.g. so the dependent services are stopped first.
+        """
+        dependents: dict[str, list[str]] = {name: [] for name in self._dependencies}
+        for name, deps in self._dependencies.items():
+            for dep in deps:
+                dependents[dep].append(name)
+        return DeploymentGraph(self._services, dependents)
+
+    def critical_path(self, elapsed: dict[str, timedelta]) -> list[str]:
+        """
+        Returns the chain of the dependent services, that took the longest time overall,
+        so it has defined the duration of the whole deployment.
+
+        :param elapsed: Duration of each processed service.
+        """
+        finished: dict[str, timedelta] = {}
+        previous: dict[str, str] = {}
+        for name in self._order:
+            if name not in elapsed:
+                continue
+            before = [d for d in self._dependencies[name] if d in finished]
+            slowest = max(before, key=lambda d: finished[d], default=None)
+            finished[name] = elapsed[name] + (finished[slowest] if slowest else timedelta())
+            previous[name] = slowest
+
+        path: list[str] = []
+        name = max(finished, key=lambda n: finished[n], default=None)
+        while name:
+            path.append(name)
+            name = previous[name]
+        return path[::-1]
+
+    def _sort(self) -> list[str]:
+        # Depth-first topological sort, that keeps the path of the visited
+        # services, so the cycle could be reported as it is.
+        order: list[str] = []
+        visited: set[str] = set()
+        path: list[str] = []
+
+        def visit(name: str) -> None:
+            if name in path:
+                start = path.index(name)
+                raise CycleError(path[start:] + [name])
+            if name in visited:
+                return
+
+            path.append(name)
+            for dep in self._dependencies[name]:
+                visit(dep)
+            path.pop()
+
+            visited.add(name)
+            order.append(name)
+
+        for service in self._services:
+            visit(service.name)
+        return order
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from logdecorator import log_on_end, log_on_start
+
+from nimbuscli.core.execute import CompletedProcess, Runner
+
+
+class ImagePuller:
+    """
+    Pulls the images shared by several services only once,
+    and the different images concurrently.
+    """
+
+    def __init__(self, runner: Runner, workers: int = 4):
+        """
+        Creates a new instance of the ImagePuller.
+
+        :param runner: Process runner.
+        :param workers: Maximum number of concurrent pulls.
+        """
+        if runner is None:
+            raise ValueError("The runner cannot be None")
+
+        if workers < 1:
+            raise ValueError("The number of workers should be a positive number.")
+
+        self._runner = runner
+        self._workers = workers
+
+    def __repr__(self) -> str:
+        params = [f"workers='{self._workers}'"]
+        return "ImagePuller(" + ", ".join(params) + ")"
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @log_on_start(logging.INFO, "Pulling {images!r}")
+    @log_on_end(logging.INFO, "Pulled {images!r}")
+    def pull(self, images: list[str]) -> dict[str, CompletedProcess]:
+        """
+        Pull the images.
+
+        :param images: References of the images, possibly repeated.
+        :return: The pull of each unique image.
+        """
+        unique = list(dict.fromkeys(images))
+        with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="pull") as executor:
+            return dict(zip(unique, executor.map(self._pull, unique)))
+
+    def _pull(self, image: str) -> CompletedProcess:
+        return self._runner.execute(["docker", "pull", "--quiet", image])
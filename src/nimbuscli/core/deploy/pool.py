@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterator
+
+from logdecorator import log_on_start
+
+from nimbuscli.core.deploy.graph import DeploymentGraph
+from nimbuscli.core.deploy.service import OperationStatus, Service
+
+
+class DeploymentPool:
+    """
+    Runs the operations of several services concurrently.
+
+    With the fail-fast policy, the operations, that haven't started yet,
+    are cancelled after the first failed operation, while the running ones
+    are always completed, so no service is left half-deployed.
+    The dependent services are started only after their dependencies.
+    """
+
+    def __init__(self, workers: int = 1, fail_fast: bool = False):
+        """
+        Creates a new instance of the DeploymentPool.
+
+        :param workers: Maximum number of concurrent operations.
+        :param fail_fast: Whether to cancel the pending operations after the first failure.
+        """
+        if workers < 1:
+            raise ValueError("The number of workers should be a positive number.")
+
+        self._workers = workers
+        self._fail_fast = fail_fast
+
+    def __repr__(self) -> str:
+        params = [
+            f"workers='{self._workers}'",
+            f"fail_fast='{self._fail_fast}'",
+        ]
+        return "DeploymentPool(" + ", ".join(params) + ")"
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def fail_fast(self) -> bool:
+        return self._fail_fast
+
+    @log_on_start(logging.DEBUG, "Running the operations of {services!r}")
+    def run(
+        self,
+        services: list[Service],
+        operation: Callable[[Service], OperationStatus],
+        graph: DeploymentGraph = None,
+    ) -> list[OperationStatus]:
+        """
+        Run the operation of each service and return the statuses in the order of the services.
+
+        :param services: Services to operate on.
+        :param operation: Operation of a single service, e.g. its start.
+        :param graph: Dependencies between the services. Each service is started as soon as
+            all its dependencies have succeeded, and is cancelled if any of them has failed.
+        """
+        failed = threading.Event()
+
+        def run(service: Service) -> OperationStatus:
+            if self._fail_fast and failed.is_set():
+                return OperationStatus.cancelled(service)
+            try:
+                status = operation(service)
+            except BaseException:
+                failed.set()
+                raise
+            if not status.success:
+                failed.set()
+            return status
+
+        # The dependencies refer to the names, and a name could be shared by several services.
+        results: list[OperationStatus] = [None] * len(services)
+        pending = list(enumerate(services))
+        remaining: dict[str, int] = {}
+        for service in services:
+            remaining[service.name] = remaining.get(service.name, 0) + 1
+        unsuccessful: set[str] = set()
+
+        def complete(ix: int, status: OperationStatus) -> None:
+            results[ix] = status
+            remaining[services[ix].name] -= 1
+            if not status.success:
+                unsuccessful.add(services[ix].name)
+
+        def ready() -> Iterator[tuple[int, Service]]:
+            while unblocked := [p for p in pending if not any(remaining.get(d) for d in self._deps(graph, p[1]))]:
+                pending[:] = [p for p in pending if p not in unblocked]
+                for ix, service in unblocked:
+                    if any(d in unsuccessful for d in self._deps(graph, service)):
+                        complete(ix, OperationStatus.cancelled(service))
+                    else:
+                        yield ix, service
+
+        with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="deploy") as executor:
+            futures: dict[Future, int] = {executor.submit(run, srv): ix for ix, srv in ready()}
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    complete(futures.pop(future), future.result())
+                futures |= {executor.submit(run, srv): ix for ix, srv in ready()}
+
+        return results
+
+    def _deps(self, graph: DeploymentGraph, service: Service) -> list[str]:
+        return graph.dependencies(service.name) if graph else []
@@ -13,8 +13,9 @@ class Service(ABC):
     All services should follow the APIs defined by this class.
     """
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, kind: str):
         self._name: str = name
+        self._kind: str = kind
 
     def __str__(self) -> str:
         return self.name
@@ -26,10 +27,43 @@ class Service(ABC):
         """
         return self._name
 
+    @property
+    def kind(self) -> str:
+        """
+        Service kind, e.g. 'docker'.
+        """
+        return self._kind
+
+    def dependencies(self) -> list[str]:
+        """
+        Names of the services, that the service depends on.
+        """
+        return []
+
+    def images(self) -> list[str]:
+        """
+        References of the images, that the service pulls when it starts.
+        """
+        return []
+
+    def fingerprint(self) -> str | None:
+        """
+        Fingerprint of the desired state of the service, None if it is unknown.
+        """
+        return None
+
+    def running(self) -> bool:
+        """
+        Whether the service is running.
+        """
+        return False
+
     @abstractmethod
-    def start(self) -> OperationStatus:
+    def start(self, pull: bool = True) -> OperationStatus:
         """
         Start the service.
+
+        :param pull: Whether to pull the images of the service, or they have been pulled already.
         """
 
     @abstractmethod
@@ -44,15 +78,42 @@ class OperationStatus:
     The outcome of the service operation.
     """
 
+    CANCEL = "Cancel"
+    SKIP = "Skip"
+
     def __init__(self, service: str, operation: str, kind: str):
         self.service: str = service
         self.operation: str = operation
         self.kind: str = kind
         self.processes: list[CompletedProcess] = []
+        self.fingerprint: str = None
+        self.downtime: timedelta = None
+
+    @staticmethod
+    def cancelled(service: Service) -> OperationStatus:
+        """
+        The outcome of the operation, that has never been started.
+        """
+        return OperationStatus(service.name, OperationStatus.CANCEL, service.kind)
+
+    @staticmethod
+    def unchanged(service: Service) -> OperationStatus:
+        """
+        The outcome of the operation, that has been skipped, since the service is already in the desired state.
+        """
+        return OperationStatus(service.name, OperationStatus.SKIP, service.kind)
+
+    @property
+    def cancel(self) -> bool:
+        return self.operation == OperationStatus.CANCEL
+
+    @property
+    def skip(self) -> bool:
+        return self.operation == OperationStatus.SKIP
 
     @property
     def success(self) -> bool:
-        return all(proc.success for proc in self.processes)
+        return not self.cancel and all(proc.success for proc in self.processes)
 
     @property
     def elapsed(self) -> timedelta:
@@ -2,9 +2,13 @@ from __future__ import annotations
 
 import logging
 import os
+import shlex
 import subprocess
+import threading
 from abc import abstractmethod
+from collections import deque
 from datetime import datetime
+from typing import BinaryIO, Callable
 
 from logdecorator import log_on_end, log_on_error, log_on_start
 
@@ -40,12 +44,50 @@ class ProcessRunner(Runner):
         result.completed = datetime.now()
         return result
 
+    def stream(
+        self, cmd: list[str] | str, consumer: Callable[[BinaryIO], None], cwd=None, env=None
+    ) -> CompletedProcess:
+        if isinstance(cmd, str):
+            cmd = shlex.split(cmd)
+
+        env = {**os.environ, **env} if env else os.environ
+        result = CompletedProcess(cmd, cwd, env)
+        result.started = datetime.now()
+
+        try:
+            with self._spawn(cmd, cwd, env) as process:
+                # The stderr is drained concurrently, otherwise the process
+                # could block on a full pipe while the stdout is being consumed.
+                stderr = _Tail(process.stderr)
+                try:
+                    consumer(process.stdout)
+                except BaseException:
+                    process.kill()
+                    raise
+                finally:
+                    # Unblock the process, if the output hasn't been read till the end.
+                    process.stdout.close()
+                    result.exitcode = process.wait()
+                    result.stderr = stderr.join()
+
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            result.exception = e
+
+        result.completed = datetime.now()
+        return result
+
     @abstractmethod
     def _run(self, cmd: list[str], cwd: str, env: dict[str, str]):
         """
         Execute a command using a processes runner.
         """
 
+    @abstractmethod
+    def _spawn(self, cmd: list[str], cwd: str, env: dict[str, str]) -> subprocess.Popen:
+        """
+        Start a command with the binary stdout and stderr pipes.
+        """
+
 
 class SubprocessRunner(ProcessRunner):
     """
@@ -69,3 +111,40 @@ class SubprocessRunner(ProcessRunner):
             cwd=cwd,
             env=env,
         )
+
+    @log_on_start(logging.DEBUG, "Stream {cmd!s}; cwd: {cwd!s}")
+    @log_on_error(logging.ERROR, "Failed to start: {e!r}", on_exceptions=Exception)
+    def _spawn(self, cmd: list[str], cwd: str, env: dict[str, str]) -> subprocess.Popen:
+        return subprocess.Popen(  # pylint: disable=consider-using-with
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            env=env,
+        )
+
+
+class _Tail:
+    """
+    Reads the stream in a background thread and keeps only its tail,
+    so a chatty process cannot exhaust the memory.
+    """
+
+    def __init__(self, stream: BinaryIO, limit: int = 64 * 1024):
+        self._chunks: deque[bytes] = deque()
+        self._size = 0
+        self._limit = limit
+        self._thread = threading.Thread(target=self._read, args=(stream,), daemon=True)
+        self._thread.start()
+
+    def join(self) -> str:
+        self._thread.join()
+        return b"".join(self._chunks).decode("utf-8", errors="replace").strip()
+
+    def _read(self, stream: BinaryIO) -> None:
+        while chunk := stream.read1(8192):
+            self._chunks.append(chunk)
+            self._size += len(chunk)
+            while self._size - len(self._chunks[0]) >= self._limit:
+                self._size -= len(self._chunks.popleft())
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
+from typing import BinaryIO, Callable
 
 
 class Runner(ABC):
@@ -27,6 +28,21 @@ class Runner(ABC):
         :return: Result of the command execution.
         """
 
+    @abstractmethod
+    def stream(
+        self, cmd: list[str] | str, consumer: Callable[[BinaryIO], None], cwd=None, env=None
+    ) -> CompletedProcess:
+        """
+        Execute a command and pass its standard output to the consumer as a binary stream.
+        The output is never captured, so the consumer should read the stream till the end.
+
+        :param cmd: A command to execute.
+        :param consumer: A function that reads the standard output of the command.
+        :param cwd: Current working directory.
+        :param env: Modified environment.
+        :return: Result of the command execution, the 'stdout' is always None.
+        """
+
 
 class CompletedProcess:
 
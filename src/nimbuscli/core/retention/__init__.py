@@ -0,0 +1 @@
+from nimbuscli.core.retention.policy import RetentionPolicy
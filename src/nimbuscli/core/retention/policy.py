@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class RetentionPolicy:
+    """
+    Defines which backups of a directory are kept.
+
+    The latest backups are kept, as well as the latest backup of each of the
+    most recent days, weeks, months and years (grandfather-father-son rotation).
+    The periods without any backups are not counted.
+    """
+
+    def __init__(self, last: int = 0, daily: int = 0, weekly: int = 0, monthly: int = 0, yearly: int = 0):
+        """
+        Creates a new instance of the RetentionPolicy.
+
+        :param last: Number of the latest backups to keep.
+        :param daily: Number of the days to keep the latest backup of.
+        :param weekly: Number of the ISO weeks to keep the latest backup of.
+        :param monthly: Number of the months to keep the latest backup of.
+        :param yearly: Number of the years to keep the latest backup of.
+        """
+        if any(count < 0 for count in (last, daily, weekly, monthly, yearly)):
+            raise ValueError("The number of the kept backups cannot be negative.")
+
+        if not any((last, daily, weekly, monthly, yearly)):
+            raise ValueError("The policy should keep at least one backup.")
+
+        self._last = last
+        self._periods: list[tuple[int, Callable[[datetime], tuple]]] = [
+            (daily, lambda d: (d.year, d.month, d.day)),
+            (weekly, lambda d: tuple(d.isocalendar())[:2]),
+            (monthly, lambda d: (d.year, d.month)),
+            (yearly, lambda d: (d.year,)),
+        ]
+        self._counts = {"last": last, "daily": daily, "weekly": weekly, "monthly": monthly, "yearly": yearly}
+
+    def __repr__(self) -> str:
+        params = [f"{name}='{count}'" for name, count in self._counts.items() if count]
+        return "RetentionPolicy(" + ", ".join(params) + ")"
+
+    def __str__(self) -> str:
+        return ", ".join(f"{name} {count}" for name, count in self._counts.items() if count)
+
+    def expired(self, backups: list[T], created: Callable[[T], datetime]) -> list[T]:
+        """
+        Select the backups, that are not kept by the policy.
+
+        :param backups: All the backups of a single directory.
+        :param created: Returns the creation time of a backup.
+        :return: The expired backups, from the newest to the oldest.
+        """
+        ordered = sorted(backups, key=created, reverse=True)
+        kept = set(range(min(self._last, len(ordered))))
+
+        for count, period in self._periods:
+            seen: set[tuple] = set()
+            for ix, backup in enumerate(ordered):
+                if len(seen) == count:
+                    break
+                if (p := period(created(backup))) not in seen:
+                    seen.add(p)
+                    kept.add(ix)
+
+        return [backup for ix, backup in enumerate(ordered) if ix not in kept]
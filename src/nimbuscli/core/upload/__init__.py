@@ -1,2 +1,34 @@
-from nimbuscli.core.upload.aws import AwsUploader
-from nimbuscli.core.upload.uploader import Uploader, UploadProgress, UploadStatus
+from nimbuscli.core.upload.aws import AwsUploader, ChecksumError, DeleteError
+from nimbuscli.core.upload.digest import (
+    DigestCatalog,
+    Manifest,
+    ManifestCatalog,
+    composite_checksum,
+    file_digest,
+    part_checksum,
+    part_digests,
+)
+from nimbuscli.core.upload.endpoint import S3Endpoint
+from nimbuscli.core.upload.fanout import ChunkReader, FanoutError, FanoutUploader
+from nimbuscli.core.upload.filesystem import FileSystemUploader
+from nimbuscli.core.upload.multipart import (
+    FilePart,
+    MultipartSession,
+    MultipartSessions,
+)
+from nimbuscli.core.upload.pool import ByteBudget, TokenBucket, TransferPool
+from nimbuscli.core.upload.progress import (
+    ProgressAggregator,
+    ProgressCallback,
+    ProgressSnapshot,
+    TransferCounter,
+    TransferProgress,
+    log_progress,
+)
+from nimbuscli.core.upload.transfer import TransferTuner
+from nimbuscli.core.upload.uploader import (
+    RemoteObject,
+    Uploader,
+    UploadProgress,
+    UploadStatus,
+)
@@ -1,15 +1,44 @@
 from __future__ import annotations
 
+import itertools
 import logging
 import os
+import posixpath
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Callable
+from typing import BinaryIO, Callable, Iterator
 
 from boto3 import Session
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
 from logdecorator import log_on_end, log_on_error, log_on_start
+from s3transfer.utils import signal_not_transferring, signal_transferring
 
-from nimbuscli.core.upload.uploader import Uploader, UploadProgress, UploadStatus
+from nimbuscli.core.upload.digest import (
+    DigestCatalog,
+    Manifest,
+    ManifestCatalog,
+    composite_checksum,
+    file_digest,
+    part_checksum,
+    part_digests,
+)
+from nimbuscli.core.upload.endpoint import S3Endpoint
+from nimbuscli.core.upload.multipart import (
+    FilePart,
+    MultipartSession,
+    MultipartSessions,
+)
+from nimbuscli.core.upload.pool import TokenBucket
+from nimbuscli.core.upload.progress import ProgressAggregator, ProgressCallback
+from nimbuscli.core.upload.transfer import MAX_PARTS, TransferTuner
+from nimbuscli.core.upload.uploader import (
+    RemoteObject,
+    Uploader,
+    UploadProgress,
+    UploadStatus,
+)
 
 
 class AwsUploader(Uploader):
@@ -17,50 +46,100 @@ class AwsUploader(Uploader):
     Upload files to AWS S3 bucket.
     """
 
-    class CallbackAdapter:
-        """
-        Converts boto3 callback to common callback.
-        """
+    # The objects in these storage classes cannot be copied without a restore.
+    ARCHIVAL_STORAGE = ("GLACIER", "DEEP_ARCHIVE")
 
-        def __init__(self, filepath: str, on_progress: Callable[[UploadProgress], None]):
-            self._filepath = filepath
-            self._filesize = os.stat(filepath).st_size
-            self._on_progress = on_progress
-            self._uploaded = 0
-            self._reported = 0
-            self._started = datetime.now()
-            self._lock = threading.Lock()
+    # Name of the object metadata entry with the SHA-256 digest of the content.
+    DIGEST_METADATA = "sha256"
 
-        def __eq__(self, other):
-            return (self._filepath, self._on_progress) == (other._filepath, other._on_progress)
+    # Maximum number of the keys, that could be deleted by a single request.
+    DELETE_BATCH = 1000
 
-        @log_on_end(logging.DEBUG, "Uploaded {self._filepath!s} [{self._uploaded!s}/{self._filesize!s}]")
-        def __call__(self, bytes_amount: int):
-            with self._lock:
+    # S3 additional checksums, that are verified by S3 for each uploaded part.
+    CHECKSUM_ALGORITHMS = ("CRC32", "CRC32C", "SHA1", "SHA256")
 
-                # Accumulate the uploaded bytes,
-                # and calculate the upload progress.
-                self._uploaded += bytes_amount
-                progress = min(int((self._uploaded / self._filesize) * 100), 100)
+    class CallbackAdapter(ProgressCallback):
+        """
+        Converts boto3 callback to common callback.
+        """
 
-                # Throttle the reported progress.
-                # Report when uploaded (at least) another 10% of the file.
-                if progress >= self._reported + 10 or (progress == 100 and self._reported != 100):
-                    self._reported = progress
+    def __init__(
+        self,
+        access_key: str,
+        secret_key: str,
+        bucket: str,
+        storage_class: str,
+        tuner: TransferTuner = None,
+        limiter: TokenBucket = None,
+        dedup: bool = False,
+        catalog: DigestCatalog = None,
+        sessions: MultipartSessions = None,
+        abandon_after: timedelta = None,
+        manifests: ManifestCatalog = None,
+        progress: ProgressAggregator = None,
+        checksum: str = None,
+        endpoint: S3Endpoint = None,
+        transfers: int = 1,
+    ):
+        """
+        Creates a new instance of the AwsUploader.
 
-                    elapsed = max(timedelta(seconds=1), datetime.now() - self._started)
-                    speed = int(self._uploaded // elapsed.total_seconds())
+        :param access_key: AWS access key.
+        :param secret_key: AWS secret key.
+        :param bucket: Name of the S3 bucket.
+        :param storage_class: S3 storage class of the uploaded files.
+        :param tuner: Multipart transfer settings. The boto3 defaults are used if not specified.
+        :param limiter: Bandwidth limit shared by all uploads. The bandwidth is not limited if not specified.
+        :param dedup: Skip the files that are already uploaded, based on their content digest.
+        :param catalog: Catalog of the uploaded objects, that allows to copy the file
+            from a different key on the server side, instead of uploading it again.
+        :param sessions: Unfinished multipart uploads. When specified, the multipart
+            uploads are resumed after a failure, instead of starting over.
+        :param abandon_after: Age of the unfinished multipart uploads in the bucket,
+            after which they are aborted. The uploads are never aborted if not specified.
+        :param manifests: Part manifests of the previous versions. When specified, the parts
+            that are unchanged since the previous version are copied on the server side.
+        :param progress: Progress of all transfers, that could be shared by several uploaders.
+        :param checksum: S3 additional checksum algorithm, e.g. 'SHA256'. When specified,
+            the checksum of each part is sent with the part, and verified by S3.
+        :param endpoint: Connection settings of the S3 client. The AWS S3 defaults are used if not specified.
+        :param transfers: Number of the files, that are uploaded concurrently by this uploader.
+            The connection pool of the client is sized for all their concurrent part uploads.
+        """
+        if not bucket:
+            raise ValueError("The bucket cannot be None or empty.")
 
-                    self._on_progress(UploadProgress(progress, elapsed, speed))
+        if checksum is not None and checksum not in AwsUploader.CHECKSUM_ALGORITHMS:
+            raise ValueError(f"Checksum should be one of: {', '.join(AwsUploader.CHECKSUM_ALGORITHMS)}.")
 
-    def __init__(self, access_key: str, secret_key: str, bucket: str, storage_class: str):
+        self._tuner = tuner if tuner else TransferTuner()
+        self._limiter = limiter
+        self._dedup = dedup
+        self._catalog = catalog if dedup else None
+        self._sessions = sessions
+        self._abandon_after = abandon_after
+        self._manifests = manifests
+        self._progress = progress if progress else ProgressAggregator()
+        self._checksum = checksum
+        self._endpoint = endpoint if endpoint else S3Endpoint()
+        self._cleaned = False
+        self._lock = threading.Lock()
         self._session = Session(
             aws_access_key_id=access_key,
             aws_secret_access_key=secret_key,
         )
         self._access_key = access_key
         self._secret_key = secret_key
-        self._s3 = self._session.client("s3")
+
+        # A single client is shared by all the transfers, so the connections are reused.
+        # Each transfer makes at most one request besides its concurrent part uploads.
+        self._s3 = self._endpoint.client(self._session, transfers * (self._tuner.max_concurrency + 1))
+
+        # The bodies of the parts report the progress only while they are being sent,
+        # the same way as the transfer manager signals its own bodies.
+        events = self._s3.meta.events
+        events.register_first("request-created.s3", signal_not_transferring, unique_id="s3upload-not-transferring")
+        events.register_last("request-created.s3", signal_transferring, unique_id="s3upload-transferring")
         self._bucket = bucket
 
         # See:
@@ -74,14 +153,46 @@ class AwsUploader(Uploader):
             f"secret='{self._secret_key}'",
             f"bucket='{self._bucket}'",
             f"storage='{self._storage_class}'",
+            f"tuner={self._tuner!r}",
+            f"limiter={self._limiter!r}",
+            f"dedup='{self._dedup}'",
+            f"catalog={self._catalog!r}",
+            f"sessions={self._sessions!r}",
+            f"abandon='{self._abandon_after}'",
+            f"manifests={self._manifests!r}",
+            f"progress={self._progress!r}",
+            f"checksum='{self._checksum}'",
+            f"endpoint={self._endpoint!r}",
         ]
         return "AwsUploader(" + ", ".join(params) + ")"
 
     def config(self) -> dict[str, str]:
-        return {
+        cfg = {
             "S3 Bucket": self._bucket,
             "S3 Storage": self._storage_class,
         }
+        cfg |= {f"S3 {k}": v for k, v in self._endpoint.config().items()}
+        cfg |= {f"S3 {k}": v for k, v in self._tuner.config().items()}
+
+        if self._limiter:
+            cfg["S3 Bandwidth"] = f"{self._limiter.rate / 1024 / 1024:g} MB/s"
+
+        if self._dedup:
+            cfg["S3 Dedup"] = "True"
+
+        if self._sessions:
+            cfg["S3 Resumable"] = "True"
+
+        if self._abandon_after:
+            cfg["S3 Abandon After"] = str(self._abandon_after)
+
+        if self._manifests:
+            cfg["S3 Delta"] = "True"
+
+        if self._checksum:
+            cfg["S3 Checksum"] = self._checksum
+
+        return cfg
 
     def upload(
         self,
@@ -90,25 +201,504 @@ class AwsUploader(Uploader):
         on_progress: Callable[[UploadProgress], None] = None,
     ) -> UploadStatus:
         status = UploadStatus(filepath, key)
+        status.location = self.location
+        status.storage_class = self._storage_class
         status.started = datetime.now()
         status.size = os.stat(filepath).st_size
 
+        concurrency = self._tuner.concurrency()
+        transfer = TransferConfig(
+            multipart_threshold=self._tuner.threshold,
+            multipart_chunksize=self._tuner.part_size(status.size),
+            max_concurrency=concurrency,
+        )
+
+        callback = AwsUploader.CallbackAdapter(filepath, on_progress, self._limiter, self._progress)
+
         try:
 
-            self._upload(
-                filepath,
+            if self._dedup:
+                status.digest = file_digest(filepath)
+                if self._exists(key, status.digest):
+                    status.existing = True
+                elif source := self._find_copy(status.digest):
+                    self._copy(source, self._bucket, key, self._storage_class, status.digest, transfer)
+                    status.copied_from = source
+
+            if status.existing or status.copied_from:
+                callback.skip(status.size)
+            elif (self._sessions or self._manifests) and status.size >= self._tuner.threshold:
+                self._cleanup_abandoned()
+                self._multipart_upload(filepath, key, callback, transfer, status)
+            else:
+                self._upload(
+                    filepath,
+                    self._bucket,
+                    key,
+                    self._storage_class,
+                    callback,
+                    transfer,
+                    status.digest,
+                )
+
+            if self._checksum and not status.checksum:
+                self._object_checksum(key, status)
+
+            # The digest of a single part object is its checksum, so the object is verified
+            # against the digest, that is already computed for the deduplication.
+            if status.digest and status.checksum_algorithm == "SHA256" and "-" not in (status.checksum or "-"):
+                self._verify_checksum(key, status, part_checksum(status.digest))
+
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            status.exception = e
+
+        callback.finish()
+        status.completed = datetime.now()
+
+        if status.success and status.digest and self._catalog:
+            self._catalog.update(self.location, status.digest, key)
+
+        # Only the complete uploads tell anything about the throughput.
+        if status.success and status.sent_size == status.size:
+            self._tuner.record(concurrency, status.size, status.completed - status.started)
+
+        return status
+
+    @property
+    def location(self) -> str:
+        return self._endpoint.location(self._bucket)
+
+    @log_on_start(logging.INFO, "Listing s3 {self._bucket!s}/{prefix!s}")
+    @log_on_error(logging.ERROR, "Failed to list s3 {self._bucket!s}/{prefix!s}: {e!r}", on_exceptions=Exception)
+    def list_objects(self, prefix: str = "") -> Iterator[RemoteObject]:
+        for page in self._s3.get_paginator("list_objects_v2").paginate(Bucket=self._bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield RemoteObject(obj["Key"], obj["Size"], obj["LastModified"], obj.get("StorageClass"))
+
+    @log_on_end(logging.DEBUG, "Stat of s3 {self._bucket!s}/{key!s}: {result!r}")
+    def stat_object(self, key: str) -> RemoteObject | None:
+        # The checksum is returned only when it is explicitly requested.
+        try:
+            head = self._s3.head_object(Bucket=self._bucket, Key=key, ChecksumMode="ENABLED")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+        algorithm = next((a for a in AwsUploader.CHECKSUM_ALGORITHMS if head.get(f"Checksum{a}")), None)
+        return RemoteObject(
+            key,
+            head["ContentLength"],
+            head["LastModified"],
+            head.get("StorageClass", "STANDARD"),
+            algorithm,
+            head.get(f"Checksum{algorithm}") if algorithm else None,
+        )
+
+    @log_on_start(logging.DEBUG, "Reading s3 {self._bucket!s}/{key!s} [{offset!s}+{length!s}]")
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        response = self._s3.get_object(Bucket=self._bucket, Key=key, Range=f"bytes={offset}-{offset + length - 1}")
+        with response["Body"] as body:
+            return body.read()
+
+    def delete_objects(self, keys: list[str]) -> dict[str, Exception]:
+        failures: dict[str, Exception] = {}
+        for batch in itertools.batched(keys, AwsUploader.DELETE_BATCH):
+            failures |= self._delete_batch(list(batch))
+        return failures
+
+    @log_on_start(logging.INFO, "Deleting a batch of objects from s3 {self._bucket!s}")
+    @log_on_end(logging.INFO, "Deleted objects from s3 {self._bucket!s}, failed: {result!r}")
+    def _delete_batch(self, keys: list[str]) -> dict[str, Exception]:
+        # The quiet mode returns only the errors, so the response stays small.
+        try:
+            response = self._s3.delete_objects(
+                Bucket=self._bucket,
+                Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return {key: e for key in keys}
+
+        return {
+            error["Key"]: DeleteError(error["Key"], error.get("Code"), error.get("Message"))
+            for error in response.get("Errors", [])
+        }
+
+    @property
+    def streamable(self) -> bool:
+        # The digests, the resumable and the delta uploads need a random access to the file.
+        return not (self._dedup or self._sessions or self._manifests)
+
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        filepath: str,
+        key: str,
+        size: int,
+        on_progress: Callable[[UploadProgress], None] = None,
+    ) -> UploadStatus:
+        status = UploadStatus(filepath, key)
+        status.location = self.location
+        status.storage_class = self._storage_class
+        status.started = datetime.now()
+        status.size = size
+
+        concurrency = self._tuner.concurrency()
+        transfer = TransferConfig(
+            multipart_threshold=self._tuner.threshold,
+            multipart_chunksize=self._tuner.part_size(size),
+            max_concurrency=concurrency,
+        )
+
+        callback = AwsUploader.CallbackAdapter(filepath, on_progress, self._limiter, self._progress, size)
+
+        try:
+
+            self._upload_stream(
+                stream,
                 self._bucket,
                 key,
                 self._storage_class,
-                AwsUploader.CallbackAdapter(filepath, on_progress) if on_progress else None,
+                callback,
+                transfer,
             )
 
+            if self._checksum:
+                self._object_checksum(key, status)
+
         except Exception as e:  # pylint: disable=broad-exception-caught
             status.exception = e
 
+        callback.finish()
         status.completed = datetime.now()
+
+        if status.success:
+            self._tuner.record(concurrency, status.size, status.completed - status.started)
+
         return status
 
+    @log_on_start(logging.INFO, "Uploading to s3 {self._bucket!s}/{key!s} in parts")
+    @log_on_end(logging.INFO, "Uploaded {self._bucket!s}/{key!s} in parts")
+    @log_on_error(logging.ERROR, "Failed to upload {filepath!s} in parts: {e!r}", on_exceptions=Exception)
+    def _multipart_upload(
+        self,
+        filepath: str,
+        key: str,
+        on_progress: AwsUploader.CallbackAdapter,
+        transfer: TransferConfig,
+        status: UploadStatus,
+    ):
+        """
+        Upload the file in parts.
+
+        Each uploaded part is recorded, so the failed upload could be resumed by the next run.
+        The parts that are unchanged since the previous version of the file, are copied
+        from the previous version on the server side, instead of being uploaded again.
+        """
+        st = os.stat(filepath)
+        series = posixpath.dirname(key)
+
+        # The previous version dictates the part size,
+        # so the unchanged parts are aligned with its parts.
+        part_size = transfer.multipart_chunksize
+        previous = self._previous_version(series, st.st_size) if self._manifests else None
+        part_size = previous.part_size if previous else part_size
+        digests = part_digests(filepath, part_size) if self._manifests else None
+
+        session = self._resumed_session(key, filepath, st.st_size, st.st_mtime_ns, part_size)
+        if session is None:
+            extra = {"StorageClass": self._storage_class}
+            if status.digest:
+                extra["Metadata"] = {AwsUploader.DIGEST_METADATA: status.digest}
+            if self._checksum:
+                extra["ChecksumAlgorithm"] = self._checksum
+
+            response = self._s3.create_multipart_upload(Bucket=self._bucket, Key=key, **extra)
+            session = MultipartSession(
+                response["UploadId"],
+                filepath,
+                st.st_size,
+                st.st_mtime_ns,
+                part_size,
+                self._checksum,
+            )
+            if self._sessions:
+                self._sessions.save(self.location, key, session)
+
+        status.resumed_size = sum(session.part_range(n)[1] for n in session.parts)
+        if on_progress and status.resumed_size:
+            on_progress.skip(status.resumed_size)
+
+        missing = [n for n in range(1, session.total_parts + 1) if n not in session.parts]
+        copies = {n for n in missing if previous and previous.part(n) == digests[n - 1]}
+        status.copied_size = sum(session.part_range(n)[1] for n in copies)
+
+        def transfer_part(number: int):
+            digest = digests[number - 1] if digests else None
+            if number in copies:
+                self._copy_part(key, session, number, previous.key, digest, on_progress)
+            else:
+                self._upload_part(key, session, number, digest, on_progress)
+
+        try:
+            with ThreadPoolExecutor(max_workers=transfer.max_concurrency, thread_name_prefix="part") as executor:
+                for _ in executor.map(transfer_part, missing):
+                    pass
+
+            response = self._s3.complete_multipart_upload(
+                Bucket=self._bucket,
+                Key=key,
+                UploadId=session.upload_id,
+                MultipartUpload={"Parts": self._completed_parts(session)},
+            )
+        except Exception:
+            # The upload could be resumed only when its progress is recorded.
+            if not self._sessions:
+                self._abort(key, session.upload_id)
+            raise
+
+        if self._sessions:
+            self._sessions.remove(self.location, key)
+
+        if session.algorithm:
+            status.checksum_algorithm = session.algorithm
+            status.checksum = response.get(f"Checksum{session.algorithm}")
+
+        # The checksum of the whole object is compared to the one computed from the part digests,
+        # that are already known, so the uploaded object is verified without reading the file again.
+        if digests and session.algorithm == "SHA256":
+            self._verify_checksum(key, status, composite_checksum(digests))
+
+        if self._manifests:
+            manifest = Manifest(key, st.st_size, part_size, digests, response.get("ETag"))
+            self._manifests.update(self.location, series, manifest)
+
+    def _previous_version(self, series: str, size: int) -> Manifest | None:
+        if (previous := self._manifests.get(self.location, series)) is None:
+            return None
+
+        # The part size of the previous version should fit the new version as well.
+        if -(-size // previous.part_size) > MAX_PARTS:
+            return None
+
+        # The previous version could be deleted or replaced since it has been uploaded.
+        head = self._head(self._bucket, previous.key)
+        if not head or head.get("ETag") != previous.etag or head.get("StorageClass") in AwsUploader.ARCHIVAL_STORAGE:
+            return None
+
+        return previous
+
+    def _resumed_session(self, key: str, filepath: str, size: int, mtime: int, part_size: int) -> MultipartSession:
+        if not self._sessions or (session := self._sessions.get(self.location, key)) is None:
+            return None
+
+        # The file has changed since the upload has been started,
+        # so the uploaded parts are useless.
+        if not session.matches(filepath, size, mtime, part_size):
+            self._abort(key, session.upload_id)
+            self._sessions.remove(self.location, key)
+            return None
+
+        # The bucket is the source of truth, the parts that are missing
+        # or differ from the recorded ones are uploaded again.
+        if (uploaded := self._list_parts(key, session.upload_id)) is None:
+            self._sessions.remove(self.location, key)
+            return None
+
+        session.parts = {
+            n: etag
+            for n, etag in session.parts.items()
+            if n in uploaded and uploaded[n] == (etag, session.part_range(n)[1])
+        }
+        session.checksums = {n: c for n, c in session.checksums.items() if n in session.parts}
+        return session
+
+    def _list_parts(self, key: str, upload_id: str) -> dict[int, tuple[str, int]] | None:
+        parts = {}
+        try:
+            for page in self._s3.get_paginator("list_parts").paginate(
+                Bucket=self._bucket, Key=key, UploadId=upload_id
+            ):
+                for part in page.get("Parts", []):
+                    parts[part["PartNumber"]] = (part["ETag"], part["Size"])
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "NoSuchUpload":
+                return None
+            raise
+        return parts
+
+    @log_on_end(logging.DEBUG, "Uploaded part {number!s} of {key!s}")
+    def _upload_part(
+        self,
+        key: str,
+        session: MultipartSession,
+        number: int,
+        digest: str,
+        on_progress: AwsUploader.CallbackAdapter,
+    ):
+        offset, size = session.part_range(number)
+        with FilePart(session.filepath, offset, size, on_progress) as body:
+            response = self._s3.upload_part(
+                Bucket=self._bucket,
+                Key=key,
+                UploadId=session.upload_id,
+                PartNumber=number,
+                Body=body,
+                **self._part_checksum(session, digest),
+            )
+
+        checksum = response.get(f"Checksum{session.algorithm}") if session.algorithm else None
+        self._record_part(key, session, number, response["ETag"], checksum)
+
+        # The bytes, that haven't been read while the part was being sent, are accounted at once.
+        if on_progress and body.reported < size:
+            on_progress(size - body.reported)
+
+    @log_on_end(logging.DEBUG, "Copied part {number!s} of {key!s} from {source!s}")
+    def _copy_part(
+        self,
+        key: str,
+        session: MultipartSession,
+        number: int,
+        source: str,
+        digest: str,
+        on_progress: AwsUploader.CallbackAdapter,
+    ):
+        offset, size = session.part_range(number)
+        stop = offset + size - 1
+        response = self._s3.upload_part_copy(
+            Bucket=self._bucket,
+            Key=key,
+            UploadId=session.upload_id,
+            PartNumber=number,
+            CopySource={"Bucket": self._bucket, "Key": source},
+            CopySourceRange=f"bytes={offset}-{stop}",
+        )
+
+        result = response["CopyPartResult"]
+        checksum = None
+        if session.algorithm:
+            # The copied part is identical to the local one, so its digest is used,
+            # if S3 doesn't return the checksum of the copied range.
+            checksum = result.get(f"Checksum{session.algorithm}")
+            checksum = checksum or (part_checksum(digest) if digest and session.algorithm == "SHA256" else None)
+        self._record_part(key, session, number, result["ETag"], checksum)
+
+        if on_progress:
+            on_progress.skip(size)
+
+    def _part_checksum(self, session: MultipartSession, digest: str) -> dict[str, str]:
+        if not session.algorithm:
+            return {}
+
+        # The part digests computed for the delta uploads are reused,
+        # so the part is not read twice. Otherwise, boto3 computes the checksum.
+        if digest and session.algorithm == "SHA256":
+            return {"ChecksumSHA256": part_checksum(digest)}
+        return {"ChecksumAlgorithm": session.algorithm}
+
+    def _completed_parts(self, session: MultipartSession) -> list[dict]:
+        parts = []
+        for number, etag in sorted(session.parts.items()):
+            part = {"PartNumber": number, "ETag": etag}
+            if session.algorithm and (checksum := session.checksums.get(number)):
+                part[f"Checksum{session.algorithm}"] = checksum
+            parts.append(part)
+        return parts
+
+    def _record_part(self, key: str, session: MultipartSession, number: int, etag: str, checksum: str = None):
+        with self._lock:
+            session.parts[number] = etag
+            if checksum:
+                session.checksums[number] = checksum
+            if self._sessions:
+                self._sessions.save(self.location, key, session)
+
+    @log_on_start(logging.INFO, "Aborting multipart upload to {key!s} [{upload_id!s}]")
+    @log_on_error(logging.WARNING, "Failed to abort upload to {key!s}: {e!r}", on_exceptions=Exception, reraise=False)
+    def _abort(self, key: str, upload_id: str) -> None:
+        self._s3.abort_multipart_upload(Bucket=self._bucket, Key=key, UploadId=upload_id)
+
+    @log_on_error(
+        logging.WARNING, "Failed to clean up abandoned uploads: {e!r}", on_exceptions=Exception, reraise=False
+    )
+    def _cleanup_abandoned(self) -> None:
+        # The bucket is checked once per run.
+        with self._lock:
+            if self._cleaned or not self._abandon_after:
+                return
+            self._cleaned = True
+
+        deadline = datetime.now().astimezone() - self._abandon_after
+        for page in self._s3.get_paginator("list_multipart_uploads").paginate(Bucket=self._bucket):
+            for upload in page.get("Uploads", []):
+                if upload["Initiated"] < deadline:
+                    self._abort(upload["Key"], upload["UploadId"])
+                    if (
+                        self._sessions
+                        and (session := self._sessions.get(self.location, upload["Key"]))
+                        and (session.upload_id == upload["UploadId"])
+                    ):
+                        self._sessions.remove(self.location, upload["Key"])
+
+    def _exists(self, key: str, digest: str) -> bool:
+        head = self._head(self._bucket, key)
+        return bool(head) and head.get("Metadata", {}).get(AwsUploader.DIGEST_METADATA) == digest
+
+    def _find_copy(self, digest: str) -> str | None:
+        if not self._catalog or not (source := self._catalog.get(self.location, digest)):
+            return None
+
+        # The catalog could be outdated, so the object is verified before the copy.
+        head = self._head(self._bucket, source)
+        if not head or head.get("Metadata", {}).get(AwsUploader.DIGEST_METADATA) != digest:
+            return None
+        if head.get("StorageClass") in AwsUploader.ARCHIVAL_STORAGE:
+            return None
+
+        return source
+
+    @log_on_error(
+        logging.WARNING, "Failed to check s3 {bucket!s}/{key!s}: {e!r}", on_exceptions=Exception, reraise=False
+    )
+    def _head(self, bucket: str, key: str) -> dict | None:
+        extra = {"ChecksumMode": "ENABLED"} if self._checksum else {}
+        try:
+            return self._s3.head_object(Bucket=bucket, Key=key, **extra)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    @log_on_start(logging.INFO, "Copying s3 {source!s} to {bucket!s}/{key!s} [{storage_class!s}]")
+    @log_on_end(logging.INFO, "Copied {bucket!s}/{key!s}")
+    @log_on_error(logging.ERROR, "Failed to copy {source!s}: {e!r}", on_exceptions=Exception)
+    def _copy(
+        self,
+        source: str,
+        bucket: str,
+        key: str,
+        storage_class: str,
+        digest: str,
+        transfer: TransferConfig,
+    ):
+        extra = {
+            "StorageClass": storage_class,
+            "Metadata": {AwsUploader.DIGEST_METADATA: digest},
+            "MetadataDirective": "REPLACE",
+        }
+        if self._checksum:
+            extra["ChecksumAlgorithm"] = self._checksum
+
+        # The managed copy switches to the multipart copy for the large objects.
+        self._s3.copy(
+            {"Bucket": bucket, "Key": source},
+            bucket,
+            key,
+            ExtraArgs=extra,
+            Config=transfer,
+        )
+
     @log_on_start(logging.INFO, "Uploading to s3 {bucket!s}/{key!s} [{storage_class!s}]")
     @log_on_end(logging.INFO, "Uploaded {bucket!s}/{key!s}")
     @log_on_error(logging.ERROR, "Failed to upload {filepath!s}: {e!r}", on_exceptions=Exception)
@@ -119,12 +709,81 @@ class AwsUploader(Uploader):
         key: str,
         storage_class: str,
         on_progress: AwsUploader.CallbackAdapter,
+        transfer: TransferConfig,
+        digest: str = None,
     ):
+        extra = {"StorageClass": storage_class}
+        if digest:
+            extra["Metadata"] = {AwsUploader.DIGEST_METADATA: digest}
+        if self._checksum:
+            extra["ChecksumAlgorithm"] = self._checksum
+
         # https://boto3.amazonaws.com/v1/documentation/api/latest/guide/s3-uploading-files.html
         self._s3.upload_file(
             filepath,
             bucket,
             key,
-            ExtraArgs={"StorageClass": storage_class},
+            ExtraArgs=extra,
             Callback=on_progress,
+            Config=transfer,
         )
+
+    @log_on_start(logging.INFO, "Streaming to s3 {bucket!s}/{key!s} [{storage_class!s}]")
+    @log_on_end(logging.INFO, "Streamed {bucket!s}/{key!s}")
+    @log_on_error(logging.ERROR, "Failed to stream to {bucket!s}/{key!s}: {e!r}", on_exceptions=Exception)
+    def _upload_stream(
+        self,
+        stream: BinaryIO,
+        bucket: str,
+        key: str,
+        storage_class: str,
+        on_progress: AwsUploader.CallbackAdapter,
+        transfer: TransferConfig,
+    ):
+        extra = {"StorageClass": storage_class}
+        if self._checksum:
+            extra["ChecksumAlgorithm"] = self._checksum
+
+        self._s3.upload_fileobj(
+            stream,
+            bucket,
+            key,
+            ExtraArgs=extra,
+            Callback=on_progress,
+            Config=transfer,
+        )
+
+    def _object_checksum(self, key: str, status: UploadStatus) -> None:
+        # The managed transfers don't return the response of the upload,
+        # so the checksum that S3 has verified is read from the object.
+        if head := self._head(self._bucket, key):
+            status.checksum_algorithm = self._checksum
+            status.checksum = head.get(f"Checksum{self._checksum}")
+
+    def _verify_checksum(self, key: str, status: UploadStatus, expected: str) -> None:
+        # The number of parts is not a part of the checksum itself.
+        if status.checksum and status.checksum.split("-")[0] != expected.split("-")[0]:
+            raise ChecksumError(key, expected, status.checksum)
+
+
+class ChecksumError(Exception):
+    """
+    The checksum of the uploaded object doesn't match the local file.
+    """
+
+    def __init__(self, key: str, expected: str, actual: str):
+        super().__init__(f"Checksum mismatch of {key}: expected '{expected}', got '{actual}'.")
+        self.key = key
+        self.expected = expected
+        self.actual = actual
+
+
+class DeleteError(Exception):
+    """
+    The object has not been deleted from the bucket.
+    """
+
+    def __init__(self, key: str, code: str, message: str):
+        super().__init__(f"Failed to delete {key}: {code} {message}")
+        self.key = key
+        self.code = code
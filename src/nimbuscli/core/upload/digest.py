@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import logging
+import os
+from abc import ABC, abstractmethod
+
+from logdecorator import log_on_end
+
+from nimbuscli.core.upload.multipart import FilePart
+from nimbuscli.core.upload.pool import TokenBucket
+
+# Size of the chunks, that are read when the bandwidth is limited.
+DIGEST_CHUNK_SIZE = 1024 * 1024
+
+
+@log_on_end(logging.DEBUG, "Digest of {filepath!s}: {result!s}")
+def file_digest(filepath: str, limiter: TokenBucket = None) -> str:
+    """
+    Compute the SHA-256 digest of the file content.
+
+    :param filepath: Full path to the file.
+    :param limiter: Limit of the read bandwidth. The file is read as fast as possible if not specified.
+    :return: Hex digest of the file.
+    """
+    with open(filepath, "rb") as file:
+        if limiter is None:
+            return hashlib.file_digest(file, "sha256").hexdigest()
+
+        digest = hashlib.sha256()
+        while chunk := file.read(DIGEST_CHUNK_SIZE):
+            limiter.consume(len(chunk))
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+class DigestCatalog(ABC):
+    """
+    Defines a catalog of the uploaded objects, indexed by their content digests.
+    The catalog allows to find an already uploaded copy of the file under a different key.
+    """
+
+    @abstractmethod
+    def get(self, location: str, digest: str) -> str | None:
+        """
+        Returns the key of the uploaded object with the given digest.
+        """
+
+    @abstractmethod
+    def update(self, location: str, digest: str, key: str) -> None:
+        """
+        Record the uploaded object.
+        """
+
+
+def part_digests(filepath: str, part_size: int) -> list[str]:
+    """
+    Compute the SHA-256 digests of the consecutive file parts.
+
+    :param filepath: Full path to the file.
+    :param part_size: Size of each part, except the last one.
+    :return: Hex digests of the parts.
+    """
+    size = os.stat(filepath).st_size
+    digests = []
+    for offset in range(0, max(size, 1), part_size):
+        with FilePart(filepath, offset, min(part_size, size - offset)) as part:
+            digests.append(hashlib.file_digest(part, "sha256").hexdigest())
+    return digests
+
+
+def part_checksum(digest: str) -> str:
+    """
+    Convert the hex SHA-256 digest to the S3 checksum, i.e. to the base64 encoded digest.
+    """
+    return base64.b64encode(bytes.fromhex(digest)).decode()
+
+
+def composite_checksum(digests: list[str]) -> str:
+    """
+    Compute the S3 SHA-256 checksum of a multipart object from the digests of its parts.
+    S3 computes the checksum of the concatenated part checksums, followed by the number of parts.
+
+    :param digests: Hex SHA-256 digests of the parts.
+    :return: The composite checksum, e.g. 'base64-3'.
+    """
+    composite = hashlib.sha256(b"".join(bytes.fromhex(d) for d in digests)).hexdigest()
+    return f"{part_checksum(composite)}-{len(digests)}"
+
+
+class Manifest:
+    """
+    Digests of the parts of an uploaded object.
+    """
+
+    def __init__(self, key: str, size: int, part_size: int, parts: list[str], etag: str = None):
+        self.key: str = key
+        self.size: int = size
+        self.part_size: int = part_size
+        self.parts: list[str] = parts
+        self.etag: str = etag
+
+    def __repr__(self) -> str:
+        params = [
+            f"key='{self.key}'",
+            f"size='{self.size}'",
+            f"part='{self.part_size}'",
+            f"parts='{len(self.parts)}'",
+        ]
+        return "Manifest(" + ", ".join(params) + ")"
+
+    def part(self, number: int) -> str | None:
+        """
+        Returns the digest of the part. The parts are numbered from 1.
+        """
+        return self.parts[number - 1] if 0 < number <= len(self.parts) else None
+
+    def to_dict(self) -> dict:
+        return {
+            "key": self.key,
+            "size": self.size,
+            "part_size": self.part_size,
+            "parts": self.parts,
+            "etag": self.etag,
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> Manifest:
+        return Manifest(data["key"], data["size"], data["part_size"], data["parts"], data.get("etag"))
+
+
+class ManifestCatalog(ABC):
+    """
+    Defines a catalog of the part manifests of the uploaded objects.
+    The manifests are grouped into the series of the consecutive versions of the same file,
+    so the next version could reuse the unchanged parts of the previous one.
+    """
+
+    @abstractmethod
+    def get(self, location: str, series: str) -> Manifest | None:
+        """
+        Returns the manifest of the latest uploaded version.
+        """
+
+    @abstractmethod
+    def update(self, location: str, series: str, manifest: Manifest) -> None:
+        """
+        Record the manifest of the uploaded version.
+        """
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from boto3 import Session
+from botocore.config import Config
+
+
+class S3Endpoint:
+    """
+    Connection settings of the S3 client, that allow to target
+    the S3 compatible services, such as MinIO or Garage.
+    """
+
+    ADDRESSING = ("auto", "virtual", "path")
+
+    def __init__(
+        self,
+        url: str = None,
+        addressing: str = None,
+        region: str = None,
+        max_connections: int = None,
+        keep_alive: bool = False,
+    ):
+        """
+        Creates a new instance of the S3Endpoint.
+
+        :param url: URL of the S3 compatible service. The AWS S3 is used if not specified.
+        :param addressing: Bucket addressing style: 'auto', 'virtual' or 'path'.
+            Most of the self-hosted services support only the 'path' style.
+        :param region: Region of the bucket, or the region configured in the self-hosted service.
+        :param max_connections: Size of the connection pool. By default, the pool
+            is large enough for all the concurrent part uploads.
+        :param keep_alive: Enable TCP keep-alive, so the idle pooled connections are not dropped.
+        """
+        if addressing is not None and addressing not in S3Endpoint.ADDRESSING:
+            raise ValueError(f"Addressing should be one of: {', '.join(S3Endpoint.ADDRESSING)}.")
+
+        if max_connections is not None and max_connections <= 0:
+            raise ValueError("Max connections should be either None or a positive number.")
+
+        self._url = url
+        self._addressing = addressing
+        self._region = region
+        self._max_connections = max_connections
+        self._keep_alive = keep_alive
+
+    def __repr__(self) -> str:
+        params = [
+            f"url='{self._url}'",
+            f"addressing='{self._addressing}'",
+            f"region='{self._region}'",
+            f"connections='{self._max_connections}'",
+            f"keep_alive='{self._keep_alive}'",
+        ]
+        return "S3Endpoint(" + ", ".join(params) + ")"
+
+    def config(self) -> dict[str, str]:
+        """
+        Returns the explicitly configured settings.
+        """
+        cfg = {}
+        if self._url:
+            cfg["Endpoint"] = self._url
+        if self._addressing:
+            cfg["Addressing"] = self._addressing
+        if self._region:
+            cfg["Region"] = self._region
+        if self._max_connections:
+            cfg["Max Connections"] = str(self._max_connections)
+        if self._keep_alive:
+            cfg["Keep-Alive"] = "True"
+        return cfg
+
+    def location(self, bucket: str) -> str:
+        """
+        Returns the location of the bucket, that identifies it across the services.
+        """
+        return f"{self._url.rstrip('/')}/{bucket}" if self._url else f"s3://{bucket}"
+
+    def client(self, session: Session, connections: int):
+        """
+        Create the S3 client, that is shared by all the transfers of the uploader.
+
+        :param session: Session with the credentials.
+        :param connections: Number of the concurrent requests, that the client is expected to make.
+        """
+        config = Config(
+            max_pool_connections=self._max_connections if self._max_connections else connections,
+            tcp_keepalive=self._keep_alive,
+            s3={"addressing_style": self._addressing} if self._addressing else None,
+        )
+        return session.client("s3", endpoint_url=self._url, region_name=self._region, config=config)
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import io
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Iterator
+
+from logdecorator import log_on_error, log_on_start
+
+from nimbuscli.core.upload.uploader import (
+    RemoteObject,
+    Uploader,
+    UploadProgress,
+    UploadStatus,
+)
+
+
+class FanoutUploader(Uploader):
+    """
+    Upload files to several destinations at once.
+
+    The file is read once, and each chunk is shared by all streaming destinations.
+    Every destination consumes the chunks from its own bounded queue, so the slowest
+    destination slows down the reading, while the faster destinations could get ahead
+    of it by at most the size of the queue. The destinations that can't consume a stream
+    upload the file on their own.
+    """
+
+    CHUNK_SIZE = 8 * 1024 * 1024
+    DEFAULT_BUFFER_SIZE = 64 * 1024 * 1024
+
+    def __init__(self, destinations: dict[str, Uploader], buffer_size: int = None):
+        """
+        Creates a new instance of the FanoutUploader.
+
+        :param destinations: Uploaders by the name of the destination.
+        :param buffer_size: Maximum number of bytes, that the fastest destination
+            could get ahead of the slowest one.
+        """
+        if not destinations:
+            raise ValueError("At least one destination is required.")
+
+        self._destinations = destinations
+        self._buffer_size = buffer_size if buffer_size else FanoutUploader.DEFAULT_BUFFER_SIZE
+        self._queue_size = max(1, self._buffer_size // FanoutUploader.CHUNK_SIZE)
+
+    def __repr__(self) -> str:
+        params = [
+            f"destinations={self._destinations!r}",
+            f"buffer='{self._buffer_size}'",
+        ]
+        return "FanoutUploader(" + ", ".join(params) + ")"
+
+    def config(self) -> dict[str, str]:
+        cfg = {"Destinations": ", ".join(self._destinations)}
+        for name, uploader in self._destinations.items():
+            cfg |= {f"[{name}] {k}": v for k, v in uploader.config().items()}
+        return cfg
+
+    def list_objects(self, prefix: str = "") -> Iterator[RemoteObject]:
+        # The destinations could hold different objects, so each of them is listed on its own.
+        raise NotImplementedError("The objects should be listed by each destination.")
+
+    def delete_objects(self, keys: list[str]) -> dict[str, Exception]:
+        raise NotImplementedError("The objects should be deleted by each destination.")
+
+    def stat_object(self, key: str) -> RemoteObject | None:
+        raise NotImplementedError("The objects should be inspected by each destination.")
+
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        raise NotImplementedError("The objects should be read by each destination.")
+
+    def upload(
+        self,
+        filepath: str,
+        key: str,
+        on_progress: Callable[[UploadProgress], None] = None,
+    ) -> UploadStatus:
+        status = UploadStatus(filepath, key)
+        status.started = datetime.now()
+        status.size = os.stat(filepath).st_size
+
+        streams = {n: u for n, u in self._destinations.items() if u.streamable}
+        files = {n: u for n, u in self._destinations.items() if not u.streamable}
+
+        readers = {name: ChunkReader(self._queue_size) for name in streams}
+        tasks = {name: (self._stream, u, readers[name], filepath, key, status.size) for name, u in streams.items()}
+        tasks |= {name: (u.upload, filepath, key) for name, u in files.items()}
+
+        with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="fanout") as executor:
+            futures = {name: executor.submit(*task) for name, task in tasks.items()}
+
+            try:
+                if readers:
+                    self._feed(filepath, status.size, list(readers.values()), on_progress)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                status.exception = e
+                for reader in readers.values():
+                    reader.fail(e)
+
+            for name, future in futures.items():
+                status.destinations[name] = self._result(future, filepath, key)
+
+        if failed := [f"{n}: {s.exception!r}" for n, s in status.destinations.items() if not s.success]:
+            status.exception = status.exception or FanoutError(failed)
+
+        status.completed = datetime.now()
+        return status
+
+    @log_on_start(logging.DEBUG, "Reading {filepath!s} for {readers!r}")
+    @log_on_error(logging.ERROR, "Failed to read {filepath!s}: {e!r}", on_exceptions=Exception)
+    def _feed(
+        self,
+        filepath: str,
+        size: int,
+        readers: list[ChunkReader],
+        on_progress: Callable[[UploadProgress], None],
+    ):
+        started = datetime.now()
+        reported = 0
+        fed = 0
+
+        with open(filepath, "rb") as file:
+            while chunk := file.read(FanoutUploader.CHUNK_SIZE):
+                # The same chunk is shared by all the destinations,
+                # and blocks while the slowest of them is busy.
+                for reader in readers:
+                    reader.put(chunk)
+
+                fed += len(chunk)
+                progress = min(int((fed / size) * 100), 100)
+                if on_progress and progress >= reported + 10:
+                    reported = progress
+                    elapsed = max(timedelta(seconds=1), datetime.now() - started)
+                    on_progress(UploadProgress(progress, elapsed, int(fed // elapsed.total_seconds())))
+
+        for reader in readers:
+            reader.close_writer()
+
+    def _stream(self, uploader: Uploader, reader: ChunkReader, filepath: str, key: str, size: int) -> UploadStatus:
+        # The reader is closed even if the destination fails early,
+        # so the other destinations are not blocked by its full queue.
+        with reader:
+            return uploader.upload_stream(reader, filepath, key, size)
+
+    def _result(self, future, filepath: str, key: str) -> UploadStatus:
+        try:
+            return future.result()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            status = UploadStatus(filepath, key)
+            status.exception = e
+            return status
+
+
+class FanoutError(Exception):
+    """
+    Some of the destinations have failed.
+    """
+
+    def __init__(self, failures: list[str]):
+        super().__init__("Failed destinations: " + "; ".join(failures))
+        self.failures = failures
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    A readable stream, backed by a bounded queue of chunks.
+    """
+
+    _EOF = object()
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._buffer = memoryview(b"")
+        self._eof = False
+        self._closed = threading.Event()
+        self._error: Exception = None
+
+    def __repr__(self) -> str:
+        return f"ChunkReader(maxsize='{self._queue.maxsize}')"
+
+    def readable(self) -> bool:
+        return True
+
+    def put(self, chunk: bytes) -> None:
+        """
+        Add the chunk, waiting for a free slot.
+        The chunks are dropped, once the reader is closed.
+        """
+        while not self._closed.is_set():
+            try:
+                self._queue.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def close_writer(self) -> None:
+        self.put(ChunkReader._EOF)
+
+    def fail(self, error: Exception) -> None:
+        """
+        Abort the reading. The consumer gets the error on the next read.
+        """
+        self._error = error
+        self.close_writer()
+
+    def read(self, size: int = -1) -> bytes:
+        # Keep reading until the requested size is collected,
+        # as the consumers treat a short read as the end of the stream.
+        parts = []
+        remaining = size if size is not None and size >= 0 else None
+        while remaining is None or remaining > 0:
+            if not self._buffer and not self._next():
+                break
+            take = len(self._buffer) if remaining is None else min(remaining, len(self._buffer))
+            parts.append(self._buffer[:take].tobytes())
+            self._buffer = self._buffer[take:]
+            remaining = None if remaining is None else remaining - take
+        return b"".join(parts)
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        return size
+
+    def close(self) -> None:
+        # The producer is never blocked by a consumer that has given up.
+        self._closed.set()
+        super().close()
+
+    def _next(self) -> bool:
+        if self._eof:
+            return False
+
+        chunk = self._queue.get()
+        if chunk is ChunkReader._EOF:
+            self._eof = True
+            if self._error:
+                raise self._error
+            return False
+
+        self._buffer = memoryview(chunk)
+        return True
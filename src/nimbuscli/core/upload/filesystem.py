@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import errno
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator
+
+from logdecorator import log_on_end, log_on_error, log_on_start
+
+from nimbuscli.core.upload.pool import TokenBucket
+from nimbuscli.core.upload.progress import ProgressAggregator, ProgressCallback
+from nimbuscli.core.upload.uploader import (
+    RemoteObject,
+    Uploader,
+    UploadProgress,
+    UploadStatus,
+)
+
+# The ioctl request of the Linux 'FICLONE', that shares the extents
+# of the source file on the copy-on-write file systems (btrfs, xfs, ...).
+FICLONE = 0x40049409
+
+# The errors that mean the copy offload is not supported for the given files,
+# so the content should be copied in another way.
+UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EINVAL, errno.ENOTTY}
+
+
+class FileSystemUploader(Uploader):
+    """
+    Upload files to a directory, e.g. a mounted NAS share.
+
+    The file is copied with the fastest method supported by the file systems:
+        - reflink, that shares the content without copying it on the copy-on-write file systems.
+        - copy_file_range, that copies the content in the kernel, or on the server side for NFS and SMB.
+        - streaming through a large buffer, on all other file systems.
+
+    The file is written under a temporary name, flushed to the disk and renamed
+    to the target name, so the target is either complete or missing.
+    """
+
+    CHUNK_SIZE = 8 * 1024 * 1024
+
+    # Number of the files, that are deleted concurrently.
+    # The deletion is dominated by the latency of the (network) file system.
+    DELETE_WORKERS = 16
+
+    def __init__(
+        self,
+        directory: str,
+        limiter: TokenBucket = None,
+        progress: ProgressAggregator = None,
+    ):
+        """
+        Creates a new instance of the FileSystemUploader.
+
+        :param directory: Root directory of the uploaded files.
+        :param limiter: Bandwidth limit shared by all uploads. The bandwidth is not limited if not specified.
+        :param progress: Progress of all transfers, that could be shared by several uploaders.
+        """
+        if not directory:
+            raise ValueError("The directory cannot be None or empty.")
+
+        self._directory = Path(directory).expanduser().as_posix()
+        self._limiter = limiter
+        self._progress = progress if progress else ProgressAggregator()
+
+        # The temporary files are created only accessible to the owner, so the uploaded files
+        # get the default permissions instead. The umask could be read only by replacing it,
+        # so it is read once, before any transfer has started.
+        umask = os.umask(0o077)
+        os.umask(umask)
+        self._mode = 0o666 & ~umask
+
+    def __repr__(self) -> str:
+        params = [
+            f"directory='{self._directory}'",
+            f"limiter={self._limiter!r}",
+        ]
+        return "FileSystemUploader(" + ", ".join(params) + ")"
+
+    def config(self) -> dict[str, str]:
+        cfg = {"Directory": self._directory}
+        if self._limiter:
+            cfg["Bandwidth"] = f"{self._limiter.rate / 1024 / 1024:g} MB/s"
+        return cfg
+
+    @property
+    def location(self) -> str:
+        return self._directory
+
+    @log_on_start(logging.INFO, "Listing {self._directory!s}/{prefix!s}")
+    @log_on_error(logging.ERROR, "Failed to list {self._directory!s}: {e!r}", on_exceptions=Exception)
+    def list_objects(self, prefix: str = "") -> Iterator[RemoteObject]:
+        for root, dirs, files in os.walk(self._directory):
+            # The temporary files of the unfinished copies are hidden.
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for name in files:
+                if name.startswith("."):
+                    continue
+                path = os.path.join(root, name)
+                key = Path(os.path.relpath(path, self._directory)).as_posix()
+                if key.startswith(prefix):
+                    stat = os.stat(path)
+                    yield RemoteObject(key, stat.st_size, datetime.fromtimestamp(stat.st_mtime))
+
+    def stat_object(self, key: str) -> RemoteObject | None:
+        try:
+            stat = os.stat(os.path.join(self._directory, key))
+        except FileNotFoundError:
+            return None
+        return RemoteObject(key, stat.st_size, datetime.fromtimestamp(stat.st_mtime))
+
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        with open(os.path.join(self._directory, key), "rb") as file:
+            file.seek(offset)
+            return file.read(length)
+
+    def delete_objects(self, keys: list[str]) -> dict[str, Exception]:
+        with ThreadPoolExecutor(max_workers=FileSystemUploader.DELETE_WORKERS) as executor:
+            errors = executor.map(self._delete, keys)
+        return {key: error for key, error in zip(keys, errors) if error}
+
+    @log_on_end(logging.DEBUG, "Deleted {self._directory!s}/{key!s}: {result!r}")
+    def _delete(self, key: str) -> Exception | None:
+        try:
+            os.remove(os.path.join(self._directory, key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            return e
+        return None
+
+    @property
+    def streamable(self) -> bool:
+        return True
+
+    def upload(
+        self,
+        filepath: str,
+        key: str,
+        on_progress: Callable[[UploadProgress], None] = None,
+    ) -> UploadStatus:
+        status = UploadStatus(filepath, key)
+        status.location = self.location
+        status.started = datetime.now()
+        status.size = os.stat(filepath).st_size
+
+        callback = ProgressCallback(filepath, on_progress, self._limiter, self._progress)
+
+        try:
+            with open(filepath, "rb") as source:
+                self._write(key, lambda target: self._copy(source, target, status.size, callback))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            status.exception = e
+
+        callback.finish()
+        status.completed = datetime.now()
+        return status
+
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        filepath: str,
+        key: str,
+        size: int,
+        on_progress: Callable[[UploadProgress], None] = None,
+    ) -> UploadStatus:
+        status = UploadStatus(filepath, key)
+        status.location = self.location
+        status.started = datetime.now()
+        status.size = size
+
+        callback = ProgressCallback(filepath, on_progress, self._limiter, self._progress, size)
+
+        try:
+            self._write(key, lambda target: self._stream(stream, target, callback))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            status.exception = e
+
+        callback.finish()
+        status.completed = datetime.now()
+        return status
+
+    @log_on_start(logging.INFO, "Copying to {self._directory!s}/{key!s}")
+    @log_on_end(logging.INFO, "Copied {self._directory!s}/{key!s}")
+    @log_on_error(logging.ERROR, "Failed to copy to {key!s}: {e!r}", on_exceptions=Exception)
+    def _write(self, key: str, write: Callable[[BinaryIO], None]) -> None:
+        path = os.path.join(self._directory, key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # The temporary file is hidden, and lives next to the target,
+        # so it's renamed within the same file system.
+        fd, temp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as target:
+                write(target)
+                target.flush()
+                os.fsync(target.fileno())
+            os.chmod(temp, self._mode)
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+        # The rename is durable only when the directory itself is flushed.
+        self._fsync_directory(directory)
+
+    def _copy(self, source: BinaryIO, target: BinaryIO, size: int, callback: ProgressCallback) -> None:
+        # The bandwidth limit could be applied only to the copy through the user space.
+        if not self._limiter and self._reflink(source, target):
+            callback(size)
+            return
+
+        if not self._limiter and self._copy_range(source, target, size, callback):
+            return
+
+        self._stream(source, target, callback)
+
+    @log_on_end(logging.DEBUG, "Reflinked {source.name!s}: {result!s}")
+    def _reflink(self, source: BinaryIO, target: BinaryIO) -> bool:
+        # The 'fcntl' module is available only on Unix.
+        try:
+            # pylint: disable-next=import-outside-toplevel
+            import fcntl
+        except ImportError:
+            return False
+
+        try:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+            return True
+        except OSError as e:
+            if e.errno in UNSUPPORTED:
+                return False
+            raise
+
+    @log_on_end(logging.DEBUG, "Copied {source.name!s} in kernel: {result!s}")
+    def _copy_range(self, source: BinaryIO, target: BinaryIO, size: int, callback: ProgressCallback) -> bool:
+        if not hasattr(os, "copy_file_range"):
+            return False
+
+        copied = 0
+        while copied < size:
+            try:
+                count = os.copy_file_range(source.fileno(), target.fileno(), FileSystemUploader.CHUNK_SIZE)
+            except OSError as e:
+                # Nothing is copied yet, so the file could be still copied in another way.
+                if copied == 0 and e.errno in UNSUPPORTED:
+                    return False
+                raise
+
+            if count == 0:
+                break
+
+            copied += count
+            callback(count)
+
+        if copied != size:
+            raise OSError(errno.EIO, f"Copied {copied} of {size} bytes of {source.name}")
+        return True
+
+    def _stream(self, source: BinaryIO, target: BinaryIO, callback: ProgressCallback) -> None:
+        buffer = bytearray(FileSystemUploader.CHUNK_SIZE)
+        with memoryview(buffer) as view:
+            while count := source.readinto(buffer):
+                target.write(view[:count])
+                callback(count)
+
+    @log_on_error(
+        logging.WARNING, "Failed to flush directory {directory!s}: {e!r}", on_exceptions=OSError, reraise=False
+    )
+    def _fsync_directory(self, directory: str) -> None:
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
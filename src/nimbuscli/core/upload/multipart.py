@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import io
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable
+
+
+class MultipartSession:
+    """
+    Progress of a single multipart upload, that could be resumed after a restart.
+    """
+
+    def __init__(
+        self,
+        upload_id: str,
+        filepath: str,
+        size: int,
+        mtime: int,
+        part_size: int,
+        algorithm: str = None,
+    ):
+        self.upload_id: str = upload_id
+        self.filepath: str = filepath
+        self.size: int = size
+        self.mtime: int = mtime
+        self.part_size: int = part_size
+        self.algorithm: str = algorithm
+        self.parts: dict[int, str] = {}
+        self.checksums: dict[int, str] = {}
+        self.created: datetime = datetime.now()
+
+    def __repr__(self) -> str:
+        params = [
+            f"id='{self.upload_id}'",
+            f"file='{self.filepath}'",
+            f"parts='{len(self.parts)}/{self.total_parts}'",
+        ]
+        return "MultipartSession(" + ", ".join(params) + ")"
+
+    @property
+    def total_parts(self) -> int:
+        return max(1, -(-self.size // self.part_size))
+
+    def part_range(self, number: int) -> tuple[int, int]:
+        """
+        Returns the offset and the size of the part.
+        The parts are numbered from 1.
+        """
+        offset = (number - 1) * self.part_size
+        return offset, min(self.part_size, self.size - offset)
+
+    def matches(self, filepath: str, size: int, mtime: int, part_size: int) -> bool:
+        """
+        Check whether the session uploads the same version of the file.
+        """
+        return (self.filepath, self.size, self.mtime, self.part_size) == (filepath, size, mtime, part_size)
+
+    def to_dict(self) -> dict:
+        return {
+            "upload_id": self.upload_id,
+            "filepath": self.filepath,
+            "size": self.size,
+            "mtime": self.mtime,
+            "part_size": self.part_size,
+            "algorithm": self.algorithm,
+            "parts": {str(n): etag for n, etag in sorted(self.parts.items())},
+            "checksums": {str(n): checksum for n, checksum in sorted(self.checksums.items())},
+            "created": self.created.isoformat(),
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> MultipartSession:
+        session = MultipartSession(
+            data["upload_id"],
+            data["filepath"],
+            data["size"],
+            data["mtime"],
+            data["part_size"],
+            data.get("algorithm"),
+        )
+        session.parts = {int(n): etag for n, etag in data.get("parts", {}).items()}
+        session.checksums = {int(n): checksum for n, checksum in data.get("checksums", {}).items()}
+        session.created = datetime.fromisoformat(data["created"])
+        return session
+
+
+class MultipartSessions(ABC):
+    """
+    Defines a persistent collection of the unfinished multipart uploads.
+    """
+
+    @abstractmethod
+    def get(self, location: str, key: str) -> MultipartSession | None:
+        """
+        Returns the unfinished upload to the given key.
+        """
+
+    @abstractmethod
+    def save(self, location: str, key: str, session: MultipartSession) -> None:
+        """
+        Persist the progress of the upload.
+        """
+
+    @abstractmethod
+    def remove(self, location: str, key: str) -> None:
+        """
+        Forget the completed or abandoned upload.
+        """
+
+
+class FilePart(io.RawIOBase):
+    """
+    A read-only view of a file region, so a part
+    is uploaded without loading it into the memory.
+
+    The callback receives the number of the read bytes with each chunk, but only
+    while the part is being sent, so the reads, that compute the checksums before
+    the request, are not counted. The bytes, that are read again after a retry,
+    are not counted twice.
+    """
+
+    def __init__(self, filepath: str, offset: int, size: int, callback: Callable[[int], None] = None):
+        super().__init__()
+        self._file = open(filepath, "rb")  # pylint: disable=consider-using-with
+        self._offset = offset
+        self._size = size
+        self._position = 0
+        self._file.seek(offset)
+        self._callback = callback
+        self._transferring = False
+        self._reported = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def reported(self) -> int:
+        """
+        Number of the bytes, that have been passed to the callback.
+        """
+        return self._reported
+
+    def signal_transferring(self) -> None:
+        self._transferring = True
+
+    def signal_not_transferring(self) -> None:
+        self._transferring = False
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        match whence:
+            case os.SEEK_SET:
+                position = offset
+            case os.SEEK_CUR:
+                position = self._position + offset
+            case os.SEEK_END:
+                position = self._size + offset
+            case _:
+                raise ValueError(f"Unsupported whence: {whence}")
+
+        self._position = min(max(position, 0), self._size)
+        self._file.seek(self._offset + self._position)
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = self._size - self._position
+        size = remaining if size is None or size < 0 else min(size, remaining)
+        data = self._file.read(size)
+        self._position += len(data)
+
+        if self._callback and self._transferring and self._position > self._reported:
+            amount, self._reported = self._position - self._reported, self._position
+            self._callback(amount)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        return size
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+
+class TokenBucket:
+    """
+    A token bucket that limits the bandwidth shared by all concurrent transfers.
+
+    Each transfer reserves the tokens for the bytes it has sent, and waits
+    until the reservation is covered. The reservations are served in the order
+    of arrival, so every transfer gets a fair share of the bandwidth.
+    """
+
+    def __init__(self, rate: int, burst: int = None):
+        """
+        Creates a new instance of the TokenBucket.
+
+        :param rate: Bandwidth limit in bytes per second.
+        :param burst: Maximum amount of bytes that could be sent at once.
+            One second worth of the bandwidth is used by default.
+        """
+        if rate <= 0:
+            raise ValueError("The rate should be a positive number.")
+
+        self._rate = rate
+        self._burst = burst if burst else rate
+        self._tokens = float(self._burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        params = [
+            f"rate='{self._rate}'",
+            f"burst='{self._burst}'",
+        ]
+        return "TokenBucket(" + ", ".join(params) + ")"
+
+    @property
+    def rate(self) -> int:
+        return self._rate
+
+    def consume(self, amount: int) -> None:
+        """
+        Take the tokens from the bucket, waiting for them if needed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+            # The tokens could go negative, which reserves
+            # the future tokens for this transfer.
+            self._tokens -= amount
+            delay = -self._tokens / self._rate if self._tokens < 0 else 0
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ByteBudget:
+    """
+    Limits the amount of bytes that are in flight at the same time.
+    The waiting transfers are served in the order of arrival,
+    so a large transfer is never starved by the small ones.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("The capacity should be a positive number.")
+
+        self._capacity = capacity
+        self._available = capacity
+        self._queue: deque[object] = deque()
+        self._cond = threading.Condition()
+
+    def __repr__(self) -> str:
+        return f"ByteBudget(capacity='{self._capacity}')"
+
+    @contextmanager
+    def reserve(self, amount: int) -> Iterator[int]:
+        """
+        Reserve the bytes for the duration of the transfer.
+        The transfers larger than the capacity reserve the whole capacity.
+        """
+        amount = min(amount, self._capacity)
+        ticket = object()
+
+        with self._cond:
+            self._queue.append(ticket)
+            self._cond.wait_for(lambda: self._queue[0] is ticket and self._available >= amount)
+            self._queue.popleft()
+            self._available -= amount
+            self._cond.notify_all()
+
+        try:
+            yield amount
+        finally:
+            with self._cond:
+                self._available += amount
+                self._cond.notify_all()
+
+
+class TransferPool:
+    """
+    Runs several transfers concurrently,
+    within the optional limit of the bytes in flight.
+    """
+
+    def __init__(self, workers: int, max_inflight: int = None):
+        """
+        Creates a new instance of the TransferPool.
+
+        :param workers: Maximum number of concurrent transfers.
+        :param max_inflight: Maximum number of bytes that are transferred at the same time.
+        """
+        if workers < 1:
+            raise ValueError("The number of workers should be a positive number.")
+
+        self._workers = workers
+        self._budget = ByteBudget(max_inflight) if max_inflight else None
+
+    def __repr__(self) -> str:
+        params = [
+            f"workers='{self._workers}'",
+            f"budget={self._budget!r}",
+        ]
+        return "TransferPool(" + ", ".join(params) + ")"
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    def map(self, size: Callable[[Any], int], func: Callable[[Any], Any], items: list[Any]) -> list[Any]:
+        """
+        Transfer the items concurrently and return the results in the order of the items.
+
+        :param size: Returns the number of bytes transferred for the item.
+        :param func: Transfers the item.
+        :param items: Items to transfer.
+        """
+
+        def transfer(item: Any) -> Any:
+            if self._budget is None:
+                return func(item)
+            with self._budget.reserve(size(item)):
+                return func(item)
+
+        with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="transfer") as executor:
+            futures: list[Future] = [executor.submit(transfer, item) for item in items]
+            return [f.result() for f in futures]
@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Callable
+
+from logdecorator import log_on_start
+
+from nimbuscli.core.upload.pool import TokenBucket
+from nimbuscli.core.upload.uploader import UploadProgress
+
+
+class TransferProgress:
+    """
+    Progress of a single transfer.
+    """
+
+    def __init__(self, name: str, transferred: int, total: int, rate: float, elapsed: timedelta):
+        self.name = name
+        self.transferred = transferred
+        self.total = total
+        self.rate = rate
+        self.elapsed = elapsed
+
+    def __repr__(self) -> str:
+        params = [
+            f"name='{self.name}'",
+            f"progress='{self.progress}'",
+            f"rate='{int(self.rate)}'",
+            f"eta='{self.eta}'",
+        ]
+        return "TransferProgress(" + ", ".join(params) + ")"
+
+    @property
+    def progress(self) -> int:
+        return min(int((self.transferred / self.total) * 100), 100) if self.total else 100
+
+    @property
+    def eta(self) -> timedelta | None:
+        remaining = max(0, self.total - self.transferred)
+        if remaining == 0:
+            return timedelta()
+        return timedelta(seconds=remaining / self.rate) if self.rate > 0 else None
+
+
+class ProgressSnapshot(TransferProgress):
+    """
+    Overall progress of all transfers.
+    """
+
+    def __init__(
+        self,
+        transfers: list[TransferProgress],
+        transferred: int,
+        total: int,
+        rate: float,
+        elapsed: timedelta,
+    ):
+        super().__init__("total", transferred, total, rate, elapsed)
+        self.transfers = transfers
+
+    def __repr__(self) -> str:
+        params = [
+            f"transfers='{len(self.transfers)}'",
+            f"progress='{self.progress}'",
+            f"rate='{int(self.rate)}'",
+            f"eta='{self.eta}'",
+        ]
+        return "ProgressSnapshot(" + ", ".join(params) + ")"
+
+
+class ProgressAggregator:
+    """
+    Aggregates the progress of many concurrent transfers.
+
+    The transferred bytes are counted by each thread in its own counter, without any locks.
+    The counters are summed up only when a snapshot is taken, at most once per interval.
+    The throughput is smoothed with an exponentially weighted moving average,
+    so the ETA doesn't jump with each slower or faster chunk.
+    """
+
+    # Interval between the snapshots, that are written to the log.
+    LOG_INTERVAL = 5.0
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        smoothing: float = 0.3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Creates a new instance of the ProgressAggregator.
+
+        :param interval: Minimal number of seconds between two snapshots.
+        :param smoothing: Weight of the latest throughput sample in the average, in (0 - 1] range.
+        :param clock: Source of the monotonic time in seconds.
+        """
+        if not 0 < smoothing <= 1:
+            raise ValueError("Smoothing should be in (0 - 1] range.")
+
+        self._interval = interval
+        self._smoothing = smoothing
+        self._clock = clock
+        self._started: float = None
+        self._last = float("-inf")
+        self._lock = threading.Lock()
+        self._publishing = threading.Lock()
+        self._transfers: list[TransferCounter] = []
+        self._consumers: list[Callable[[ProgressSnapshot], None]] = []
+
+        # The totals of the finished transfers: the sent bytes, that give the throughput,
+        # the transferred bytes, that include the skipped ones, and the total bytes.
+        self._finished = (0, 0, 0)
+        self._rate: _Rate = None
+
+    def __repr__(self) -> str:
+        params = [
+            f"interval='{self._interval}'",
+            f"smoothing='{self._smoothing}'",
+        ]
+        return "ProgressAggregator(" + ", ".join(params) + ")"
+
+    def subscribe(self, consumer: Callable[[ProgressSnapshot], None]) -> None:
+        """
+        Add a consumer of the overall progress snapshots.
+        """
+        self._consumers.append(consumer)
+
+    def transfer(
+        self,
+        name: str,
+        total: int,
+        on_update: Callable[[TransferProgress], None] = None,
+    ) -> TransferCounter:
+        """
+        Start tracking a new transfer.
+
+        :param name: Name of the transfer.
+        :param total: Number of bytes to transfer.
+        :param on_update: An optional callback that receives the progress of this transfer.
+        """
+        now = self._clock()
+        counter = TransferCounter(self, name, total, on_update, now, self._smoothing)
+        with self._lock:
+            # The overall throughput is measured since the first transfer,
+            # not since the aggregator is created.
+            if self._started is None:
+                self._started = now
+                self._rate = _Rate(self._smoothing, now)
+            self._transfers.append(counter)
+        return counter
+
+    def snapshot(self) -> ProgressSnapshot:
+        """
+        Take a snapshot of the overall progress, regardless of the interval.
+        """
+        with self._lock:
+            return self._take(self._clock())
+
+    def tick(self) -> None:
+        """
+        Take and publish a snapshot, unless one has been taken recently,
+        or another thread is taking it right now.
+        """
+        now = self._clock()
+        if now - self._last < self._interval:
+            return
+        if not self._publishing.acquire(blocking=False):  # pylint: disable=consider-using-with
+            return
+
+        # The snapshots are published by a single thread at a time, and the consumers
+        # are invoked outside the main lock, so a slow consumer never blocks the transfers.
+        try:
+            with self._lock:
+                if now - self._last < self._interval:
+                    return
+                self._last = now
+                counters = list(self._transfers)
+                snapshot = self._take(now)
+
+            for counter, progress in zip(counters, snapshot.transfers):
+                if counter.on_update:
+                    counter.on_update(progress)
+            for consumer in self._consumers:
+                consumer(snapshot)
+        finally:
+            self._publishing.release()
+
+    def finish(self, counter: TransferCounter) -> None:
+        """
+        Stop tracking the transfer, and publish its final progress.
+        """
+        with self._lock:
+            progress = counter.sample(self._clock())
+            self._transfers.remove(counter)
+            sent, transferred, total = self._finished
+            self._finished = (sent + counter.sent, transferred + progress.transferred, total + progress.total)
+
+        if counter.on_update:
+            with self._publishing:
+                counter.on_update(progress)
+
+    def _take(self, now: float) -> ProgressSnapshot:
+        if self._started is None:
+            return ProgressSnapshot([], 0, 0, 0.0, timedelta())
+
+        transfers = [t.sample(now) for t in self._transfers]
+        sent, transferred, total = self._finished
+
+        sent += sum(t.sent for t in self._transfers)
+        transferred += sum(t.transferred for t in transfers)
+        total += sum(t.total for t in transfers)
+
+        return ProgressSnapshot(
+            transfers,
+            transferred,
+            total,
+            self._rate.update(sent, now),
+            timedelta(seconds=now - self._started),
+        )
+
+
+class TransferCounter:
+    """
+    Counts the bytes of a single transfer, that could be sent by several threads.
+    """
+
+    # Each thread checks whether a snapshot is due after sending
+    # this fraction of the transfer, but at least once per this many bytes.
+    CHECK_FRACTION = 100
+    CHECK_BYTES = 1024 * 1024
+
+    def __init__(
+        self,
+        aggregator: ProgressAggregator,
+        name: str,
+        total: int,
+        on_update: Callable[[TransferProgress], None],
+        started: float,
+        smoothing: float,
+    ):
+        self.name = name
+        self.total = total
+        self.on_update = on_update
+        self._aggregator = aggregator
+        self._check = max(1, min(TransferCounter.CHECK_BYTES, total // TransferCounter.CHECK_FRACTION))
+        self._local = threading.local()
+        self._cells: list[list[int]] = []
+        self._cells_lock = threading.Lock()
+        self._skipped = 0
+        self._started = started
+        self._rate = _Rate(smoothing, started)
+
+    def __repr__(self) -> str:
+        params = [
+            f"name='{self.name}'",
+            f"total='{self.total}'",
+        ]
+        return "TransferCounter(" + ", ".join(params) + ")"
+
+    def __call__(self, amount: int) -> None:
+        # This is the hot path, that is invoked for each sent chunk.
+        # Each thread updates only its own cell, so no lock is needed.
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._local.cell = [0, 0]
+            with self._cells_lock:
+                self._cells.append(cell)
+
+        cell[0] += amount
+        if cell[0] >= cell[1]:
+            cell[1] = cell[0] + self._check
+            self._aggregator.tick()
+
+    @property
+    def transferred(self) -> int:
+        return self.sent + self._skipped
+
+    @property
+    def sent(self) -> int:
+        with self._cells_lock:
+            return sum(cell[0] for cell in self._cells)
+
+    def skip(self, amount: int) -> None:
+        """
+        Account for the bytes that are not sent by this transfer,
+        e.g. uploaded by a previous run. These bytes don't count towards the throughput.
+        """
+        with self._cells_lock:
+            self._skipped += amount
+        self._aggregator.tick()
+
+    def sample(self, now: float) -> TransferProgress:
+        sent = self.sent
+        return TransferProgress(
+            self.name,
+            sent + self._skipped,
+            self.total,
+            self._rate.update(sent, now),
+            timedelta(seconds=now - self._started),
+        )
+
+    def finish(self) -> None:
+        """
+        Stop tracking the transfer, and publish its final progress.
+        """
+        self._aggregator.finish(self)
+
+
+class _Rate:
+    """
+    Exponentially weighted moving average of the throughput.
+    """
+
+    def __init__(self, smoothing: float, started: float):
+        self._smoothing = smoothing
+        self._value = 0.0
+        self._last: tuple[int, float] = (0, started)
+
+    def update(self, total: int, now: float) -> float:
+        amount, elapsed = total - self._last[0], now - self._last[1]
+        if elapsed <= 0:
+            return self._value
+
+        sample = amount / elapsed
+        self._value = sample if self._value == 0 else self._smoothing * sample + (1 - self._smoothing) * self._value
+        self._last = (total, now)
+        return self._value
+
+
+class ProgressCallback:
+    """
+    Counts the uploaded bytes of a single file, and reports its progress in 10% steps.
+    The callback also throttles the upload, when the bandwidth is limited.
+
+    The callback is invoked for each sent chunk by many transfer threads,
+    so it only counts the bytes. The progress is calculated and reported
+    by the aggregator, at most once per its interval.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        on_progress: Callable[[UploadProgress], None],
+        limiter: TokenBucket = None,
+        aggregator: ProgressAggregator = None,
+        filesize: int = None,
+    ):
+        self._filepath = filepath
+        self._filesize = filesize if filesize is not None else os.stat(filepath).st_size
+        self._on_progress = on_progress
+        self._limiter = limiter
+        self._reported = 0
+        aggregator = aggregator if aggregator else ProgressAggregator()
+        self._counter = aggregator.transfer(filepath, self._filesize, self._report if on_progress else None)
+
+    def __eq__(self, other):
+        return (self._filepath, self._on_progress) == (other._filepath, other._on_progress)
+
+    def skip(self, bytes_amount: int):
+        """
+        Account for the bytes that are not sent by this upload,
+        e.g. uploaded by the previous run or copied on the server side.
+        """
+        self._counter.skip(bytes_amount)
+
+    def finish(self):
+        """
+        Stop tracking the upload, and report its final progress.
+        """
+        self._counter.finish()
+
+    def __call__(self, bytes_amount: int):
+        # The callback is invoked by the transfer threads after each sent chunk,
+        # so blocking here slows down the transfer to the shared bandwidth limit.
+        if self._limiter:
+            self._limiter.consume(bytes_amount)
+
+        self._counter(bytes_amount)
+
+    def _report(self, progress: TransferProgress):
+        # The aggregator publishes the progress of a transfer from a single thread at a time.
+        # Report when uploaded (at least) another 10% of the file.
+        if progress.progress >= self._reported + 10 or (progress.progress == 100 and self._reported != 100):
+            self._reported = progress.progress
+            elapsed = max(timedelta(seconds=1), progress.elapsed)
+            self._on_progress(UploadProgress(progress.progress, elapsed, int(progress.rate)))
+
+
+@log_on_start(logging.INFO, "Upload progress: {snapshot!r}")
+def log_progress(snapshot: ProgressSnapshot) -> None:
+    """
+    Log the progress snapshots.
+    """
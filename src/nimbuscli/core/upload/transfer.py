@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+from datetime import timedelta
+
+from logdecorator import log_on_end
+
+MB = 1024 * 1024
+
+MIN_PART_SIZE = 5 * MB
+MAX_PART_SIZE = 5 * 1024 * MB
+MAX_PARTS = 10_000
+
+
+class TransferTuner:
+    """
+    Picks the multipart transfer settings for each uploaded file.
+
+    The part size and the concurrency could be either fixed or tuned automatically.
+    In the 'auto' mode the part size is derived from the file size, while the
+    concurrency is adjusted between the uploads, based on the measured throughput.
+    """
+
+    AUTO = "auto"
+
+    DEFAULT_PART_SIZE = 8 * MB
+    DEFAULT_CONCURRENCY = 10
+    DEFAULT_THRESHOLD = 8 * MB
+
+    # The auto mode aims at this number of parts,
+    # so the large files are not split into thousands of tiny parts.
+    TARGET_PARTS = 2_000
+    MAX_CONCURRENCY = 64
+
+    def __init__(
+        self,
+        part_size: int | str | None = None,
+        concurrency: int | str | None = None,
+        threshold: int | None = None,
+    ):
+        """
+        Creates a new instance of the TransferTuner.
+
+        :param part_size: Size of the multipart upload part in bytes, or 'auto'.
+        :param concurrency: Maximum number of concurrent part uploads, or 'auto'.
+        :param threshold: Minimal file size in bytes that triggers the multipart upload.
+        """
+        if part_size not in (None, TransferTuner.AUTO) and not (
+            isinstance(part_size, int) and MIN_PART_SIZE <= part_size <= MAX_PART_SIZE
+        ):
+            raise ValueError("Part size should be either None, 'auto' or in [5 MB - 5 GB] range.")
+
+        if concurrency not in (None, TransferTuner.AUTO) and not (isinstance(concurrency, int) and concurrency > 0):
+            raise ValueError("Concurrency should be either None, 'auto' or a positive number.")
+
+        if threshold is not None and threshold < MIN_PART_SIZE:
+            raise ValueError("Multipart threshold should be either None or at least 5 MB.")
+
+        self._part_size = part_size
+        self._concurrency = concurrency
+        self._threshold = threshold if threshold is not None else TransferTuner.DEFAULT_THRESHOLD
+
+        self._lock = threading.Lock()
+        self._current = TransferTuner.DEFAULT_CONCURRENCY
+        self._best: tuple[int, float] = None
+
+    def __repr__(self) -> str:
+        params = [
+            f"part='{self._part_size}'",
+            f"concurrency='{self._concurrency}'",
+            f"threshold='{self._threshold}'",
+        ]
+        return "TransferTuner(" + ", ".join(params) + ")"
+
+    @property
+    def threshold(self) -> int:
+        return self._threshold
+
+    def config(self) -> dict[str, str]:
+        """
+        Returns the explicitly configured settings.
+        """
+        cfg = {}
+        if self._part_size is not None:
+            cfg["Part Size"] = self._format(self._part_size)
+        if self._concurrency is not None:
+            cfg["Concurrency"] = str(self._concurrency)
+        if self._threshold != TransferTuner.DEFAULT_THRESHOLD:
+            cfg["Multipart Threshold"] = self._format(self._threshold)
+        return cfg
+
+    def part_size(self, file_size: int) -> int:
+        """
+        Returns the part size for the file, that never exceeds the 10,000 parts limit.
+        """
+        match self._part_size:
+            case None:
+                part_size = TransferTuner.DEFAULT_PART_SIZE
+            case TransferTuner.AUTO:
+                part_size = math.ceil(file_size / TransferTuner.TARGET_PARTS / MB) * MB
+                part_size = max(part_size, TransferTuner.DEFAULT_PART_SIZE)
+            case _:
+                part_size = self._part_size
+
+        # The part size is rounded up to the whole megabytes.
+        minimal = math.ceil(file_size / MAX_PARTS / MB) * MB
+        return min(MAX_PART_SIZE, max(part_size, minimal))
+
+    @property
+    def max_concurrency(self) -> int:
+        """
+        Returns the highest number of concurrent part uploads of a single file.
+        """
+        match self._concurrency:
+            case None:
+                return TransferTuner.DEFAULT_CONCURRENCY
+            case TransferTuner.AUTO:
+                return TransferTuner.MAX_CONCURRENCY
+            case _:
+                return self._concurrency
+
+    def concurrency(self) -> int:
+        """
+        Returns the number of concurrent part uploads for the next file.
+        """
+        match self._concurrency:
+            case None:
+                return TransferTuner.DEFAULT_CONCURRENCY
+            case TransferTuner.AUTO:
+                with self._lock:
+                    return self._current
+            case _:
+                return self._concurrency
+
+    @log_on_end(logging.DEBUG, "Measured {size!s} bytes in {elapsed!s} with concurrency {concurrency!s}")
+    def record(self, concurrency: int, size: int, elapsed: timedelta) -> None:
+        """
+        Record the throughput of the completed upload.
+        The concurrency grows while it keeps improving the throughput,
+        and settles on the best known level, once it doesn't.
+        """
+        if self._concurrency != TransferTuner.AUTO or elapsed.total_seconds() <= 0:
+            return
+
+        # The small files are dominated by the latency,
+        # so they tell nothing about the optimal concurrency.
+        if size < self._threshold or size < 4 * self.part_size(size):
+            return
+
+        throughput = size / elapsed.total_seconds()
+
+        with self._lock:
+            if self._best is None or throughput > self._best[1] * 1.1:
+                self._best = (concurrency, throughput)
+                self._current = min(concurrency * 2, TransferTuner.MAX_CONCURRENCY)
+            elif concurrency == self._best[0] and throughput < self._best[1] / 2:
+                # The network conditions have changed, start over from the current level.
+                self._best = (concurrency, throughput)
+                self._current = max(concurrency // 2, 1)
+            else:
+                self._current = self._best[0]
+
+    def _format(self, value: int | str) -> str:
+        return value if isinstance(value, str) else f"{value // MB} MB"
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from typing import Callable
+from typing import BinaryIO, Callable, Iterator
 
 
 class Uploader(ABC):
@@ -33,6 +33,82 @@ class Uploader(ABC):
         :return: Status of the file upload.
         """
 
+    @property
+    def location(self) -> str | None:
+        """
+        Location of the uploaded objects, e.g. 's3://bucket' or a directory path.
+        """
+        return None
+
+    def list_objects(self, prefix: str = "") -> Iterator[RemoteObject]:
+        """
+        List the uploaded objects. The uploaders, that can't list their objects, fail.
+
+        :param prefix: Only the objects with keys that start with this prefix are listed.
+        :return: The objects under the location of the uploader.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support listing.")
+
+    def delete_objects(self, keys: list[str]) -> dict[str, Exception]:
+        """
+        Delete the uploaded objects. The uploaders, that can't delete their objects, fail.
+
+        :param keys: The keys of the objects to delete.
+        :return: The errors by the key of each object, that couldn't be deleted.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support deletion.")
+
+    def stat_object(self, key: str) -> RemoteObject | None:
+        """
+        Returns the details of the uploaded object, including its stored checksum, if any.
+        The uploaders, that can't inspect their objects, fail.
+
+        :param key: The key of the object.
+        :return: The object, or None if it doesn't exist.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support inspection.")
+
+    def read_range(self, key: str, offset: int, length: int) -> bytes:
+        """
+        Read a range of the uploaded object. The uploaders, that can't read their objects, fail.
+
+        :param key: The key of the object.
+        :param offset: Offset of the first byte of the range.
+        :param length: Number of bytes to read. Less bytes are returned at the end of the object.
+        :return: Content of the range.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support reading.")
+
+    @property
+    def streamable(self) -> bool:
+        """
+        Whether the uploader could consume a stream instead of a file.
+        """
+        return False
+
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        filepath: str,
+        key: str,
+        size: int,
+        on_progress: Callable[[UploadProgress], None] = None,
+    ) -> UploadStatus:
+        """
+        Upload the content of a file, that is read by someone else.
+        The uploaders, that don't support streams, fail the upload.
+
+        :param stream: Readable stream with the file content.
+        :param filepath: Full path to the file.
+        :param key: The name of the key to upload to.
+        :param size: Size of the file.
+        :param on_progress: An optional callback that is invoked on progress update.
+        :return: Status of the file upload.
+        """
+        status = UploadStatus(filepath, key)
+        status.exception = NotImplementedError(f"{type(self).__name__} does not support streams.")
+        return status
+
 
 class UploadProgress:
     """
@@ -55,6 +131,36 @@ class UploadProgress:
         return "UploadProgress(" + ", ".join(params) + ")"
 
 
+class RemoteObject:
+    """
+    An object, that has been uploaded to the destination.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        size: int,
+        modified: datetime,
+        storage_class: str = None,
+        checksum_algorithm: str = None,
+        checksum: str = None,
+    ):
+        self.key = key
+        self.size = size
+        self.modified = modified
+        self.storage_class = storage_class
+        self.checksum_algorithm = checksum_algorithm
+        self.checksum = checksum
+
+    def __repr__(self):
+        params = [
+            f"key='{self.key}'",
+            f"size='{self.size}'",
+            f"modified='{self.modified}'",
+        ]
+        return "RemoteObject(" + ", ".join(params) + ")"
+
+
 class UploadStatus:
 
     SUCCESS = "success"
@@ -63,10 +169,20 @@ class UploadStatus:
     def __init__(self, filepath: str, key: str):
         self.filepath: str = filepath
         self.key: str = key
+        self.location: str = None
+        self.storage_class: str = None
         self.size: int = None
         self.started: datetime = None
         self.completed: datetime = None
         self.exception: Exception = None
+        self.digest: str = None
+        self.checksum_algorithm: str = None
+        self.checksum: str = None
+        self.existing: bool = False
+        self.copied_from: str = None
+        self.resumed_size: int = 0
+        self.copied_size: int = 0
+        self.destinations: dict[str, UploadStatus] = {}
 
     @property
     def status(self) -> str:
@@ -85,6 +201,15 @@ class UploadStatus:
             ]
         )
 
+    @property
+    def sent_size(self) -> int:
+        """
+        Number of bytes actually sent by this upload.
+        """
+        if self.existing or self.copied_from:
+            return 0
+        return self.size - self.resumed_size - self.copied_size if self.size else 0
+
     @property
     def elapsed(self) -> timedelta:
         return max(timedelta(seconds=1), self.completed - self.started)
@@ -5,7 +5,7 @@ import requests
 
 import nimbuscli.report.format as fmt
 from nimbuscli.cmd import ExecutionResult
-from nimbuscli.cmd.backup import BackupActionResult, UploadActionResult
+from nimbuscli.cmd.backup import BackupActionResult, BackupEntry, UploadActionResult
 from nimbuscli.cmd.deploy import DeploymentActionResult
 from nimbuscli.notify.notifier import Notifier
 
@@ -105,15 +105,18 @@ class DiscordNotifier(Notifier):
             "name": f"{fmt.ch('backup')} Backups",
             "value": "\n".join(
                 [
-                    f"{ix:02d}. "
-                    f"{fmt.ch('success') if entry.success else fmt.ch('failure')} "
-                    f"{fmt.ch('directory')} {entry.directory}"
+                    f"{ix:02d}. {self._backup_status(entry)} {fmt.ch('directory')} {entry.directory}"
                     for ix, entry in enumerate(action.entries)
                 ]
             ),
             "inline": False,
         }
 
+    def _backup_status(self, entry: BackupEntry) -> str:
+        if entry.unchanged:
+            return fmt.ch("unchanged")
+        return fmt.ch("success") if entry.success else fmt.ch("failure")
+
     def _upload_details(self, action: UploadActionResult) -> dict:
         return {
             "name": f"{fmt.ch('upload')} Uploads",
@@ -1,26 +1,43 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Iterator
+from typing import Any, Iterator
 
+from nimbuscli.core.archive import StreamSource
+from nimbuscli.core.execute import Runner
 from nimbuscli.provider.resource import Provider, Resource
 
 
 class DirectoryResource(Resource):
 
-    def __init__(self, name: str, directories: list[str]):
+    def __init__(self, name: str, directories: list[str], streams: list[StreamSource] = None):
         super().__init__(name)
         self.directories: list[str] = directories
+        self.streams: list[StreamSource] = streams if streams else []
 
 
 class DirectoryProvider(Provider[DirectoryResource]):
 
-    def __init__(self, directory_groups: dict[str, list[str]]):
+    def __init__(self, directory_groups: dict[str, list[str | dict[str, str]]], runner: Runner = None):
+        """
+        Creates a new instance of the DirectoryProvider.
+
+        :param directory_groups: Directory groups, where each entry is either
+            a directory path or a stream source with the 'name' and 'command'.
+        :param runner: Process runner, that executes the stream sources.
+        """
         self._groups = directory_groups
+        self._runner = runner
 
     def _resources(self) -> Iterator[DirectoryResource]:
-        for group_name, directories in self._groups.items():
+        for group_name, entries in self._groups.items():
             yield DirectoryResource(
                 group_name,
-                [Path(d).expanduser().as_posix() for d in directories],
+                [Path(e).expanduser().as_posix() for e in entries if isinstance(e, str)],
+                [self._stream(e) for e in entries if not isinstance(e, str)],
             )
+
+    def _stream(self, entry: Any) -> StreamSource:
+        if self._runner is None:
+            raise ValueError("The runner is required to use the stream sources.")
+        return StreamSource(entry["name"], entry["command"], self._runner)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import fnmatch
 import logging
 from pathlib import Path
 from typing import Iterator
@@ -77,14 +78,32 @@ class ServiceFactory:
     the characteristics of the resource.
     """
 
-    def __init__(self, runner: Runner, secrets: Secrets) -> None:
+    def __init__(
+        self,
+        runner: Runner,
+        secrets: Secrets,
+        strategy: str = DockerService.RESTART,
+        bluegreen: list[str] = None,
+    ) -> None:
+        """
+        Creates a new instance of the ServiceFactory.
+
+        :param runner: Process runner of the services.
+        :param secrets: Secrets of the services.
+        :param strategy: How the running services are replaced: 'restart' or 'update'.
+        :param bluegreen: Glob patterns of the stateless services, that are replaced using the blue/green strategy.
+        """
         self._runner = runner
         self._secrets = secrets
+        self._strategy = strategy
+        self._bluegreen = bluegreen or []
 
     def __repr__(self) -> str:
         params = [
             f"runner='{self._runner.__class__.__name__}'",
             f"secrets='{self._secrets.__class__.__name__}'",
+            f"strategy='{self._strategy}'",
+            f"bluegreen={self._bluegreen!r}",
         ]
         return "ServiceFactory(" + ", ".join(params) + ")"
 
@@ -99,7 +118,13 @@ class ServiceFactory:
                     resource.directory,
                     self._secrets.env(resource.name),
                     self._runner,
+                    self._strategy_of(resource.name),
                 )
 
             case _:
                 return None
+
+    def _strategy_of(self, name: str) -> str:
+        if any(fnmatch.fnmatch(name, pattern) for pattern in self._bluegreen):
+            return DockerService.BLUEGREEN
+        return self._strategy
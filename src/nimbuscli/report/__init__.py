@@ -1,3 +1,4 @@
 from nimbuscli.report.factory import CfgReporterFactory, ReporterFactory
+from nimbuscli.report.history import HistoryReporter
 from nimbuscli.report.reporter import CompositeReporter, Reporter, ReportWriter
 from nimbuscli.report.writer import TextWriter, Writer
@@ -8,8 +8,10 @@ from pathlib import Path
 from logdecorator import log_on_end, log_on_error, log_on_start
 
 from nimbuscli.config import Config
+from nimbuscli.report.history import HistoryReporter
 from nimbuscli.report.reporter import CompositeReporter, Reporter, ReportWriter
 from nimbuscli.report.writer import TextWriter, Writer
+from nimbuscli.state import RunHistory
 
 
 class ReporterFactory(ABC):
@@ -43,6 +45,11 @@ class CfgReporterFactory(ReporterFactory):
         now = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         return os.path.join(directory, f"{now}.{extension}")
 
+    def history_file(self) -> str:
+        directory = self._cfg.nested("state.directory")
+        directory = directory if directory else "~/.nimbus/state"
+        return os.path.join(os.path.expanduser(directory), "history.db")
+
     def text_writer(self, file) -> Writer:
         return TextWriter(
             file,
@@ -79,4 +86,7 @@ class CfgReporterFactory(ReporterFactory):
         if writer := self.create_writer("stdout"):
             reporters.append(ReportWriter(writer, details=False))
 
+        # The history of the runs is always kept, so it could be compared by 'ni stats'.
+        reporters.append(HistoryReporter(RunHistory(self.history_file())))
+
         return CompositeReporter(reporters)
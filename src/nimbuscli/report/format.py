@@ -155,6 +155,9 @@ def ch(kind: str) -> str:
         "service": "⚙️",
         "deployment": "🏗️",  # 🏢 🏭 👷 🧱 🚚 🛻
         "shell": "➡️",  # ➡️ ⏩ ▶️
+        "resume": "⏯️",
+        "unchanged": "💤",
+        "fingerprint": "🧬",
         # -- Services --
         "docker": "🐳",
         "docker-compose": "🐳",
@@ -180,5 +183,6 @@ def ch(kind: str) -> str:
         "duration": "⌛",
         "size": "⚖️",  # 📏
         "speed": "🚀",
+        "downtime": "⏸️",
     }
     return m.get(kind, kind)
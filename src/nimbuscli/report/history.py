@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+import posixpath
+from pathlib import Path
+from typing import Iterator
+
+from logdecorator import log_on_error, log_on_start
+
+from nimbuscli.cmd import ExecutionResult
+from nimbuscli.cmd.backup import BackupActionResult, UploadActionResult
+from nimbuscli.cmd.deploy import DeploymentActionResult, ImagePullActionResult
+from nimbuscli.core.archive import StreamArchivalStatus
+from nimbuscli.core.execute import CompletedProcess
+from nimbuscli.report.reporter import Reporter
+from nimbuscli.state import HistoryRecord, RunHistory
+
+
+class HistoryReporter(Reporter):
+    """
+    Knows an internal structure of the core objects and persists
+    their measurements in the run history, instead of printing them.
+    """
+
+    def __init__(self, history: RunHistory) -> None:
+        self._history = history
+
+    def __repr__(self) -> str:
+        params = [f"history='{self._history!r}'"]
+        return "HistoryReporter(" + ", ".join(params) + ")"
+
+    @property
+    def reports(self) -> Iterator[str]:
+        yield from []
+
+    @log_on_start(logging.INFO, "Recording the run history: [{self._history!r}]")
+    @log_on_error(logging.WARNING, "Failed to record the run history: {e!r}", on_exceptions=Exception, reraise=False)
+    def write(self, result: ExecutionResult) -> None:
+        self._history.record(
+            result.command,
+            result.arguments,
+            result.started,
+            result.completed,
+            result.success,
+            list(self.records(result)),
+        )
+
+    def records(self, result: ExecutionResult) -> Iterator[HistoryRecord]:
+        for action in result.actions:
+            match action:
+                case BackupActionResult():
+                    yield from self.records_backup(action)
+                case UploadActionResult():
+                    yield from self.records_upload(action)
+                case DeploymentActionResult():
+                    yield from self.records_deploy(action)
+                case ImagePullActionResult():
+                    yield from self.records_pull(action)
+                case _:
+                    pass
+
+    def records_backup(self, result: BackupActionResult) -> Iterator[HistoryRecord]:
+        # The resumed archives have been created by the interrupted run.
+        for b in result.processed:
+            if b.resumed or b.archive is None or b.archive.elapsed is None:
+                continue
+
+            name = f"{b.group}/{Path(b.directory).name}"
+            yield HistoryRecord(
+                HistoryRecord.ARCHIVE,
+                name,
+                b.archive.elapsed,
+                b.success,
+                b.archive.size,
+                b.archive.source_size,
+            )
+            if isinstance(b.archive, StreamArchivalStatus) and b.archive.proc:
+                yield from self.records_process(name, [b.archive.proc])
+
+    def records_upload(self, result: UploadActionResult) -> Iterator[HistoryRecord]:
+        # Only the bytes actually sent tell anything about the throughput,
+        # so the deduplicated and copied uploads are recorded with zero size.
+        for u in result.entries:
+            if u.resumed or u.upload is None or u.upload.started is None or u.upload.completed is None:
+                continue
+
+            yield HistoryRecord(
+                HistoryRecord.UPLOAD,
+                posixpath.dirname(u.upload.key),
+                u.upload.elapsed,
+                u.success,
+                u.upload.sent_size,
+            )
+
+    def records_deploy(self, result: DeploymentActionResult) -> Iterator[HistoryRecord]:
+        for d in result.entries:
+            if d.cancel or d.skip:
+                continue
+            yield HistoryRecord(HistoryRecord.DEPLOY, d.service, d.elapsed, d.success, detail=d.operation)
+            yield from self.records_process(d.service, d.processes)
+
+    def records_pull(self, result: ImagePullActionResult) -> Iterator[HistoryRecord]:
+        for image, proc in result.pulls.items():
+            yield from self.records_process(image, [proc])
+
+    def records_process(self, name: str, processes: list[CompletedProcess]) -> Iterator[HistoryRecord]:
+        for proc in processes:
+            if proc.elapsed is not None:
+                cmd = " ".join(proc.cmd) if isinstance(proc.cmd, list) else proc.cmd
+                yield HistoryRecord(HistoryRecord.PROCESS, name, proc.elapsed, proc.success, detail=cmd)
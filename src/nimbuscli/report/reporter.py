@@ -15,12 +15,21 @@ from nimbuscli.cmd.backup import (
     DirectoryMappingActionResult,
     UploadActionResult,
 )
+from nimbuscli.cmd.catalog import CatalogActionResult
 from nimbuscli.cmd.deploy import (
     CreateServicesActionResult,
     DeploymentActionResult,
+    DeploymentPlanActionResult,
+    ImagePullActionResult,
     ServiceMappingActionResult,
 )
-from nimbuscli.core.archive import RarArchivalStatus
+from nimbuscli.cmd.estimate import EstimateActionResult, EstimateEntry
+from nimbuscli.cmd.prune import PruneActionResult
+from nimbuscli.cmd.stats import SeriesStats, StatsActionResult
+from nimbuscli.cmd.verify import VerifyActionResult
+from nimbuscli.core.archive import RarArchivalStatus, StreamArchivalStatus
+from nimbuscli.core.execute import CompletedProcess
+from nimbuscli.core.upload import UploadStatus
 from nimbuscli.report.writer import Writer
 
 
@@ -55,7 +64,7 @@ class CompositeReporter(Reporter):
             yield from r.reports
 
 
-class ReportWriter(Reporter):
+class ReportWriter(Reporter):  # pylint: disable=too-many-public-methods
     """
     Knows an internal structure of the core objects and outputs them to `Writer`.
     """
@@ -94,7 +103,7 @@ class ReportWriter(Reporter):
         self._writer.line("")
         self._writer.line("=" * 100)
 
-    def summary(self, result: ExecutionResult) -> None:
+    def summary(self, result: ExecutionResult) -> None:  # pylint: disable=too-many-branches
         s = self._writer.section(f"{fmt.ch('summary')} Summary")
         s.row("Command", result.command)
 
@@ -124,8 +133,22 @@ class ReportWriter(Reporter):
                     self.summary_backup(s, result.config["Destination"], action)
                 case UploadActionResult():
                     self.summary_upload(s, action)
+                case ImagePullActionResult():
+                    self.summary_pull(s, action)
+                case DeploymentPlanActionResult():
+                    self.summary_plan(s, action)
                 case DeploymentActionResult():
                     self.summary_deploy(s, action)
+                case CatalogActionResult():
+                    self.summary_catalog(s, action)
+                case PruneActionResult():
+                    self.summary_prune(s, action)
+                case VerifyActionResult():
+                    self.summary_verify(s, action)
+                case StatsActionResult():
+                    self.summary_stats(s, action)
+                case EstimateActionResult():
+                    self.summary_estimate(s, action)
                 case _:
                     pass
 
@@ -186,7 +209,11 @@ class ReportWriter(Reporter):
                 style="number",
             )
 
-        if failed := sorted(f"{fmt.ch('directory')} {b.directory}" for b in result.entries if not b.success):
+        if unchanged := sorted(f"{fmt.ch('directory')} {b.directory}" for b in result.unchanged):
+            b = w.section(f"{fmt.ch('unchanged')} Unchanged backups (skipped)")
+            b.list(unchanged, style="number")
+
+        if failed := sorted(f"{fmt.ch('directory')} {b.directory}" for b in result.failed):
             b = w.section(f"{fmt.ch('failure')} Failed backups -- ¯\\_(ツ)_/¯")
             b.list(failed, style="number")
 
@@ -221,8 +248,204 @@ class ReportWriter(Reporter):
             b = w.section(f"{fmt.ch('failure')} Failed uploads -- ¯\\_(ツ)_/¯")
             b.list(failed, style="number")
 
+    def summary_catalog(self, w: Writer, result: CatalogActionResult) -> None:
+        w.row(
+            "Archives", f"[ {fmt.ch('total')} {len(result.entries)} | {fmt.ch('size')} {fmt.size(result.total_size)} ]"
+        )
+
+        if synced := sorted((e.location, f"+{e.added}", f"-{e.removed}") for e in result.synced if e.success):
+            b = w.section(f"{fmt.ch('success')} Synchronized locations")
+            b.list(
+                [
+                    f"{fmt.ch('cloud')} {location} [ {added} | {removed} ]"
+                    for location, added, removed in fmt.align(synced, "lrr")
+                ],
+                style="number",
+            )
+
+        for entry in sorted((e for e in result.synced if not e.success), key=lambda e: e.location):
+            b = w.section(f"{fmt.ch('failure')} Failed to synchronize {entry.location} -- ¯\\_(ツ)_/¯")
+            b.list(fmt.wrap(str(entry.exception)))
+
+        for location, entries in result.locations.items():
+            b = w.section(
+                f"{fmt.ch('cloud')} {location} [ {fmt.ch('size')} {fmt.size(sum(e.size for e in entries))} ]"
+            )
+            b.list(
+                [
+                    f"{fmt.ch('archive')} {key} [ {fmt.ch('size')} {size} | {fmt.ch('time')} {created} ]"
+                    for key, size, created in fmt.align(
+                        [(e.key, fmt.size(e.size), fmt.datetime(e.created)) for e in entries], "lrr"
+                    )
+                ],
+                style="number",
+            )
+
+    def summary_prune(self, w: Writer, result: PruneActionResult) -> None:
+        title = "Would remove" if result.dry_run else "Removed"
+        w.row(title, f"{fmt.ch('size')} {fmt.size(result.freed_size)}")
+
+        for entry in result.entries:
+            b = w.section(
+                f"{fmt.ch('success') if entry.success else fmt.ch('failure')} {entry.location} "
+                f"[ {fmt.ch('archive')} {len(entry.removed)} | {fmt.ch('size')} {fmt.size(entry.freed_size)} "
+                f"| kept {entry.kept} ]"
+            )
+            if entry.removed:
+                b.list(
+                    [
+                        f"{fmt.ch('archive')} {key} [ {fmt.ch('size')} {size} | {fmt.ch('time')} {created} ]"
+                        for key, size, created in fmt.align(
+                            [(a.key, fmt.size(a.size), fmt.datetime(a.created)) for a in entry.removed], "lrr"
+                        )
+                    ],
+                    style="number",
+                )
+            for key, error in sorted(entry.failures.items()):
+                ex = b.section(f"{fmt.ch('exception')} {key}")
+                ex.list(fmt.wrap(str(error)))
+            if entry.exception:
+                ex = b.section(f"{fmt.ch('exception')} Exception")
+                ex.list(fmt.wrap(str(entry.exception)))
+
+    def summary_verify(self, w: Writer, result: VerifyActionResult) -> None:
+        w.row(
+            "Archives",
+            f"[ {fmt.ch('total')} {len(result.entries)} "
+            f"| {fmt.ch('ok')} {len(result.entries) - len(result.failed)} "
+            f"| {fmt.ch('nok')} {len(result.failed)} "
+            f"| {fmt.ch('size')} {fmt.size(result.total_size)} ]",
+        )
+
+        for location, entries in result.locations.items():
+            failed = [e for e in entries if not e.success]
+            methods: dict[str, int] = {}
+            for entry in entries:
+                if entry.success:
+                    methods[entry.method] = methods.get(entry.method, 0) + 1
+
+            b = w.section(
+                f"{fmt.ch('failure') if failed else fmt.ch('success')} {location} "
+                f"[ {fmt.ch('archive')} {len(entries)} | {fmt.ch('nok')} {len(failed)} ]"
+            )
+            if methods:
+                b.list([f"{method}: {count}" for method, count in sorted(methods.items())])
+            for entry in failed:
+                ex = b.section(f"{fmt.ch('exception')} {entry.key if entry.key else 'Exception'}")
+                ex.list(fmt.wrap(str(entry.exception)))
+
+    def summary_stats(self, w: Writer, result: StatsActionResult) -> None:
+        w.row("Series", f"[ {fmt.ch('total')} {len(result.entries)} | {fmt.ch('nok')} {len(result.regressions)} ]")
+
+        for kind, series in result.kinds.items():
+            b = w.section(f"{fmt.ch('chart')} {kind.capitalize()}")
+            b.list(
+                [
+                    f"{flag} {name} [ runs {runs} | p50 {p50} | p90 {p90} | last {latest} | trend {trend}"
+                    + (f" | ratio {ratio} ]" if ratio.strip() else " ]")
+                    for flag, name, runs, p50, p90, latest, trend, ratio in fmt.align(
+                        [self._series_stats(s) for s in series], "llrrrrrr"
+                    )
+                ],
+                style="number",
+            )
+
+        if result.regressions:
+            b = w.section(f"{fmt.ch('exception')} Slower than the 90th percentile of the history")
+            b.list([f"{s.kind}: {self._series_name(s)}" for s in result.regressions], style="number")
+
+    def _series_stats(self, s: SeriesStats) -> list[str]:
+        def value(v: float) -> str:
+            return fmt.speed(int(v)) if s.sized else fmt.duration(timedelta(seconds=v))
+
+        return [
+            fmt.ch("nok") if s.regression else fmt.ch("ok"),
+            self._series_name(s),
+            str(s.runs),
+            value(s.p50),
+            value(s.p90),
+            value(s.latest),
+            f"{s.trend:+.0%}" if s.trend is not None else "-",
+            f"{s.ratio:.2f}" if s.ratio else "",
+        ]
+
+    def _series_name(self, s: SeriesStats) -> str:
+        return f"{s.name} ({s.detail})" if s.detail else s.name
+
+    def summary_estimate(self, w: Writer, result: EstimateActionResult) -> None:
+        w.row("Source size", f"{fmt.ch('size')} {fmt.size(result.source_size)}")
+        w.row("Archive size", f"{fmt.ch('size')} {fmt.size(result.archive_size)}")
+        w.row("Archive time", f"{fmt.ch('duration')} {fmt.duration(result.archive_time)}")
+        w.row("Upload time", f"{fmt.ch('duration')} {fmt.duration(result.upload_time)}")
+
+        if known := sorted((self._estimate(e) for e in result.entries if e.known), key=lambda e: e[0]):
+            b = w.section(f"{fmt.ch('chart')} Estimated backups")
+            b.list(
+                [
+                    f"{fmt.ch('directory')} {name} [ {fmt.ch('size')} {size} | ratio {ratio} "
+                    f"| {fmt.ch('duration')} {archive} | {fmt.ch('cloud')} {upload} | {basis} ]"
+                    for name, size, ratio, archive, upload, basis in fmt.align(known, "lrrrrl")
+                ],
+                style="number",
+            )
+
+        if unknown := sorted(f"{fmt.ch('directory')} {e.name}" for e in result.unknown if e.success):
+            b = w.section(f"{fmt.ch('unchanged')} Not estimated (no history)")
+            b.list(unknown, style="number")
+
+        for entry in sorted((e for e in result.entries if not e.success), key=lambda e: e.name):
+            b = w.section(f"{fmt.ch('failure')} Failed to estimate {entry.name} -- ¯\\_(ツ)_/¯")
+            b.list(fmt.wrap(str(entry.exception)))
+
+    def _estimate(self, e: EstimateEntry) -> tuple[str, ...]:
+        return (
+            e.name,
+            fmt.size(e.archive_size),
+            f"{e.estimate.ratio:.2f}" if e.estimate else "-",
+            fmt.duration(e.archive_time) if e.archive_time is not None else "-",
+            fmt.duration(e.upload_time) if e.upload_time is not None else "-",
+            e.basis,
+        )
+
+    def _downtime(self, downtime: timedelta) -> str:
+        # The blue/green deployments have no downtime at all, unlike the short one.
+        if downtime is None:
+            return ""
+        return fmt.duration(downtime) if downtime else "none"
+
+    def summary_plan(self, w: Writer, result: DeploymentPlanActionResult) -> None:
+        if result.graph and len(levels := result.graph.levels) > 1:
+            w.row("Stages", " > ".join(", ".join(sorted(level)) for level in levels))
+
+        if result.exception:
+            b = w.section(f"{fmt.ch('failure')} Failed to plan the deployment -- ¯\\_(ツ)_/¯")
+            b.list(fmt.wrap(str(result.exception)))
+
+    def summary_pull(self, w: Writer, result: ImagePullActionResult) -> None:
+        w.row(
+            "Images",
+            f"[ {fmt.ch('total')} {len(result.pulls)} "
+            f"| {fmt.ch('ok')} {len(result.pulls) - len(result.failed)} "
+            f"| {fmt.ch('nok')} {len(result.failed)} ]",
+        )
+
+        if result.failed:
+            b = w.section(f"{fmt.ch('failure')} Failed to pull (pulled by each service) -- ¯\\_(ツ)_/¯")
+            b.list(sorted(result.failed), style="number")
+
     def summary_deploy(self, w: Writer, result: DeploymentActionResult) -> None:
-        if processed := sorted((d.service, d.kind, fmt.duration(d.elapsed)) for d in result.successful):
+        if len(result.critical_path) > 1:
+            w.row(
+                "Critical path",
+                f"{' > '.join(s.service for s in result.critical_path)} "
+                f"[ {fmt.ch('duration')} {fmt.duration(result.critical_elapsed)} ]",
+            )
+
+        if processed := sorted(
+            (d.service, d.kind, fmt.duration(d.elapsed), self._downtime(d.downtime))
+            for d in result.successful
+            if not d.skip
+        ):
             title = None
             match result.operation:
                 case "Up":
@@ -235,7 +458,8 @@ class ReportWriter(Reporter):
             d.list(
                 [
                     f"{fmt.ch(kind)} {service} [ {fmt.ch('duration')} {duration} ]"
-                    for service, kind, duration in fmt.align(processed, "lrr")
+                    + (f" [ {fmt.ch('downtime')} {downtime} ]" if downtime.strip() else "")
+                    for service, kind, duration, downtime in fmt.align(processed, "lrrr")
                 ],
                 style="number",
             )
@@ -254,6 +478,20 @@ class ReportWriter(Reporter):
                 style="number",
             )
 
+        if unchanged := sorted((d.service, d.kind) for d in result.unchanged):
+            d = w.section(f"{fmt.ch('unchanged')} Unchanged services (skipped)")
+            d.list(
+                [f"{fmt.ch(kind)} {service}" for service, kind in fmt.align(unchanged, "lr")],
+                style="number",
+            )
+
+        if cancelled := sorted((d.service, d.kind) for d in result.cancelled):
+            d = w.section(f"{fmt.ch('unchanged')} Cancelled (failed dependency or fail-fast)")
+            d.list(
+                [f"{fmt.ch(kind)} {service}" for service, kind in fmt.align(cancelled, "lr")],
+                style="number",
+            )
+
     def details_directory_mapping(self, w: Writer, result: DirectoryMappingActionResult):
         d = w.section(f"{fmt.ch('mapping')} Mapped Directories")
         d.row("Success", f"{fmt.ch('success') if result.success else fmt.ch('failure')} {result.success}")
@@ -264,6 +502,8 @@ class ReportWriter(Reporter):
         for group in sorted(result.entries, key=lambda e: e.name):
             g = d.section(f"Group [{group.name}]:")
             g.list((f"{fmt.ch('directory')} {v}" for v in sorted(group.directories)))
+            if group.streams:
+                g.list((f"{fmt.ch('shell')} {s.name}: {s.cmd}" for s in sorted(group.streams, key=lambda s: s.name)))
 
     def details_backup(self, w: Writer, result: BackupActionResult):
         d = w.section(f"{fmt.ch('backup')} Backup")
@@ -273,10 +513,18 @@ class ReportWriter(Reporter):
         d.row("Completed", f"{fmt.ch('time')} {fmt.datetime(result.completed)}")
         d.row("Elapsed", f"{fmt.ch('duration')} {fmt.duration(result.elapsed)}")
 
-        total_backups = len(result.entries)
-        for ix, entry in enumerate(sorted(result.entries, key=lambda e: (e.group, e.directory))):
+        if result.unchanged:
+            u = d.section(f"{fmt.ch('unchanged')} Unchanged (skipped)")
+            for entry in sorted(result.unchanged, key=lambda e: (e.group, e.directory)):
+                b = u.section(f"[{entry.group}] {fmt.ch('directory')} {entry.directory}")
+                b.row("Fingerprint", f"{fmt.ch('fingerprint')} {entry.fingerprint}")
+
+        total_backups = len(result.processed)
+        for ix, entry in enumerate(sorted(result.processed, key=lambda e: (e.group, e.directory))):
             b = d.section(f"[{ix+1}/{total_backups}] [{entry.group}] {fmt.ch('directory')} {entry.directory}")
             b.row("Success", f"{fmt.ch('success') if entry.success else fmt.ch('failure')} {entry.success}")
+            if entry.resumed:
+                b.row("Resumed", f"{fmt.ch('resume')} {entry.resumed}")
             b.row("Started", f"{fmt.ch('time')} {fmt.datetime(entry.archive.started)}")
             b.row("Completed", f"{fmt.ch('time')} {fmt.datetime(entry.archive.completed)}")
             b.row("Elapsed", f"{fmt.ch('duration')} {fmt.duration(entry.archive.elapsed)}")
@@ -288,20 +536,30 @@ class ReportWriter(Reporter):
             else:
                 match entry.archive:
                     case RarArchivalStatus():
-                        if entry.archive.proc.exitcode:
-                            b.row("Exit Code", f"{fmt.ch('exitcode')} {entry.archive.proc.exitcode}")
+                        self.details_process(b, entry.archive.proc)
+                    case StreamArchivalStatus():
+                        b.row("Command", f"{fmt.ch('shell')} {entry.archive.source.cmd}")
+                        if entry.archive.proc:
+                            self.details_process(b, entry.archive.proc)
+                        elif entry.archive.exception:
+                            ex = b.section(f"{fmt.ch('exception')} Exception")
+                            ex.list(fmt.wrap(str(entry.archive.exception)))
 
-                        if entry.archive.proc.stdout:
-                            s = b.section("StdOut", indent=False)
-                            s.list(entry.archive.proc.stdout.split("\n"))
+    def details_process(self, w: Writer, proc: CompletedProcess):
+        if proc.exitcode:
+            w.row("Exit Code", f"{fmt.ch('exitcode')} {proc.exitcode}")
 
-                        if entry.archive.proc.stderr:
-                            s = b.section("StdErr", indent=False)
-                            s.list(entry.archive.proc.stderr.split("\n"))
+        if proc.stdout:
+            s = w.section("StdOut", indent=False)
+            s.list(proc.stdout.split("\n"))
 
-                        if entry.archive.proc.exception:
-                            ex = b.section(f"{fmt.ch('exception')} Exception")
-                            ex.list(fmt.wrap(str(entry.archive.proc.exception)))
+        if proc.stderr:
+            s = w.section("StdErr", indent=False)
+            s.list(proc.stderr.split("\n"))
+
+        if proc.exception:
+            ex = w.section(f"{fmt.ch('exception')} Exception")
+            ex.list(fmt.wrap(str(proc.exception)))
 
     def details_upload(self, w: Writer, result: UploadActionResult):
         d = w.section(f"{fmt.ch('upload')} Upload")
@@ -315,6 +573,8 @@ class ReportWriter(Reporter):
         for ix, entry in enumerate(sorted(result.entries, key=lambda e: e.upload.key)):
             b = d.section(f"[{ix+1}/{total_uploads}] {fmt.ch('archive')} {entry.upload.key}")
             b.row("Success", f"{fmt.ch('success') if entry.success else fmt.ch('failure')} {entry.success}")
+            if entry.resumed:
+                b.row("Resumed", f"{fmt.ch('resume')} {entry.resumed}")
             b.row("Started", f"{fmt.ch('time')} {fmt.datetime(entry.upload.started)}")
             b.row("Completed", f"{fmt.ch('time')} {fmt.datetime(entry.upload.completed)}")
             b.row("Elapsed", f"{fmt.ch('duration')} {fmt.duration(entry.upload.elapsed)}")
@@ -323,11 +583,28 @@ class ReportWriter(Reporter):
                 b.row("Size", f"{fmt.ch('size')} {fmt.size(entry.upload.size)}")
                 b.row("Speed", f"{fmt.ch('speed')} {fmt.speed(entry.upload.speed)}")
                 b.row("Archive", f"{fmt.ch('archive')} {entry.upload.filepath}")
+                if entry.upload.digest:
+                    b.row("Digest", f"{fmt.ch('fingerprint')} {entry.upload.digest}")
+                if entry.upload.checksum:
+                    b.row(
+                        "Checksum",
+                        f"{fmt.ch('fingerprint')} {entry.upload.checksum_algorithm} {entry.upload.checksum}",
+                    )
+                if entry.upload.existing:
+                    b.row("Already Uploaded", f"{fmt.ch('unchanged')} {entry.upload.existing}")
+                if entry.upload.resumed_size:
+                    b.row("Resumed Size", f"{fmt.ch('resume')} {fmt.size(entry.upload.resumed_size)}")
+                if entry.upload.copied_size:
+                    b.row("Copied Parts", f"{fmt.ch('link')} {fmt.size(entry.upload.copied_size)}")
+                if entry.upload.copied_from:
+                    b.row("Copied From", f"{fmt.ch('link')} {entry.upload.copied_from}")
             else:
                 if entry.upload.exception:
                     ex = b.section(f"{fmt.ch('exception')} Exception")
                     ex.list(fmt.wrap(str(entry.upload.exception)))
 
+            self.details_destinations(b, entry.upload)
+
             if entry.progress:
                 progress = sorted(
                     (
@@ -346,6 +623,23 @@ class ReportWriter(Reporter):
                     ]
                 )
 
+    def details_destinations(self, w: Writer, upload: UploadStatus):
+        for name, destination in upload.destinations.items():
+            success = destination.success
+            d = w.section(f"{fmt.ch('cloud')} {name}")
+            d.row("Success", f"{fmt.ch('success') if success else fmt.ch('failure')} {success}")
+            if destination.started and destination.completed:
+                d.row("Elapsed", f"{fmt.ch('duration')} {fmt.duration(destination.elapsed)}")
+            if success:
+                d.row("Speed", f"{fmt.ch('speed')} {fmt.speed(destination.speed)}")
+                if destination.checksum:
+                    d.row(
+                        "Checksum", f"{fmt.ch('fingerprint')} {destination.checksum_algorithm} {destination.checksum}"
+                    )
+            elif destination.exception:
+                ex = d.section(f"{fmt.ch('exception')} Exception")
+                ex.list(fmt.wrap(str(destination.exception)))
+
     def details_service_mapping(self, w: Writer, result: ServiceMappingActionResult):
         s = w.section(f"{fmt.ch('mapping')} Mapped Services")
         s.row("Success", f"{fmt.ch('success') if result.success else fmt.ch('failure')} {result.success}")
@@ -376,15 +670,16 @@ class ReportWriter(Reporter):
         for ix, entry in enumerate(sorted(result.entries, key=lambda e: e.service)):
             b = d.section(f"[{ix+1}/{total_services}] {fmt.ch(entry.kind)} {entry.service}")
             b.row("Success", f"{fmt.ch('success') if entry.success else fmt.ch('failure')} {entry.success}")
-            b.row(
-                "Started",
-                f"{fmt.ch('time')} {fmt.datetime(min(t.started for e in result.entries for t in e.processes))}",
-            )
-            b.row(
-                "Completed",
-                f"{fmt.ch('time')} {fmt.datetime(max(t.completed for e in result.entries for t in e.processes))}",
-            )
+            if entry.cancel or entry.skip:
+                b.row("Cancelled" if entry.cancel else "Unchanged", f"{fmt.ch('unchanged')} True")
+                continue
+
+            # The services are deployed concurrently, so each one has its own time frame.
+            b.row("Started", f"{fmt.ch('time')} {fmt.datetime(min(t.started for t in entry.processes))}")
+            b.row("Completed", f"{fmt.ch('time')} {fmt.datetime(max(t.completed for t in entry.processes))}")
             b.row("Elapsed", f"{fmt.ch('duration')} {fmt.duration(entry.elapsed)}")
+            if entry.downtime is not None:
+                b.row("Downtime", f"{fmt.ch('downtime')} {self._downtime(entry.downtime)}")
 
             for proc in entry.processes:
                 p = b.section(f"{fmt.ch('shell')} {' '.join(proc.cmd)}")
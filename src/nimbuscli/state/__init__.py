@@ -0,0 +1,7 @@
+from nimbuscli.state.catalog import BackupCatalog, CatalogEntry
+from nimbuscli.state.digests import DigestStore, ManifestStore
+from nimbuscli.state.fingerprint import FingerprintStore, fingerprint
+from nimbuscli.state.history import HistoryRecord, RunHistory
+from nimbuscli.state.index import FileIndex, IndexRoot
+from nimbuscli.state.journal import Journal, JournalEntry
+from nimbuscli.state.uploads import MultipartStore
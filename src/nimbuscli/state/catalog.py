@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from contextlib import closing, contextmanager
+from datetime import datetime
+from typing import Iterable, Iterator
+
+from logdecorator import log_on_end, log_on_start
+
+from nimbuscli.core.upload import RemoteObject
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archives (
+    location TEXT NOT NULL,
+    key TEXT NOT NULL,
+    grp TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created TEXT NOT NULL,
+    directory TEXT,
+    digest TEXT,
+    checksum_algorithm TEXT,
+    checksum TEXT,
+    storage_class TEXT,
+    PRIMARY KEY (location, key)
+);
+CREATE INDEX IF NOT EXISTS archives_group ON archives (grp, created);
+"""
+
+_COLUMNS = "location, key, grp, size, created, directory, digest, checksum_algorithm, checksum, storage_class"
+
+_RECORD = f"""
+INSERT INTO archives ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (location, key) DO UPDATE SET
+    grp = excluded.grp,
+    size = excluded.size,
+    created = excluded.created,
+    directory = COALESCE(excluded.directory, directory),
+    digest = COALESCE(excluded.digest, digest),
+    checksum_algorithm = COALESCE(excluded.checksum_algorithm, checksum_algorithm),
+    checksum = COALESCE(excluded.checksum, checksum),
+    storage_class = COALESCE(excluded.storage_class, storage_class)
+"""
+
+# The listing knows nothing about the content of the objects, so the recorded
+# details are kept, unless the object has been replaced with a different one.
+_SYNC = """
+INSERT INTO archives (location, key, grp, size, created, storage_class) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (location, key) DO UPDATE SET
+    created = CASE WHEN size = excluded.size THEN created ELSE excluded.created END,
+    directory = CASE WHEN size = excluded.size THEN directory END,
+    digest = CASE WHEN size = excluded.size THEN digest END,
+    checksum_algorithm = CASE WHEN size = excluded.size THEN checksum_algorithm END,
+    checksum = CASE WHEN size = excluded.size THEN checksum END,
+    storage_class = COALESCE(excluded.storage_class, storage_class),
+    size = excluded.size
+"""
+
+
+class CatalogEntry:
+    """
+    A single archive in the catalog, that is stored either
+    in the local destination or in one of the upload destinations.
+    """
+
+    def __init__(
+        self,
+        location: str,
+        key: str,
+        size: int,
+        created: datetime,
+        directory: str = None,
+        digest: str = None,
+        checksum_algorithm: str = None,
+        checksum: str = None,
+        storage_class: str = None,
+    ):
+        """
+        Creates a new instance of the CatalogEntry.
+
+        :param location: Location of the archive, e.g. 's3://bucket' or the backup destination.
+        :param key: Key of the archive under the location, in the 'group/directory/archive' form.
+        :param size: Size of the archive.
+        :param created: Time when the archive has been created or uploaded.
+        :param directory: The directory, that has been archived.
+        :param digest: SHA-256 digest of the archive.
+        :param checksum_algorithm: Algorithm of the checksum, that is stored with the object.
+        :param checksum: The checksum, that is stored with the object.
+        :param storage_class: Storage class of the object.
+        """
+        self.location = location
+        self.key = key
+        self.size = size
+        self.created = created
+        self.directory = directory
+        self.digest = digest
+        self.checksum_algorithm = checksum_algorithm
+        self.checksum = checksum
+        self.storage_class = storage_class
+
+    def __repr__(self) -> str:
+        params = [
+            f"location='{self.location}'",
+            f"key='{self.key}'",
+            f"size='{self.size}'",
+            f"created='{self.created}'",
+        ]
+        return "CatalogEntry(" + ", ".join(params) + ")"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CatalogEntry) and self.to_row() == other.to_row()
+
+    @property
+    def group(self) -> str:
+        return self.key.split("/", 1)[0]
+
+    def to_row(self) -> tuple:
+        return (
+            self.location,
+            self.key,
+            self.group,
+            self.size,
+            _timestamp(self.created),
+            self.directory,
+            self.digest,
+            self.checksum_algorithm,
+            self.checksum,
+            self.storage_class,
+        )
+
+    @staticmethod
+    def from_row(row: tuple) -> CatalogEntry:
+        location, key, _, size, created, directory, digest, algorithm, checksum, storage_class = row
+        return CatalogEntry(
+            location,
+            key,
+            size,
+            datetime.fromisoformat(created),
+            directory,
+            digest,
+            algorithm,
+            checksum,
+            storage_class,
+        )
+
+
+class BackupCatalog:
+    """
+    A local SQLite catalog of the archives, that have been created and uploaded.
+
+    The catalog answers what backups exist without listing the destinations,
+    and could be synchronized with the actual content of a destination on demand.
+    """
+
+    def __init__(self, filepath: str):
+        """
+        Creates a new instance of the BackupCatalog.
+
+        :param filepath: Full path to the database file.
+        """
+        self._filepath = filepath
+        self._initialized = False
+
+    def __repr__(self) -> str:
+        params = [f"file='{self._filepath}'"]
+        return "BackupCatalog(" + ", ".join(params) + ")"
+
+    @log_on_start(logging.DEBUG, "Recording {entries!r} in the catalog")
+    def record(self, entries: list[CatalogEntry]) -> None:
+        """
+        Add or update the archives in a single transaction.
+        """
+        with self._transaction() as conn:
+            conn.executemany(_RECORD, [e.to_row() for e in entries])
+
+    @log_on_end(logging.INFO, "Synchronized the catalog of {location!s}: {result!r} (added, removed)")
+    def sync(self, location: str, objects: Iterable[RemoteObject]) -> tuple[int, int]:
+        """
+        Replace the archives of the location with the listed objects, in a single transaction.
+
+        :param location: Location of the listed objects.
+        :param objects: All the objects stored in the location.
+        :return: Number of the added and removed archives.
+        """
+        listed = {o.key: o for o in objects}
+        with self._transaction() as conn:
+            existing = {row[0] for row in conn.execute("SELECT key FROM archives WHERE location = ?", (location,))}
+            removed = existing - listed.keys()
+            conn.executemany("DELETE FROM archives WHERE location = ? AND key = ?", [(location, k) for k in removed])
+            conn.executemany(
+                _SYNC,
+                [
+                    (location, o.key, o.key.split("/", 1)[0], o.size, _timestamp(o.modified), o.storage_class)
+                    for o in listed.values()
+                ],
+            )
+        return len(listed.keys() - existing), len(removed)
+
+    def entries(self, location: str = None, group: str = None) -> list[CatalogEntry]:
+        """
+        Returns the archives, ordered by the location, the group and the creation time.
+
+        :param location: Only the archives in this location are returned, if specified.
+        :param group: Only the archives of this group are returned, if specified.
+        """
+        query = f"SELECT {_COLUMNS} FROM archives"
+        conditions = [(c, v) for c, v in [("location", location), ("grp", group)] if v is not None]
+        if conditions:
+            query += " WHERE " + " AND ".join(f"{c} = ?" for c, _ in conditions)
+        query += " ORDER BY location, grp, created, key"
+
+        with closing(self._connect()) as conn:
+            return [CatalogEntry.from_row(row) for row in conn.execute(query, [v for _, v in conditions])]
+
+    def locations(self) -> list[str]:
+        """
+        Returns all the locations known to the catalog.
+        """
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT location FROM archives ORDER BY location")]
+
+    def remove(self, location: str, keys: list[str]) -> None:
+        """
+        Remove the archives from the catalog in a single transaction.
+        """
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM archives WHERE location = ? AND key = ?", [(location, k) for k in keys])
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # The transaction is committed on success and rolled back on failure.
+        with closing(self._connect()) as conn:
+            with conn:
+                yield conn
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self._filepath), exist_ok=True)
+
+        conn = sqlite3.connect(self._filepath, timeout=30)
+        if not self._initialized:
+            with conn:
+                conn.executescript(_SCHEMA)
+            self._initialized = True
+        return conn
+
+
+def _timestamp(value: datetime) -> str:
+    # The listed objects have the time zone, while the local times don't,
+    # so all the times are stored as the local times to keep them comparable.
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat()
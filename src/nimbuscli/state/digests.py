@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from nimbuscli.core.upload import DigestCatalog, Manifest, ManifestCatalog
+from nimbuscli.state.storage import JsonStore
+
+
+class DigestStore(JsonStore, DigestCatalog):
+    """
+    A persistent catalog of the uploaded objects, indexed by their content digests.
+    """
+
+    _entries = "digests"
+
+    def get(self, location: str, digest: str) -> str | None:
+        entry = self._get(location, digest)
+        return entry["key"] if entry else None
+
+    def update(self, location: str, digest: str, key: str) -> None:
+        # The catalog is updated by concurrent uploads,
+        # and saved after each one, so it survives an interrupted run.
+        self._set(location, digest, {"key": key, "updated": datetime.now().isoformat()})
+
+
+class ManifestStore(JsonStore, ManifestCatalog):
+    """
+    A persistent catalog of the part manifests of the latest uploaded versions.
+    """
+
+    _entries = "manifests"
+
+    def get(self, location: str, series: str) -> Manifest | None:
+        data = self._get(location, series)
+        return Manifest.from_dict(data) if data else None
+
+    def update(self, location: str, series: str, manifest: Manifest) -> None:
+        self._set(location, series, manifest.to_dict())
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from logdecorator import log_on_end
+
+from nimbuscli.state.storage import JsonStore
+
+
+@log_on_end(logging.DEBUG, "Fingerprint of {directory!s}: {result!s}")
+def fingerprint(directory: str, workers: int = None) -> str:
+    """
+    Compute a fingerprint of the directory tree using only the file metadata.
+
+    The fingerprint is a Merkle hash, where the hash of each directory
+    is computed over the name, size and modification time of its files and
+    the names and hashes of its subdirectories. The file content is never read,
+    and the directories of the same tree level are scanned concurrently.
+
+    :param directory: Full path to the directory.
+    :param workers: Maximum number of concurrent directory scans.
+    :return: Hex digest of the directory tree.
+    """
+    root = os.path.abspath(os.path.expanduser(directory))
+
+    # The tree is scanned level by level, so the listings
+    # are ordered from the root to the deepest directories.
+    listings: dict[str, _Listing] = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        level = [root]
+        while level:
+            scanned = list(executor.map(_scan, level))
+            for listing in scanned:
+                listings[listing.path] = listing
+            level = [os.path.join(listing.path, os.fsdecode(d)) for listing in scanned for d in listing.dirs]
+
+    # The subdirectories are always hashed before their parents.
+    digests: dict[str, bytes] = {}
+    for listing in reversed(listings.values()):
+        h = hashlib.sha256()
+        for name, size, mtime in sorted(listing.files):
+            h.update(b"f\0" + name + b"\0" + f"{size}\0{mtime}\0".encode())
+        for name in sorted(listing.dirs):
+            h.update(b"d\0" + name + b"\0" + digests[os.path.join(listing.path, os.fsdecode(name))])
+        digests[listing.path] = h.digest()
+
+    return digests[root].hex()
+
+
+class FingerprintStore(JsonStore):
+    """
+    A persistent collection of the directory fingerprints
+    taken during the last successful backup of each directory.
+    """
+
+    _entries = "fingerprints"
+
+    def get(self, group: str, directory: str) -> str | None:
+        """
+        Returns the fingerprint of the last successful backup.
+        """
+        entry = self._get(group, directory)
+        return entry["fingerprint"] if entry else None
+
+    def update(self, group: str, directory: str, value: str) -> None:
+        """
+        Record the fingerprint of the successful backup.
+        The changes are persisted by 'save'.
+        """
+        self._set(group, directory, {"fingerprint": value, "updated": datetime.now().isoformat()}, save=False)
+
+    def save(self) -> None:
+        """
+        Persist the recorded fingerprints.
+        """
+        self._persist()
+
+
+class _Listing:
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: list[tuple[bytes, int, int]] = []
+        self.dirs: list[bytes] = []
+
+
+def _scan(path: str) -> _Listing:
+    listing = _Listing(path)
+    with os.scandir(path) as it:
+        for entry in it:
+            name = os.fsencode(entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                listing.dirs.append(name)
+            else:
+                st = entry.stat(follow_symlinks=False)
+                listing.files.append((name, st.st_size, st.st_mtime_ns))
+    return listing
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from contextlib import closing, contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from logdecorator import log_on_start
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    command TEXT NOT NULL,
+    arguments TEXT,
+    started TEXT NOT NULL,
+    completed TEXT NOT NULL,
+    success INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    run INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    detail TEXT,
+    elapsed REAL NOT NULL,
+    success INTEGER NOT NULL,
+    size INTEGER,
+    source_size INTEGER
+);
+CREATE INDEX IF NOT EXISTS records_series ON records (kind, name);
+"""
+
+_RECORD = """
+INSERT INTO records (run, kind, name, detail, elapsed, success, size, source_size) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SELECT = """
+SELECT r.kind, r.name, r.detail, r.elapsed, r.success, r.size, r.source_size, runs.started
+FROM records r JOIN runs ON runs.id = r.run
+"""
+
+
+class HistoryRecord:
+    """
+    A single measured entry of the run, e.g. an archive, an upload or a process.
+    """
+
+    ARCHIVE = "archive"
+    UPLOAD = "upload"
+    DEPLOY = "deploy"
+    PROCESS = "process"
+
+    def __init__(
+        self,
+        kind: str,
+        name: str,
+        elapsed: timedelta,
+        success: bool,
+        size: int = None,
+        source_size: int = None,
+        detail: str = None,
+        started: datetime = None,
+    ):
+        """
+        Creates a new instance of the HistoryRecord.
+
+        :param kind: Kind of the entry: 'archive', 'upload', 'deploy' or 'process'.
+        :param name: Name of the series, e.g. 'group/directory' or the service name.
+        :param elapsed: Duration of the entry.
+        :param success: Whether the entry has succeeded.
+        :param size: Size of the produced or transferred data.
+        :param source_size: Size of the archived data, that gives the compression ratio.
+        :param detail: Detail, that distinguishes the entries of the same name, e.g. the command.
+        :param started: Start time of the run, that the entry belongs to.
+        """
+        self.kind = kind
+        self.name = name
+        self.elapsed = elapsed
+        self.success = success
+        self.size = size
+        self.source_size = source_size
+        self.detail = detail
+        self.started = started
+
+    def __repr__(self) -> str:
+        params = [
+            f"kind='{self.kind}'",
+            f"name='{self.name}'",
+            f"elapsed='{self.elapsed}'",
+            f"size='{self.size}'",
+            f"success='{self.success}'",
+        ]
+        return "HistoryRecord(" + ", ".join(params) + ")"
+
+    @property
+    def group(self) -> str:
+        return self.name.split("/", 1)[0]
+
+    @property
+    def speed(self) -> int | None:
+        if self.size is None:
+            return None
+        return int(self.size // max(self.elapsed.total_seconds(), 0.001))
+
+    @property
+    def source_speed(self) -> int | None:
+        """
+        Speed of the archival, in the source bytes per second.
+        """
+        if self.source_size is None:
+            return None
+        return int(self.source_size // max(self.elapsed.total_seconds(), 0.001))
+
+    @property
+    def ratio(self) -> float | None:
+        if not self.size or not self.source_size:
+            return None
+        return self.source_size / self.size
+
+
+class RunHistory:
+    """
+    A local SQLite history of the runs, that keeps the measurements
+    of every run, so the performance could be compared over time.
+    """
+
+    def __init__(self, filepath: str):
+        """
+        Creates a new instance of the RunHistory.
+
+        :param filepath: Full path to the database file.
+        """
+        self._filepath = filepath
+        self._initialized = False
+
+    def __repr__(self) -> str:
+        params = [f"file='{self._filepath}'"]
+        return "RunHistory(" + ", ".join(params) + ")"
+
+    @log_on_start(logging.DEBUG, "Recording the run of {command!s} in the history: {records!r}")
+    def record(
+        self,
+        command: str,
+        arguments: list[str],
+        started: datetime,
+        completed: datetime,
+        success: bool,
+        records: list[HistoryRecord],
+    ) -> None:
+        """
+        Add the run with all its records in a single transaction.
+        """
+        with self._transaction() as conn:
+            run = conn.execute(
+                "INSERT INTO runs (command, arguments, started, completed, success) VALUES (?, ?, ?, ?, ?)",
+                (command, " ".join(arguments), started.isoformat(), completed.isoformat(), int(success)),
+            ).lastrowid
+            conn.executemany(
+                _RECORD,
+                [
+                    (run, r.kind, r.name, r.detail, r.elapsed.total_seconds(), int(r.success), r.size, r.source_size)
+                    for r in records
+                ],
+            )
+
+    def records(self, kind: str = None, since: datetime = None) -> list[HistoryRecord]:
+        """
+        Returns the records, ordered by the start time of their runs.
+
+        :param kind: Only the records of this kind are returned, if specified.
+        :param since: Only the records of the runs started after this time are returned, if specified.
+        """
+        query = _SELECT
+        conditions = [(c, v) for c, v in [("r.kind = ?", kind), ("runs.started >= ?", since)] if v is not None]
+        if conditions:
+            query += " WHERE " + " AND ".join(c for c, _ in conditions)
+        query += " ORDER BY runs.started, runs.id"
+
+        params = [v.isoformat() if isinstance(v, datetime) else v for _, v in conditions]
+        with closing(self._connect()) as conn:
+            return [
+                HistoryRecord(
+                    kind,
+                    name,
+                    timedelta(seconds=elapsed),
+                    bool(success),
+                    size,
+                    source_size,
+                    detail,
+                    datetime.fromisoformat(started),
+                )
+                for kind, name, detail, elapsed, success, size, source_size, started in conn.execute(query, params)
+            ]
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # The transaction is committed on success and rolled back on failure.
+        with closing(self._connect()) as conn:
+            with conn:
+                yield conn
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            os.makedirs(os.path.dirname(self._filepath), exist_ok=True)
+
+        conn = sqlite3.connect(self._filepath, timeout=30)
+        if not self._initialized:
+            with conn:
+                conn.executescript(_SCHEMA)
+            self._initialized = True
+        return conn
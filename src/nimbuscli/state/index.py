@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+from array import array
+from collections import Counter, defaultdict
+from itertools import compress
+from typing import Iterable
+
+from logdecorator import log_on_end, log_on_start
+
+from nimbuscli.provider import DirectoryResource
+
+# Column name -> array typecode.
+# The file columns share the same file id,
+# while the directory columns share the same directory id.
+_COLUMNS = {
+    # -- Files --
+    "file_dir": "I",
+    "file_name": "I",
+    "size": "q",
+    "mtime": "q",
+    "inode": "Q",
+    "mode": "I",
+    # -- Directories --
+    "dir_parent": "i",
+    "dir_name": "I",
+    # -- Interned path segments --
+    "segment_offset": "Q",
+    "segments": "B",
+}
+
+
+class IndexRoot:
+    """
+    A single directory of the directory group, that has been indexed.
+    The files and directories of the root occupy a contiguous range of ids.
+    """
+
+    def __init__(self, group: str, directory: str, dirs: range, files: range, exception: Exception = None):
+        self.group: str = group
+        self.directory: str = directory
+        self.dirs: range = dirs
+        self.files: range = files
+        self.exception: Exception = exception
+
+    def __repr__(self) -> str:
+        params = [
+            f"group='{self.group}'",
+            f"directory='{self.directory}'",
+            f"files='{len(self.files)}'",
+        ]
+        if self.exception:
+            params.append(f"exception='{self.exception!r}'")
+        return "IndexRoot(" + ", ".join(params) + ")"
+
+
+class FileIndex:
+    """
+    A compact in-memory index of the file metadata.
+
+    Instead of keeping a Python object per file, the index stores
+    the metadata in array-backed columns (size, mtime, inode, mode)
+    and the paths as references to the interned path segments.
+    The files of each root occupy a contiguous range of ids,
+    so the per-root queries work on the column slices.
+    """
+
+    def __init__(self, columns: dict[str, array], roots: list[IndexRoot]):
+        self._columns = columns
+        self._roots = roots
+
+    def __repr__(self) -> str:
+        params = [
+            f"roots='{len(self._roots)}'",
+            f"files='{len(self)}'",
+        ]
+        return "FileIndex(" + ", ".join(params) + ")"
+
+    def __len__(self) -> int:
+        return len(self._columns["size"])
+
+    @property
+    def roots(self) -> list[IndexRoot]:
+        return self._roots
+
+    @property
+    def sizes(self) -> array:
+        return self._columns["size"]
+
+    @property
+    def mtimes(self) -> array:
+        """
+        Modification time of the files in nanoseconds.
+        """
+        return self._columns["mtime"]
+
+    @property
+    def inodes(self) -> array:
+        return self._columns["inode"]
+
+    @property
+    def modes(self) -> array:
+        return self._columns["mode"]
+
+    def path(self, file: int) -> str:
+        """
+        Reconstruct the full path of the file.
+        """
+        directory = self._directory(self._columns["file_dir"][file])
+        return os.path.join(directory, self._segment(self._columns["file_name"][file]))
+
+    def paths(self, files: range) -> list[str]:
+        """
+        Reconstruct the full paths of the contiguous range of files, e.g. of a root.
+        The path of each directory is reconstructed only once.
+        """
+        start, end = files.start, files.stop
+        directories: dict[int, str] = {}
+        paths = []
+        for directory, name in zip(self._columns["file_dir"][start:end], self._columns["file_name"][start:end]):
+            if (path := directories.get(directory)) is None:
+                path = directories[directory] = self._directory(directory)
+            paths.append(os.path.join(path, self._segment(name)))
+        return paths
+
+    def total_size(self, files: Iterable[int] = None) -> int:
+        """
+        Total size of the files, or of the entire index if files are not specified.
+        """
+        sizes = self._columns["size"]
+        if files is None:
+            return sum(sizes)
+        if isinstance(files, range) and files.step == 1:
+            start, end = files.start, files.stop
+            return sum(sizes[start:end])
+        return sum(map(sizes.__getitem__, files))
+
+    def histogram(self) -> list[int]:
+        """
+        Distribution of the file sizes in power-of-two buckets.
+        The bucket 'k' counts the files of size in range [2^(k-1), 2^k).
+        The bucket '0' counts the empty files.
+        """
+        counts = Counter(map(int.bit_length, self._columns["size"]))
+        return [counts.get(k, 0) for k in range(max(counts, default=-1) + 1)]
+
+    def largest(self, n: int, files: Iterable[int] = None) -> list[int]:
+        """
+        Returns ids of the 'n' largest files, ordered from the largest.
+        """
+        sizes = self._columns["size"]
+        files = range(len(self)) if files is None else files
+        if isinstance(files, range) and files.step == 1:
+            start, end = files.start, files.stop
+            return [file for _, file in heapq.nlargest(n, zip(sizes[start:end], files))]
+        return heapq.nlargest(n, files, key=sizes.__getitem__)
+
+    def where(
+        self,
+        min_size: int = None,
+        max_size: int = None,
+        modified_after: int = None,
+        root: IndexRoot = None,
+    ) -> list[int]:
+        """
+        Returns ids of the files that match all specified conditions.
+
+        :param min_size: Minimal file size in bytes (inclusive).
+        :param max_size: Maximal file size in bytes (inclusive).
+        :param modified_after: Modification time in nanoseconds since epoch (exclusive).
+        :param root: The root directory the files belong to.
+        """
+        files = root.files if root else range(len(self))
+        start, end = files.start, files.stop
+        sizes = self._columns["size"][start:end]
+        mtimes = self._columns["mtime"][start:end]
+
+        masks = []
+        if min_size is not None:
+            masks.append(map(min_size.__le__, sizes))
+        if max_size is not None:
+            masks.append(map(max_size.__ge__, sizes))
+        if modified_after is not None:
+            masks.append(map(modified_after.__lt__, mtimes))
+
+        return list(compress(files, map(all, zip(*masks)))) if masks else list(files)
+
+    def same_size(self, min_size: int = 1) -> list[list[int]]:
+        """
+        Returns groups of files that have the same size, but different inodes.
+        These are the candidates for the content deduplication.
+        """
+        sizes, inodes = self._columns["size"], self._columns["inode"]
+
+        groups: dict[int, dict[int, int]] = defaultdict(dict)
+        for file in compress(range(len(self)), map(min_size.__le__, sizes)):
+            groups[sizes[file]].setdefault(inodes[file], file)
+
+        return [sorted(g.values()) for g in groups.values() if len(g) > 1]
+
+    def _directory(self, directory: int) -> str:
+        parts = []
+        while directory != -1:
+            parts.append(self._segment(self._columns["dir_name"][directory]))
+            directory = self._columns["dir_parent"][directory]
+        return os.path.join(*reversed(parts))
+
+    def _segment(self, segment: int) -> str:
+        offsets = self._columns["segment_offset"]
+        start, end = offsets[segment], offsets[segment + 1]
+        return os.fsdecode(bytes(self._columns["segments"][start:end]))
+
+    @staticmethod
+    @log_on_start(logging.DEBUG, "Indexing directories: {resources!s}")
+    @log_on_end(logging.DEBUG, "Created file index: {result!r}")
+    def build(resources: list[DirectoryResource]) -> FileIndex:
+        """
+        Create the index by walking all directories of the directory groups once.
+        The subdirectories that cannot be read are skipped, while the failure
+        to read the directory itself is recorded on its root.
+        """
+        builder = _Builder()
+        for resource in resources:
+            for directory in resource.directories:
+                builder.add_root(resource.name, directory)
+        return builder.build()
+
+
+class _Builder:
+
+    def __init__(self):
+        self.columns = {name: array(typecode) for name, typecode in _COLUMNS.items()}
+        self.columns["segment_offset"].append(0)
+        self.interned: dict[str, int] = {}
+        self.roots: list[IndexRoot] = []
+
+    def add_root(self, group: str, directory: str) -> None:
+        files_start = len(self.columns["size"])
+        dirs_start = len(self.columns["dir_parent"])
+
+        exception = None
+        stack = [(self._add_dir(-1, directory), directory)]
+        while stack:
+            parent, path = stack.pop()
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((self._add_dir(parent, entry.name), entry.path))
+                        else:
+                            self._add_file(parent, entry)
+            except OSError as e:
+                # The missing or unreadable directory is not an empty one.
+                if path == directory:
+                    exception = e
+
+        self.roots.append(
+            IndexRoot(
+                group,
+                directory,
+                range(dirs_start, len(self.columns["dir_parent"])),
+                range(files_start, len(self.columns["size"])),
+                exception,
+            )
+        )
+
+    def build(self) -> FileIndex:
+        return FileIndex(self.columns, self.roots)
+
+    def _add_dir(self, parent: int, name: str) -> int:
+        self.columns["dir_parent"].append(parent)
+        self.columns["dir_name"].append(self._intern(name))
+        return len(self.columns["dir_parent"]) - 1
+
+    def _add_file(self, parent: int, entry: os.DirEntry) -> None:
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            return
+        self.columns["file_dir"].append(parent)
+        self.columns["file_name"].append(self._intern(entry.name))
+        self.columns["size"].append(st.st_size)
+        self.columns["mtime"].append(st.st_mtime_ns)
+        self.columns["inode"].append(st.st_ino)
+        self.columns["mode"].append(st.st_mode)
+
+    def _intern(self, segment: str) -> int:
+        if (ix := self.interned.get(segment)) is None:
+            ix = self.interned[segment] = len(self.interned)
+            self.columns["segments"].frombytes(os.fsencode(segment))
+            self.columns["segment_offset"].append(len(self.columns["segments"]))
+        return ix
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from datetime import datetime
+
+from logdecorator import log_on_end, log_on_error, log_on_start
+
+from nimbuscli.state.storage import read_json, write_json
+
+
+class Journal:
+    """
+    A persistent record of the backup run progress.
+    The journal is updated after each completed step, so an interrupted
+    run could be resumed from the last successfully completed step.
+    The journal could be updated by several concurrent uploads.
+    """
+
+    def __init__(self, filepath: str):
+        """
+        Creates a new instance of the Journal.
+
+        :param filepath: Full path to the journal file.
+        """
+        self._filepath = filepath
+        self._selectors: list[str] = []
+        self._started: datetime = None
+        self._entries: dict[tuple[str, str], JournalEntry] = {}
+        self._lock = threading.RLock()
+
+    def __repr__(self) -> str:
+        params = [f"file='{self._filepath}'"]
+        return "Journal(" + ", ".join(params) + ")"
+
+    @property
+    def selectors(self) -> list[str]:
+        """
+        Selectors of the journaled run.
+        """
+        return self._selectors
+
+    @property
+    def entries(self) -> list[JournalEntry]:
+        return list(self._entries.values())
+
+    def entry(self, group: str, directory: str) -> JournalEntry | None:
+        return self._entries.get((group, directory))
+
+    @log_on_start(logging.DEBUG, "Starting a new journal: {self._filepath!s}")
+    def start(self, selectors: list[str]) -> None:
+        """
+        Start a new journal, discarding the previous one.
+        """
+        self._selectors = list(selectors) if selectors else []
+        self._started = datetime.now()
+        self._entries = {}
+        self._save()
+
+    @log_on_end(logging.INFO, "Loaded journal [{result!s}]: {self._filepath!s}")
+    @log_on_error(logging.ERROR, "Failed to load journal: {e!r}", on_exceptions=Exception, reraise=False)
+    def load(self) -> bool:
+        """
+        Load the journal of the interrupted run.
+        A malformed journal is ignored.
+
+        :return: True, if the journal exists and has been loaded.
+        """
+        if (data := read_json(self._filepath)) is None:
+            return False
+
+        self._selectors = data.get("selectors", [])
+        self._started = _parse(data.get("started"))
+        self._entries = {}
+        for item in data.get("entries", []):
+            entry = JournalEntry.from_dict(item)
+            self._entries[(entry.group, entry.directory)] = entry
+        return True
+
+    def planned(self, group: str, directory: str, archive: str, fingerprint: str = None) -> JournalEntry:
+        """
+        Record the archive that is about to be created.
+        """
+        entry = JournalEntry(group, directory)
+        entry.archive = archive
+        entry.fingerprint = fingerprint
+        with self._lock:
+            self._entries[(group, directory)] = entry
+            self._save()
+        return entry
+
+    def archived(self, group: str, directory: str, started: datetime, completed: datetime) -> None:
+        """
+        Record the successfully created archive.
+        """
+        with self._lock:
+            entry = self._entries[(group, directory)]
+            entry.state = JournalEntry.ARCHIVED
+            entry.archive_started = started
+            entry.archive_completed = completed
+            self._save()
+
+    def uploaded(self, group: str, directory: str, key: str, size: int, started: datetime, completed: datetime):
+        """
+        Record the successfully uploaded archive.
+        """
+        with self._lock:
+            entry = self._entries[(group, directory)]
+            entry.state = JournalEntry.UPLOADED
+            entry.key = key
+            entry.size = size
+            entry.upload_started = started
+            entry.upload_completed = completed
+            self._save()
+
+    @log_on_start(logging.DEBUG, "Completing the journal: {self._filepath!s}")
+    def complete(self) -> None:
+        """
+        Mark the run as completed. There is nothing left to resume.
+        """
+        with self._lock:
+            self._entries = {}
+            if os.path.exists(self._filepath):
+                os.remove(self._filepath)
+
+    @log_on_error(logging.ERROR, "Failed to save journal: {e!r}", on_exceptions=Exception, reraise=False)
+    def _save(self) -> None:
+        write_json(
+            self._filepath,
+            {
+                "selectors": self._selectors,
+                "started": _format(self._started),
+                "entries": [e.to_dict() for e in self._entries.values()],
+            },
+        )
+
+
+class JournalEntry:
+    """
+    Progress of a single backup entry.
+    """
+
+    PLANNED = "planned"
+    ARCHIVED = "archived"
+    UPLOADED = "uploaded"
+
+    def __init__(self, group: str, directory: str):
+        self.group: str = group
+        self.directory: str = directory
+        self.state: str = JournalEntry.PLANNED
+        self.archive: str = None
+        self.fingerprint: str = None
+        self.archive_started: datetime = None
+        self.archive_completed: datetime = None
+        self.key: str = None
+        self.size: int = None
+        self.upload_started: datetime = None
+        self.upload_completed: datetime = None
+
+    @property
+    def is_archived(self) -> bool:
+        return self.state in (JournalEntry.ARCHIVED, JournalEntry.UPLOADED)
+
+    @property
+    def is_uploaded(self) -> bool:
+        return self.state == JournalEntry.UPLOADED
+
+    def to_dict(self) -> dict:
+        return {
+            "group": self.group,
+            "directory": self.directory,
+            "state": self.state,
+            "archive": self.archive,
+            "fingerprint": self.fingerprint,
+            "archive_started": _format(self.archive_started),
+            "archive_completed": _format(self.archive_completed),
+            "key": self.key,
+            "size": self.size,
+            "upload_started": _format(self.upload_started),
+            "upload_completed": _format(self.upload_completed),
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> JournalEntry:
+        entry = JournalEntry(data["group"], data["directory"])
+        entry.state = data.get("state", JournalEntry.PLANNED)
+        entry.archive = data.get("archive")
+        entry.fingerprint = data.get("fingerprint")
+        entry.archive_started = _parse(data.get("archive_started"))
+        entry.archive_completed = _parse(data.get("archive_completed"))
+        entry.key = data.get("key")
+        entry.size = data.get("size")
+        entry.upload_started = _parse(data.get("upload_started"))
+        entry.upload_completed = _parse(data.get("upload_completed"))
+        return entry
+
+
+def _format(d: datetime | None) -> str | None:
+    return d.isoformat() if d else None
+
+
+def _parse(s: str | None) -> datetime | None:
+    return datetime.fromisoformat(s) if s else None
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any
+
+from logdecorator import log_on_error
+
+
+def read_json(filepath: str) -> Any | None:
+    """
+    Read the state file.
+
+    :param filepath: Full path to the state file.
+    :return: The content of the state file, or None if the file doesn't exist.
+    """
+    if not os.path.exists(filepath):
+        return None
+
+    with open(filepath, mode="r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def write_json(filepath: str, data: Any) -> None:
+    """
+    Replace the state file atomically, so a crash
+    never leaves a partially written file behind.
+
+    :param filepath: Full path to the state file.
+    :param data: The content of the state file.
+    """
+    directory = os.path.dirname(filepath)
+    os.makedirs(directory, exist_ok=True)
+
+    # The unique name keeps the concurrent writers from writing into the same temporary file.
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filepath)}.", suffix=".tmp")
+    try:
+        with open(fd, mode="w", encoding="utf-8") as file:
+            json.dump(data, file, indent=2)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class JsonStore:
+    """
+    A persistent two-level mapping of the entries, stored in a state file.
+    The file is read on the first access, and the changes are guarded by a lock,
+    so a single store can be shared by the concurrent transfers.
+    """
+
+    # Describes the entries in the log messages.
+    _entries = "entries"
+
+    def __init__(self, filepath: str):
+        """
+        Creates a new instance of the store.
+
+        :param filepath: Full path to the state file.
+        """
+        self._filepath = filepath
+        self._data: dict[str, dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        params = [f"file='{self._filepath}'"]
+        return type(self).__name__ + "(" + ", ".join(params) + ")"
+
+    def _get(self, scope: str, key: str) -> Any | None:
+        with self._lock:
+            return self._load().get(scope, {}).get(key)
+
+    def _set(self, scope: str, key: str, entry: Any, save: bool = True) -> None:
+        with self._lock:
+            self._load().setdefault(scope, {})[key] = entry
+            if save:
+                self._save()
+
+    def _remove(self, scope: str, key: str) -> None:
+        with self._lock:
+            if self._load().get(scope, {}).pop(key, None) is not None:
+                self._save()
+
+    def _persist(self) -> None:
+        with self._lock:
+            self._save()
+
+    @log_on_error(logging.ERROR, "Failed to save {self._entries!s}: {e!r}", on_exceptions=Exception, reraise=False)
+    def _save(self) -> None:
+        write_json(self._filepath, self._load())
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self._data is None:
+            self._data = self._read() or {}
+        return self._data
+
+    @log_on_error(logging.ERROR, "Failed to load {self._entries!s}: {e!r}", on_exceptions=Exception, reraise=False)
+    def _read(self) -> dict[str, dict[str, Any]] | None:
+        return read_json(self._filepath)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from nimbuscli.core.upload import MultipartSession, MultipartSessions
+from nimbuscli.state.storage import JsonStore
+
+
+class MultipartStore(JsonStore, MultipartSessions):
+    """
+    A persistent collection of the unfinished multipart uploads.
+    """
+
+    _entries = "multipart uploads"
+
+    def get(self, location: str, key: str) -> MultipartSession | None:
+        data = self._get(location, key)
+        return MultipartSession.from_dict(data) if data else None
+
+    def save(self, location: str, key: str, session: MultipartSession) -> None:
+        self._set(location, key, session.to_dict())
+
+    def remove(self, location: str, key: str) -> None:
+        self._remove(location, key)
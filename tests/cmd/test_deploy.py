@@ -0,0 +1,43 @@
+import pytest
+from mock import Mock
+
+from nimbuscli.cmd import Up
+from nimbuscli.core.deploy import OperationStatus
+from nimbuscli.state import FingerprintStore
+
+
+def service(name: str, images: list[str]) -> Mock:
+    srv = Mock(kind="docker")
+    srv.name = name
+    srv.dependencies.return_value = []
+    srv.images.return_value = images
+    srv.fingerprint.return_value = f"fingerprint-{name}"
+    srv.running.return_value = True
+    srv.start.side_effect = lambda pull=True: OperationStatus(name, "Start", "docker")
+    return srv
+
+
+class TestUp:
+
+    @pytest.fixture
+    def fingerprints(self, tmpdir):
+        store = FingerprintStore(str(tmpdir.join("fingerprints.json")))
+        for name in ["pulled", "failed", "built"]:
+            store.update("docker", name, f"fingerprint-{name}")
+        return store
+
+    def test_skip_unchanged(self, fingerprints):
+        services = [service("pulled", ["pulled:1"]), service("failed", ["failed:1"]), service("built", [])]
+        provider = Mock(resolve=Mock(return_value=[Mock() for _ in services]))
+        factory = Mock(create_service=Mock(side_effect=services))
+        puller = Mock(workers=2)
+        puller.pull.return_value = {"pulled:1": Mock(success=True), "failed:1": Mock(success=False)}
+
+        result = Up([], provider, factory, puller=puller, fingerprints=fingerprints).execute()
+
+        # The fingerprint of the service, which images have failed to pull, is taken from the outdated images.
+        statuses = {status.service: status for status in result.actions[-1].entries}
+        assert statuses["pulled"].skip
+        assert statuses["built"].skip
+        assert not statuses["failed"].skip
+        services[1].start.assert_called_once_with(pull=True)
@@ -0,0 +1,29 @@
+import os
+
+from mock import Mock
+
+from nimbuscli.cmd import Estimate
+from nimbuscli.core.archive import SizeEstimator, TarArchiver
+from nimbuscli.provider import DirectoryResource
+
+
+class TestEstimate:
+
+    def test_estimate_missing(self, tmpdir):
+        directory = os.path.join(tmpdir, "docs")
+        os.makedirs(directory)
+        with open(os.path.join(directory, "a.txt"), "wb") as file:
+            file.write(b"x" * 1000)
+        missing = os.path.join(tmpdir, "missing")
+        provider = Mock(resolve=Mock(return_value=[DirectoryResource("docs", [directory, missing])]))
+        history = Mock(records=Mock(return_value=[]))
+
+        result = Estimate([], provider, SizeEstimator(TarArchiver("gz")), history).execute()
+
+        # The missing directory is not estimated, instead of being reported as an empty one.
+        entries = result.actions[-1].entries
+        assert [e.directory for e in entries] == [directory, missing]
+        assert entries[0].known
+        assert isinstance(entries[1].exception, FileNotFoundError)
+        assert not entries[1].known
+        assert not result.actions[-1].success
@@ -12,6 +12,7 @@ from nimbuscli.config.schema import (
     observability,
     profiles,
     schema,
+    state,
 )
 
 
@@ -67,6 +68,8 @@ def pytest_generate_tests(metafunc):
         # --
         "profiles_filename": "profiles/",
         # --
+        "state_filename": "state/",
+        # --
         "commands_filename": "commands",
         "backup_filename": "commands/backup/",
         "deploy_filename": "commands/deploy/",
@@ -88,6 +91,10 @@ def test_profiles(profiles_filename):
     validate(profiles(), profiles_filename)
 
 
+def test_state(state_filename):
+    validate(state(), state_filename)
+
+
 def test_commands(commands_filename):
     validate(commands(), commands_filename)
 
@@ -0,0 +1,165 @@
+import os
+import tarfile
+import zipfile
+
+import pytest
+from mock import Mock
+
+from nimbuscli.core.archive import TarArchiver, ZipArchiver
+from nimbuscli.core.archive.encryption import (
+    DecryptedReader,
+    EncryptedWriter,
+    decrypt,
+    verify,
+)
+
+pytest.importorskip("cryptography")
+
+
+def encrypt(path: str, data: bytes, chunk_size: int, writes: int = 1) -> None:
+    with EncryptedWriter(path, "secret", chunk_size) as out:
+        step = max(1, len(data) // writes)
+        for offset in range(0, len(data), step):
+            end = offset + step
+            out.write(data[offset:end])
+
+
+class TestEncryption:
+
+    @pytest.mark.parametrize("size", [0, 15, 16, 17, 100])
+    @pytest.mark.parametrize("writes", [1, 50])
+    def test_roundtrip(self, tmpdir, size, writes):
+        data = os.urandom(size)
+        source = os.path.join(tmpdir, "data.enc")
+        target = os.path.join(tmpdir, "data")
+
+        encrypt(source, data, 16, writes)
+        decrypt(source, target, "secret")
+
+        with open(target, "rb") as file:
+            assert file.read() == data
+        assert verify(source, "secret", workers=3) == size
+
+    def test_seek(self, tmpdir):
+        data = os.urandom(100)
+        source = os.path.join(tmpdir, "data.enc")
+        encrypt(source, data, 16)
+
+        with DecryptedReader(source, "secret") as reader:
+            assert len(reader) == 100
+            assert reader.seek(-10, os.SEEK_END) == 90
+            assert reader.read() == data[90:]
+            assert reader.seek(20) == 20
+            assert reader.read(30) == data[20:50]
+            assert reader.seek(-45, os.SEEK_CUR) == 5
+            assert reader.read(5) == data[5:10]
+            assert reader.seek(200) == 200
+            assert reader.read() == b""
+
+    def test_wrong_password(self, tmpdir):
+        source = os.path.join(tmpdir, "data.enc")
+        encrypt(source, os.urandom(100), 16)
+
+        with pytest.raises(ValueError):
+            verify(source, "wrong")
+
+    @pytest.mark.parametrize("position", [0, 20, 40, 60, -1])
+    def test_tampered(self, tmpdir, position):
+        source = os.path.join(tmpdir, "data.enc")
+        encrypt(source, os.urandom(100), 16)
+
+        with open(source, "r+b") as file:
+            file.seek(position, os.SEEK_END if position < 0 else os.SEEK_SET)
+            value = file.read(1)
+            file.seek(-1, os.SEEK_CUR)
+            file.write(bytes([value[0] ^ 0x01]))
+
+        with pytest.raises(ValueError):
+            verify(source, "secret")
+
+    @pytest.mark.parametrize("cut", [1, 16, 32, 33])
+    def test_truncated(self, tmpdir, cut):
+        source = os.path.join(tmpdir, "data.enc")
+        encrypt(source, os.urandom(64), 16)
+
+        size = os.path.getsize(source)
+        with open(source, "r+b") as file:
+            file.truncate(size - cut)
+
+        with pytest.raises(ValueError):
+            verify(source, "secret")
+
+    def test_aborted(self, tmpdir):
+        source = os.path.join(tmpdir, "data.enc")
+        out = EncryptedWriter(source, "secret", 16)
+        out.write(os.urandom(40))
+        out.abort()
+
+        with pytest.raises(ValueError):
+            verify(source, "secret")
+
+    def test_not_encrypted(self, tmpdir):
+        source = os.path.join(tmpdir, "data")
+        with open(source, "wb") as file:
+            file.write(os.urandom(100))
+
+        with pytest.raises(ValueError):
+            DecryptedReader(source, "secret")
+
+    @pytest.mark.parametrize("password", [None, ""])
+    def test_empty_password(self, tmpdir, password):
+        with pytest.raises(ValueError):
+            EncryptedWriter(os.path.join(tmpdir, "data.enc"), password)
+
+
+class TestEncryptedArchivers:
+
+    @pytest.fixture
+    def directory(self, tmpdir):
+        directory = os.path.join(tmpdir, "source")
+        os.makedirs(os.path.join(directory, "sub"))
+        for name in ["a", "b", "sub/c"]:
+            with open(os.path.join(directory, name), "wb") as file:
+                file.write(os.urandom(50_000))
+        return directory
+
+    @pytest.mark.parametrize("compression", [None, "gz", "bz2", "xz"])
+    def test_tar(self, tmpdir, directory, compression):
+        archiver = TarArchiver(compression, "secret")
+        archive = os.path.join(tmpdir, f"archive.{archiver.extension}")
+        assert archiver.extension.endswith(".enc")
+
+        status = archiver.archive(directory, archive)
+
+        assert status.success
+        verify(archive, "secret")
+        with DecryptedReader(archive, "secret") as reader, tarfile.open(fileobj=reader, mode="r|*") as tar:
+            assert sorted(m.name for m in tar) == ["a", "b", "sub/c"]
+
+    @pytest.mark.parametrize("compression", [None, "gz", "bz2", "xz"])
+    def test_zip(self, tmpdir, directory, compression):
+        archiver = ZipArchiver(compression, "secret")
+        archive = os.path.join(tmpdir, f"archive.{archiver.extension}")
+        assert archiver.extension == "zip.enc"
+
+        status = archiver.archive(directory, archive)
+
+        assert status.success
+        verify(archive, "secret")
+        with DecryptedReader(archive, "secret") as reader:
+            with zipfile.ZipFile(reader) as zf:
+                assert zf.testzip() is None
+                assert sorted(zf.namelist()) == ["a", "b", "sub/c"]
+
+    def test_failed_archive(self, tmpdir, directory, monkeypatch):
+        archiver = TarArchiver("gz", "secret")
+        archive = os.path.join(tmpdir, f"archive.{archiver.extension}")
+
+        exc = Exception("add file")
+        monkeypatch.setattr(archiver, "add_file", Mock(side_effect=exc))
+
+        status = archiver.archive(directory, archive)
+
+        assert status.exception == exc
+        with pytest.raises(ValueError):
+            verify(archive, "secret")
@@ -0,0 +1,96 @@
+import os
+import stat
+
+import pytest
+from mock import Mock
+
+from nimbuscli.core.archive import SizeEstimator, TarArchiver
+from nimbuscli.core.archive.rar import RarArchiver
+from nimbuscli.core.archive.zip import ZipArchiver
+
+
+class TestSizeEstimator:
+
+    @pytest.mark.parametrize("files, slices", [(0, 3), (16, 0), (-1, -1)])
+    def test_init_failed_params(self, files, slices):
+        with pytest.raises(ValueError):
+            SizeEstimator(Mock(), files, slices)
+
+    def test_estimate(self, tmpdir):
+        directory = tmpdir.mkdir("source")
+        directory.join("zeros.bin").write_binary(b"\0" * 1024 * 1024)
+        directory.join("random.bin").write_binary(os.urandom(1024 * 1024))
+        directory.mkdir("empty").join("empty.txt").write_binary(b"")
+
+        estimate = SizeEstimator(TarArchiver("gz")).estimate(str(directory))
+
+        assert estimate.directory == str(directory)
+        assert estimate.files == 3
+        assert estimate.source_size == 2 * 1024 * 1024
+        assert estimate.sampled_size == 2 * 3 * SizeEstimator.SLICE_SIZE
+        assert 1.5 < estimate.ratio < 2.5
+        assert estimate.archive_size < estimate.source_size
+        assert estimate.compression_speed > 0
+
+    def test_estimate_limited(self, tmpdir):
+        directory = tmpdir.mkdir("source")
+        for i in range(10):
+            directory.join(f"{i}.txt").write_binary(b"abc" * (i + 1) * 100)
+
+        archiver = Mock(compressed_size=Mock(side_effect=lambda data: len(data) // 2))
+        estimate = SizeEstimator(archiver, files=2, slices=1).estimate(str(directory))
+
+        assert estimate.files == 10
+        assert archiver.compressed_size.call_count == 2
+        assert estimate.ratio == pytest.approx(2, rel=0.01)
+
+    def test_estimate_indexed(self, tmpdir):
+        directory = tmpdir.mkdir("source")
+        directory.join("data.txt").write_binary(b"abc" * 1000)
+        directory.join("other.txt").write_binary(b"abc" * 1000)
+        entries = [
+            (str(directory.join("data.txt")), 3000, stat.S_IFREG | 0o644),
+            (str(directory.join("link")), 10, stat.S_IFLNK | 0o777),
+        ]
+
+        archiver = Mock(compressed_size=Mock(side_effect=lambda data: len(data) // 2))
+        estimate = SizeEstimator(archiver).estimate(str(directory), entries)
+
+        # Only the given entries are estimated, without scanning the directory.
+        assert estimate.files == 2
+        assert estimate.source_size == 3000
+        assert estimate.sampled_size == 3000
+
+    def test_estimate_empty(self, tmpdir):
+        archiver = Mock()
+        estimate = SizeEstimator(archiver).estimate(str(tmpdir.mkdir("empty")))
+
+        assert estimate.files == 0
+        assert estimate.source_size == 0
+        assert estimate.archive_size == 0
+        assert estimate.ratio == 1.0
+        assert estimate.compression_speed is None
+        archiver.compressed_size.assert_not_called()
+
+
+class TestCompressedSize:
+
+    @pytest.mark.parametrize(
+        "archiver",
+        [
+            TarArchiver("gz"),
+            TarArchiver("bz2"),
+            TarArchiver("xz"),
+            ZipArchiver("gz"),
+            ZipArchiver("bz2"),
+            ZipArchiver("xz"),
+            RarArchiver(Mock(), compression=5),
+        ],
+    )
+    def test_compressed(self, archiver):
+        data = b"nimbus " * 10000
+        assert 0 < archiver.compressed_size(data) < len(data) // 10
+
+    @pytest.mark.parametrize("archiver", [TarArchiver(None), ZipArchiver(None), RarArchiver(Mock(), compression=0)])
+    def test_stored(self, archiver):
+        assert archiver.compressed_size(b"nimbus " * 10000) == 70000
@@ -138,3 +138,25 @@ class TestRarArchiver:
             assert f"-rr{recovery}" not in cmd
         else:
             assert f"-rr{recovery}" in cmd
+
+    @pytest.mark.parametrize(
+        ["password", "option"],
+        [
+            [None, "-p-"],
+            ["pwd", "-ppwd"],
+        ],
+    )
+    def test_test(self, password, option):
+        mock_runner = Mock()
+        mock_runner.execute.return_value = Mock(success=True, exception=None)
+
+        RarArchiver(mock_runner, password).test("archive.rar")
+
+        mock_runner.execute.assert_called_once_with(["rar", "t", "-idq", option, "archive.rar"])
+
+    def test_test_damaged(self):
+        mock_runner = Mock()
+        mock_runner.execute.return_value = Mock(success=False, exception=None, exitcode=3)
+
+        with pytest.raises(ValueError):
+            RarArchiver(mock_runner).test("archive.rar")
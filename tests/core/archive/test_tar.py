@@ -1,11 +1,18 @@
+import importlib.util
 import os
+import tarfile
 from datetime import datetime as dt
 
 import pytest
 from mock import Mock, call, patch
 
+from nimbuscli.core.archive import StreamSource
 from nimbuscli.core.archive.tar import TarArchiver
-from tests.helpers import MockDateTime
+from tests.helpers import MockDateTime, StreamRunner
+
+requires_cryptography = pytest.mark.skipif(
+    importlib.util.find_spec("cryptography") is None, reason="The encryption requires the 'cryptography' package."
+)
 
 
 class TestTarArchiver:
@@ -31,10 +38,15 @@ class TestTarArchiver:
         with pytest.raises(ValueError):
             TarArchiver(compression)
 
+    def test_init_failed_password(self):
+        with pytest.raises(ValueError):
+            TarArchiver("gz", "")
+
+    @patch("os.lstat", return_value=Mock(st_size=10))
     @patch("tarfile.open")
     @patch("os.walk")
     @patch("nimbuscli.core.archive.archiver.datetime", MockDateTime)
-    def test_archive(self, os_walk, tarfile_open):
+    def test_archive(self, os_walk, tarfile_open, _):
         directory = "DIRECTORY_PATH/abc"
         archive = "archive/abc.tar.gz"
         started = dt(2024, 1, 1, 10, 00, 00)
@@ -59,6 +71,7 @@ class TestTarArchiver:
         assert res.directory == directory
         assert res.archive == archive
         assert res.exception is None
+        assert res.source_size == 70
 
         tarfile_open.assert_called_with(archive, "w:gz")
         os_walk.assert_called_with(directory)
@@ -138,3 +151,55 @@ class TestTarArchiver:
         tarfile_open.assert_called_with(archive, "w:gz")
         os_walk.assert_called_with(directory)
         tar_mock.add.assert_has_calls([call(os.path.join(directory, "file1"), arcname="file1")])
+
+    @pytest.mark.parametrize(
+        "size, members",
+        [
+            (0, ["dump.sql"]),
+            (100, ["dump.sql"]),
+            (128, ["dump.sql"]),
+            (129, ["dump.sql.part00000", "dump.sql.part00001"]),
+            (300, ["dump.sql.part00000", "dump.sql.part00001", "dump.sql.part00002"]),
+        ],
+    )
+    def test_archive_stream(self, tmpdir, monkeypatch, size, members):
+        data = os.urandom(size)
+        archive = os.path.join(tmpdir, "dump.tar.gz")
+        monkeypatch.setattr(TarArchiver, "SEGMENT_SIZE", 128)
+
+        tar = TarArchiver("gz")
+        res = tar.archive_stream(StreamSource("dump.sql", "pg_dump", StreamRunner(data)), archive)
+
+        assert res.success
+        assert res.directory == "dump.sql"
+        with tarfile.open(archive) as arc:
+            assert arc.getnames() == members
+            assert b"".join(arc.extractfile(m).read() for m in members) == data
+
+    def test_archive_stream_failed(self, tmpdir):
+        archive = os.path.join(tmpdir, "dump.tar")
+
+        tar = TarArchiver()
+        res = tar.archive_stream(StreamSource("dump.sql", "pg_dump", StreamRunner(b"data", exitcode=1)), archive)
+
+        assert not res.success
+        assert res.proc.exitcode == 1
+        assert isinstance(res.exception, RuntimeError)
+
+    @pytest.mark.parametrize("compression", [None, "gz", "xz"])
+    @pytest.mark.parametrize("password", [None, pytest.param("secret", marks=requires_cryptography)])
+    def test_test(self, tmpdir, compression, password):
+        directory = tmpdir.mkdir("data")
+        directory.join("file.bin").write_binary(os.urandom(4096))
+        archive = os.path.join(tmpdir, "data.tar")
+
+        tar = TarArchiver(compression, password)
+        assert tar.archive(str(directory), archive).success
+
+        tar.test(archive)
+
+        # The truncated archive is detected, either by the tar or by the decryption.
+        with open(archive, "r+b") as file:
+            file.truncate(os.path.getsize(archive) // 2)
+        with pytest.raises(Exception):
+            tar.test(archive)
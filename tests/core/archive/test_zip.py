@@ -1,3 +1,4 @@
+import importlib.util
 import os
 import zipfile
 from datetime import datetime as dt
@@ -5,8 +6,13 @@ from datetime import datetime as dt
 import pytest
 from mock import Mock, call, patch
 
+from nimbuscli.core.archive import StreamSource
 from nimbuscli.core.archive.zip import ZipArchiver
-from tests.helpers import MockDateTime
+from tests.helpers import MockDateTime, StreamRunner
+
+requires_cryptography = pytest.mark.skipif(
+    importlib.util.find_spec("cryptography") is None, reason="The encryption requires the 'cryptography' package."
+)
 
 
 class TestZipArchiver:
@@ -33,10 +39,15 @@ class TestZipArchiver:
         with pytest.raises(ValueError):
             ZipArchiver(compression)
 
+    def test_init_failed_password(self):
+        with pytest.raises(ValueError):
+            ZipArchiver("gz", "")
+
+    @patch("os.lstat", return_value=Mock(st_size=10))
     @patch("zipfile.ZipFile")
     @patch("os.walk")
     @patch("nimbuscli.core.archive.archiver.datetime", MockDateTime)
-    def test_archive(self, os_walk, zipfile_mock):
+    def test_archive(self, os_walk, zipfile_mock, _):
         directory = "DIRECTORY_PATH/abc"
         archive = "archive/abc.zip"
         started = dt(2024, 1, 1, 10, 00, 00)
@@ -61,6 +72,7 @@ class TestZipArchiver:
         assert res.directory == directory
         assert res.archive == archive
         assert res.exception is None
+        assert res.source_size == 70
 
         zipfile_mock.assert_called_with(archive, "w", zipfile.ZIP_DEFLATED)
         os_walk.assert_called_with(directory)
@@ -75,3 +87,35 @@ class TestZipArchiver:
                 call(os.path.join(directory, "subB/fileB2"), arcname="subB/fileB2"),
             ]
         )
+
+    @pytest.mark.parametrize("compression", [None, "gz"])
+    @pytest.mark.parametrize("size", [0, 100, 3 * 1024 * 1024])
+    def test_archive_stream(self, tmpdir, compression, size):
+        data = os.urandom(size)
+        archive = os.path.join(tmpdir, "dump.zip")
+
+        archiver = ZipArchiver(compression)
+        res = archiver.archive_stream(StreamSource("dump.sql", "pg_dump", StreamRunner(data)), archive)
+
+        assert res.success
+        with zipfile.ZipFile(archive) as arc:
+            assert arc.namelist() == ["dump.sql"]
+            assert arc.read("dump.sql") == data
+
+    @pytest.mark.parametrize("password", [None, pytest.param("secret", marks=requires_cryptography)])
+    def test_test(self, tmpdir, password):
+        directory = tmpdir.mkdir("data")
+        directory.join("file.bin").write_binary(b"content" * 1000)
+        archive = os.path.join(tmpdir, "data.zip")
+
+        archiver = ZipArchiver(None, password)
+        assert archiver.archive(str(directory), archive).success
+
+        archiver.test(archive)
+
+        # The stored member is damaged in place, so only its CRC or the authentication fails.
+        with open(archive, "r+b") as file:
+            file.seek(200)
+            file.write(b"damaged")
+        with pytest.raises(Exception):
+            archiver.test(archive)
@@ -1,3 +1,6 @@
+import json
+from datetime import datetime, timedelta
+
 import pytest
 from mock import Mock, call
 
@@ -6,9 +9,11 @@ from nimbuscli.core.deploy.docker import DockerService
 
 class MockProc:
 
-    def __init__(self, s=None, e=None):
+    def __init__(self, s=None, e=None, started=None, completed=None):
         self._success = s
         self._elapsed = e
+        self.started = started
+        self.completed = completed
 
     @property
     def success(self):
@@ -71,7 +76,7 @@ class TestDockerService:
                 call("docker compose config --quiet", directory, env),
                 call("docker compose pull", directory, env),
                 call("docker compose down", directory, env),
-                call("docker compose up --detach", directory, env),
+                call("docker compose up --detach --wait", directory, env),
             ]
         )
 
@@ -95,3 +100,263 @@ class TestDockerService:
                 call("docker compose down", directory, env),
             ]
         )
+
+    @pytest.mark.parametrize(
+        ["labels", "expected"],
+        [
+            [[None, None], []],
+            [[{"nimbus.depends_on": "proxy, postgres"}, None], ["postgres", "proxy"]],
+            [[{"nimbus.depends_on": "proxy"}, {"nimbus.depends_on": "redis,proxy,"}], ["proxy", "redis"]],
+            [[["nimbus.depends_on=proxy", "other=1"], {"other": "2"}], ["proxy"]],
+            [[{"nimbus.depends_on": "NAME, proxy"}, None], ["proxy"]],
+        ],
+    )
+    def test_dependencies(self, labels, expected):
+        compose = {"services": {f"srv{ix}": {"image": "nginx", "labels": lb} for ix, lb in enumerate(labels)}}
+        mock_runner = Mock()
+        mock_runner.execute.return_value = Mock(success=True, stdout=json.dumps(compose))
+
+        ds = DockerService("NAME", "DIRECTORY", {"KEY": "VALUE"}, mock_runner)
+
+        assert ds.dependencies() == expected
+        assert ds.dependencies() == expected
+        mock_runner.execute.assert_called_once_with(
+            "docker compose config --format json", "DIRECTORY", {"KEY": "VALUE"}
+        )
+
+    def test_dependencies_failed(self):
+        mock_runner = Mock()
+        mock_runner.execute.return_value = Mock(success=False, stderr="invalid compose file")
+
+        ds = DockerService("NAME", "DIRECTORY", {}, mock_runner)
+
+        assert ds.dependencies() is None
+
+    def test_start_pulled(self):
+        mock_runner = Mock()
+        mock_runner.execute.side_effect = [MockProc(s=True)] * 3
+
+        directory = "DIRECTORY"
+        env = {"KEY": "VALUE"}
+
+        result = DockerService("NAME", directory, env, mock_runner).start(pull=False)
+
+        assert result.operation == "Start"
+        assert mock_runner.execute.call_args_list == [
+            call("docker compose config --quiet", directory, env),
+            call("docker compose down", directory, env),
+            call("docker compose up --detach --wait --pull never", directory, env),
+        ]
+
+    def test_images(self):
+        compose = {
+            "services": {
+                "db": {"image": "postgres:16"},
+                "replica": {"image": "postgres:16"},
+                "app": {"image": "app:latest", "build": {"context": "."}},
+                "local": {"image": "local:1", "pull_policy": "never"},
+                "web": {"image": "nginx:1.27", "pull_policy": "always"},
+            }
+        }
+        mock_runner = Mock()
+        mock_runner.execute.return_value = Mock(success=True, stdout=json.dumps(compose))
+
+        ds = DockerService("NAME", "DIRECTORY", {}, mock_runner)
+
+        assert ds.images() == ["nginx:1.27", "postgres:16"]
+        assert ds.dependencies() == []
+        mock_runner.execute.assert_called_once()
+
+    def test_fingerprint(self):
+        compose = {"services": {"db": {"image": "postgres:16"}, "web": {"image": "nginx:1.27"}}}
+        ids = iter(["sha256:aaa\nsha256:bbb", "sha256:aaa\nsha256:bbb", "sha256:aaa\nsha256:ccc"])
+
+        def execute(cmd, *_):
+            if cmd[:3] == ["docker", "image", "inspect"]:
+                assert cmd[-2:] == ["nginx:1.27", "postgres:16"]
+                return Mock(success=True, stdout=next(ids))
+            return Mock(success=True, stdout=json.dumps(compose))
+
+        mock_runner = Mock()
+        mock_runner.execute.side_effect = execute
+
+        first = DockerService("NAME", "DIRECTORY", {"KEY": "VALUE"}, mock_runner).fingerprint()
+        same = DockerService("NAME", "DIRECTORY", {"KEY": "VALUE"}, mock_runner).fingerprint()
+        pulled = DockerService("NAME", "DIRECTORY", {"KEY": "VALUE"}, mock_runner).fingerprint()
+
+        ids = iter(["sha256:aaa\nsha256:bbb"])
+        mock_runner.execute.side_effect = execute
+        env = DockerService("NAME", "DIRECTORY", {"KEY": "OTHER"}, mock_runner).fingerprint()
+
+        assert first == same
+        assert len({first, pulled, env}) == 3
+        assert "VALUE" not in first
+
+    def test_fingerprint_missing_image(self):
+        compose = {"services": {"db": {"image": "postgres:16"}}}
+        mock_runner = Mock()
+        mock_runner.execute.side_effect = [
+            Mock(success=True, stdout=json.dumps(compose)),
+            Mock(success=False, stderr="No such image"),
+        ]
+
+        assert DockerService("NAME", "DIRECTORY", {}, mock_runner).fingerprint() is None
+
+    @pytest.mark.parametrize(
+        ["output", "expected"],
+        [
+            ['{"Service": "db", "State": "running"}\n{"Service": "web", "State": "running"}', True],
+            ['[{"Service": "db", "State": "running"}, {"Service": "web", "State": "running"}]', True],
+            ['{"Service": "db", "State": "running"}\n{"Service": "web", "State": "restarting"}', False],
+            ['{"Service": "db", "State": "running"}', False],
+            ["", False],
+        ],
+    )
+    def test_running(self, output, expected):
+        compose = {"services": {"db": {"image": "postgres:16"}, "web": {"image": "nginx:1.27"}}}
+        mock_runner = Mock()
+        mock_runner.execute.side_effect = [
+            Mock(success=True, stdout=output),
+            Mock(success=True, stdout=json.dumps(compose)),
+        ]
+
+        assert DockerService("NAME", "DIRECTORY", {}, mock_runner).running() == expected
+        mock_runner.execute.assert_any_call("docker compose ps --format json", "DIRECTORY", {})
+
+    def test_running_failed(self):
+        mock_runner = Mock()
+        mock_runner.execute.return_value = Mock(success=False, stdout="")
+
+        assert not DockerService("NAME", "DIRECTORY", {}, mock_runner).running()
+
+    def test_start_downtime(self):
+        t = datetime(2024, 1, 1, 12, 0, 0)
+        mock_runner = Mock()
+        mock_runner.execute.side_effect = [
+            MockProc(s=True),
+            MockProc(s=True),
+            MockProc(s=True, started=t, completed=t + timedelta(seconds=3)),
+            MockProc(s=True, started=t + timedelta(seconds=3), completed=t + timedelta(seconds=10)),
+        ]
+
+        result = DockerService("NAME", "DIRECTORY", {}, mock_runner).start()
+
+        assert result.downtime == timedelta(seconds=10)
+
+    def test_start_update(self):
+        mock_runner = Mock()
+        mock_runner.execute.side_effect = [
+            MockProc(s=True),
+            MockProc(s=True),
+            MockProc(s=True, e=timedelta(seconds=4)),
+        ]
+
+        directory = "DIRECTORY"
+        env = {"KEY": "VALUE"}
+
+        result = DockerService("NAME", directory, env, mock_runner, DockerService.UPDATE).start()
+
+        assert result.success
+        assert result.downtime == timedelta(seconds=4)
+        assert mock_runner.execute.call_args_list == [
+            call("docker compose config --quiet", directory, env),
+            call("docker compose pull", directory, env),
+            call("docker compose up --detach --wait", directory, env),
+        ]
+
+    def test_start_update_pulled(self):
+        mock_runner = Mock()
+        mock_runner.execute.side_effect = [MockProc(s=True), MockProc(s=False)]
+
+        result = DockerService("NAME", "DIRECTORY", {}, mock_runner, DockerService.UPDATE).start(pull=False)
+
+        assert not result.success
+        assert result.downtime is None
+        assert mock_runner.execute.call_args_list == [
+            call("docker compose config --quiet", "DIRECTORY", {}),
+            call("docker compose up --detach --wait --pull never", "DIRECTORY", {}),
+        ]
+
+    @pytest.mark.parametrize(
+        ["projects", "target", "stopped"],
+        [
+            [[], "app-blue", []],
+            [["app"], "app-blue", ["app"]],
+            [["app-blue"], "app-green", ["app-blue"]],
+            [["app-green", "other"], "app-blue", ["app-green"]],
+            [["app-blue", "app-green"], "app-green", ["app-blue"]],
+        ],
+    )
+    def test_start_bluegreen(self, projects, target, stopped):
+        compose = {"name": "app", "services": {"web": {"image": "nginx", "ports": [{"target": 80}]}}}
+        ls = json.dumps([{"Name": p, "Status": "running(1)"} for p in projects])
+        mock_runner = Mock()
+        mock_runner.execute.side_effect = [
+            Mock(success=True, stdout=json.dumps(compose)),
+            Mock(success=True),
+            Mock(success=True, stdout=ls),
+            Mock(success=True),
+        ] + [Mock(success=True)] * len(stopped)
+
+        result = DockerService("NAME", "DIRECTORY", {}, mock_runner, DockerService.BLUEGREEN).start(pull=False)
+
+        assert result.success
+        assert result.downtime == timedelta()
+        assert mock_runner.execute.call_args_list == [
+            call("docker compose config --format json", "DIRECTORY", {}),
+            call("docker compose config --quiet", "DIRECTORY", {}),
+            call("docker compose ls --all --format json", "DIRECTORY", {}),
+            call(
+                ["docker", "compose", "--project-name", target, "up", "--detach", "--wait", "--pull", "never"],
+                "DIRECTORY",
+                {},
+            ),
+        ] + [call(["docker", "compose", "--project-name", p, "down"], "DIRECTORY", {}) for p in stopped]
+
+    def test_start_bluegreen_failed(self):
+        compose = {"name": "app", "services": {"web": {"image": "nginx"}}}
+        mock_runner = Mock()
+        mock_runner.execute.side_effect = [
+            Mock(success=True, stdout=json.dumps(compose)),
+            Mock(success=True),
+            Mock(success=True, stdout=json.dumps([{"Name": "app-blue"}])),
+            Mock(success=False),
+            Mock(success=True),
+        ]
+
+        result = DockerService("NAME", "DIRECTORY", {}, mock_runner, DockerService.BLUEGREEN).start(pull=False)
+
+        # The failed copy is removed, while the running one is kept.
+        assert not result.success
+        assert result.downtime is None
+        assert mock_runner.execute.call_args_list[-1] == call(
+            ["docker", "compose", "--project-name", "app-green", "down"], "DIRECTORY", {}
+        )
+
+    @pytest.mark.parametrize(
+        "container",
+        [
+            {"image": "nginx", "ports": [{"target": 80, "published": "8080"}]},
+            {"image": "nginx", "container_name": "web"},
+            {"image": "nginx", "hostname": "web"},
+        ],
+    )
+    def test_start_bluegreen_exclusive(self, container):
+        compose = {"name": "app", "services": {"web": container}}
+        mock_runner = Mock()
+        mock_runner.execute.side_effect = [
+            Mock(success=True, stdout=json.dumps(compose)),
+            MockProc(s=True),
+            MockProc(s=True),
+            MockProc(s=True),
+        ]
+
+        result = DockerService("NAME", "DIRECTORY", {}, mock_runner, DockerService.BLUEGREEN).start()
+
+        # The host ports and the fixed names can't be shared by the two copies, so the service is updated in place.
+        assert result.success
+        assert mock_runner.execute.call_args_list[-1] == call("docker compose up --detach --wait", "DIRECTORY", {})
+
+    def test_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            DockerService("NAME", "DIRECTORY", {}, Mock(), "recreate")
@@ -0,0 +1,79 @@
+from datetime import timedelta as td
+
+import pytest
+from mock import Mock
+
+from nimbuscli.core.deploy import CycleError, DeploymentGraph
+
+
+def services(*names: str) -> list[Mock]:
+    result = []
+    for name in names:
+        srv = Mock()
+        srv.name = name
+        result.append(srv)
+    return result
+
+
+class TestDeploymentGraph:
+
+    def test_dependencies(self):
+        graph = DeploymentGraph(
+            services("proxy", "db", "app"),
+            {"app": ["db", "proxy", "db", "unknown"], "db": []},
+        )
+
+        assert graph.dependencies("app") == ["db", "proxy"]
+        assert graph.dependencies("db") == []
+        assert graph.dependencies("proxy") == []
+
+    def test_levels(self):
+        graph = DeploymentGraph(
+            services("app", "web", "proxy", "db", "cache"),
+            {"app": ["db", "cache"], "web": ["app", "proxy"], "cache": ["db"]},
+        )
+
+        assert graph.levels == [["proxy", "db"], ["cache"], ["app"], ["web"]]
+
+    def test_levels_empty(self):
+        assert not DeploymentGraph([], {}).levels
+
+    @pytest.mark.parametrize(
+        ["dependencies", "cycle"],
+        [
+            [{"a": ["a"]}, ["a", "a"]],
+            [{"a": ["b"], "b": ["a"]}, ["a", "b", "a"]],
+            [{"a": ["b"], "b": ["c"], "c": ["b"]}, ["b", "c", "b"]],
+        ],
+    )
+    def test_cycle(self, dependencies, cycle):
+        with pytest.raises(CycleError) as e:
+            DeploymentGraph(services("a", "b", "c"), dependencies)
+
+        assert e.value.cycle == cycle
+
+    def test_reversed(self):
+        graph = DeploymentGraph(services("proxy", "db", "app"), {"app": ["db", "proxy"]}).reversed()
+
+        assert graph.dependencies("db") == ["app"]
+        assert graph.dependencies("proxy") == ["app"]
+        assert graph.dependencies("app") == []
+        assert graph.levels == [["app"], ["proxy", "db"]]
+
+    def test_critical_path(self):
+        graph = DeploymentGraph(
+            services("proxy", "db", "cache", "app"),
+            {"app": ["db", "cache", "proxy"], "cache": ["db"]},
+        )
+        elapsed = {"proxy": td(seconds=50), "db": td(seconds=20), "cache": td(seconds=5), "app": td(seconds=10)}
+
+        assert graph.critical_path(elapsed) == ["proxy", "app"]
+
+        elapsed["cache"] = td(seconds=40)
+        assert graph.critical_path(elapsed) == ["db", "cache", "app"]
+
+    def test_critical_path_partial(self):
+        graph = DeploymentGraph(services("db", "app"), {"app": ["db"]})
+
+        assert graph.critical_path({"db": td(seconds=5)}) == ["db"]
+        assert not graph.critical_path({})
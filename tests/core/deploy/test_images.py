@@ -0,0 +1,41 @@
+import pytest
+from mock import Mock, call
+
+from nimbuscli.core.deploy import ImagePuller
+
+
+class TestImagePuller:
+
+    @pytest.mark.parametrize("workers", [0, -1])
+    def test_init_failed_params(self, workers):
+        with pytest.raises(ValueError):
+            ImagePuller(Mock(), workers)
+
+    def test_init_failed_runner(self):
+        with pytest.raises(ValueError):
+            ImagePuller(None)
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_pull(self, workers):
+        runner = Mock()
+        runner.execute.side_effect = lambda cmd: Mock(success=cmd[-1] != "redis:7")
+
+        pulls = ImagePuller(runner, workers).pull(["postgres:16", "redis:7", "postgres:16", "nginx", "redis:7"])
+
+        assert list(pulls) == ["postgres:16", "redis:7", "nginx"]
+        assert [p.success for p in pulls.values()] == [True, False, True]
+        assert runner.execute.call_count == 3
+        runner.execute.assert_has_calls(
+            [
+                call(["docker", "pull", "--quiet", "postgres:16"]),
+                call(["docker", "pull", "--quiet", "redis:7"]),
+                call(["docker", "pull", "--quiet", "nginx"]),
+            ],
+            any_order=True,
+        )
+
+    def test_pull_empty(self):
+        runner = Mock()
+
+        assert not ImagePuller(runner).pull([])
+        runner.execute.assert_not_called()
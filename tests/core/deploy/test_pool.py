@@ -0,0 +1,156 @@
+import threading
+import time
+
+import pytest
+from mock import Mock
+
+from nimbuscli.core.deploy import DeploymentGraph, DeploymentPool, OperationStatus
+from nimbuscli.core.deploy.docker import DockerService
+
+
+def service(name: str) -> Mock:
+    srv = Mock(kind="docker")
+    srv.name = name
+    return srv
+
+
+def status(srv: Mock, success: bool) -> OperationStatus:
+    result = OperationStatus(srv.name, "Start", srv.kind)
+    result.processes.append(Mock(success=success))
+    return result
+
+
+class TestDeploymentPool:
+
+    @pytest.mark.parametrize("workers", [0, -1])
+    def test_init_failed_params(self, workers):
+        with pytest.raises(ValueError):
+            DeploymentPool(workers)
+
+    @pytest.mark.parametrize("workers", [1, 3, 10])
+    def test_run_ordered(self, workers):
+        services = [service(f"srv{i}") for i in range(10)]
+
+        def operation(srv):
+            # The first services complete last.
+            time.sleep((10 - int(srv.name[3:])) / 1000)
+            return status(srv, True)
+
+        results = DeploymentPool(workers).run(services, operation)
+
+        assert [r.service for r in results] == [s.name for s in services]
+        assert all(r.success for r in results)
+
+    def test_run_concurrent(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def operation(srv):
+            barrier.wait()
+            return status(srv, True)
+
+        results = DeploymentPool(3).run([service("a"), service("b"), service("c")], operation)
+
+        assert all(r.success for r in results)
+
+    def test_run_continue(self):
+        services = [service("a"), service("b"), service("c")]
+        operation = Mock(
+            side_effect=[status(services[0], True), status(services[1], False), status(services[2], True)]
+        )
+
+        results = DeploymentPool(1).run(services, operation)
+
+        assert operation.call_count == 3
+        assert [r.success for r in results] == [True, False, True]
+        assert not any(r.cancel for r in results)
+
+    def test_run_fail_fast(self):
+        services = [service("a"), service("b"), service("c"), service("d")]
+        operation = Mock(side_effect=[status(services[0], True), status(services[1], False)])
+
+        results = DeploymentPool(1, fail_fast=True).run(services, operation)
+
+        assert operation.call_count == 2
+        assert [r.service for r in results] == ["a", "b", "c", "d"]
+        assert [r.success for r in results] == [True, False, False, False]
+        assert [r.cancel for r in results] == [False, False, True, True]
+        assert results[2].kind == "docker"
+
+    def test_run_exception(self):
+        operation = Mock(side_effect=[RuntimeError("boom")])
+
+        with pytest.raises(RuntimeError):
+            DeploymentPool(1, fail_fast=True).run([service("a"), service("b")], operation)
+
+        assert operation.call_count == 1
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_run_graph(self, workers):
+        services = [service("app"), service("proxy"), service("db"), service("cache")]
+        graph = DeploymentGraph(services, {"app": ["db", "cache", "proxy"], "cache": ["db"]})
+        started = []
+
+        def operation(srv):
+            started.append(srv.name)
+            return status(srv, True)
+
+        results = DeploymentPool(workers).run(services, operation, graph)
+
+        assert [r.service for r in results] == ["app", "proxy", "db", "cache"]
+        assert all(r.success for r in results)
+        assert started.index("db") < started.index("cache") < started.index("app")
+        assert started.index("proxy") < started.index("app")
+
+    def test_run_graph_failed_dependency(self):
+        services = [service("app"), service("db"), service("proxy"), service("web")]
+        graph = DeploymentGraph(services, {"app": ["db"], "web": ["app", "proxy"]})
+
+        def operation(srv):
+            return status(srv, srv.name != "db")
+
+        results = DeploymentPool(2).run(services, operation, graph)
+
+        assert [(r.service, r.success, r.cancel) for r in results] == [
+            ("app", False, True),
+            ("db", False, False),
+            ("proxy", True, False),
+            ("web", False, True),
+        ]
+
+    def test_run_graph_duplicate_names(self):
+        services = [service("app"), service("db"), service("db")]
+        graph = DeploymentGraph(services, {"app": ["db"]})
+        started = []
+
+        def operation(srv):
+            started.append(srv)
+            return status(srv, True)
+
+        results = DeploymentPool(1).run(services, operation, graph)
+
+        assert started == [services[1], services[2], services[0]]
+        assert all(r.success for r in results)
+
+    def test_run_graph_docker_wait(self):
+        lock = threading.Lock()
+        executed = []
+
+        def execute(command, directory, _env):
+            if directory == "db" and command.startswith("docker compose up"):
+                # The dependent would start meanwhile, if the dependency didn't wait to become healthy.
+                time.sleep(0.05)
+            with lock:
+                executed.append((directory, command))
+            return Mock(success=True, started=None, completed=None)
+
+        runner = Mock()
+        runner.execute.side_effect = execute
+        services = [DockerService("app", "app", {}, runner), DockerService("db", "db", {}, runner)]
+        graph = DeploymentGraph(services, {"app": ["db"]})
+
+        results = DeploymentPool(2).run(services, lambda srv: srv.start(), graph)
+
+        assert all(r.success for r in results)
+        assert executed.index(("db", "docker compose up --detach --wait")) < executed.index(
+            ("app", "docker compose config --quiet")
+        )
@@ -1,6 +1,7 @@
 from datetime import timedelta as td
 
 import pytest
+from mock import Mock
 
 from nimbuscli.core.deploy.service import OperationStatus
 
@@ -70,3 +71,24 @@ class TestOperationStatus:
             operation.processes.append(MockProc(e=d))
 
         assert operation.elapsed == expected
+
+    def test_cancelled(self):
+        srv = Mock(kind="docker")
+        srv.name = "nginx"
+
+        operation = OperationStatus.cancelled(srv)
+
+        assert (operation.service, operation.kind) == ("nginx", "docker")
+        assert operation.cancel
+        assert not operation.success
+
+    def test_unchanged(self):
+        srv = Mock(kind="docker")
+        srv.name = "nginx"
+
+        operation = OperationStatus.unchanged(srv)
+
+        assert (operation.service, operation.kind) == ("nginx", "docker")
+        assert operation.skip
+        assert not operation.cancel
+        assert operation.success
@@ -1,3 +1,4 @@
+import sys
 from datetime import datetime as dt
 
 import pytest
@@ -79,3 +80,58 @@ class TestSubprocessRunner:
         proc = runner.execute(cmd, cwd, env)
 
         assert proc.exception == exc
+
+    def test_stream(self):
+        script = "import sys; sys.stdout.buffer.write(b'x' * 1000000); sys.stderr.write('warning')"
+        received = []
+
+        runner = SubprocessRunner()
+        proc = runner.stream([sys.executable, "-c", script], lambda out: received.append(out.read()))
+
+        assert proc.success
+        assert proc.exitcode == 0
+        assert proc.stdout is None
+        assert proc.stderr == "warning"
+        assert received == [b"x" * 1000000]
+
+    def test_stream_failed(self):
+        script = "import sys; sys.stderr.write('e' * 1000000); sys.exit(3)"
+
+        runner = SubprocessRunner()
+        proc = runner.stream([sys.executable, "-c", script], lambda out: out.read())
+
+        assert not proc.success
+        assert proc.exitcode == 3
+        assert 64 * 1024 <= len(proc.stderr) < 1000000
+
+    def test_stream_unread(self):
+        script = "import sys; sys.stdout.buffer.write(b'x' * 10000000)"
+
+        runner = SubprocessRunner()
+        proc = runner.stream([sys.executable, "-c", script], lambda out: out.read(10))
+
+        # The process is not blocked on the full pipe.
+        assert proc.completed is not None
+        assert proc.exception is None
+
+    def test_stream_consumer_exception(self):
+        exc = Exception("consumer")
+
+        def consumer(_):
+            raise exc
+
+        runner = SubprocessRunner()
+        proc = runner.stream([sys.executable, "-c", "import time; time.sleep(60)"], consumer)
+
+        assert proc.exception == exc
+        assert proc.exitcode != 0
+        assert proc.elapsed.total_seconds() < 30
+
+    def test_stream_quoted(self):
+        received = []
+
+        runner = SubprocessRunner()
+        proc = runner.stream(f"{sys.executable} -c 'print(\"a b\")'", lambda out: received.append(out.read()))
+
+        assert proc.success
+        assert received == [b"a b\n"]
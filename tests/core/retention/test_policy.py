@@ -0,0 +1,76 @@
+from datetime import datetime as dt
+from datetime import timedelta as td
+
+import pytest
+
+from nimbuscli.core.retention import RetentionPolicy
+
+
+def daily_backups(start: dt, days: int, per_day: int = 1) -> list[dt]:
+    return [start + td(days=d, hours=h) for d in range(days) for h in range(per_day)]
+
+
+def kept(policy: RetentionPolicy, backups: list[dt]) -> list[dt]:
+    expired = policy.expired(backups, lambda b: b)
+    return sorted(set(backups) - set(expired), reverse=True)
+
+
+class TestRetentionPolicy:
+
+    @pytest.mark.parametrize(
+        "counts",
+        [
+            {},
+            {"last": 0},
+            {"last": -1},
+            {"last": 3, "daily": -1},
+        ],
+    )
+    def test_invalid(self, counts):
+        with pytest.raises(ValueError):
+            RetentionPolicy(**counts)
+
+    def test_str(self):
+        assert str(RetentionPolicy(last=3, monthly=12)) == "last 3, monthly 12"
+
+    def test_last(self):
+        backups = daily_backups(dt(2024, 1, 1), 10)
+
+        assert kept(RetentionPolicy(last=3), backups) == backups[-1:-4:-1]
+        assert kept(RetentionPolicy(last=30), backups) == backups[::-1]
+
+    def test_daily(self):
+        # The latest backup of each of the last 3 days is kept.
+        backups = daily_backups(dt(2024, 1, 1), 5, per_day=3)
+
+        assert kept(RetentionPolicy(daily=3), backups) == [
+            dt(2024, 1, 5, 2),
+            dt(2024, 1, 4, 2),
+            dt(2024, 1, 3, 2),
+        ]
+
+    def test_weekly(self):
+        # 2024-01-01 is Monday.
+        backups = daily_backups(dt(2024, 1, 1), 21)
+
+        assert kept(RetentionPolicy(weekly=2), backups) == [dt(2024, 1, 21), dt(2024, 1, 14)]
+
+    def test_monthly_skips_empty_periods(self):
+        backups = [dt(2024, 1, 10), dt(2024, 1, 20), dt(2024, 3, 5), dt(2024, 6, 1), dt(2024, 6, 2)]
+
+        assert kept(RetentionPolicy(monthly=3), backups) == [dt(2024, 6, 2), dt(2024, 3, 5), dt(2024, 1, 20)]
+
+    def test_combined(self):
+        backups = daily_backups(dt(2023, 1, 1), 400)
+
+        result = kept(RetentionPolicy(last=2, daily=7, weekly=4, monthly=6, yearly=2), backups)
+
+        assert result[:7] == backups[-1:-8:-1]
+        assert dt(2023, 12, 31) in result
+        assert dt(2023, 1, 1) not in result
+        assert len(result) == len(set(result))
+
+    def test_expired_order(self):
+        backups = daily_backups(dt(2024, 1, 1), 5)
+
+        assert RetentionPolicy(last=2).expired(backups, lambda b: b) == backups[-3::-1]
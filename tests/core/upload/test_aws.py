@@ -1,10 +1,29 @@
+import os
 from datetime import datetime as dt
 from datetime import timedelta as td
 
 import pytest
-from mock import Mock, PropertyMock, patch
-
-from nimbuscli.core.upload import AwsUploader, UploadProgress, UploadStatus
+from botocore.exceptions import ClientError
+from mock import ANY, Mock, PropertyMock, patch
+
+from nimbuscli.core.upload import (
+    AwsUploader,
+    ChecksumError,
+    DeleteError,
+    Manifest,
+    MultipartSession,
+    ProgressAggregator,
+    S3Endpoint,
+    TokenBucket,
+    TransferTuner,
+    UploadProgress,
+    UploadStatus,
+    composite_checksum,
+    file_digest,
+    part_checksum,
+    part_digests,
+)
+from nimbuscli.state import ManifestStore, MultipartStore
 from tests.helpers import MockDateTime
 
 
@@ -55,19 +74,11 @@ class TestAwsUploaderCallbackAdapter:
         ],
     )
     @patch("os.stat")
-    @patch("nimbuscli.core.upload.aws.datetime", MockDateTime)
     def test_onprogress(self, mock_osstat, filesize, upbytes, reported):
         type(mock_osstat.return_value).st_size = PropertyMock(return_value=filesize)
 
-        now_time = dt(2024, 1, 1, 10, 00, 00)
-        call_time = [now_time]
-        for _ in range(len(reported) * 2):
-            call_time.append(now_time + td(seconds=5))
-            now_time = now_time + td(seconds=5)
-        MockDateTime.now_returns(*call_time)
-
         mock_onprogress = MockOnProgress()
-        callback = AwsUploader.CallbackAdapter("filepath", mock_onprogress)
+        callback = AwsUploader.CallbackAdapter("filepath", mock_onprogress, aggregator=ProgressAggregator(0))
 
         assert callback._filesize == filesize
 
@@ -80,6 +91,42 @@ class TestAwsUploaderCallbackAdapter:
             progress = mock_onprogress.reported[ix]
             assert progress.progress == value
 
+    @patch("os.stat")
+    def test_onprogress_throttled(self, mock_osstat):
+        type(mock_osstat.return_value).st_size = PropertyMock(return_value=100)
+        clock = Mock(return_value=0.0)
+
+        mock_onprogress = MockOnProgress()
+        aggregator = ProgressAggregator(1.0, clock=clock)
+        callback = AwsUploader.CallbackAdapter("filepath", mock_onprogress, aggregator=aggregator)
+
+        # The progress is not calculated more often than the interval.
+        for _ in range(50):
+            callback(1)
+        assert not mock_onprogress.reported
+
+        clock.return_value = 5.0
+        callback(1)
+        assert [p.progress for p in mock_onprogress.reported] == [51]
+        assert mock_onprogress.reported[0].speed == 10
+        assert mock_onprogress.reported[0].elapsed == td(seconds=5)
+
+        # The final progress is reported when the upload is finished.
+        callback(49)
+        callback.finish()
+        assert [p.progress for p in mock_onprogress.reported] == [51, 100]
+
+    @patch("os.stat")
+    def test_limiter(self, mock_osstat):
+        type(mock_osstat.return_value).st_size = PropertyMock(return_value=100)
+        limiter = Mock()
+
+        callback = AwsUploader.CallbackAdapter("filepath", None, limiter)
+        callback(40)
+        callback(60)
+
+        assert [c.args for c in limiter.consume.call_args_list] == [(40,), (60,)]
+
 
 class TestAwsUploader:
 
@@ -89,10 +136,30 @@ class TestAwsUploader:
             self._args = args
             self._kwargs = kwargs
 
-        def client(self, name):
+        def client(self, name, **kwargs):
             self._client_name = name
+            self._client_kwargs = kwargs
             return Mock()
 
+    @patch("nimbuscli.core.upload.aws.Session", MockSession)
+    def test_config_transfer(self):
+        tuner = TransferTuner("auto", 16, 64 * 1024 * 1024)
+        uploader = AwsUploader("key", "secret", "bucket", "class", tuner)
+
+        assert uploader.config() == {
+            "S3 Bucket": "bucket",
+            "S3 Storage": "class",
+            "S3 Part Size": "auto",
+            "S3 Concurrency": "16",
+            "S3 Multipart Threshold": "64 MB",
+        }
+
+    @patch("nimbuscli.core.upload.aws.Session", MockSession)
+    def test_config_bandwidth(self):
+        uploader = AwsUploader("key", "secret", "bucket", "class", limiter=TokenBucket(int(2.5 * 1024 * 1024)))
+
+        assert uploader.config()["S3 Bandwidth"] == "2.5 MB/s"
+
     @patch("nimbuscli.core.upload.aws.Session", MockSession)
     def test_config(self):
         uploader = AwsUploader("key", "secret", "bucket", "class")
@@ -105,6 +172,132 @@ class TestAwsUploader:
         assert client_name == "s3"
         assert cfg == {"S3 Bucket": "bucket", "S3 Storage": "class"}
 
+    @patch("nimbuscli.core.upload.aws.Session", MockSession)
+    def test_config_endpoint(self):
+        endpoint = S3Endpoint("http://minio.lan:9000", "path", "garage", keep_alive=True)
+        uploader = AwsUploader("key", "secret", "bucket", "class", TransferTuner(concurrency=8), endpoint=endpoint)
+
+        kwargs = uploader._session._client_kwargs
+        assert kwargs["endpoint_url"] == "http://minio.lan:9000"
+        assert kwargs["region_name"] == "garage"
+        assert kwargs["config"].s3 == {"addressing_style": "path"}
+        assert kwargs["config"].tcp_keepalive
+        assert uploader.config() == {
+            "S3 Bucket": "bucket",
+            "S3 Storage": "class",
+            "S3 Endpoint": "http://minio.lan:9000",
+            "S3 Addressing": "path",
+            "S3 Region": "garage",
+            "S3 Keep-Alive": "True",
+            "S3 Concurrency": "8",
+        }
+        assert uploader.location == "http://minio.lan:9000/bucket"
+
+    @patch("nimbuscli.core.upload.aws.Session", MockSession)
+    def test_delete_objects(self):
+        uploader = AwsUploader("key", "secret", "bucket", "class")
+        keys = [f"g/d/{ix}.tar" for ix in range(2500)]
+        failure = Exception("throttled")
+        uploader._s3.delete_objects.side_effect = [
+            {"Errors": [{"Key": "g/d/7.tar", "Code": "AccessDenied", "Message": "Access Denied"}]},
+            failure,
+            {},
+        ]
+
+        failures = uploader.delete_objects(keys)
+
+        # The keys are deleted in batches of at most 1000 keys.
+        batches = [c.kwargs["Delete"]["Objects"] for c in uploader._s3.delete_objects.call_args_list]
+        assert [len(b) for b in batches] == [1000, 1000, 500]
+        assert [o["Key"] for b in batches for o in b] == keys
+        assert uploader._s3.delete_objects.call_args.kwargs["Delete"]["Quiet"]
+
+        assert isinstance(failures.pop("g/d/7.tar"), DeleteError)
+        assert failures == {key: failure for key in keys[1000:2000]}
+
+    @patch("nimbuscli.core.upload.aws.Session", MockSession)
+    def test_list_objects(self):
+        modified = dt(2024, 3, 1, 12, 0)
+        uploader = AwsUploader("key", "secret", "bucket", "class")
+        paginator = uploader._s3.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {"Contents": [{"Key": "g/d/a.tar", "Size": 10, "LastModified": modified, "StorageClass": "GLACIER"}]},
+            {"Contents": [{"Key": "g/d/b.tar", "Size": 20, "LastModified": modified}]},
+            {},
+        ]
+
+        objects = list(uploader.list_objects("g/"))
+
+        assert uploader.location == "s3://bucket"
+        paginator.paginate.assert_called_once_with(Bucket="bucket", Prefix="g/")
+        assert [(o.key, o.size, o.modified, o.storage_class) for o in objects] == [
+            ("g/d/a.tar", 10, modified, "GLACIER"),
+            ("g/d/b.tar", 20, modified, None),
+        ]
+
+    @patch("nimbuscli.core.upload.aws.Session", MockSession)
+    def test_stat_object(self):
+        modified = dt(2024, 3, 1, 12, 0)
+        uploader = AwsUploader("key", "secret", "bucket", "class")
+        uploader._s3.head_object.side_effect = [
+            {"ContentLength": 10, "LastModified": modified, "ChecksumCRC32C": "crc-2"},
+            {"ContentLength": 20, "LastModified": modified, "StorageClass": "GLACIER"},
+            ClientError({"Error": {"Code": "404"}}, "HeadObject"),
+        ]
+
+        first, second, missing = [uploader.stat_object(k) for k in ("a.tar", "b.tar", "c.tar")]
+
+        uploader._s3.head_object.assert_called_with(Bucket="bucket", Key="c.tar", ChecksumMode="ENABLED")
+        assert (first.size, first.storage_class, first.checksum_algorithm, first.checksum) == (
+            10,
+            "STANDARD",
+            "CRC32C",
+            "crc-2",
+        )
+        assert (second.size, second.storage_class, second.checksum_algorithm, second.checksum) == (
+            20,
+            "GLACIER",
+            None,
+            None,
+        )
+        assert missing is None
+
+    @patch("nimbuscli.core.upload.aws.Session", MockSession)
+    def test_read_range(self):
+        uploader = AwsUploader("key", "secret", "bucket", "class")
+        body = Mock()
+        body.__enter__ = Mock(return_value=body)
+        body.__exit__ = Mock(return_value=False)
+        body.read.return_value = b"data"
+        uploader._s3.get_object.return_value = {"Body": body}
+
+        assert uploader.read_range("a.tar", 100, 4) == b"data"
+        uploader._s3.get_object.assert_called_once_with(Bucket="bucket", Key="a.tar", Range="bytes=100-103")
+
+    @pytest.mark.parametrize(
+        ["concurrency", "transfers", "max_connections", "pool"],
+        [
+            [None, 1, None, 11],
+            [8, 4, None, 36],
+            ["auto", 2, None, 130],
+            [8, 4, 16, 16],
+        ],
+    )
+    @patch("nimbuscli.core.upload.aws.Session", MockSession)
+    def test_connection_pool(self, concurrency, transfers, max_connections, pool):
+        uploader = AwsUploader(
+            "key",
+            "secret",
+            "bucket",
+            "class",
+            TransferTuner(concurrency=concurrency),
+            endpoint=S3Endpoint(max_connections=max_connections),
+            transfers=transfers,
+        )
+
+        # The pool fits the part uploads of all the concurrent transfers.
+        assert uploader._session._client_kwargs["config"].max_pool_connections == pool
+
     @patch("os.stat")
     @patch("nimbuscli.core.upload.aws.Session", Mock)
     @patch("nimbuscli.core.upload.aws.datetime", MockDateTime)
@@ -113,9 +306,7 @@ class TestAwsUploader:
         completed_dt = dt(2024, 5, 10, 12, 35, 55)
         MockDateTime.now_returns(
             started_dt,  # started
-            started_dt,  # CallbackAdapter.__init__
             completed_dt,  # completed
-            completed_dt,  # assert CallbackAdapter.__init__
         )
 
         type(mock_osstat.return_value).st_size = PropertyMock(return_value=100)
@@ -140,8 +331,14 @@ class TestAwsUploader:
             "key",
             ExtraArgs={"StorageClass": "class"},
             Callback=AwsUploader.CallbackAdapter("filepath", mock_onprogress),
+            Config=ANY,
         )
 
+        transfer = uploader._s3.upload_file.call_args.kwargs["Config"]
+        assert transfer.multipart_threshold == 8 * 1024 * 1024
+        assert transfer.multipart_chunksize == 8 * 1024 * 1024
+        assert transfer.max_concurrency == 10
+
     @patch("os.stat")
     @patch("nimbuscli.core.upload.aws.Session", Mock)
     @patch("nimbuscli.core.upload.aws.datetime", MockDateTime)
@@ -150,9 +347,7 @@ class TestAwsUploader:
         completed_dt = dt(2024, 5, 10, 12, 35, 55)
         MockDateTime.now_returns(
             started_dt,  # started
-            started_dt,  # CallbackAdapter.__init__
             completed_dt,  # completed
-            completed_dt,  # assert CallbackAdapter.__init__
         )
 
         type(mock_osstat.return_value).st_size = PropertyMock(return_value=100)
@@ -182,4 +377,491 @@ class TestAwsUploader:
             "key",
             ExtraArgs={"StorageClass": "class"},
             Callback=AwsUploader.CallbackAdapter("filepath", mock_onprogress),
+            Config=ANY,
+        )
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload_stream(self):
+        uploader = AwsUploader("key", "secret", "bucket", "class")
+        stream = Mock()
+
+        status = uploader.upload_stream(stream, "filepath", "key", 100)
+
+        assert uploader.streamable
+        assert status.success
+        uploader._s3.upload_fileobj.assert_called_once_with(
+            stream,
+            "bucket",
+            "key",
+            ExtraArgs={"StorageClass": "class"},
+            Callback=AwsUploader.CallbackAdapter("filepath", None, filesize=100),
+            Config=ANY,
+        )
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_streamable(self):
+        assert not AwsUploader("key", "secret", "bucket", "class", dedup=True).streamable
+        assert not AwsUploader("key", "secret", "bucket", "class", sessions=Mock()).streamable
+        assert not AwsUploader("key", "secret", "bucket", "class", manifests=Mock()).streamable
+
+
+class TestAwsUploaderDedup:
+
+    DIGEST = "1d0b55917d28cb4d3e93cfd39aae10597c11d60c416134260e8be722feb70114"
+
+    @pytest.fixture
+    def archive(self, tmpdir):
+        filepath = tmpdir.join("archive.tar")
+        filepath.write(b"data\n" * 2)
+        return str(filepath)
+
+    @pytest.fixture
+    def catalog(self):
+        catalog = Mock()
+        catalog.get.return_value = None
+        return catalog
+
+    def head(self, digest: str, storage: str = None):
+        head = {"Metadata": {"sha256": digest}}
+        if storage:
+            head["StorageClass"] = storage
+        return head
+
+    def not_found(self):
+        return ClientError({"Error": {"Code": "404"}}, "HeadObject")
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload_new(self, archive, catalog):
+        uploader = AwsUploader("key", "secret", "bucket", "class", dedup=True, catalog=catalog)
+        uploader._s3.head_object.side_effect = self.not_found()
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        assert status.digest == file_digest(archive)
+        assert not status.existing
+        assert uploader._s3.upload_file.call_args.kwargs["ExtraArgs"] == {
+            "StorageClass": "class",
+            "Metadata": {"sha256": status.digest},
+        }
+        catalog.update.assert_called_once_with("s3://bucket", status.digest, "group/archive.tar")
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload_existing(self, archive, catalog):
+        uploader = AwsUploader("key", "secret", "bucket", "class", dedup=True, catalog=catalog)
+        uploader._s3.head_object.return_value = self.head(file_digest(archive))
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        assert status.existing
+        uploader._s3.upload_file.assert_not_called()
+        uploader._s3.copy.assert_not_called()
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload_changed(self, archive, catalog):
+        uploader = AwsUploader("key", "secret", "bucket", "class", dedup=True, catalog=catalog)
+        uploader._s3.head_object.return_value = self.head("outdated")
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        assert not status.existing
+        uploader._s3.upload_file.assert_called_once()
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload_copy(self, archive, catalog):
+        digest = file_digest(archive)
+        catalog.get.return_value = "group/previous.tar"
+        uploader = AwsUploader("key", "secret", "bucket", "class", dedup=True, catalog=catalog)
+        uploader._s3.head_object.side_effect = [self.not_found(), self.head(digest)]
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        assert status.copied_from == "group/previous.tar"
+        uploader._s3.upload_file.assert_not_called()
+        uploader._s3.copy.assert_called_once_with(
+            {"Bucket": "bucket", "Key": "group/previous.tar"},
+            "bucket",
+            "group/archive.tar",
+            ExtraArgs={"StorageClass": "class", "Metadata": {"sha256": digest}, "MetadataDirective": "REPLACE"},
+            Config=ANY,
+        )
+
+    @pytest.mark.parametrize(
+        "head",
+        [
+            None,
+            {"Metadata": {"sha256": "outdated"}},
+            {"Metadata": {"sha256": DIGEST}, "StorageClass": "DEEP_ARCHIVE"},
+        ],
+    )
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload_copy_unavailable(self, archive, catalog, head):
+        catalog.get.return_value = "group/previous.tar"
+        uploader = AwsUploader("key", "secret", "bucket", "class", dedup=True, catalog=catalog)
+        uploader._s3.head_object.side_effect = [self.not_found(), head if head else self.not_found()]
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        assert not status.copied_from
+        uploader._s3.copy.assert_not_called()
+        uploader._s3.upload_file.assert_called_once()
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload_head_failure(self, archive, catalog):
+        uploader = AwsUploader("key", "secret", "bucket", "class", dedup=True, catalog=catalog)
+        uploader._s3.head_object.side_effect = ClientError({"Error": {"Code": "403"}}, "HeadObject")
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        uploader._s3.upload_file.assert_called_once()
+
+
+class MultipartUploader:
+
+    MB = 1024 * 1024
+
+    def uploader(
+        self, sessions, uploaded=None, uploads=None, abandon_after=None, manifests=None, checksum=None, endpoint=None
+    ):
+        uploader = AwsUploader(
+            "key",
+            "secret",
+            "bucket",
+            "class",
+            TransferTuner(5 * self.MB, 2, 5 * self.MB),
+            sessions=sessions,
+            abandon_after=abandon_after,
+            manifests=manifests,
+            checksum=checksum,
+            endpoint=endpoint,
+        )
+        uploader._s3.create_multipart_upload.return_value = {"UploadId": "new"}
+        uploader._s3.complete_multipart_upload.return_value = {"ETag": '"completed"'}
+        uploader._s3.upload_part_copy.side_effect = lambda **kw: {
+            "CopyPartResult": {"ETag": f'"copy-{kw["PartNumber"]}"'}
+        }
+        uploader._s3.upload_part.side_effect = lambda **kw: {"ETag": f'"{kw["PartNumber"]}"'}
+
+        pages = {
+            "list_parts": [{"Parts": uploaded or []}],
+            "list_multipart_uploads": [{"Uploads": uploads or []}],
+        }
+        uploader._s3.get_paginator.side_effect = lambda name: Mock(paginate=Mock(return_value=pages[name]))
+        return uploader
+
+    def uploaded_parts(self, uploader):
+        return sorted(c.kwargs["PartNumber"] for c in uploader._s3.upload_part.call_args_list)
+
+    def completed_parts(self, uploader):
+        kwargs = uploader._s3.complete_multipart_upload.call_args.kwargs
+        return kwargs["UploadId"], kwargs["MultipartUpload"]["Parts"]
+
+
+class TestAwsUploaderResumable(MultipartUploader):
+
+    @pytest.fixture
+    def archive(self, tmpdir):
+        filepath = tmpdir.join("archive.tar")
+        filepath.write(b"x" * (11 * self.MB))
+        return str(filepath)
+
+    @pytest.fixture
+    def sessions(self, tmpdir):
+        return MultipartStore(str(tmpdir.join("multipart.json")))
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload(self, archive, sessions):
+        uploader = self.uploader(sessions)
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        assert status.resumed_size == 0
+        assert self.uploaded_parts(uploader) == [1, 2, 3]
+        assert self.completed_parts(uploader) == (
+            "new",
+            [{"PartNumber": n, "ETag": f'"{n}"'} for n in [1, 2, 3]],
         )
+        assert sessions.get("s3://bucket", "group/archive.tar") is None
+        uploader._s3.upload_file.assert_not_called()
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload_failure(self, archive, sessions):
+        def upload_part(**kwargs):
+            if kwargs["PartNumber"] == 2:
+                raise OSError("network")
+            return {"ETag": f'"{kwargs["PartNumber"]}"'}
+
+        uploader = self.uploader(sessions)
+        uploader._s3.upload_part.side_effect = upload_part
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert not status.success
+        assert sessions.get("s3://bucket", "group/archive.tar").parts == {1: '"1"', 3: '"3"'}
+        uploader._s3.complete_multipart_upload.assert_not_called()
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload_resume(self, archive, sessions):
+        st = os.stat(archive)
+        session = MultipartSession("previous", archive, st.st_size, st.st_mtime_ns, 5 * self.MB)
+        session.parts = {1: '"1"', 2: '"2"'}
+        sessions.save("s3://bucket", "group/archive.tar", session)
+
+        # The second part is not confirmed by the bucket.
+        uploader = self.uploader(sessions, uploaded=[{"PartNumber": 1, "ETag": '"1"', "Size": 5 * self.MB}])
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        assert status.resumed_size == 5 * self.MB
+        assert self.uploaded_parts(uploader) == [2, 3]
+        assert self.completed_parts(uploader)[0] == "previous"
+        uploader._s3.create_multipart_upload.assert_not_called()
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload_endpoints(self, archive, sessions, tmpdir):
+        manifests = ManifestStore(str(tmpdir.join("manifests.json")))
+        endpoint = S3Endpoint("http://minio.lan:9000", "path")
+        failed = self.uploader(sessions, manifests=manifests, endpoint=endpoint)
+        failed._s3.upload_part.side_effect = OSError("network")
+        uploader = self.uploader(sessions, manifests=manifests)
+
+        # The buckets with the same name on the different endpoints don't share the uploads.
+        assert not failed.upload(archive, "group/archive.tar").success
+        assert uploader.upload(archive, "group/archive.tar").success
+
+        assert self.uploaded_parts(uploader) == [1, 2, 3]
+        assert self.completed_parts(uploader)[0] == "new"
+        assert sessions.get("http://minio.lan:9000/bucket", "group/archive.tar") is not None
+        assert sessions.get("s3://bucket", "group/archive.tar") is None
+        assert manifests.get("http://minio.lan:9000/bucket", "group") is None
+        assert manifests.get("s3://bucket", "group").key == "group/archive.tar"
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload_throttled(self, archive, sessions):
+        def upload_part(**kwargs):
+            body = kwargs["Body"]
+            body.read()  # The checksum is computed before the request is sent.
+            body.seek(0)
+            body.signal_transferring()
+            while body.read(self.MB):
+                pass
+            return {"ETag": f'"{kwargs["PartNumber"]}"'}
+
+        uploader = self.uploader(sessions)
+        uploader._s3.upload_part.side_effect = upload_part
+        uploader._limiter = Mock()
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        # The bandwidth is charged for each sent chunk, not for the whole part after it is uploaded.
+        assert status.success
+        assert [c.args[0] for c in uploader._limiter.consume.call_args_list] == [self.MB] * 11
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload_changed(self, archive, sessions):
+        session = MultipartSession("previous", archive, 1, 1, 5 * self.MB)
+        sessions.save("s3://bucket", "group/archive.tar", session)
+        uploader = self.uploader(sessions)
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        assert self.uploaded_parts(uploader) == [1, 2, 3]
+        assert self.completed_parts(uploader)[0] == "new"
+        uploader._s3.abort_multipart_upload.assert_called_once_with(
+            Bucket="bucket", Key="group/archive.tar", UploadId="previous"
+        )
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_cleanup_abandoned(self, archive, sessions):
+        now = dt.now().astimezone()
+        uploads = [
+            {"Key": "group/old.tar", "UploadId": "old", "Initiated": now - td(days=8)},
+            {"Key": "group/recent.tar", "UploadId": "recent", "Initiated": now - td(days=1)},
+        ]
+        uploader = self.uploader(sessions, uploads=uploads, abandon_after=td(days=7))
+
+        assert uploader.upload(archive, "group/archive.tar").success
+        assert uploader.upload(archive, "group/archive.tar").success
+
+        uploader._s3.abort_multipart_upload.assert_called_once_with(
+            Bucket="bucket", Key="group/old.tar", UploadId="old"
+        )
+
+
+class TestAwsUploaderDelta(MultipartUploader):
+
+    @pytest.fixture
+    def archive(self, tmpdir):
+        filepath = tmpdir.join("archive.tar")
+        filepath.write(b"a" * (5 * self.MB) + b"b" * (5 * self.MB) + b"c" * self.MB)
+        return str(filepath)
+
+    @pytest.fixture
+    def manifests(self, tmpdir):
+        return ManifestStore(str(tmpdir.join("manifests.json")))
+
+    def previous(self, archive, manifests, changed_part=2):
+        digests = part_digests(archive, 5 * self.MB)
+        digests[changed_part - 1] = "changed"
+        manifests.update(
+            "s3://bucket", "group", Manifest("group/previous.tar", 11 * self.MB, 5 * self.MB, digests, '"p"')
+        )
+
+    def copied_parts(self, uploader):
+        return sorted(c.kwargs["PartNumber"] for c in uploader._s3.upload_part_copy.call_args_list)
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_delta(self, archive, manifests):
+        self.previous(archive, manifests)
+        uploader = self.uploader(None, manifests=manifests)
+        uploader._s3.head_object.return_value = {"ETag": '"p"'}
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        assert status.copied_size == 6 * self.MB
+        assert status.sent_size == 5 * self.MB
+        assert self.uploaded_parts(uploader) == [2]
+        assert self.copied_parts(uploader) == [1, 3]
+        assert uploader._s3.upload_part_copy.call_args_list[0].kwargs["CopySource"] == {
+            "Bucket": "bucket",
+            "Key": "group/previous.tar",
+        }
+        assert [c.kwargs["CopySourceRange"] for c in uploader._s3.upload_part_copy.call_args_list] == [
+            f"bytes=0-{5 * self.MB - 1}",
+            f"bytes={10 * self.MB}-{11 * self.MB - 1}",
+        ]
+
+        manifest = manifests.get("s3://bucket", "group")
+        assert manifest.key == "group/archive.tar"
+        assert manifest.etag == '"completed"'
+        assert manifest.parts == part_digests(archive, 5 * self.MB)
+
+    @pytest.mark.parametrize("head", [None, {"ETag": '"replaced"'}, {"ETag": '"p"', "StorageClass": "GLACIER"}])
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_delta_unavailable(self, archive, manifests, head):
+        self.previous(archive, manifests)
+        uploader = self.uploader(None, manifests=manifests)
+        uploader._s3.head_object.return_value = head
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        assert status.copied_size == 0
+        assert self.uploaded_parts(uploader) == [1, 2, 3]
+        uploader._s3.upload_part_copy.assert_not_called()
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_delta_failure(self, archive, manifests):
+        uploader = self.uploader(None, manifests=manifests)
+        uploader._s3.upload_part.side_effect = OSError("network")
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert not status.success
+        uploader._s3.abort_multipart_upload.assert_called_once_with(
+            Bucket="bucket", Key="group/archive.tar", UploadId="new"
+        )
+        assert manifests.get("s3://bucket", "group") is None
+
+
+class TestAwsUploaderChecksum(MultipartUploader):
+
+    @pytest.fixture
+    def archive(self, tmpdir):
+        filepath = tmpdir.join("archive.tar")
+        filepath.write(b"a" * (5 * self.MB) + b"b" * (5 * self.MB) + b"c" * self.MB)
+        return str(filepath)
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            AwsUploader("key", "secret", "bucket", "class", checksum="MD5")
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload(self, archive):
+        uploader = AwsUploader("key", "secret", "bucket", "class", checksum="CRC32C")
+        uploader._s3.head_object.return_value = {"ChecksumCRC32C": "crc-3"}
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        assert (status.checksum_algorithm, status.checksum) == ("CRC32C", "crc-3")
+        assert uploader._s3.upload_file.call_args.kwargs["ExtraArgs"] == {
+            "StorageClass": "class",
+            "ChecksumAlgorithm": "CRC32C",
+        }
+        uploader._s3.head_object.assert_called_once_with(
+            Bucket="bucket",
+            Key="group/archive.tar",
+            ChecksumMode="ENABLED",
+        )
+
+    @pytest.mark.parametrize(["digest", "success"], [["valid", True], ["invalid", False]])
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_upload_verified(self, archive, digest, success):
+        digest = file_digest(archive) if digest == "valid" else "00" * 32
+        uploader = AwsUploader("key", "secret", "bucket", "class", dedup=True, checksum="SHA256")
+        uploader._s3.head_object.side_effect = [None, {"ChecksumSHA256": part_checksum(digest)}]
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success == success
+        assert success or isinstance(status.exception, ChecksumError)
+
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_resumable(self, archive, tmpdir):
+        uploader = self.uploader(MultipartStore(str(tmpdir.join("multipart.json"))), checksum="CRC32")
+        uploader._s3.upload_part.side_effect = lambda **kw: {
+            "ETag": f'"{kw["PartNumber"]}"',
+            "ChecksumCRC32": f"crc-{kw['PartNumber']}",
+        }
+        uploader._s3.complete_multipart_upload.return_value = {"ETag": '"completed"', "ChecksumCRC32": "crc-3"}
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        assert (status.checksum_algorithm, status.checksum) == ("CRC32", "crc-3")
+        assert uploader._s3.create_multipart_upload.call_args.kwargs["ChecksumAlgorithm"] == "CRC32"
+        assert all(c.kwargs["ChecksumAlgorithm"] == "CRC32" for c in uploader._s3.upload_part.call_args_list)
+        assert self.completed_parts(uploader)[1] == [
+            {"PartNumber": n, "ETag": f'"{n}"', "ChecksumCRC32": f"crc-{n}"} for n in [1, 2, 3]
+        ]
+
+    @pytest.mark.parametrize(["checksum", "success"], [["valid", True], ["invalid", False]])
+    @patch("nimbuscli.core.upload.aws.Session", Mock)
+    def test_delta(self, archive, tmpdir, checksum, success):
+        digests = part_digests(archive, 5 * self.MB)
+        checksum = composite_checksum(digests) if checksum == "valid" else composite_checksum(digests[:1])
+
+        manifests = ManifestStore(str(tmpdir.join("manifests.json")))
+        previous = ["changed"] + digests[1:]
+        manifests.update(
+            "s3://bucket", "group", Manifest("group/previous.tar", 11 * self.MB, 5 * self.MB, previous, '"p"')
+        )
+
+        uploader = self.uploader(None, manifests=manifests, checksum="SHA256")
+        uploader._s3.head_object.return_value = {"ETag": '"p"'}
+        uploader._s3.upload_part.side_effect = lambda **kw: {
+            "ETag": f'"{kw["PartNumber"]}"',
+            "ChecksumSHA256": kw["ChecksumSHA256"],
+        }
+        uploader._s3.complete_multipart_upload.return_value = {"ETag": '"completed"', "ChecksumSHA256": checksum}
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        # The part digests are reused as the part checksums,
+        # and the whole object is verified against them.
+        assert status.success == success
+        assert success or isinstance(status.exception, ChecksumError)
+        assert uploader._s3.upload_part.call_args.kwargs["ChecksumSHA256"] == part_checksum(digests[0])
+        assert "ChecksumAlgorithm" not in uploader._s3.upload_part.call_args.kwargs
+        assert [p["ChecksumSHA256"] for p in self.completed_parts(uploader)[1]] == [part_checksum(d) for d in digests]
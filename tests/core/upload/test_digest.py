@@ -0,0 +1,75 @@
+import base64
+import hashlib
+import os
+
+import pytest
+from mock import Mock, patch
+
+from nimbuscli.core.upload import (
+    Manifest,
+    composite_checksum,
+    file_digest,
+    part_checksum,
+    part_digests,
+)
+
+
+@pytest.fixture
+def filepath(tmpdir):
+    filepath = os.path.join(tmpdir, "file")
+    with open(filepath, "wb") as file:
+        file.write(b"a" * 10 + b"b" * 10 + b"c" * 5)
+    return filepath
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_file_digest(filepath):
+    assert file_digest(filepath) == sha256(b"a" * 10 + b"b" * 10 + b"c" * 5)
+
+
+@patch("nimbuscli.core.upload.digest.DIGEST_CHUNK_SIZE", 10)
+def test_file_digest_limited(filepath):
+    limiter = Mock()
+
+    assert file_digest(filepath, limiter) == sha256(b"a" * 10 + b"b" * 10 + b"c" * 5)
+    assert [c.args[0] for c in limiter.consume.call_args_list] == [10, 10, 5]
+
+
+@pytest.mark.parametrize(
+    ["part_size", "parts"],
+    [
+        [10, [b"a" * 10, b"b" * 10, b"c" * 5]],
+        [25, [b"a" * 10 + b"b" * 10 + b"c" * 5]],
+        [100, [b"a" * 10 + b"b" * 10 + b"c" * 5]],
+    ],
+)
+def test_part_digests(filepath, part_size, parts):
+    assert part_digests(filepath, part_size) == [sha256(p) for p in parts]
+
+
+def test_part_digests_empty(tmpdir):
+    filepath = os.path.join(tmpdir, "empty")
+    open(filepath, "wb").close()
+
+    assert part_digests(filepath, 10) == [sha256(b"")]
+
+
+def test_checksum():
+    digests = [sha256(b"a"), sha256(b"b")]
+    expected = hashlib.sha256(hashlib.sha256(b"a").digest() + hashlib.sha256(b"b").digest()).digest()
+
+    assert part_checksum(digests[0]) == base64.b64encode(hashlib.sha256(b"a").digest()).decode()
+    assert composite_checksum(digests) == f"{base64.b64encode(expected).decode()}-2"
+
+
+def test_manifest():
+    manifest = Manifest("docs/a.tar", 25, 10, ["a", "b", "c"], '"etag"')
+
+    assert manifest.part(1) == "a"
+    assert manifest.part(3) == "c"
+    assert manifest.part(0) is None
+    assert manifest.part(4) is None
+    assert Manifest.from_dict(manifest.to_dict()).to_dict() == manifest.to_dict()
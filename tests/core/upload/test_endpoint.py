@@ -0,0 +1,28 @@
+import pytest
+
+from nimbuscli.core.upload import S3Endpoint
+
+
+class TestS3Endpoint:
+
+    @pytest.mark.parametrize(
+        ["addressing", "max_connections"],
+        [
+            ["dns", None],
+            [None, 0],
+            [None, -1],
+        ],
+    )
+    def test_invalid(self, addressing, max_connections):
+        with pytest.raises(ValueError):
+            S3Endpoint(addressing=addressing, max_connections=max_connections)
+
+    def test_config(self):
+        assert S3Endpoint().config() == {}
+        assert S3Endpoint("http://garage:3900", "path", "garage", 32, True).config() == {
+            "Endpoint": "http://garage:3900",
+            "Addressing": "path",
+            "Region": "garage",
+            "Max Connections": "32",
+            "Keep-Alive": "True",
+        }
@@ -0,0 +1,177 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+from mock import patch
+
+from nimbuscli.core.upload import (
+    ChunkReader,
+    FanoutError,
+    FanoutUploader,
+    Uploader,
+    UploadStatus,
+)
+
+
+class MockUploader(Uploader):
+
+    def __init__(self, streamable=True, delay=0.0, fail_after=None):
+        self._streamable = streamable
+        self._delay = delay
+        self._fail_after = fail_after
+        self.received = b""
+        self.positions: list[int] = []
+
+    def config(self):
+        return {"Bucket": "bucket"}
+
+    @property
+    def streamable(self):
+        return self._streamable
+
+    def upload(self, filepath, key, on_progress=None):
+        with open(filepath, "rb") as file:
+            self.received = file.read()
+        return self._status(filepath, key, len(self.received))
+
+    def upload_stream(self, stream, filepath, key, size, on_progress=None):
+        while chunk := stream.read(7):
+            self.received += chunk
+            self.positions.append(len(self.received))
+            if self._fail_after is not None and len(self.received) >= self._fail_after:
+                status = self._status(filepath, key, size)
+                status.exception = OSError("connection reset")
+                return status
+            time.sleep(self._delay)
+        return self._status(filepath, key, size)
+
+    def _status(self, filepath, key, size):
+        status = UploadStatus(filepath, key)
+        status.size = size
+        status.started = datetime.now()
+        status.completed = datetime.now()
+        return status
+
+
+class TestFanoutUploader:
+
+    @pytest.fixture
+    def archive(self, tmpdir):
+        filepath = tmpdir.join("archive.tar")
+        filepath.write_binary(bytes(range(256)) * 4)
+        return str(filepath)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            FanoutUploader({})
+
+    def test_config(self):
+        uploader = FanoutUploader({"aws": MockUploader(), "minio": MockUploader()})
+
+        assert uploader.config() == {
+            "Destinations": "aws, minio",
+            "[aws] Bucket": "bucket",
+            "[minio] Bucket": "bucket",
+        }
+
+    @patch.object(FanoutUploader, "CHUNK_SIZE", 10)
+    def test_upload(self, archive):
+        destinations = {"a": MockUploader(), "b": MockUploader(), "c": MockUploader(streamable=False)}
+        uploader = FanoutUploader(destinations, 20)
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert status.success
+        assert status.size == 1024
+        assert list(status.destinations) == ["a", "b", "c"]
+        assert all(d.success for d in status.destinations.values())
+        with open(archive, "rb") as file:
+            content = file.read()
+        assert all(d.received == content for d in destinations.values())
+
+    @patch.object(FanoutUploader, "CHUNK_SIZE", 10)
+    def test_upload_read_once(self, archive):
+        destinations = {"a": MockUploader(), "b": MockUploader()}
+        uploader = FanoutUploader(destinations, 20)
+
+        with patch("builtins.open", wraps=open) as mock_open:
+            assert uploader.upload(archive, "group/archive.tar").success
+
+        assert [c.args[0] for c in mock_open.call_args_list].count(archive) == 1
+
+    @patch.object(FanoutUploader, "CHUNK_SIZE", 10)
+    def test_upload_backpressure(self, archive):
+        fast = MockUploader()
+        slow = MockUploader(delay=0.002)
+        uploader = FanoutUploader({"fast": fast, "slow": slow}, 50)
+        progress: list[tuple[int, int]] = []
+
+        def sample():
+            while len(slow.received) < 1024:
+                progress.append((len(fast.received), len(slow.received)))
+                time.sleep(0.001)
+
+        sampler = threading.Thread(target=sample)
+        sampler.start()
+        assert uploader.upload(archive, "group/archive.tar").success
+        sampler.join()
+
+        # The fast destination is ahead of the slow one by at most
+        # the queued chunks, the current chunk and a partially consumed one.
+        assert max(f - s for f, s in progress) <= 50 + 10 + 10 + 7
+
+    @patch.object(FanoutUploader, "CHUNK_SIZE", 10)
+    def test_upload_failure(self, archive):
+        failing = MockUploader(fail_after=100)
+        uploader = FanoutUploader({"ok": MockUploader(), "failing": failing}, 20)
+
+        status = uploader.upload(archive, "group/archive.tar")
+
+        assert not status.success
+        assert isinstance(status.exception, FanoutError)
+        assert "failing" in str(status.exception)
+        assert status.destinations["ok"].success
+        assert not status.destinations["failing"].success
+
+    @patch.object(FanoutUploader, "CHUNK_SIZE", 10)
+    def test_upload_read_failure(self, archive):
+        uploader = FanoutUploader({"a": MockUploader(), "b": MockUploader()}, 20)
+
+        with patch("builtins.open", side_effect=OSError("disk")):
+            status = uploader.upload(archive, "group/archive.tar")
+
+        assert not status.success
+        assert isinstance(status.exception, OSError)
+        assert not any(d.success for d in status.destinations.values())
+
+
+class TestChunkReader:
+
+    def test_read(self):
+        reader = ChunkReader(10)
+        for chunk in [b"abc", b"defg", b"h"]:
+            reader.put(chunk)
+        reader.close_writer()
+
+        assert reader.read(2) == b"ab"
+        assert reader.read(4) == b"cdef"
+        assert reader.read() == b"gh"
+        assert reader.read(1) == b""
+
+    def test_fail(self):
+        reader = ChunkReader(10)
+        reader.put(b"abc")
+        reader.fail(OSError("disk"))
+
+        assert reader.read(3) == b"abc"
+        with pytest.raises(OSError):
+            reader.read(3)
+
+    def test_closed(self):
+        reader = ChunkReader(1)
+        reader.close()
+
+        # The writer is never blocked by a closed reader.
+        reader.put(b"abc")
+        reader.put(b"def")
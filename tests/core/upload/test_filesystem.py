@@ -0,0 +1,198 @@
+import errno
+import io
+import os
+import stat
+
+import pytest
+from mock import Mock, patch
+
+from nimbuscli.core.upload import (
+    FileSystemUploader,
+    ProgressAggregator,
+    TokenBucket,
+    UploadProgress,
+)
+
+
+class MockOnProgress:
+
+    def __init__(self):
+        self.reported: list[UploadProgress] = []
+
+    def __call__(self, progress: UploadProgress):
+        self.reported.append(progress)
+
+
+def unsupported(*args):
+    raise OSError(errno.EXDEV, "cross-device")
+
+
+class TestFileSystemUploader:
+
+    @pytest.fixture
+    def archive(self, tmpdir):
+        filepath = tmpdir.join("archive.tar")
+        filepath.write_binary(os.urandom(1000))
+        return str(filepath)
+
+    @pytest.fixture
+    def target(self, tmpdir):
+        return str(tmpdir.join("nas"))
+
+    def content(self, filepath):
+        with open(filepath, "rb") as file:
+            return file.read()
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            FileSystemUploader("")
+
+    def test_config(self, target):
+        assert FileSystemUploader(target).config() == {"Directory": target}
+        assert FileSystemUploader(target, TokenBucket(2 * 1024 * 1024)).config() == {
+            "Directory": target,
+            "Bandwidth": "2 MB/s",
+        }
+
+    def test_upload(self, archive, target):
+        on_progress = MockOnProgress()
+        uploader = FileSystemUploader(target, progress=ProgressAggregator(0))
+
+        status = uploader.upload(archive, "group/dir/archive.tar", on_progress)
+
+        assert status.success
+        assert status.size == 1000
+        assert status.location == target
+        assert self.content(os.path.join(target, "group/dir/archive.tar")) == self.content(archive)
+        assert os.listdir(os.path.join(target, "group/dir")) == ["archive.tar"]
+        assert on_progress.reported[-1].progress == 100
+
+    @pytest.mark.parametrize(
+        ["reflink", "copy_range"],
+        [
+            [unsupported, os.copy_file_range],
+            [unsupported, unsupported],
+        ],
+    )
+    @patch.object(FileSystemUploader, "CHUNK_SIZE", 300)
+    def test_upload_fallback(self, archive, target, reflink, copy_range):
+        on_progress = MockOnProgress()
+        uploader = FileSystemUploader(target, progress=ProgressAggregator(0))
+
+        with patch("fcntl.ioctl", side_effect=reflink), patch("os.copy_file_range", side_effect=copy_range):
+            status = uploader.upload(archive, "archive.tar", on_progress)
+
+        assert status.success
+        assert self.content(os.path.join(target, "archive.tar")) == self.content(archive)
+        assert [p.progress for p in on_progress.reported] == [30, 60, 90, 100]
+
+    def test_upload_limited(self, archive, target):
+        limiter = Mock()
+        uploader = FileSystemUploader(target, limiter)
+
+        with patch("fcntl.ioctl") as ioctl, patch("os.copy_file_range") as copy_range:
+            status = uploader.upload(archive, "archive.tar")
+
+        # The limited upload is always copied through the user space.
+        assert status.success
+        ioctl.assert_not_called()
+        copy_range.assert_not_called()
+        limiter.consume.assert_called_once_with(1000)
+
+    def test_upload_failure(self, archive, target):
+        uploader = FileSystemUploader(target)
+
+        with (
+            patch("fcntl.ioctl", side_effect=unsupported),
+            patch("os.copy_file_range", side_effect=OSError(errno.ENOSPC, "no space")),
+        ):
+            status = uploader.upload(archive, "archive.tar")
+
+        # Neither the partial target, nor the temporary file are left behind.
+        assert not status.success
+        assert isinstance(status.exception, OSError)
+        assert os.listdir(target) == []
+
+    def test_upload_replace(self, archive, target):
+        os.makedirs(target)
+        with open(os.path.join(target, "archive.tar"), "wb") as file:
+            file.write(b"previous")
+
+        status = FileSystemUploader(target).upload(archive, "archive.tar")
+
+        assert status.success
+        assert self.content(os.path.join(target, "archive.tar")) == self.content(archive)
+
+    @pytest.mark.parametrize("umask", [0o022, 0o027])
+    def test_upload_permissions(self, archive, target, umask):
+        previous = os.umask(umask)
+        try:
+            uploader = FileSystemUploader(target)
+        finally:
+            os.umask(previous)
+
+        assert uploader.upload(archive, "archive.tar").success
+        assert uploader.upload_stream(io.BytesIO(b"streamed"), archive, "stream.tar", 8).success
+
+        # The uploaded files get the default permissions, not the ones of the temporary files.
+        assert stat.S_IMODE(os.stat(os.path.join(target, "archive.tar")).st_mode) == 0o666 & ~umask
+        assert stat.S_IMODE(os.stat(os.path.join(target, "stream.tar")).st_mode) == 0o666 & ~umask
+
+    def test_upload_stream(self, archive, target):
+        uploader = FileSystemUploader(target)
+
+        status = uploader.upload_stream(io.BytesIO(b"streamed"), archive, "archive.tar", 8)
+
+        assert uploader.streamable
+        assert status.success
+        assert self.content(os.path.join(target, "archive.tar")) == b"streamed"
+
+    def test_list_objects(self, archive, target):
+        uploader = FileSystemUploader(target)
+        uploader.upload(archive, "group/dir/archive.tar")
+        uploader.upload(archive, "other/dir/archive.tar")
+        with open(os.path.join(target, "group/dir/.archive.tar.tmp"), "wb") as file:
+            file.write(b"unfinished")
+
+        objects = sorted(uploader.list_objects(), key=lambda o: o.key)
+
+        assert uploader.location == target
+        assert [(o.key, o.size) for o in objects] == [("group/dir/archive.tar", 1000), ("other/dir/archive.tar", 1000)]
+        assert [o.key for o in uploader.list_objects("group/")] == ["group/dir/archive.tar"]
+
+    def test_delete_objects(self, archive, target):
+        uploader = FileSystemUploader(target)
+        uploader.upload(archive, "group/dir/first.tar")
+        uploader.upload(archive, "group/dir/second.tar")
+
+        def remove_file(path):
+            if path.endswith("second.tar"):
+                raise PermissionError(errno.EACCES, "denied")
+
+        # The files are deleted concurrently, so the failure depends only on the path.
+        with patch("os.remove", side_effect=remove_file) as remove:
+            failures = uploader.delete_objects(["group/dir/first.tar", "group/dir/second.tar", "missing.tar"])
+
+        assert remove.call_count == 3
+        assert list(failures) == ["group/dir/second.tar"]
+        assert isinstance(failures["group/dir/second.tar"], PermissionError)
+
+        # The missing files are already deleted.
+        assert uploader.delete_objects(["group/dir/first.tar", "missing.tar"]) == {}
+        assert [o.key for o in uploader.list_objects()] == ["group/dir/second.tar"]
+
+    def test_stat_object(self, archive, target):
+        uploader = FileSystemUploader(target)
+        uploader.upload(archive, "group/dir/archive.tar")
+
+        obj = uploader.stat_object("group/dir/archive.tar")
+
+        assert (obj.key, obj.size, obj.checksum) == ("group/dir/archive.tar", 1000, None)
+        assert uploader.stat_object("missing.tar") is None
+
+    def test_read_range(self, archive, target):
+        uploader = FileSystemUploader(target)
+        uploader.upload(archive, "archive.tar")
+
+        assert uploader.read_range("archive.tar", 100, 50) == self.content(archive)[100:150]
+        assert uploader.read_range("archive.tar", 990, 50) == self.content(archive)[990:]
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+from mock import Mock
+
+from nimbuscli.core.upload import FilePart, MultipartSession
+
+
+class TestMultipartSession:
+
+    @pytest.mark.parametrize(
+        ["size", "part_size", "parts", "last"],
+        [
+            [100, 30, 4, (90, 10)],
+            [90, 30, 3, (60, 30)],
+            [0, 30, 1, (0, 0)],
+        ],
+    )
+    def test_parts(self, size, part_size, parts, last):
+        session = MultipartSession("id", "file", size, 1, part_size)
+
+        assert session.total_parts == parts
+        assert session.part_range(1) == (0, min(size, part_size))
+        assert session.part_range(parts) == last
+
+    def test_roundtrip(self):
+        session = MultipartSession("id", "file", 100, 1, 30, "SHA256")
+        session.parts = {2: '"b"', 1: '"a"'}
+        session.checksums = {2: "b==", 1: "a=="}
+
+        loaded = MultipartSession.from_dict(session.to_dict())
+
+        assert loaded.to_dict() == session.to_dict()
+        assert loaded.parts == {1: '"a"', 2: '"b"'}
+        assert (loaded.algorithm, loaded.checksums) == ("SHA256", {1: "a==", 2: "b=="})
+        assert loaded.matches("file", 100, 1, 30)
+        assert not loaded.matches("file", 100, 2, 30)
+
+
+class TestFilePart:
+
+    @pytest.fixture
+    def filepath(self, tmpdir):
+        filepath = os.path.join(tmpdir, "file")
+        with open(filepath, "wb") as file:
+            file.write(bytes(range(100)))
+        return filepath
+
+    def test_read(self, filepath):
+        with FilePart(filepath, 10, 20) as part:
+            assert len(part) == 20
+            assert part.read(5) == bytes(range(10, 15))
+            assert part.tell() == 5
+            assert part.read() == bytes(range(15, 30))
+            assert part.read() == b""
+
+    def test_seek(self, filepath):
+        with FilePart(filepath, 80, 20) as part:
+            assert len(part) == 20
+            assert part.seek(0, os.SEEK_END) == 20
+            assert part.seek(-5, os.SEEK_CUR) == 15
+            assert part.read() == bytes(range(95, 100))
+            assert part.seek(0) == 0
+            assert part.read(3) == bytes(range(80, 83))
+
+    def test_callback(self, filepath):
+        callback = Mock()
+        with FilePart(filepath, 10, 20, callback) as part:
+            # The reads before the part is sent, e.g. of the checksum, are not counted.
+            part.read()
+            part.seek(0)
+            part.signal_transferring()
+            part.read(5)
+            part.read(10)
+
+            # The bytes, that are read again after a retry, are counted once.
+            part.seek(0)
+            part.read()
+
+            assert [c.args[0] for c in callback.call_args_list] == [5, 10, 5]
+            assert part.reported == 20
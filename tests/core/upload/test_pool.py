@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+from mock import patch
+
+from nimbuscli.core.upload import ByteBudget, TokenBucket, TransferPool
+
+
+class TestTokenBucket:
+
+    @pytest.mark.parametrize("rate", [0, -1])
+    def test_invalid(self, rate):
+        with pytest.raises(ValueError):
+            TokenBucket(rate)
+
+    @patch("nimbuscli.core.upload.pool.time")
+    def test_consume(self, mock_time):
+        mock_time.monotonic.return_value = 100.0
+        bucket = TokenBucket(1000)
+
+        # The burst is available immediately.
+        bucket.consume(1000)
+        mock_time.sleep.assert_not_called()
+
+        # The next chunk waits for the tokens.
+        bucket.consume(500)
+        mock_time.sleep.assert_called_once_with(0.5)
+
+        # The waiting chunks are queued one after another.
+        bucket.consume(500)
+        mock_time.sleep.assert_called_with(1.0)
+
+    @patch("nimbuscli.core.upload.pool.time")
+    def test_refill(self, mock_time):
+        mock_time.monotonic.return_value = 100.0
+        bucket = TokenBucket(1000, burst=2000)
+        bucket.consume(2000)
+
+        # The bucket is never filled above the burst.
+        mock_time.monotonic.return_value = 110.0
+        bucket.consume(2000)
+        bucket.consume(1000)
+
+        mock_time.sleep.assert_called_once_with(1.0)
+
+    def test_shared(self):
+        bucket = TokenBucket(100_000, burst=1)
+        started = time.monotonic()
+
+        threads = [threading.Thread(target=lambda: [bucket.consume(1000) for _ in range(10)]) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # 40 KB at 100 KB/s, regardless of the number of transfers.
+        assert time.monotonic() - started >= 0.35
+
+
+class TestByteBudget:
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            ByteBudget(0)
+
+    def test_reserve(self):
+        budget = ByteBudget(100)
+
+        with budget.reserve(60) as reserved:
+            assert reserved == 60
+            assert budget._available == 40
+
+        with budget.reserve(1000) as reserved:
+            assert reserved == 100
+
+        assert budget._available == 100
+
+    def test_fifo(self):
+        budget = ByteBudget(100)
+        acquired = []
+
+        def reserve(name, amount):
+            with budget.reserve(amount):
+                acquired.append(name)
+
+        with budget.reserve(60):
+            large = threading.Thread(target=reserve, args=("large", 100))
+            large.start()
+            while not budget._queue:
+                time.sleep(0.001)
+
+            # The small reservation fits into the budget,
+            # but it waits behind the large one.
+            small = threading.Thread(target=reserve, args=("small", 10))
+            small.start()
+            time.sleep(0.05)
+            assert not acquired
+
+        large.join()
+        small.join()
+        assert acquired == ["large", "small"]
+
+
+class TestTransferPool:
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            TransferPool(0)
+
+    @pytest.mark.parametrize("max_inflight", [None, 100, 250])
+    def test_map(self, max_inflight):
+        pool = TransferPool(4, max_inflight)
+        lock = threading.Lock()
+        inflight = [0, 0]
+
+        def transfer(size):
+            with lock:
+                inflight[0] += size
+                inflight[1] = max(inflight)
+            time.sleep(0.01)
+            with lock:
+                inflight[0] -= size
+            return size * 2
+
+        items = [100, 50, 100, 100, 50, 100]
+        assert pool.map(lambda x: x, transfer, items) == [200, 100, 200, 200, 100, 200]
+
+        if max_inflight:
+            assert inflight[1] <= max_inflight
+
+    def test_map_exception(self):
+        pool = TransferPool(2)
+
+        def transfer(item):
+            raise RuntimeError(item)
+
+        with pytest.raises(RuntimeError):
+            pool.map(lambda x: 1, transfer, [1, 2])
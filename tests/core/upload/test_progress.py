@@ -0,0 +1,144 @@
+import threading
+from datetime import timedelta as td
+
+import pytest
+from mock import Mock
+
+from nimbuscli.core.upload import ProgressAggregator, TransferProgress
+
+
+class TestTransferProgress:
+
+    @pytest.mark.parametrize(
+        ["transferred", "total", "rate", "progress", "eta"],
+        [
+            [0, 100, 0.0, 0, None],
+            [50, 100, 10.0, 50, td(seconds=5)],
+            [100, 100, 0.0, 100, td()],
+            [150, 100, 10.0, 100, td()],
+            [0, 0, 0.0, 100, td()],
+        ],
+    )
+    def test_progress(self, transferred, total, rate, progress, eta):
+        p = TransferProgress("name", transferred, total, rate, td())
+
+        assert p.progress == progress
+        assert p.eta == eta
+
+
+class TestProgressAggregator:
+
+    @pytest.mark.parametrize("smoothing", [0, -0.1, 1.1])
+    def test_invalid(self, smoothing):
+        with pytest.raises(ValueError):
+            ProgressAggregator(smoothing=smoothing)
+
+    def test_snapshot(self):
+        clock = Mock(return_value=10.0)
+        aggregator = ProgressAggregator(clock=clock)
+
+        first = aggregator.transfer("first", 100)
+        second = aggregator.transfer("second", 300)
+        first(50)
+        second(100)
+        second.skip(50)
+
+        clock.return_value = 15.0
+        snapshot = aggregator.snapshot()
+
+        assert [t.name for t in snapshot.transfers] == ["first", "second"]
+        assert [t.transferred for t in snapshot.transfers] == [50, 150]
+        assert (snapshot.transferred, snapshot.total, snapshot.progress) == (200, 400, 50)
+        assert snapshot.elapsed == td(seconds=5)
+
+        # The skipped bytes don't count towards the throughput.
+        assert snapshot.rate == 30.0
+        assert snapshot.transfers[1].rate == 20.0
+        assert snapshot.eta == td(seconds=200 / 30)
+
+    def test_ewma(self):
+        clock = Mock(return_value=0.0)
+        aggregator = ProgressAggregator(smoothing=0.5, clock=clock)
+        counter = aggregator.transfer("name", 1000)
+
+        clock.return_value = 1.0
+        counter(100)
+        assert aggregator.snapshot().rate == 100.0
+
+        # A single slow interval moves the rate only halfway.
+        clock.return_value = 2.0
+        counter(300)
+        assert aggregator.snapshot().rate == 200.0
+
+    def test_finish(self):
+        clock = Mock(return_value=0.0)
+        on_update = Mock()
+        aggregator = ProgressAggregator(clock=clock)
+
+        counter = aggregator.transfer("name", 100, on_update)
+        counter(100)
+        counter.finish()
+        aggregator.transfer("next", 100)
+
+        assert on_update.call_args.args[0].progress == 100
+
+        # The finished transfers still count towards the overall progress.
+        snapshot = aggregator.snapshot()
+        assert [t.name for t in snapshot.transfers] == ["next"]
+        assert (snapshot.transferred, snapshot.total) == (100, 200)
+
+    def test_finish_skipped(self):
+        clock = Mock(return_value=0.0)
+        aggregator = ProgressAggregator(clock=clock)
+
+        counter = aggregator.transfer("name", 100 * 1024 * 1024)
+        counter.skip(100 * 1024 * 1024)
+        clock.return_value = 1.0
+        counter.finish()
+
+        # The skipped bytes of the finished transfers don't count towards the throughput either.
+        snapshot = aggregator.snapshot()
+        assert (snapshot.transferred, snapshot.progress) == (100 * 1024 * 1024, 100)
+        assert snapshot.rate == 0.0
+
+    def test_tick(self):
+        clock = Mock(return_value=0.0)
+        consumer = Mock()
+        aggregator = ProgressAggregator(1.0, clock=clock)
+        aggregator.subscribe(consumer)
+
+        on_update = Mock()
+        counter = aggregator.transfer("name", 100, on_update)
+
+        # The snapshots are published at most once per interval.
+        for _ in range(10):
+            counter(1)
+        clock.return_value = 0.5
+        counter(5)
+        clock.return_value = 1.5
+        counter(5)
+
+        assert [c.args[0].transferred for c in consumer.call_args_list] == [1, 20]
+        assert [c.args[0].transferred for c in on_update.call_args_list] == [1, 20]
+
+    def test_concurrent(self):
+        aggregator = ProgressAggregator(0)
+        snapshots = []
+        aggregator.subscribe(snapshots.append)
+        counter = aggregator.transfer("name", 8 * 10_000)
+
+        def send():
+            for _ in range(10_000):
+                counter(1)
+
+        threads = [threading.Thread(target=send) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # The counts of all threads are collected without losing any bytes,
+        # while a snapshot is taken only once per 1% of the transfer in each thread.
+        assert counter.transferred == 8 * 10_000
+        assert aggregator.snapshot().progress == 100
+        assert 0 < len(snapshots) <= 8 * 101
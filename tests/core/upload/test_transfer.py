@@ -0,0 +1,75 @@
+from datetime import timedelta as td
+
+import pytest
+
+from nimbuscli.core.upload import TransferTuner
+
+MB = 1024 * 1024
+GB = 1024 * MB
+
+
+class TestTransferTuner:
+
+    @pytest.mark.parametrize(
+        ["part_size", "concurrency", "threshold"],
+        [
+            [4 * MB, None, None],
+            [6 * GB, None, None],
+            ["fixed", None, None],
+            [None, 0, None],
+            [None, None, MB],
+        ],
+    )
+    def test_init_failed_params(self, part_size, concurrency, threshold):
+        with pytest.raises(ValueError):
+            TransferTuner(part_size, concurrency, threshold)
+
+    @pytest.mark.parametrize(
+        ["part_size", "file_size", "expected"],
+        [
+            [None, 100, 8 * MB],
+            [None, 500 * GB, 52 * MB],
+            [16 * MB, 100, 16 * MB],
+            [16 * MB, 500 * GB, 52 * MB],
+            ["auto", 100, 8 * MB],
+            ["auto", 1 * GB, 8 * MB],
+            ["auto", 500 * GB, 256 * MB],
+            ["auto", 50_000 * GB, 5 * GB],
+        ],
+    )
+    def test_part_size(self, part_size, file_size, expected):
+        tuner = TransferTuner(part_size)
+        assert tuner.part_size(file_size) == expected
+        assert tuner.part_size(file_size) * 10_000 >= min(file_size, 10_000 * 5 * GB)
+
+    def test_concurrency_fixed(self):
+        assert TransferTuner().concurrency() == 10
+        assert TransferTuner(concurrency=4).concurrency() == 4
+
+        tuner = TransferTuner(concurrency=4)
+        tuner.record(4, 10 * GB, td(seconds=10))
+        assert tuner.concurrency() == 4
+
+    def test_concurrency_auto(self):
+        tuner = TransferTuner(concurrency="auto")
+        assert tuner.concurrency() == 10
+
+        # The small files are ignored.
+        tuner.record(10, MB, td(seconds=10))
+        assert tuner.concurrency() == 10
+
+        # The concurrency grows while the throughput improves.
+        tuner.record(10, 10 * GB, td(seconds=100))
+        assert tuner.concurrency() == 20
+        tuner.record(20, 10 * GB, td(seconds=50))
+        assert tuner.concurrency() == 40
+
+        # And settles on the best level, once it doesn't.
+        tuner.record(40, 10 * GB, td(seconds=49))
+        assert tuner.concurrency() == 20
+        tuner.record(20, 10 * GB, td(seconds=52))
+        assert tuner.concurrency() == 20
+
+        # The network conditions have changed.
+        tuner.record(20, 10 * GB, td(seconds=200))
+        assert tuner.concurrency() == 10
@@ -1,4 +1,7 @@
 from datetime import datetime
+from io import BytesIO
+
+from nimbuscli.core.execute import CompletedProcess
 
 
 class MockDateTime(datetime):
@@ -20,3 +23,24 @@ class MockDateTime(datetime):
         v = MockDateTime.__values[MockDateTime.__next]
         MockDateTime.__next += 1
         return v
+
+
+class StreamRunner:
+    """
+    A runner that passes the predefined output to the stream consumer.
+    """
+
+    def __init__(self, data: bytes, exitcode: int = 0):
+        self._data = data
+        self._exitcode = exitcode
+
+    def stream(self, cmd, consumer, cwd=None, env=None):
+        proc = CompletedProcess(cmd, cwd, env)
+        proc.started = datetime.now()
+        try:
+            consumer(BytesIO(self._data))
+            proc.exitcode = self._exitcode
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            proc.exception = e
+        proc.completed = datetime.now()
+        return proc
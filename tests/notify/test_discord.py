@@ -164,6 +164,10 @@ class TestDiscordNotifier:
         result = notifier._backup_details(bar)
         assert result["value"] == "00. ❌ 📁 dir\n01. ❌ 📁 dir2"
 
+        bar.entries[1].unchanged = True
+        result = notifier._backup_details(bar)
+        assert result["value"] == "00. ❌ 📁 dir\n01. 💤 📁 dir2"
+
     def test_upload_details(self):
         notifier = DiscordNotifier("webhook")
         uar = UploadActionResult([])
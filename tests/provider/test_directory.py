@@ -1,4 +1,5 @@
 import pytest
+from mock import Mock
 
 from nimbuscli.provider.directory import DirectoryProvider
 
@@ -33,3 +34,29 @@ class TestDirectoryProvider:
             d[r.name] = list(r.directories)
 
         assert d == groups
+
+    def test_streams(self):
+        runner = Mock()
+        p = DirectoryProvider(
+            {
+                "db": [
+                    "/mnt/db",
+                    {"name": "pg.sql", "command": "docker exec pg pg_dumpall"},
+                ],
+            },
+            runner,
+        )
+
+        [r] = p._resources()
+
+        assert r.directories == ["/mnt/db"]
+        assert [(s.name, s.cmd) for s in r.streams] == [("pg.sql", "docker exec pg pg_dumpall")]
+
+        r.streams[0].stream(print)
+        runner.stream.assert_called_once_with("docker exec pg pg_dumpall", print)
+
+    def test_streams_no_runner(self):
+        p = DirectoryProvider({"db": [{"name": "pg.sql", "command": "pg_dumpall"}]})
+
+        with pytest.raises(ValueError):
+            list(p._resources())
@@ -1,8 +1,10 @@
 from pathlib import Path
 
 import pytest
+from mock import Mock
 
-from nimbuscli.provider.service import ServiceProvider
+from nimbuscli.core.deploy import DockerService
+from nimbuscli.provider.service import ServiceFactory, ServiceProvider, ServiceResource
 
 
 class TestServiceProvider:
@@ -117,3 +119,21 @@ class TestServiceProvider:
         assert len(res) == len(discovered)
         for expectation in discovered:
             assert expectation in res
+
+
+class TestServiceFactory:
+
+    @pytest.mark.parametrize(
+        ["strategy", "bluegreen", "name", "expected"],
+        [
+            [DockerService.RESTART, [], "web", "restart"],
+            [DockerService.UPDATE, [], "web", "update"],
+            [DockerService.UPDATE, ["web*", "api"], "webapp", "bluegreen"],
+            [DockerService.RESTART, ["web*", "api"], "postgres", "restart"],
+        ],
+    )
+    def test_strategy(self, strategy, bluegreen, name, expected):
+        f = ServiceFactory(Mock(), Mock(), strategy, bluegreen)
+        s = f.create_service(ServiceResource(name, "docker-compose", "/srv/" + name))
+
+        assert f"strategy='{expected}'" in repr(s)
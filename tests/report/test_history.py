@@ -0,0 +1,121 @@
+import os
+from datetime import datetime as dt
+from datetime import timedelta as td
+
+from mock import Mock
+
+from nimbuscli.cmd import ExecutionResult
+from nimbuscli.cmd.backup import (
+    BackupActionResult,
+    BackupEntry,
+    UploadActionResult,
+    UploadEntry,
+)
+from nimbuscli.cmd.deploy import (
+    DeploymentActionResult,
+    DeploymentPlanActionResult,
+    ImagePullActionResult,
+)
+from nimbuscli.core.archive import ArchivalStatus
+from nimbuscli.core.deploy import OperationStatus
+from nimbuscli.core.execute import CompletedProcess
+from nimbuscli.core.upload import UploadStatus
+from nimbuscli.report import HistoryReporter
+from nimbuscli.state import HistoryRecord
+
+STARTED = dt(2024, 3, 1, 12, 0)
+
+
+def backup_entry(tmpdir, directory: str, resumed: bool = False) -> BackupEntry:
+    archive = tmpdir.join(f"{directory}.tar")
+    archive.write_binary(b"a" * 1000)
+
+    entry = BackupEntry("photos", f"~/photos/{directory}")
+    entry.archive = ArchivalStatus(entry.directory, str(archive))
+    entry.archive.started = STARTED
+    entry.archive.completed = STARTED + td(seconds=10)
+    entry.archive.source_size = 4000
+    entry.resumed = resumed
+    return entry
+
+
+def upload_entry(key: str, copied: bool = False) -> UploadEntry:
+    entry = UploadEntry()
+    entry.backup = Mock(success=True)
+    entry.upload = UploadStatus("archive.tar", key)
+    entry.upload.size = 1000
+    entry.upload.started = STARTED
+    entry.upload.completed = STARTED + td(seconds=4)
+    entry.upload.copied_from = "other.tar" if copied else None
+    return entry
+
+
+def deploy_status() -> OperationStatus:
+    proc = CompletedProcess(["docker", "compose", "up"], os.getcwd(), None)
+    proc.exitcode = 0
+    proc.started = STARTED
+    proc.completed = STARTED + td(seconds=3)
+
+    status = OperationStatus("nginx", "Up", "docker-compose")
+    status.processes.append(proc)
+    return status
+
+
+def test_write(tmpdir):
+    result = ExecutionResult("Backup", STARTED)
+    result.completed = STARTED + td(minutes=1)
+    result.actions = [
+        BackupActionResult([backup_entry(tmpdir, "2023"), backup_entry(tmpdir, "2022", resumed=True)]),
+        UploadActionResult([upload_entry("photos/2023/a.tar"), upload_entry("photos/2022/b.tar", copied=True)]),
+        DeploymentActionResult("Up", [deploy_status()]),
+    ]
+    history = Mock()
+
+    HistoryReporter(history).write(result)
+
+    command, _, started, completed, success, records = history.record.call_args.args
+    assert (command, started, completed, success) == ("Backup", STARTED, result.completed, True)
+    assert [(r.kind, r.name, r.elapsed, r.size, r.source_size, r.detail) for r in records] == [
+        (HistoryRecord.ARCHIVE, "photos/2023", td(seconds=10), 1000, 4000, None),
+        (HistoryRecord.UPLOAD, "photos/2023", td(seconds=4), 1000, None, None),
+        (HistoryRecord.UPLOAD, "photos/2022", td(seconds=4), 0, None, None),
+        (HistoryRecord.DEPLOY, "nginx", td(seconds=3), None, None, "Up"),
+        (HistoryRecord.PROCESS, "nginx", td(seconds=3), None, None, "docker compose up"),
+    ]
+
+
+def test_write_failed():
+    history = Mock()
+    history.record.side_effect = OSError("read-only")
+    result = ExecutionResult("Up", STARTED)
+    result.completed = STARTED
+
+    # The history is not essential, so the failure is only logged.
+    HistoryReporter(history).write(result)
+
+    assert list(HistoryReporter(history).reports) == []
+
+
+def test_write_deploy():
+    pull = CompletedProcess(["docker", "pull", "--quiet", "nginx:1.27"], None, None)
+    pull.exitcode = 0
+    pull.started = STARTED
+    pull.completed = STARTED + td(seconds=7)
+    cancelled = OperationStatus.cancelled(Mock(kind="docker"))
+
+    result = ExecutionResult("Up", STARTED)
+    result.completed = STARTED + td(minutes=1)
+    result.actions = [
+        ImagePullActionResult(DeploymentPlanActionResult([]), {"nginx:1.27": pull}),
+        DeploymentActionResult("Up", [deploy_status(), cancelled]),
+    ]
+    history = Mock()
+
+    HistoryReporter(history).write(result)
+
+    records = history.record.call_args.args[-1]
+    assert [(r.kind, r.name, r.elapsed, r.detail) for r in records] == [
+        (HistoryRecord.PROCESS, "nginx:1.27", td(seconds=7), "docker pull --quiet nginx:1.27"),
+        (HistoryRecord.DEPLOY, "nginx", td(seconds=3), "Up"),
+        (HistoryRecord.PROCESS, "nginx", td(seconds=3), "docker compose up"),
+    ]
@@ -0,0 +1,90 @@
+import os
+from datetime import datetime as dt
+from datetime import timezone
+
+import pytest
+
+from nimbuscli.core.upload import RemoteObject
+from nimbuscli.state import BackupCatalog, CatalogEntry
+
+
+class TestBackupCatalog:
+
+    @pytest.fixture
+    def catalog(self, tmpdir):
+        return BackupCatalog(os.path.join(tmpdir, "state", "catalog.db"))
+
+    def entry(self, key: str, size: int = 100, created: dt = dt(2024, 3, 1, 12, 0), **kwargs) -> CatalogEntry:
+        return CatalogEntry("s3://bucket", key, size, created, **kwargs)
+
+    def test_record(self, catalog):
+        first = self.entry("photos/2023/2023_2024-03-01_1200.tar", digest="abc", storage_class="STANDARD")
+        second = self.entry("docs/work/work_2024-03-01_1200.tar", checksum_algorithm="SHA256", checksum="Y2s=")
+        local = CatalogEntry("/mnt/backups", first.key, 100, dt(2024, 3, 1, 11, 0), "~/photos/2023")
+
+        catalog.record([first, second, local])
+
+        assert catalog.locations() == ["/mnt/backups", "s3://bucket"]
+        assert catalog.entries() == [local, second, first]
+        assert catalog.entries("s3://bucket", "photos") == [first]
+        assert catalog.entries(group="docs") == [second]
+        assert catalog.entries(group="missing") == []
+
+    def test_record_update(self, catalog):
+        catalog.record([self.entry("g/d/a.tar", digest="abc", storage_class="STANDARD")])
+
+        # The details, that are not known to the latest upload, are kept.
+        catalog.record([self.entry("g/d/a.tar", 200, checksum_algorithm="CRC32", checksum="AAA=")])
+
+        assert catalog.entries() == [
+            self.entry(
+                "g/d/a.tar", 200, digest="abc", storage_class="STANDARD", checksum_algorithm="CRC32", checksum="AAA="
+            )
+        ]
+
+    def test_sync(self, catalog):
+        catalog.record(
+            [
+                self.entry("g/d/kept.tar", directory="~/d", digest="abc"),
+                self.entry("g/d/replaced.tar", directory="~/d", digest="def"),
+                self.entry("g/d/removed.tar"),
+            ]
+        )
+        catalog.record([CatalogEntry("/mnt/backups", "g/d/removed.tar", 100, dt(2024, 3, 1))])
+
+        modified = dt(2024, 3, 2, 10, 0, tzinfo=timezone.utc)
+        added, removed = catalog.sync(
+            "s3://bucket",
+            [
+                RemoteObject("g/d/kept.tar", 100, modified, "STANDARD"),
+                RemoteObject("g/d/replaced.tar", 300, modified),
+                RemoteObject("g/d/added.tar", 50, modified, "GLACIER"),
+            ],
+        )
+
+        local = modified.astimezone().replace(tzinfo=None)
+        assert (added, removed) == (1, 1)
+        assert catalog.entries("s3://bucket") == [
+            self.entry("g/d/kept.tar", directory="~/d", digest="abc", storage_class="STANDARD"),
+            self.entry("g/d/added.tar", 50, local, storage_class="GLACIER"),
+            self.entry("g/d/replaced.tar", 300, local),
+        ]
+
+        # The other locations are not affected.
+        assert [e.key for e in catalog.entries("/mnt/backups")] == ["g/d/removed.tar"]
+
+    def test_remove(self, catalog):
+        catalog.record([self.entry("g/d/a.tar"), self.entry("g/d/b.tar")])
+
+        catalog.remove("s3://bucket", ["g/d/a.tar", "g/d/missing.tar"])
+
+        assert [e.key for e in catalog.entries()] == ["g/d/b.tar"]
+
+    def test_persistent(self, catalog, tmpdir):
+        catalog.record([self.entry("g/d/a.tar")])
+
+        assert BackupCatalog(os.path.join(tmpdir, "state", "catalog.db")).entries() == [self.entry("g/d/a.tar")]
+
+    def test_empty(self, catalog):
+        assert catalog.entries() == []
+        assert catalog.locations() == []
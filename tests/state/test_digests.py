@@ -0,0 +1,47 @@
+import os
+
+from nimbuscli.core.upload import Manifest
+from nimbuscli.state import DigestStore, ManifestStore
+
+
+class TestDigestStore:
+
+    def test_roundtrip(self, tmpdir):
+        filepath = os.path.join(tmpdir, "state", "digests.json")
+        store = DigestStore(filepath)
+        assert store.get("bucket", "abc") is None
+
+        store.update("bucket", "abc", "docs/a.tar")
+        store.update("bucket", "def", "docs/b.tar")
+        store.update("archive", "abc", "docs/c.tar")
+
+        loaded = DigestStore(filepath)
+        assert loaded.get("bucket", "abc") == "docs/a.tar"
+        assert loaded.get("bucket", "def") == "docs/b.tar"
+        assert loaded.get("archive", "abc") == "docs/c.tar"
+        assert loaded.get("archive", "def") is None
+
+    def test_malformed(self, tmpdir):
+        filepath = os.path.join(tmpdir, "digests.json")
+        with open(filepath, "w", encoding="utf-8") as file:
+            file.write("{ not a json")
+
+        store = DigestStore(filepath)
+
+        assert store.get("bucket", "abc") is None
+
+
+class TestManifestStore:
+
+    def test_roundtrip(self, tmpdir):
+        filepath = os.path.join(tmpdir, "state", "manifests.json")
+        store = ManifestStore(filepath)
+        assert store.get("bucket", "docs") is None
+
+        store.update("bucket", "docs", Manifest("docs/a.tar", 25, 10, ["a", "b", "c"], '"a"'))
+        store.update("bucket", "docs", Manifest("docs/b.tar", 25, 10, ["a", "x", "c"], '"b"'))
+
+        loaded = ManifestStore(filepath).get("bucket", "docs")
+        assert loaded.key == "docs/b.tar"
+        assert loaded.parts == ["a", "x", "c"]
+        assert ManifestStore(filepath).get("archive", "docs") is None
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from nimbuscli.state import FingerprintStore, fingerprint
+
+
+def touch(path: str, data: bytes = b"data", mtime_ns: int = 1_700_000_000_000_000_000):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(data)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestFingerprint:
+
+    @pytest.fixture
+    def tree(self, tmpdir):
+        root = os.path.join(tmpdir, "tree")
+        touch(os.path.join(root, "a"))
+        touch(os.path.join(root, "sub", "b"))
+        touch(os.path.join(root, "sub", "deep", "c"))
+        os.makedirs(os.path.join(root, "empty"))
+        return root
+
+    def test_stable(self, tree):
+        assert fingerprint(tree) == fingerprint(tree, workers=1)
+
+    def test_content_is_not_read(self, tree):
+        expected = fingerprint(tree)
+        touch(os.path.join(tree, "sub", "deep", "c"), b"atad")
+        assert fingerprint(tree) == expected
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda root: touch(os.path.join(root, "sub", "deep", "c"), b"longer data"),
+            lambda root: touch(os.path.join(root, "sub", "deep", "c"), mtime_ns=1),
+            lambda root: os.rename(os.path.join(root, "sub", "b"), os.path.join(root, "sub", "x")),
+            lambda root: os.remove(os.path.join(root, "a")),
+            lambda root: touch(os.path.join(root, "empty", "new")),
+            lambda root: os.makedirs(os.path.join(root, "sub", "new")),
+            lambda root: os.rename(os.path.join(root, "sub", "deep"), os.path.join(root, "deep")),
+        ],
+    )
+    def test_changed(self, tree, change):
+        expected = fingerprint(tree)
+        change(tree)
+        assert fingerprint(tree) != expected
+
+    def test_missing(self, tmpdir):
+        with pytest.raises(FileNotFoundError):
+            fingerprint(os.path.join(tmpdir, "missing"))
+
+
+class TestFingerprintStore:
+
+    def test_roundtrip(self, tmpdir):
+        filepath = os.path.join(tmpdir, "state", "fingerprints.json")
+        store = FingerprintStore(filepath)
+        assert store.get("docs", "~/Documents") is None
+
+        store.update("docs", "~/Documents", "abc")
+        store.update("docs", "~/Notes", "def")
+        store.save()
+
+        loaded = FingerprintStore(filepath)
+        assert loaded.get("docs", "~/Documents") == "abc"
+        assert loaded.get("docs", "~/Notes") == "def"
+        assert loaded.get("apps", "~/Documents") is None
+
+    def test_malformed(self, tmpdir):
+        filepath = os.path.join(tmpdir, "fingerprints.json")
+        with open(filepath, "w", encoding="utf-8") as file:
+            file.write("{ not a json")
+
+        store = FingerprintStore(filepath)
+
+        assert store.get("docs", "~/Documents") is None
@@ -0,0 +1,65 @@
+import os
+from datetime import datetime as dt
+from datetime import timedelta as td
+
+import pytest
+
+from nimbuscli.state import HistoryRecord, RunHistory
+
+
+class TestRunHistory:
+
+    @pytest.fixture
+    def history(self, tmpdir):
+        return RunHistory(os.path.join(tmpdir, "state", "history.db"))
+
+    def run(self, history: RunHistory, started: dt, records: list[HistoryRecord]):
+        history.record("Backup", ["photos*"], started, started + td(minutes=5), True, records)
+
+    def test_record(self, history):
+        first = dt(2024, 3, 1, 12, 0)
+        second = dt(2024, 3, 2, 12, 0)
+        self.run(
+            history,
+            second,
+            [
+                HistoryRecord(HistoryRecord.ARCHIVE, "photos/2023", td(seconds=10), True, 1000, 4000),
+                HistoryRecord(HistoryRecord.UPLOAD, "photos/2023", td(seconds=4), False, 1000),
+            ],
+        )
+        self.run(history, first, [HistoryRecord(HistoryRecord.ARCHIVE, "photos/2023", td(seconds=20), True, 1000)])
+        self.run(history, second, [])
+
+        records = history.records()
+
+        # The records are ordered by the start time of the run.
+        assert [(r.kind, r.started, r.elapsed, r.success) for r in records] == [
+            (HistoryRecord.ARCHIVE, first, td(seconds=20), True),
+            (HistoryRecord.ARCHIVE, second, td(seconds=10), True),
+            (HistoryRecord.UPLOAD, second, td(seconds=4), False),
+        ]
+        assert [r.elapsed for r in history.records(HistoryRecord.ARCHIVE, since=second)] == [td(seconds=10)]
+        assert history.records(HistoryRecord.DEPLOY) == []
+
+    def test_record_process(self, history):
+        process = HistoryRecord(HistoryRecord.PROCESS, "nginx", td(seconds=3), True, detail="docker compose up -d")
+        self.run(history, dt(2024, 3, 1), [process])
+
+        (record,) = history.records()
+
+        assert (record.name, record.detail, record.size, record.speed, record.ratio) == (
+            "nginx",
+            "docker compose up -d",
+            None,
+            None,
+            None,
+        )
+        assert record.source_speed is None
+
+    def test_measurements(self):
+        record = HistoryRecord(HistoryRecord.ARCHIVE, "photos/2023", td(seconds=4), True, 1000, 3000)
+
+        assert record.group == "photos"
+        assert record.speed == 250
+        assert record.source_speed == 750
+        assert record.ratio == 3
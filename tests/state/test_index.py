@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+from nimbuscli.provider import DirectoryResource
+from nimbuscli.state import FileIndex
+
+
+def touch(path: str, size: int, mtime_ns: int = 1_700_000_000_000_000_000):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(b"x" * size)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class TestFileIndex:
+
+    @pytest.fixture
+    def resources(self, tmpdir):
+        docs = os.path.join(tmpdir, "docs")
+        touch(os.path.join(docs, "a.txt"), 10)
+        touch(os.path.join(docs, "sub", "b.txt"), 100, mtime_ns=2_000_000_000_000_000_000)
+        touch(os.path.join(docs, "sub", "deep", "c.txt"), 10)
+        os.link(os.path.join(docs, "a.txt"), os.path.join(docs, "sub", "a.link"))
+
+        media = os.path.join(tmpdir, "media")
+        touch(os.path.join(media, "a.txt"), 1000)
+        touch(os.path.join(media, "empty"), 0)
+
+        return [
+            DirectoryResource("docs", [docs]),
+            DirectoryResource("media", [media, os.path.join(tmpdir, "missing")]),
+        ]
+
+    @pytest.fixture
+    def index(self, resources):
+        return FileIndex.build(resources)
+
+    def files(self, index, ids):
+        return sorted(os.path.basename(index.path(i)) for i in ids)
+
+    def test_build(self, index, resources):
+        assert len(index) == 6
+        assert [(r.group, r.directory) for r in index.roots] == [
+            ("docs", resources[0].directories[0]),
+            ("media", resources[1].directories[0]),
+            ("media", resources[1].directories[1]),
+        ]
+        assert [len(r.files) for r in index.roots] == [4, 2, 0]
+        assert [type(r.exception) for r in index.roots] == [type(None), type(None), FileNotFoundError]
+
+        paths = sorted(index.path(i) for i in range(len(index)))
+        docs = resources[0].directories[0]
+        assert os.path.join(docs, "sub", "deep", "c.txt") in paths
+        assert all(os.path.exists(p) for p in paths)
+        assert sorted(p for r in index.roots for p in index.paths(r.files)) == paths
+
+    def test_totals(self, index):
+        assert index.total_size() == 1130
+        assert [index.total_size(r.files) for r in index.roots] == [130, 1000, 0]
+        assert index.total_size([0, 0]) == 2 * index.sizes[0]
+
+    def test_histogram(self, index):
+        histogram = index.histogram()
+        assert len(histogram) == 11
+        assert histogram[0] == 1
+        assert histogram[4] == 3
+        assert histogram[7] == 1
+        assert histogram[10] == 1
+        assert sum(histogram) == len(index)
+
+    def test_largest(self, index):
+        assert self.files(index, index.largest(2)) == ["a.txt", "b.txt"]
+        assert index.sizes[index.largest(1)[0]] == 1000
+        assert self.files(index, index.largest(1, index.roots[0].files)) == ["b.txt"]
+
+    def test_where(self, index):
+        assert self.files(index, index.where(min_size=10, max_size=100)) == ["a.link", "a.txt", "b.txt", "c.txt"]
+        assert self.files(index, index.where(min_size=11, root=index.roots[0])) == ["b.txt"]
+        assert self.files(index, index.where(modified_after=1_800_000_000_000_000_000)) == ["b.txt"]
+        assert len(index.where()) == len(index)
+
+    def test_same_size(self, index):
+        groups = index.same_size()
+        assert len(groups) == 1
+        assert self.files(index, groups[0]) == ["a.txt", "c.txt"]
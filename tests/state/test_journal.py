@@ -0,0 +1,92 @@
+import os
+from datetime import datetime as dt
+
+from nimbuscli.state import Journal, JournalEntry
+
+
+class TestJournal:
+
+    def test_start(self, tmpdir):
+        filepath = os.path.join(tmpdir, "state", "journal.json")
+        journal = Journal(filepath)
+
+        journal.start(["app*"])
+
+        assert os.path.exists(filepath)
+        assert journal.selectors == ["app*"]
+        assert journal.entries == []
+
+    def test_load_missing(self, tmpdir):
+        journal = Journal(os.path.join(tmpdir, "journal.json"))
+        assert journal.load() is False
+
+    def test_load_malformed(self, tmpdir):
+        filepath = os.path.join(tmpdir, "journal.json")
+        with open(filepath, "w", encoding="utf-8") as file:
+            file.write("{ not a json")
+
+        journal = Journal(filepath)
+
+        assert not journal.load()
+        assert journal.entries == []
+
+    def test_roundtrip(self, tmpdir):
+        filepath = os.path.join(tmpdir, "journal.json")
+        started = dt(2024, 1, 1, 10, 00, 00)
+        completed = dt(2024, 1, 1, 10, 30, 15)
+
+        journal = Journal(filepath)
+        journal.start(["media"])
+        journal.planned("media", "/mnt/music", "/backups/music.tar")
+        journal.archived("media", "/mnt/music", started, completed)
+        journal.uploaded("media", "/mnt/music", "media/music/music.tar", 1024, started, completed)
+        journal.planned("media", "/mnt/video", "/backups/video.tar")
+
+        loaded = Journal(filepath)
+        assert loaded.load()
+        assert loaded.selectors == ["media"]
+        assert len(loaded.entries) == 2
+        assert loaded.entry("media", "/mnt/other") is None
+
+        music = loaded.entry("media", "/mnt/music")
+        assert music.is_archived
+        assert music.is_uploaded
+        assert music.archive == "/backups/music.tar"
+        assert music.archive_started == started
+        assert music.archive_completed == completed
+        assert music.key == "media/music/music.tar"
+        assert music.size == 1024
+        assert music.upload_started == started
+        assert music.upload_completed == completed
+
+        video = loaded.entry("media", "/mnt/video")
+        assert video.state == JournalEntry.PLANNED
+        assert not video.is_archived
+        assert not video.is_uploaded
+        assert video.archive == "/backups/video.tar"
+
+    def test_complete(self, tmpdir):
+        filepath = os.path.join(tmpdir, "journal.json")
+        journal = Journal(filepath)
+        journal.start([])
+        journal.planned("apps", "/mnt/apps", "/backups/apps.tar")
+
+        journal.complete()
+
+        assert not os.path.exists(filepath)
+        assert journal.entries == []
+        assert not Journal(filepath).load()
+
+    def test_start_discards_previous(self, tmpdir):
+        filepath = os.path.join(tmpdir, "journal.json")
+        journal = Journal(filepath)
+        journal.start(["a"])
+        journal.planned("apps", "/mnt/apps", "/backups/apps.tar")
+
+        journal = Journal(filepath)
+        journal.start(["b"])
+
+        loaded = Journal(filepath)
+        assert loaded.load()
+        assert loaded.selectors == ["b"]
+        assert loaded.entries == []
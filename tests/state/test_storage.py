@@ -0,0 +1,25 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from nimbuscli.state.storage import read_json, write_json
+
+
+class TestStorage:
+
+    def test_roundtrip(self, tmpdir):
+        filepath = os.path.join(tmpdir, "state", "data.json")
+        assert read_json(filepath) is None
+
+        write_json(filepath, {"a": 1})
+
+        assert read_json(filepath) == {"a": 1}
+        assert os.listdir(os.path.join(tmpdir, "state")) == ["data.json"]
+
+    def test_concurrent(self, tmpdir):
+        filepath = os.path.join(tmpdir, "data.json")
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda ix: write_json(filepath, {"writer": ix, "data": list(range(1000))}), range(64)))
+
+        # Each writer has its own temporary file, so the last replace always leaves a complete file.
+        assert read_json(filepath)["data"] == list(range(1000))
+        assert os.listdir(tmpdir) == ["data.json"]
@@ -0,0 +1,32 @@
+import os
+
+from nimbuscli.core.upload import MultipartSession
+from nimbuscli.state import MultipartStore
+
+
+class TestMultipartStore:
+
+    def test_roundtrip(self, tmpdir):
+        filepath = os.path.join(tmpdir, "state", "multipart.json")
+        store = MultipartStore(filepath)
+        assert store.get("bucket", "docs/a.tar") is None
+
+        session = MultipartSession("id", "/backups/a.tar", 100, 1, 30)
+        session.parts = {1: '"a"'}
+        store.save("bucket", "docs/a.tar", session)
+        store.save("bucket", "docs/b.tar", MultipartSession("other", "/backups/b.tar", 100, 1, 30))
+        store.remove("bucket", "docs/b.tar")
+
+        loaded = MultipartStore(filepath)
+        assert loaded.get("bucket", "docs/a.tar").to_dict() == session.to_dict()
+        assert loaded.get("bucket", "docs/b.tar") is None
+        assert loaded.get("archive", "docs/a.tar") is None
+
+    def test_malformed(self, tmpdir):
+        filepath = os.path.join(tmpdir, "multipart.json")
+        with open(filepath, "w", encoding="utf-8") as file:
+            file.write("{ not a json")
+
+        store = MultipartStore(filepath)
+
+        assert store.get("bucket", "docs/a.tar") is None